@@ -20,6 +20,7 @@ interface ExtractedField {
   name: string;
   type: 'text' | 'date' | 'amount' | 'number' | 'unknown';
   sampleValues: string[];
+  format?: string;
 }
 
 interface FieldMapperProps {
@@ -64,9 +65,11 @@ export function FieldMapper({ extractedFields, mappings, onChange }: FieldMapper
     if (systemField && systemField !== 'ignore') {
       newMappings[systemField] = { source: `col_${columnIndex}` };
 
-      // Add format hint for date fields
+      // Add format hint: prefer the format learned during extraction
       const column = columns.find(c => c.index === columnIndex);
-      if ((systemField === 'date' || systemField === 'valueDate') && column?.type === 'date') {
+      if (column?.format) {
+        newMappings[systemField].format = column.format;
+      } else if ((systemField === 'date' || systemField === 'valueDate') && column?.type === 'date') {
         const sampleDate = column.sampleValues[0];
         if (sampleDate) {
           // Detect format
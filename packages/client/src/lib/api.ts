@@ -188,7 +188,8 @@ export const uploadsApi = {
       headers: { 'Content-Type': 'multipart/form-data' },
     }).then((r) => r.data);
   },
-  confirmBankStatement: (uploadId: string, accountId: string, transactions: any[]) =>
+  // transactions is omitted for partial PDF previews; the server finishes the parse on confirm
+  confirmBankStatement: (uploadId: string, accountId: string, transactions?: any[]) =>
     api.post('/uploads/bank-statement/confirm', { uploadId, accountId, transactions }).then((r) => r.data),
   previewVyapar: (file: File) => {
     const formData = new FormData();
@@ -46,6 +46,7 @@ export interface LearningSession {
       name: string;
       type: 'text' | 'date' | 'amount' | 'number' | 'unknown';
       sampleValues: string[];
+      format?: string;
     }[];
     sampleRows: any[][];
     rowCount: number;
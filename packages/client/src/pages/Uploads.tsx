@@ -950,7 +950,11 @@ export function Uploads() {
               ) : (
                 <div className="flex items-center justify-between rounded-lg bg-muted p-4">
                   <span>{uploadType === 'etrade_portfolio' ? 'Total Holdings' : 'Total Transactions'}</span>
-                  <Badge>{uploadType === 'etrade_portfolio' ? previewData.holdingsCount : previewData.transactionCount}</Badge>
+                  <Badge>
+                    {uploadType === 'etrade_portfolio'
+                      ? previewData.holdingsCount
+                      : previewData.isPartial ? `${previewData.transactionCount}+` : previewData.transactionCount}
+                  </Badge>
                 </div>
               )}
 
@@ -1027,6 +1031,13 @@ export function Uploads() {
                 </div>
               )}
 
+              {previewData.isPartial && (
+                <p className="text-center text-sm text-muted-foreground">
+                  Showing the first {previewData.transactionCount} transactions ({previewData.pagesParsed} of {previewData.pageCount} pages read).
+                  The rest of the statement is parsed when you import.
+                </p>
+              )}
+
               {uploadType !== 'home_loan_statement' && ((uploadType === 'etrade_portfolio' && previewData.holdingsCount > 10) ||
                 (uploadType !== 'etrade_portfolio' && previewData.transactionCount > 10)) && (
                 <p className="text-center text-sm text-muted-foreground">
@@ -1051,7 +1062,9 @@ export function Uploads() {
                       ? `Import ${previewData?.holdingsCount} Mutual Fund Holdings`
                       : uploadType === 'vyapar_report' && previewData?.itemDetails?.count > 0
                         ? `Import ${previewData?.transactionCount} Transactions + ${previewData.itemDetails.count} Items`
-                        : `Import ${previewData?.transactionCount} Transactions`}
+                        : previewData?.isPartial
+                          ? 'Import All Transactions'
+                          : `Import ${previewData?.transactionCount} Transactions`}
             </Button>
           </DialogFooter>
         </DialogContent>
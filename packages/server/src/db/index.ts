@@ -3,6 +3,7 @@ import { drizzle } from 'drizzle-orm/better-sqlite3';
 import { v4 as uuidv4 } from 'uuid';
 import path from 'path';
 import { fileURLToPath } from 'url';
+import { isMainThread, workerData } from 'worker_threads';
 
 import * as usersSchema from './schema/users.js';
 import * as accountsSchema from './schema/accounts.js';
@@ -26,6 +27,8 @@ import * as enrichmentRulesSchema from './schema/enrichment-rules.js';
 import * as reconciliationRulesSchema from './schema/reconciliation-rules.js';
 import * as gearupTeamSchema from './schema/gearup-team.js';
 import * as personalTeamSchema from './schema/personal-team.js';
+import * as rollupsSchema from './schema/rollups.js';
+import * as marketDataSchema from './schema/market-data.js';
 
 const __dirname = path.dirname(fileURLToPath(import.meta.url));
 
@@ -39,8 +42,27 @@ if (!fs.existsSync(dataDir)) {
   fs.mkdirSync(dataDir, { recursive: true });
 }
 
-const sqlite: DatabaseType = new Database(dbPath);
-sqlite.pragma('journal_mode = WAL');
+// Read-pool workers (services/read-pool.ts) get a read-only connection, so
+// anything they run can't write; the main thread keeps the only writer
+const isReadWorker = !isMainThread && workerData?.readOnlyDatabase === true;
+
+const sqlite: DatabaseType = isReadWorker
+  ? new Database(dbPath, { readonly: true, fileMustExist: true })
+  : new Database(dbPath);
+if (!isReadWorker) {
+  sqlite.pragma('journal_mode = WAL');
+}
+
+/**
+ * Separate read-only connection for long reads such as streamed exports.
+ * While a statement iterator is open its connection refuses writes, so
+ * iterating on the shared connection would block every other request's
+ * writes until it finished. Under WAL this one reads a snapshot alongside
+ * the writer. Close it after use.
+ */
+export function openReadOnlyConnection(): DatabaseType {
+  return new Database(dbPath, { readonly: true, fileMustExist: true });
+}
 
 export const db = drizzle(sqlite, {
   schema: {
@@ -66,9 +88,168 @@ export const db = drizzle(sqlite, {
     ...reconciliationRulesSchema,
     ...gearupTeamSchema,
     ...personalTeamSchema,
+    ...rollupsSchema,
+    ...marketDataSchema,
   },
 });
 
+// Transaction tables summed into monthly_rollups, with the columns that key them
+const ROLLUP_SOURCES = [
+  { source: 'bank', table: 'bank_transactions', account: 'account_id', category: 'category_id' },
+  { source: 'vyapar', table: 'vyapar_transactions', account: null, category: 'category_name' },
+];
+
+type RollupSource = typeof ROLLUP_SOURCES[number];
+
+// Rollup key columns for a row (NEW or OLD in a trigger, or the table itself)
+function rollupKey(row: string, { source, account, category }: RollupSource) {
+  return {
+    source: `'${source}'`,
+    user_id: `COALESCE(${row}.user_id, '')`,
+    account_id: account ? `COALESCE(${row}.${account}, '')` : `''`,
+    month: `substr(${row}.date, 1, 7)`,
+    category_id: `COALESCE(${row}.${category}, '')`,
+    transaction_type: `${row}.transaction_type`,
+  };
+}
+
+function rollupAdd(spec: RollupSource) {
+  const key = rollupKey('NEW', spec);
+  return `
+    INSERT INTO monthly_rollups (${Object.keys(key).join(', ')}, total, count)
+    VALUES (${Object.values(key).join(', ')}, NEW.amount, 1)
+    ON CONFLICT (${Object.keys(key).join(', ')})
+    DO UPDATE SET total = ROUND(total + excluded.total, 2), count = count + 1;`;
+}
+
+function rollupRemove(spec: RollupSource) {
+  const match = Object.entries(rollupKey('OLD', spec)).map(([column, value]) => `${column} = ${value}`).join(' AND ');
+  return `
+    UPDATE monthly_rollups SET total = ROUND(total - OLD.amount, 2), count = count - 1 WHERE ${match};
+    DELETE FROM monthly_rollups WHERE ${match} AND count <= 0;`;
+}
+
+/**
+ * Rebuild monthly_rollups from the transaction tables
+ */
+export function rebuildMonthlyRollups() {
+  sqlite.transaction(() => {
+    sqlite.exec('DELETE FROM monthly_rollups');
+    for (const spec of ROLLUP_SOURCES) {
+      const key = rollupKey(spec.table, spec);
+      sqlite.exec(`
+        INSERT INTO monthly_rollups (${Object.keys(key).join(', ')}, total, count)
+        SELECT ${Object.values(key).join(', ')}, ROUND(SUM(amount), 2), COUNT(*)
+        FROM ${spec.table}
+        GROUP BY ${Object.values(key).slice(1).join(', ')}
+      `);
+    }
+  })();
+}
+
+// Monthly sums per user, account, category and type, kept current by triggers
+// so imports, categorization and deletes from any route update them
+function initializeMonthlyRollups() {
+  const exists = sqlite.prepare("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'monthly_rollups'").get();
+
+  sqlite.exec(`
+    CREATE TABLE IF NOT EXISTS monthly_rollups (
+      source TEXT NOT NULL,
+      user_id TEXT NOT NULL,
+      account_id TEXT NOT NULL,
+      month TEXT NOT NULL,
+      category_id TEXT NOT NULL,
+      transaction_type TEXT NOT NULL,
+      total REAL NOT NULL DEFAULT 0,
+      count INTEGER NOT NULL DEFAULT 0,
+      PRIMARY KEY (source, user_id, account_id, month, category_id, transaction_type)
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_monthly_rollups_user_month ON monthly_rollups(source, user_id, month);
+  `);
+
+  for (const spec of ROLLUP_SOURCES) {
+    const columns = ['user_id', 'date', spec.category, 'transaction_type', 'amount', ...(spec.account ? [spec.account] : [])];
+    const changed = columns.map(c => `OLD.${c} IS NOT NEW.${c}`).join(' OR ');
+    sqlite.exec(`
+      CREATE TRIGGER IF NOT EXISTS ${spec.table}_rollup_insert AFTER INSERT ON ${spec.table}
+      BEGIN ${rollupAdd(spec)}
+      END;
+
+      CREATE TRIGGER IF NOT EXISTS ${spec.table}_rollup_delete AFTER DELETE ON ${spec.table}
+      BEGIN ${rollupRemove(spec)}
+      END;
+
+      CREATE TRIGGER IF NOT EXISTS ${spec.table}_rollup_update AFTER UPDATE OF ${columns.join(', ')} ON ${spec.table}
+      WHEN ${changed}
+      BEGIN ${rollupRemove(spec)}${rollupAdd(spec)}
+      END;
+    `);
+  }
+
+  if (!exists) {
+    rebuildMonthlyRollups();
+    console.log('Migration: Built monthly_rollups from existing transactions');
+  }
+}
+
+// Full-text search indexes over transaction text (see services/transaction-search.ts).
+// External-content FTS5 tables keyed by rowid: they store only the index, and
+// triggers keep them in sync. VACUUM may renumber these tables' rowids, so run
+// rebuildSearchIndexes() after one.
+export const SEARCH_INDEXES = [
+  { table: 'bank_transactions', fts: 'bank_transactions_fts', columns: ['narration'] },
+  { table: 'vyapar_transactions', fts: 'vyapar_transactions_fts', columns: ['party_name', 'invoice_number', 'description'] },
+  { table: 'credit_card_transactions', fts: 'credit_card_transactions_fts', columns: ['description'] },
+];
+
+/**
+ * Rebuild the full-text search indexes from the transaction tables
+ */
+export function rebuildSearchIndexes() {
+  for (const { fts } of SEARCH_INDEXES) {
+    sqlite.exec(`INSERT INTO ${fts}(${fts}) VALUES ('rebuild')`);
+  }
+}
+
+function initializeSearchIndexes() {
+  let created = false;
+
+  for (const { table, fts, columns } of SEARCH_INDEXES) {
+    const exists = sqlite.prepare("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?").get(fts);
+    const values = (row: string) => columns.map(c => `${row}.${c}`).join(', ');
+
+    // Trigram tokens match any substring of 3+ characters, like the LIKE '%term%' filters they replace
+    sqlite.exec(`
+      CREATE VIRTUAL TABLE IF NOT EXISTS ${fts} USING fts5(
+        ${columns.join(', ')}, content = '${table}', content_rowid = 'rowid', tokenize = 'trigram'
+      );
+
+      CREATE TRIGGER IF NOT EXISTS ${fts}_insert AFTER INSERT ON ${table} BEGIN
+        INSERT INTO ${fts}(rowid, ${columns.join(', ')}) VALUES (NEW.rowid, ${values('NEW')});
+      END;
+
+      CREATE TRIGGER IF NOT EXISTS ${fts}_delete AFTER DELETE ON ${table} BEGIN
+        INSERT INTO ${fts}(${fts}, rowid, ${columns.join(', ')}) VALUES ('delete', OLD.rowid, ${values('OLD')});
+      END;
+
+      CREATE TRIGGER IF NOT EXISTS ${fts}_update AFTER UPDATE OF ${columns.join(', ')} ON ${table} BEGIN
+        INSERT INTO ${fts}(${fts}, rowid, ${columns.join(', ')}) VALUES ('delete', OLD.rowid, ${values('OLD')});
+        INSERT INTO ${fts}(rowid, ${columns.join(', ')}) VALUES (NEW.rowid, ${values('NEW')});
+      END;
+    `);
+
+    if (!exists) {
+      sqlite.exec(`INSERT INTO ${fts}(${fts}) VALUES ('rebuild')`);
+      created = true;
+    }
+  }
+
+  if (created) {
+    console.log('Migration: Built full-text search indexes for transactions');
+  }
+}
+
 // Initialize tables
 export function initializeDatabase() {
   sqlite.exec(`
@@ -379,7 +560,6 @@ export function initializeDatabase() {
       created_at TEXT NOT NULL
     );
 
-    CREATE INDEX IF NOT EXISTS idx_bank_transactions_account ON bank_transactions(account_id);
     CREATE INDEX IF NOT EXISTS idx_bank_transactions_date ON bank_transactions(date);
     CREATE INDEX IF NOT EXISTS idx_bank_transactions_reconciled ON bank_transactions(is_reconciled);
     CREATE INDEX IF NOT EXISTS idx_vyapar_transactions_date ON vyapar_transactions(date);
@@ -728,6 +908,13 @@ export function initializeDatabase() {
     CREATE INDEX IF NOT EXISTS idx_portfolio_snapshots_user_date ON portfolio_snapshots(user_id, snapshot_date);
     CREATE INDEX IF NOT EXISTS idx_portfolio_snapshots_date ON portfolio_snapshots(snapshot_date);
 
+    -- Last-known FX rates and stock prices
+    CREATE TABLE IF NOT EXISTS market_data_cache (
+      key TEXT PRIMARY KEY,
+      value TEXT NOT NULL,
+      fetched_at INTEGER NOT NULL
+    );
+
     -- Learned statement templates
     CREATE TABLE IF NOT EXISTS learned_templates (
       id TEXT PRIMARY KEY,
@@ -1001,6 +1188,22 @@ export function initializeDatabase() {
     }
   }
 
+  // Add decoded narration fields (UPI/NEFT/IMPS/RTGS), filled in by the statement parsers
+  const narrationFieldMigrations = [
+    'ALTER TABLE bank_transactions ADD COLUMN channel TEXT',
+    'ALTER TABLE bank_transactions ADD COLUMN counterparty_name TEXT',
+    'ALTER TABLE bank_transactions ADD COLUMN counterparty_account TEXT',
+    'ALTER TABLE bank_transactions ADD COLUMN bank_reference TEXT',
+    'ALTER TABLE bank_transactions ADD COLUMN narration_remark TEXT',
+  ];
+  for (const migration of narrationFieldMigrations) {
+    try {
+      sqlite.exec(migration);
+    } catch (e) {
+      // Column already exists, ignore
+    }
+  }
+
   // Set purpose = 'business' for all already reconciled bank transactions
   sqlite.exec(`
     UPDATE bank_transactions
@@ -1232,6 +1435,32 @@ export function initializeDatabase() {
     }
   }
 
+  // Migration: composite indexes for the per-user query shapes of the transaction
+  // tables (list pages, date-range totals, account lookups, unreconciled counts).
+  // scripts/query-benchmark.ts fails if one of those queries scans a table.
+  const transactionQueryIndexes = [
+    // Date-range totals by type and category are answered from the index alone
+    'CREATE INDEX IF NOT EXISTS idx_bank_transactions_user_date ON bank_transactions(user_id, date, transaction_type, category_id, amount)',
+    'CREATE INDEX IF NOT EXISTS idx_bank_transactions_user_account_date ON bank_transactions(user_id, account_id, date)',
+    'CREATE INDEX IF NOT EXISTS idx_bank_transactions_user_reconciled ON bank_transactions(user_id, is_reconciled)',
+    // Duplicate checks and the import watermark (latest row of an account)
+    'CREATE INDEX IF NOT EXISTS idx_bank_transactions_account_date ON bank_transactions(account_id, date)',
+    'DROP INDEX IF EXISTS idx_bank_transactions_account',
+    'CREATE INDEX IF NOT EXISTS idx_bank_transactions_reconciled_with ON bank_transactions(reconciled_with_id)',
+    'CREATE INDEX IF NOT EXISTS idx_vyapar_transactions_user_date ON vyapar_transactions(user_id, date, transaction_type, category_name, amount)',
+    'CREATE INDEX IF NOT EXISTS idx_vyapar_transactions_user_reconciled ON vyapar_transactions(user_id, is_reconciled)',
+    'CREATE INDEX IF NOT EXISTS idx_vyapar_transactions_reconciled_with ON vyapar_transactions(reconciled_with_id)',
+    'CREATE INDEX IF NOT EXISTS idx_credit_card_transactions_user_date ON credit_card_transactions(user_id, date)',
+    'CREATE INDEX IF NOT EXISTS idx_credit_card_transactions_user_account_date ON credit_card_transactions(user_id, account_id, date)',
+  ];
+  for (const idx of transactionQueryIndexes) {
+    try {
+      sqlite.exec(idx);
+    } catch (e) {
+      console.error(`Migration failed: ${idx}`, e);
+    }
+  }
+
   // Migration: Add source column to credit_card_transactions for tracking Gmail vs Statement
   try {
     sqlite.exec("ALTER TABLE credit_card_transactions ADD COLUMN source TEXT DEFAULT 'statement'");
@@ -1251,6 +1480,9 @@ export function initializeDatabase() {
     // Ignore errors
   }
 
+  initializeMonthlyRollups();
+  initializeSearchIndexes();
+
   // Seed default categories if none exist
   const categoryCount = sqlite.prepare('SELECT COUNT(*) as count FROM categories').get() as { count: number };
   if (categoryCount.count === 0) {
@@ -1292,6 +1524,8 @@ export * from './schema/enrichment-rules.js';
 export * from './schema/reconciliation-rules.js';
 export * from './schema/gearup-team.js';
 export * from './schema/personal-team.js';
+export * from './schema/rollups.js';
+export * from './schema/market-data.js';
 
 // Export sqlite for direct queries
 export { sqlite };
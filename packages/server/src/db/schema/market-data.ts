@@ -0,0 +1,11 @@
+import { sqliteTable, text, integer } from 'drizzle-orm/sqlite-core';
+
+// Last-known FX rates and stock prices (see services/market-data.ts), so
+// portfolio pages can be served without waiting on upstream APIs
+export const marketDataCache = sqliteTable('market_data_cache', {
+  key: text('key').primaryKey(), // e.g. fx:USD-INR, prices:AAPL:30
+  value: text('value').notNull(), // JSON
+  fetchedAt: integer('fetched_at').notNull(), // epoch ms
+});
+
+export type MarketDataCacheEntry = typeof marketDataCache.$inferSelect;
@@ -0,0 +1,21 @@
+import { sqliteTable, text, real, integer, primaryKey } from 'drizzle-orm/sqlite-core';
+
+// Monthly sums of bank and Vyapar transactions for dashboards and reports.
+// Maintained by triggers on bank_transactions and vyapar_transactions (see db/index.ts).
+// Key columns are '' rather than NULL so the upserts in the triggers match.
+export const monthlyRollups = sqliteTable('monthly_rollups', {
+  source: text('source').notNull(), // bank, vyapar
+  userId: text('user_id').notNull(),
+  accountId: text('account_id').notNull(), // '' for vyapar
+  month: text('month').notNull(), // yyyy-MM
+  categoryId: text('category_id').notNull(), // bank: category id, vyapar: category name
+  transactionType: text('transaction_type').notNull(),
+  total: real('total').notNull(),
+  count: integer('count').notNull(),
+}, (table) => ({
+  pk: primaryKey({
+    columns: [table.source, table.userId, table.accountId, table.month, table.categoryId, table.transactionType],
+  }),
+}));
+
+export type MonthlyRollup = typeof monthlyRollups.$inferSelect;
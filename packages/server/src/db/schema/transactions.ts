@@ -30,6 +30,12 @@ export const bankTransactions = sqliteTable('bank_transactions', {
   gstType: text('gst_type'), // 'input' (purchases) or 'output' (sales)
   purpose: text('purpose'), // 'business', 'personal', or null (null = business)
   updatedByEmail: text('updated_by_email'), // Email of user who last updated (for team tracking)
+  // Payment details decoded from the narration by the statement parsers
+  channel: text('channel'), // UPI, NEFT, IMPS, RTGS
+  counterpartyName: text('counterparty_name'),
+  counterpartyAccount: text('counterparty_account'), // VPA or (masked) account number
+  bankReference: text('bank_reference'), // RRN / UTR
+  narrationRemark: text('narration_remark'),
   createdAt: text('created_at').notNull(),
   updatedAt: text('updated_at').notNull(),
 });
@@ -3,16 +3,11 @@
  */
 
 import * as XLSX from 'xlsx';
-import { execSync } from 'child_process';
-import * as path from 'path';
-import * as fs from 'fs';
-import * as os from 'os';
-import { fileURLToPath } from 'url';
 import { db, learnedTemplates } from '../db/index.js';
-import { eq, and } from 'drizzle-orm';
-
-const __filename = fileURLToPath(import.meta.url);
-const __dirname = path.dirname(__filename);
+import { eq, and, inArray } from 'drizzle-orm';
+import { matchTemplates } from './template-index.js';
+import { fingerprintPDF, recordLayoutRoute, LayoutRoute } from './layout-fingerprint.js';
+import { runStatementParser } from './statement-parser-runner.js';
 
 export interface DetectionResult {
   fileType: 'bank_statement' | 'vyapar_report' | 'credit_card' | 'credit_card_infinia' | 'etrade_portfolio' | 'cams_statement' | 'home_loan_statement' | 'learned_template' | 'unknown';
@@ -63,49 +58,8 @@ async function checkLearnedTemplates(
       }
     }
 
-    let bestMatch: { template: any; score: number } | null = null;
-
-    for (const template of templates) {
-      const patterns = JSON.parse(template.detectionPatterns || '{}');
-      let score = 0;
-
-      // Check text patterns
-      if (textContent && patterns.textPatterns) {
-        const contentLower = textContent.toLowerCase();
-        for (const pattern of patterns.textPatterns) {
-          if (contentLower.includes(pattern.toLowerCase())) {
-            score += 10;
-          }
-        }
-      }
-
-      // Check filename patterns
-      if (patterns.filenamePatterns) {
-        const filenameLower = filename.toLowerCase();
-        for (const pattern of patterns.filenamePatterns) {
-          if (filenameLower.includes(pattern.toLowerCase())) {
-            score += 5;
-          }
-          try {
-            const regex = new RegExp(pattern, 'i');
-            if (regex.test(filename)) {
-              score += 8;
-            }
-          } catch {
-            // Invalid regex, skip
-          }
-        }
-      }
-
-      // Check file type matches
-      if (template.fileType === ext) {
-        score += 3;
-      }
-
-      if (score > 0 && (!bestMatch || score > bestMatch.score)) {
-        bestMatch = { template, score };
-      }
-    }
+    // Text, filename and file type checks in one pass over the compiled template index
+    const [bestMatch] = matchTemplates(userId, templates, { content: textContent, filename, fileType: ext });
 
     if (bestMatch && bestMatch.score >= 10) {
       const confidence = bestMatch.score >= 20 ? 'high' : bestMatch.score >= 10 ? 'medium' : 'low';
@@ -126,6 +80,46 @@ async function checkLearnedTemplates(
   }
 }
 
+/**
+ * Route a PDF whose layout fingerprint is already known, without scoring its text.
+ * Learned templates must still belong to the user and be active.
+ */
+async function routeKnownLayout(route: LayoutRoute, userId?: string): Promise<DetectionResult | null> {
+  const templateIds = Object.keys(route.templates || {});
+  if (userId && templateIds.length > 0) {
+    const templates = await db
+      .select()
+      .from(learnedTemplates)
+      .where(and(
+        eq(learnedTemplates.userId, userId),
+        eq(learnedTemplates.isActive, 1),
+        inArray(learnedTemplates.id, templateIds)
+      ));
+
+    if (templates.length > 0) {
+      return {
+        fileType: 'learned_template',
+        bankName: templates[0].institution,
+        confidence: 'high',
+        details: `Matched learned template by layout: ${templates[0].name}`,
+        learnedTemplateId: templates[0].id,
+        learnedTemplateName: templates[0].name,
+      };
+    }
+  }
+
+  if (route.fileType) {
+    return {
+      fileType: route.fileType as DetectionResult['fileType'],
+      bankName: route.bank ?? null,
+      confidence: 'high',
+      details: `${route.bank ? route.bank.toUpperCase() : 'Statement'} layout recognised from an earlier upload`,
+    };
+  }
+
+  return null;
+}
+
 /**
  * Detect the type of file and bank from the content
  * @param password - Optional password for encrypted PDFs
@@ -139,12 +133,26 @@ export async function detectFileType(
   userId?: string
 ): Promise<DetectionResult> {
   const ext = filename.toLowerCase().split('.').pop();
+  const isPDF = ext === 'pdf' || mimeType === 'application/pdf';
+
+  // PDFs with a known layout fingerprint (and a header naming its bank) skip text-based detection
+  const layout = isPDF ? await fingerprintPDF(buffer, password, userId) : null;
+  if (layout?.route) {
+    const routed = await routeKnownLayout(layout.route, userId);
+    if (routed) {
+      console.log('[Detection] Routed by layout fingerprint:', layout.fingerprint);
+      return routed;
+    }
+  }
 
   // Check learned templates first (if userId provided)
   if (userId) {
     const learnedMatch = await checkLearnedTemplates(buffer, filename, userId);
     if (learnedMatch) {
       console.log('[Detection] Matched learned template:', learnedMatch.learnedTemplateName);
+      if (layout && learnedMatch.learnedTemplateId) {
+        recordLayoutRoute(layout.fingerprint, { templateId: learnedMatch.learnedTemplateId }, userId);
+      }
       return learnedMatch;
     }
   }
@@ -163,7 +171,7 @@ export async function detectFileType(
   }
 
   // Check for PDF (bank statements, CAMS, home loans)
-  if (ext === 'pdf' || mimeType === 'application/pdf') {
+  if (isPDF) {
     // Check filename patterns first for CAMS statements (often password protected)
     if (detectCAMSFromFilename(filename)) {
       return {
@@ -174,7 +182,13 @@ export async function detectFileType(
         needsPassword: true,
       };
     }
-    return detectPDFType(buffer, filename, password);
+
+    const result = await detectPDFType(buffer, filename, password, userId);
+    // Password-protected PDFs go through the Python detector, which records its own result
+    if (layout && !password && result.confidence === 'high' && result.fileType !== 'unknown' && !result.needsPassword) {
+      recordLayoutRoute(layout.fingerprint, { bank: result.bankName, fileType: result.fileType }, userId);
+    }
+    return result;
   }
 
   // Check for Excel files
@@ -209,20 +223,9 @@ function detectCAMSFromFilename(filename: string): boolean {
 /**
  * Use Python pdfplumber to detect bank from password-protected PDFs
  */
-async function detectWithPython(buffer: Buffer, password?: string): Promise<DetectionResult | null> {
-  const tempDir = os.tmpdir();
-  const tempFile = path.join(tempDir, `detect-${Date.now()}.pdf`);
-
+async function detectWithPython(buffer: Buffer, password?: string, userId?: string): Promise<DetectionResult | null> {
   try {
-    // Write buffer to temp file
-    fs.writeFileSync(tempFile, buffer);
-
-    const scriptPath = path.join(__dirname, 'pdf_detector.py');
-    const args = password ? `"${tempFile}" "${password}"` : `"${tempFile}"`;
-    const result = execSync(`python3 "${scriptPath}" ${args}`, {
-      encoding: 'utf-8',
-      maxBuffer: 10 * 1024 * 1024,
-    });
+    const result = await runStatementParser('detect', buffer, { password, user: userId });
 
     const parsed = JSON.parse(result.trim());
 
@@ -250,23 +253,16 @@ async function detectWithPython(buffer: Buffer, password?: string): Promise<Dete
     console.error('[PDF Detection] Python detector error:', error?.message);
     console.error('[PDF Detection] Python stderr:', error?.stderr);
     return null;
-  } finally {
-    // Clean up temp file
-    try {
-      if (fs.existsSync(tempFile)) {
-        fs.unlinkSync(tempFile);
-      }
-    } catch {}
   }
 }
 
-async function detectPDFType(buffer: Buffer, filename?: string, password?: string): Promise<DetectionResult> {
+async function detectPDFType(buffer: Buffer, filename?: string, password?: string, userId?: string): Promise<DetectionResult> {
   console.log('[PDF Detection] Starting detection for:', filename, 'hasPassword:', !!password);
 
   // For password-protected PDFs, use Python detector (pdfplumber handles passwords correctly)
   if (password) {
     console.log('[PDF Detection] Using Python detector for password-protected PDF');
-    const pythonResult = await detectWithPython(buffer, password);
+    const pythonResult = await detectWithPython(buffer, password, userId);
     if (pythonResult) {
       console.log('[PDF Detection] Python result:', JSON.stringify(pythonResult));
       return pythonResult;
@@ -1,10 +1,7 @@
-import { execSync } from 'child_process';
-import path from 'path';
-import { fileURLToPath } from 'url';
 import { v4 as uuidv4 } from 'uuid';
 import type { NewBankTransaction } from '../db/index.js';
-
-const __dirname = path.dirname(fileURLToPath(import.meta.url));
+import { NarrationFields, narrationColumns } from './narration-fields.js';
+import { runStatementParserJSON, projectPython } from './statement-parser-runner.js';
 
 export interface ParsedHDFCTransaction {
   date: string;
@@ -14,6 +11,8 @@ export interface ParsedHDFCTransaction {
   amount: number;
   transactionType: 'credit' | 'debit';
   balance: number | null;
+  narrationFields?: NarrationFields | null; // Decoded UPI/NEFT/IMPS/RTGS details
+  suggestedCategory?: string | null; // Built-in category rule match (category name)
 }
 
 export interface HDFCAccountMetadata {
@@ -43,79 +42,137 @@ export interface HDFCStatementData {
   actualBalance: number;
 }
 
+export interface HDFCStatementPreview {
+  metadata: HDFCAccountMetadata;
+  transactions: ParsedHDFCTransaction[];
+  complete: boolean; // True when the preview holds every transaction (all pages, none cut by the limit)
+  pagesParsed: number;
+  pageCount: number;
+}
+
 /**
- * Parse HDFC PDF statement and return full data including metadata
- * @param password - Optional password for encrypted PDFs
+ * Date and balance after the last transaction already imported for an account.
+ * Lets the parser skip the pages of an overlapping statement that end before it.
  */
-export async function parseHDFCPDFStatementFull(buffer: Buffer, password?: string): Promise<HDFCStatementData> {
-  const fs = await import('fs');
-  const os = await import('os');
-  const tempFile = path.join(os.tmpdir(), `hdfc-pdf-${Date.now()}.pdf`);
-
-  try {
-    fs.writeFileSync(tempFile, buffer);
-
-    const pythonScript = path.join(__dirname, 'hdfc_pdf_parser.py');
-    const venvPython = path.join(process.cwd(), '..', '..', '.venv', 'bin', 'python3');
-    const pythonCmd = fs.existsSync(venvPython) ? venvPython : 'python3';
-
-    // Pass password as second argument if provided
-    const passwordArg = password ? ` "${password}"` : '';
-    const result = execSync(`${pythonCmd} "${pythonScript}" "${tempFile}"${passwordArg}`, {
-      encoding: 'utf-8',
-      maxBuffer: 50 * 1024 * 1024, // 50MB buffer for large statements
-      timeout: 120000, // 2 minutes for large PDFs
-    });
-
-    const parsed = JSON.parse(result);
-
-    if (parsed.success) {
-      console.log(`Parsed ${parsed.count} HDFC PDF transactions`);
-
-      const transactions = (parsed.transactions || [])
-        .filter((t: any) => t.date) // Filter out transactions with null dates
-        .map((t: any) => ({
-          date: t.date,
-          valueDate: t.valueDate || null,
-          description: t.description || '',
-          reference: t.reference || null,
-          amount: t.amount,
-          transactionType: t.transactionType as 'credit' | 'debit',
-          balance: t.balance,
-        }));
-
-      return {
-        metadata: {
-          accountNumber: parsed.metadata?.accountNumber || null,
-          accountType: parsed.metadata?.accountType || null,
-          accountStatus: parsed.metadata?.accountStatus || null,
-          accountHolderName: parsed.metadata?.accountHolderName || null,
-          address: parsed.metadata?.address || null,
-          bankName: 'HDFC Bank',
-          branch: parsed.metadata?.branch || null,
-          ifscCode: parsed.metadata?.ifscCode || null,
-          micrCode: parsed.metadata?.micrCode || null,
-          currency: parsed.metadata?.currency || 'INR',
-          customerId: parsed.metadata?.customerId || null,
-          email: parsed.metadata?.email || null,
-          statementPeriod: {
-            from: parsed.metadata?.statementPeriod?.from || null,
-            to: parsed.metadata?.statementPeriod?.to || null,
-          },
-          openingBalance: parsed.metadata?.openingBalance || null,
-          closingBalance: parsed.metadata?.closingBalance || null,
-        },
-        transactions,
-        actualBalance: parsed.metadata?.closingBalance || 0,
-      };
-    }
+export interface StatementWatermark {
+  date: string;
+  balance: number | null;
+}
 
+/**
+ * Run the statement_parsers hdfc command on a buffer and return its parsed JSON output
+ */
+async function runHDFCParser(buffer: Buffer, password?: string, extraArgs: string[] = []): Promise<any> {
+  const parsed = await runStatementParserJSON('hdfc', buffer, { password }, {
+    args: extraArgs,
+    python: projectPython(),
+    maxBuffer: 50 * 1024 * 1024, // 50MB buffer for large statements
+    timeout: 120000, // 2 minutes for large PDFs
+  });
+
+  // Scanned statements fail here with the pages that need OCR (parsed.ocrPages)
+  if (!parsed.success) {
     throw new Error(parsed.error || 'Unknown parsing error');
-  } finally {
-    try {
-      fs.unlinkSync(tempFile);
-    } catch {}
   }
+  return parsed;
+}
+
+function toHDFCTransactions(parsed: any): ParsedHDFCTransaction[] {
+  return (parsed.transactions || [])
+    .filter((t: any) => t.date) // Filter out transactions with null dates
+    .map((t: any) => ({
+      date: t.date,
+      valueDate: t.valueDate || null,
+      description: t.description || '',
+      reference: t.reference || null,
+      amount: t.amount,
+      transactionType: t.transactionType as 'credit' | 'debit',
+      balance: t.balance,
+      narrationFields: t.narrationFields || null,
+      suggestedCategory: t.suggestedCategory || null,
+    }));
+}
+
+function toHDFCMetadata(parsed: any): HDFCAccountMetadata {
+  return {
+    accountNumber: parsed.metadata?.accountNumber || null,
+    accountType: parsed.metadata?.accountType || null,
+    accountStatus: parsed.metadata?.accountStatus || null,
+    accountHolderName: parsed.metadata?.accountHolderName || null,
+    address: parsed.metadata?.address || null,
+    bankName: 'HDFC Bank',
+    branch: parsed.metadata?.branch || null,
+    ifscCode: parsed.metadata?.ifscCode || null,
+    micrCode: parsed.metadata?.micrCode || null,
+    currency: parsed.metadata?.currency || 'INR',
+    customerId: parsed.metadata?.customerId || null,
+    email: parsed.metadata?.email || null,
+    statementPeriod: {
+      from: parsed.metadata?.statementPeriod?.from || null,
+      to: parsed.metadata?.statementPeriod?.to || null,
+    },
+    openingBalance: parsed.metadata?.openingBalance || null,
+    closingBalance: parsed.metadata?.closingBalance || null,
+  };
+}
+
+/**
+ * Parse HDFC PDF statement and return full data including metadata
+ * @param password - Optional password for encrypted PDFs
+ * @param watermark - Last import for the account; only rows after it are returned
+ */
+export async function parseHDFCPDFStatementFull(
+  buffer: Buffer,
+  password?: string,
+  watermark?: StatementWatermark | null
+): Promise<HDFCStatementData> {
+  const args = watermark
+    ? ['--since', watermark.date, ...(watermark.balance != null ? ['--since-balance', String(watermark.balance)] : [])]
+    : [];
+  const parsed = await runHDFCParser(buffer, password, args);
+  console.log(`Parsed ${parsed.count} HDFC PDF transactions`);
+  if (parsed.watermark) {
+    const w = parsed.watermark;
+    console.log(w.applied
+      ? `[HDFC PDF] Watermark ${w.since}: skipped ${w.pagesSkipped} pages, parsed ${w.pagesParsed}`
+      : `[HDFC PDF] Watermark ${w.since} not continuous with the statement, parsed all pages`);
+  }
+
+  return {
+    metadata: toHDFCMetadata(parsed),
+    transactions: toHDFCTransactions(parsed),
+    actualBalance: parsed.metadata?.closingBalance || 0,
+  };
+}
+
+/**
+ * Parse only the pages needed for the first `limit` transactions plus header metadata.
+ * Closing balance is not available in a preview.
+ */
+export async function previewHDFCPDFStatement(
+  buffer: Buffer,
+  password?: string,
+  limit = 10
+): Promise<HDFCStatementPreview> {
+  const parsed = await runHDFCParser(buffer, password, ['--preview', String(limit)]);
+
+  return {
+    metadata: toHDFCMetadata(parsed),
+    transactions: toHDFCTransactions(parsed),
+    complete: !!parsed.complete,
+    pagesParsed: parsed.pagesParsed || 0,
+    pageCount: parsed.pageCount || 0,
+  };
+}
+
+/**
+ * Read only account metadata, statement period and opening/closing balance.
+ * Lays out the header of page 1 and the end of the last page, so it takes
+ * the same time however long the statement is.
+ */
+export async function parseHDFCPDFStatementMetadata(buffer: Buffer, password?: string): Promise<HDFCAccountMetadata> {
+  const parsed = await runHDFCParser(buffer, password, ['--metadata-only']);
+  return toHDFCMetadata(parsed);
 }
 
 /**
@@ -145,6 +202,7 @@ export function convertToDBTransactions(
     transactionType: t.transactionType,
     amount: t.amount,
     balance: t.balance,
+    ...narrationColumns(t.narrationFields),
     categoryId: null,
     notes: null,
     isReconciled: false,
@@ -5,10 +5,7 @@
  * and statement metadata extraction.
  */
 
-import { execSync } from 'child_process';
-import path from 'path';
-import fs from 'fs';
-import os from 'os';
+import { execFileSync } from 'child_process';
 
 export interface ParsedICICICCTransaction {
   date: string;
@@ -73,18 +70,13 @@ function parseAmount(amountStr: string): number {
 }
 
 function extractTextWithPdftotext(buffer: Buffer): string {
-  const tempFile = path.join(os.tmpdir(), `icici-cc-${Date.now()}.pdf`);
-  try {
-    fs.writeFileSync(tempFile, buffer);
-    const result = execSync(`pdftotext -layout "${tempFile}" -`, {
-      encoding: 'utf-8',
-      maxBuffer: 10 * 1024 * 1024,
-      timeout: 30000,
-    });
-    return result;
-  } finally {
-    try { fs.unlinkSync(tempFile); } catch {}
-  }
+  // `-` as the input file makes pdftotext read the PDF from stdin
+  return execFileSync('pdftotext', ['-layout', '-', '-'], {
+    input: buffer,
+    encoding: 'utf-8',
+    maxBuffer: 10 * 1024 * 1024,
+    timeout: 30000,
+  });
 }
 
 function extractMetadata(text: string): ICICICCStatementMetadata {
@@ -1,10 +1,7 @@
-import { execSync } from 'child_process';
-import path from 'path';
-import { fileURLToPath } from 'url';
 import { v4 as uuidv4 } from 'uuid';
 import type { NewBankTransaction } from '../db/index.js';
-
-const __dirname = path.dirname(fileURLToPath(import.meta.url));
+import { NarrationFields, narrationColumns } from './narration-fields.js';
+import { runStatementParser, runStatementParserJSON, projectPython } from './statement-parser-runner.js';
 
 export interface ParsedKotakTransaction {
   date: string;
@@ -19,6 +16,8 @@ export interface ParsedKotakTransaction {
   suspiciousReason?: string;
   amountCorrected?: boolean;
   originalAmount?: number;
+  narrationFields?: NarrationFields | null; // Decoded UPI/NEFT/IMPS/RTGS details
+  suggestedCategory?: string | null; // Built-in category rule match (category name)
 }
 
 export interface KotakAccountMetadata {
@@ -46,36 +45,137 @@ export interface KotakStatementData {
   actualBalance: number;
 }
 
+export interface KotakStatementPreview {
+  metadata: KotakAccountMetadata;
+  transactions: ParsedKotakTransaction[];
+  complete: boolean; // True when the preview holds every transaction (all pages, none cut by the limit)
+  pagesParsed: number;
+  pageCount: number;
+}
+
+const EMPTY_KOTAK_METADATA: KotakAccountMetadata = {
+  accountNumber: null,
+  accountType: null,
+  accountHolderName: null,
+  bankName: 'Kotak Mahindra Bank',
+  branch: null,
+  ifscCode: null,
+  micrCode: null,
+  currency: 'INR',
+  statementPeriod: { from: null, to: null },
+  openingBalance: null,
+  closingBalance: null,
+};
+
+/**
+ * Run the statement_parsers kotak command on a buffer and return its parsed JSON output
+ */
+async function runKotakParser(buffer: Buffer, password?: string, extraArgs: string[] = []): Promise<any> {
+  const parsed = await runStatementParserJSON('kotak', buffer, { password }, {
+    args: extraArgs,
+    python: projectPython(),
+    timeout: 60000,
+  });
+
+  // Scanned statements fail here with the pages that need OCR (parsed.ocrPages)
+  if (!parsed.success) {
+    throw new Error(parsed.error || 'Unknown parsing error');
+  }
+  return parsed;
+}
+
+function toKotakTransactions(parsed: any): ParsedKotakTransaction[] {
+  return (parsed.transactions || []).map((t: any) => ({
+    date: t.date,
+    description: t.description || '',
+    reference: t.reference || null,
+    amount: t.amount,
+    transactionType: t.transactionType,
+    balance: t.balance,
+    shownBalance: t.shownBalance,
+    sweepAdjustment: t.sweepAdjustment,
+    suspicious: t.suspicious,
+    suspiciousReason: t.suspiciousReason,
+    amountCorrected: t.amountCorrected,
+    originalAmount: t.originalAmount,
+    narrationFields: t.narrationFields || null,
+    suggestedCategory: t.suggestedCategory || null,
+  }));
+}
+
 /**
  * Parse Kotak statement and return full data including metadata and sweep handling
  * @param password - Optional password for encrypted PDFs
  */
 export async function parseKotakStatementFull(buffer: Buffer, password?: string): Promise<KotakStatementData> {
-  const fs = await import('fs');
-  const os = await import('os');
-  const tempFile = path.join(os.tmpdir(), `kotak-${Date.now()}.pdf`);
+  const parsed = await runKotakParser(buffer, password);
+  console.log(`Parsed ${parsed.count} Kotak transactions, ${parsed.sweepCount} sweep transactions`);
+
+  const sweepTransactions = (parsed.sweepTransactions || []).map((t: any) => ({
+    date: t.date,
+    description: t.description || '',
+    reference: t.reference || null,
+    amount: t.amount,
+    transactionType: t.transactionType,
+    balance: t.balance,
+    isSweep: true,
+    sweepType: t.sweepType,
+    sweepAccountNumber: t.sweepAccountNumber,
+  }));
+
+  return {
+    metadata: parsed.metadata || EMPTY_KOTAK_METADATA,
+    transactions: toKotakTransactions(parsed),
+    sweepTransactions,
+    sweepBalance: parsed.sweepBalance || 0,
+    actualBalance: parsed.actualBalance || 0,
+  };
+}
+
+/**
+ * Parse only the pages needed for the first `limit` transactions plus header metadata.
+ * Closing balance is not available in a preview.
+ */
+export async function previewKotakStatement(
+  buffer: Buffer,
+  password?: string,
+  limit = 10
+): Promise<KotakStatementPreview> {
+  const parsed = await runKotakParser(buffer, password, ['--preview', String(limit)]);
+
+  return {
+    metadata: parsed.metadata || EMPTY_KOTAK_METADATA,
+    transactions: toKotakTransactions(parsed),
+    complete: !!parsed.complete,
+    pagesParsed: parsed.pagesParsed || 0,
+    pageCount: parsed.pageCount || 0,
+  };
+}
+
+/**
+ * Read only account metadata, statement period and opening/closing balance.
+ * Lays out the header of page 1 and the end of the last page, so it takes
+ * the same time however long the statement is. The closing balance is as
+ * printed, without sweep adjustments.
+ */
+export async function parseKotakStatementMetadata(buffer: Buffer, password?: string): Promise<KotakAccountMetadata> {
+  const parsed = await runKotakParser(buffer, password, ['--metadata-only']);
+  return parsed.metadata || EMPTY_KOTAK_METADATA;
+}
 
+export async function parseKotakStatement(buffer: Buffer): Promise<ParsedKotakTransaction[]> {
+  // Try Python parser first (more accurate)
   try {
-    fs.writeFileSync(tempFile, buffer);
-
-    const pythonScript = path.join(__dirname, 'kotak_pdf_parser.py');
-    const venvPython = path.join(process.cwd(), '..', '..', '.venv', 'bin', 'python3');
-    const pythonCmd = fs.existsSync(venvPython) ? venvPython : 'python3';
-
-    // Pass password as second argument if provided
-    const passwordArg = password ? ` "${password}"` : '';
-    const result = execSync(`${pythonCmd} "${pythonScript}" "${tempFile}"${passwordArg}`, {
-      encoding: 'utf-8',
-      maxBuffer: 10 * 1024 * 1024,
-      timeout: 60000,
+    const result = await runStatementParser('kotak', buffer, {}, {
+      python: projectPython(),
+      timeout: 30000,
     });
 
     const parsed = JSON.parse(result);
 
-    if (parsed.success) {
-      console.log(`Parsed ${parsed.count} Kotak transactions, ${parsed.sweepCount} sweep transactions`);
-
-      const transactions = (parsed.transactions || []).map((t: any) => ({
+    if (parsed.success && parsed.transactions) {
+      console.log(`Parsed ${parsed.count} Kotak transactions using Python parser`);
+      return parsed.transactions.map((t: any) => ({
         date: t.date,
         description: t.description || '',
         reference: t.reference || null,
@@ -88,105 +188,16 @@ export async function parseKotakStatementFull(buffer: Buffer, password?: string)
         suspiciousReason: t.suspiciousReason,
         amountCorrected: t.amountCorrected,
         originalAmount: t.originalAmount,
+        narrationFields: t.narrationFields || null,
+        suggestedCategory: t.suggestedCategory || null,
       }));
-
-      const sweepTransactions = (parsed.sweepTransactions || []).map((t: any) => ({
-        date: t.date,
-        description: t.description || '',
-        reference: t.reference || null,
-        amount: t.amount,
-        transactionType: t.transactionType,
-        balance: t.balance,
-        isSweep: true,
-        sweepType: t.sweepType,
-        sweepAccountNumber: t.sweepAccountNumber,
-      }));
-
-      return {
-        metadata: parsed.metadata || {
-          accountNumber: null,
-          accountType: null,
-          accountHolderName: null,
-          bankName: 'Kotak Mahindra Bank',
-          branch: null,
-          ifscCode: null,
-          micrCode: null,
-          currency: 'INR',
-          statementPeriod: { from: null, to: null },
-          openingBalance: null,
-          closingBalance: null,
-        },
-        transactions,
-        sweepTransactions,
-        sweepBalance: parsed.sweepBalance || 0,
-        actualBalance: parsed.actualBalance || 0,
-      };
     }
-
-    throw new Error(parsed.error || 'Unknown parsing error');
-  } finally {
-    try {
-      fs.unlinkSync(tempFile);
-    } catch {}
+  } catch (pythonError: any) {
+    console.error('Python parser failed, falling back to JS parser:', pythonError.message);
   }
-}
-
-export async function parseKotakStatement(buffer: Buffer): Promise<ParsedKotakTransaction[]> {
-  // Write buffer to temp file
-  const fs = await import('fs');
-  const os = await import('os');
-  const tempFile = path.join(os.tmpdir(), `kotak-${Date.now()}.pdf`);
-
-  try {
-    fs.writeFileSync(tempFile, buffer);
-
-    // Try Python parser first (more accurate)
-    try {
-      const pythonScript = path.join(__dirname, 'kotak_pdf_parser.py');
-      const venvPython = path.join(process.cwd(), '..', '..', '.venv', 'bin', 'python3');
 
-      // Check if venv exists, otherwise use system python
-      const pythonCmd = fs.existsSync(venvPython) ? venvPython : 'python3';
-
-      const result = execSync(`${pythonCmd} "${pythonScript}" "${tempFile}"`, {
-        encoding: 'utf-8',
-        maxBuffer: 10 * 1024 * 1024,
-        timeout: 30000,
-      });
-
-      const parsed = JSON.parse(result);
-
-      if (parsed.success && parsed.transactions) {
-        console.log(`Parsed ${parsed.count} Kotak transactions using Python parser`);
-        return parsed.transactions.map((t: any) => ({
-          date: t.date,
-          description: t.description || '',
-          reference: t.reference || null,
-          amount: t.amount,
-          transactionType: t.transactionType,
-          balance: t.balance,
-          shownBalance: t.shownBalance,
-          sweepAdjustment: t.sweepAdjustment,
-          suspicious: t.suspicious,
-          suspiciousReason: t.suspiciousReason,
-          amountCorrected: t.amountCorrected,
-          originalAmount: t.originalAmount,
-        }));
-      }
-    } catch (pythonError: any) {
-      console.error('Python parser failed, falling back to JS parser:', pythonError.message);
-    }
-
-    // Fallback to JavaScript parser
-    return parseKotakStatementJS(buffer);
-
-  } finally {
-    // Clean up temp file
-    try {
-      const fs = await import('fs');
-      fs.unlinkSync(tempFile);
-    } catch {}
-  }
+  // Fallback to JavaScript parser
+  return parseKotakStatementJS(buffer);
 }
 
 // Original JavaScript parser as fallback
@@ -359,6 +370,7 @@ export function convertToDBTransactions(
     transactionType: t.transactionType,
     amount: t.amount,
     balance: t.balance,
+    ...narrationColumns(t.narrationFields),
     categoryId: null,
     notes: null,
     isReconciled: false,
@@ -0,0 +1,73 @@
+/**
+ * Layout Fingerprints
+ * Wraps the Python `fingerprint` command: a structural fingerprint of a PDF
+ * (fonts, page size, producer, table ruling) read without layout analysis,
+ * and the local index routing known fingerprints to a bank or learned template.
+ */
+
+import { execFile } from 'child_process';
+import * as path from 'path';
+import { fileURLToPath } from 'url';
+import { runStatementParser, projectPython } from './statement-parser-runner.js';
+
+const __filename = fileURLToPath(import.meta.url);
+const __dirname = path.dirname(__filename);
+
+export interface ColumnGeometry {
+  header: string;
+  x0: number | null;
+}
+
+export interface LayoutRoute {
+  bank?: string | null;
+  fileType?: string | null;
+  parser?: string | null;
+  templates?: Record<string, { columns?: ColumnGeometry[] }>;
+}
+
+export interface LayoutFingerprint {
+  fingerprint: string;
+  route: LayoutRoute | null;
+}
+
+/**
+ * Fingerprint a PDF and look up where its layout routes for the user. Bank
+ * routes are only returned when the statement header names the bank.
+ * Returns null when the PDF can't be fingerprinted (e.g. encrypted without a password).
+ */
+export async function fingerprintPDF(buffer: Buffer, password?: string, userId?: string): Promise<LayoutFingerprint | null> {
+  try {
+    const result = await runStatementParser('fingerprint', buffer, { password, user: userId }, { python: projectPython(), timeout: 30000 });
+
+    const parsed = JSON.parse(result.trim());
+    if (!parsed.success) return null;
+
+    return { fingerprint: parsed.fingerprint, route: parsed.route };
+  } catch (error: any) {
+    console.error('[Layout Fingerprint] Error:', error?.message);
+    return null;
+  }
+}
+
+/**
+ * Record where a fingerprint routes for the user, after detection or template matching succeeded.
+ * Runs in the background; failures are only logged.
+ */
+export function recordLayoutRoute(
+  fingerprint: string,
+  route: { bank?: string | null; fileType?: string; templateId?: string; columns?: ColumnGeometry[] },
+  userId?: string
+): void {
+  const args = ['-m', 'statement_parsers', 'fingerprint', '--record', fingerprint];
+  if (userId) args.push('--user', userId);
+  if (route.bank) args.push('--bank', route.bank);
+  if (route.fileType) args.push('--file-type', route.fileType);
+  if (route.templateId) args.push('--template-id', route.templateId);
+  if (route.columns) args.push('--columns', JSON.stringify(route.columns));
+
+  execFile(projectPython(), args, { cwd: __dirname, timeout: 30000 }, (error) => {
+    if (error) {
+      console.error('[Layout Fingerprint] Failed to record route:', error.message);
+    }
+  });
+}
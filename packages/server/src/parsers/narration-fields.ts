@@ -0,0 +1,47 @@
+/**
+ * Narration Fields
+ * Structured payment details decoded from UPI/NEFT/IMPS/RTGS narrations by
+ * the Python statement parsers (statement_parsers/narration_decoder.py)
+ */
+
+export interface NarrationFields {
+  channel: 'UPI' | 'NEFT' | 'IMPS' | 'RTGS';
+  counterpartyName: string | null;
+  counterpartyAccount: string | null; // VPA or (masked) account number
+  bankReference: string | null;       // RRN / UTR
+  remark: string | null;
+}
+
+/**
+ * Bank transaction columns for decoded narration fields (all null when not decoded)
+ */
+export function narrationColumns(fields?: NarrationFields | null) {
+  return {
+    channel: fields?.channel ?? null,
+    counterpartyName: fields?.counterpartyName ?? null,
+    counterpartyAccount: fields?.counterpartyAccount ?? null,
+    bankReference: fields?.bankReference ?? null,
+    narrationRemark: fields?.remark ?? null,
+  };
+}
+
+/**
+ * Decoded fields as stored on a bank transaction row, or null when the
+ * narration wasn't decoded at import
+ */
+export function storedNarrationFields(txn: {
+  channel?: string | null;
+  counterpartyName?: string | null;
+  counterpartyAccount?: string | null;
+  bankReference?: string | null;
+  narrationRemark?: string | null;
+}): NarrationFields | null {
+  if (!txn.channel) return null;
+  return {
+    channel: txn.channel as NarrationFields['channel'],
+    counterpartyName: txn.counterpartyName ?? null,
+    counterpartyAccount: txn.counterpartyAccount ?? null,
+    bankReference: txn.bankReference ?? null,
+    remark: txn.narrationRemark ?? null,
+  };
+}
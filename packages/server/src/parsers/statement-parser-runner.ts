@@ -0,0 +1,96 @@
+/**
+ * Statement Parser Runner
+ * Runs the Python statement_parsers commands with the PDF passed on stdin:
+ * one line of JSON job parameters (password, template mappings) followed by
+ * the raw bytes, read by the `-` PDF argument (see statement_parsers/common.py).
+ * Nothing is written to disk, concurrent uploads can't collide on a temp file
+ * name, and passwords and mappings stay off the command line.
+ */
+
+import { execFile } from 'child_process';
+import * as path from 'path';
+import * as fs from 'fs';
+import { fileURLToPath } from 'url';
+
+const __filename = fileURLToPath(import.meta.url);
+const __dirname = path.dirname(__filename);
+
+export interface StatementParserJob {
+  password?: string;
+  mappings?: unknown;
+  user?: string; // Scopes layout index lookups and records (fingerprint, detect)
+}
+
+export interface StatementParserOptions {
+  args?: string[]; // Extra command arguments, after the PDF
+  python?: string;
+  timeout?: number;
+  maxBuffer?: number;
+}
+
+/**
+ * The project virtualenv's python3 when it exists, else python3 on PATH
+ */
+export function projectPython(): string {
+  const venvPython = path.join(process.cwd(), '..', '..', '.venv', 'bin', 'python3');
+  return fs.existsSync(venvPython) ? venvPython : 'python3';
+}
+
+function statementParserInput(pdf: Buffer, job: StatementParserJob): Buffer {
+  return Buffer.concat([Buffer.from(JSON.stringify(job) + '\n'), pdf]);
+}
+
+function commandArgs(command: string, options: StatementParserOptions): string[] {
+  return ['-m', 'statement_parsers', command, '-', ...(options.args ?? [])];
+}
+
+/**
+ * Run a statement_parsers command on a PDF buffer and resolve with its stdout
+ */
+export function runStatementParser(
+  command: string,
+  pdf: Buffer,
+  job: StatementParserJob = {},
+  options: StatementParserOptions = {}
+): Promise<string> {
+  return new Promise((resolve, reject) => {
+    const child = execFile(options.python ?? 'python3', commandArgs(command, options), {
+      cwd: __dirname, // Parent of the statement_parsers package
+      encoding: 'utf-8',
+      maxBuffer: options.maxBuffer ?? 10 * 1024 * 1024,
+      timeout: options.timeout,
+    }, (error, stdout) => {
+      if (error) reject(Object.assign(error, { stdout }));
+      else resolve(stdout);
+    });
+
+    // A command that exits early (e.g. a usage error) closes stdin before
+    // reading everything; its exit status reports the failure
+    child.stdin!.on('error', () => {});
+    child.stdin!.end(statementParserInput(pdf, job));
+  });
+}
+
+/**
+ * Run a statement_parsers command and parse its JSON output. Commands that
+ * fail still print a JSON result (e.g. a scanned statement with the pages
+ * that need OCR), which is returned rather than the bare exit status.
+ */
+export async function runStatementParserJSON(
+  command: string,
+  pdf: Buffer,
+  job: StatementParserJob = {},
+  options: StatementParserOptions = {}
+): Promise<any> {
+  let stdout: string;
+  try {
+    stdout = await runStatementParser(command, pdf, job, options);
+  } catch (error: any) {
+    try {
+      return JSON.parse(error.stdout);
+    } catch {
+      throw error;
+    }
+  }
+  return JSON.parse(stdout);
+}
@@ -0,0 +1,8 @@
+"""
+Bank statement PDF parsers used by the server's TypeScript wrappers.
+
+Run through the package entry point, e.g.
+    python -m statement_parsers hdfc statement.pdf [password] [--preview N]
+
+Keep this module free of imports: every command pays for it on startup.
+"""
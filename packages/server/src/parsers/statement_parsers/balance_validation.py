@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Balance Continuity and Anomaly Engine
+Validates parsed transactions column-wise in a single pass: balance deltas,
+continuity breaks, digit-inflation corrections (10x/100x mis-reads),
+transaction type fixes and suspicious-amount flags.
+
+Uses NumPy for large statements when it is installed and falls back to a
+pure-Python loop otherwise; both backends give identical results.
+
+Can also be run as a command to check continuity across several statements
+of the same account:
+    python -m statement_parsers validate-balances < statements.json
+where statements.json is {"statements": [<parser output>, ...]}.
+"""
+
+import sys
+import json
+
+from .transaction_records import TransactionRecord, from_paise
+
+# Below this many rows the cost of building arrays outweighs NumPy's speedup
+NUMPY_MIN_ROWS = 256
+
+# Balance-based corrections larger than this are not trusted (1 crore, in paise)
+MAX_BALANCE_CORRECTION = 1000000000
+
+# Amounts above this are flagged for review (10 lakh, in paise)
+LARGE_AMOUNT = 100000000
+
+NO_FIX, FIX_10X, FIX_100X, FIX_BALANCE = 0, 1, 2, 3
+FIX_LABELS = {FIX_10X: '10x', FIX_100X: '100x', FIX_BALANCE: 'balance-based'}
+
+_numpy = None
+
+
+def _load_numpy():
+    """Import NumPy on first use; False if it isn't installed"""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError:
+            _numpy = False
+    return _numpy
+
+
+def _analyze_numpy(np, amounts, balances, is_credit, fix_amounts):
+    n = len(amounts)
+    amt = np.array(amounts, dtype=np.int64)
+    has_balance = np.array([b is not None for b in balances], dtype=bool)
+    bal = np.array([0 if b is None else b for b in balances], dtype=np.int64)
+    credit = np.array(is_credit, dtype=bool)
+
+    # Row i is checkable when it and the row before both carry a balance
+    valid = np.zeros(n, dtype=bool)
+    valid[1:] = has_balance[1:] & has_balance[:-1]
+    delta = np.zeros(n, dtype=np.int64)
+    delta[1:] = bal[1:] - bal[:-1]
+    delta[~valid] = 0
+    expected = np.abs(delta)
+
+    fixes = np.zeros(n, dtype=np.int8)
+    if fix_amounts:
+        candidates = valid & (expected != amt) & (expected > 0)
+        is_10x = candidates & (19 * expected <= 2 * amt) & (2 * amt <= 21 * expected)
+        is_100x = candidates & ~is_10x & (95 * expected <= amt) & (amt <= 105 * expected)
+        is_other = candidates & ~is_10x & ~is_100x & (expected < MAX_BALANCE_CORRECTION)
+        fixes[is_10x] = FIX_10X
+        fixes[is_100x] = FIX_100X
+        fixes[is_other] = FIX_BALANCE
+
+    corrected = np.where(fixes > 0, expected, amt)
+    new_credit = np.where(valid & (delta > 0), True, np.where(valid & (delta < 0), False, credit))
+    signed = np.where(new_credit, corrected, -corrected)
+    breaks = valid & (delta != signed)
+
+    # Repeated leading digits (33400, 55000) on the rupee part
+    rupees = corrected // 100
+    big = rupees >= 1000
+    digits = np.floor(np.log10(np.where(big, rupees, 1))).astype(np.int64)
+    leading = np.where(big, rupees // (10 ** np.maximum(digits - 1, 0)), 0)
+    repeated = big & (leading // 10 == leading % 10)
+    large = corrected > LARGE_AMOUNT
+
+    return (
+        corrected.tolist(), fixes.tolist(), new_credit.tolist(), delta.tolist(),
+        np.flatnonzero(breaks).tolist(), repeated.tolist(), large.tolist(),
+        leading.tolist(),
+    )
+
+
+def _analyze_python(amounts, balances, is_credit, fix_amounts):
+    n = len(amounts)
+    corrected = list(amounts)
+    fixes = [NO_FIX] * n
+    new_credit = list(is_credit)
+    delta = [0] * n
+    breaks = []
+    repeated = [False] * n
+    large = [False] * n
+    leading = [0] * n
+
+    for i in range(n):
+        amt = amounts[i]
+        if i > 0 and balances[i] is not None and balances[i - 1] is not None:
+            d = balances[i] - balances[i - 1]
+            expected = abs(d)
+            delta[i] = d
+
+            if fix_amounts and expected != amt and expected > 0:
+                if 19 * expected <= 2 * amt <= 21 * expected:
+                    fixes[i] = FIX_10X
+                elif 95 * expected <= amt <= 105 * expected:
+                    fixes[i] = FIX_100X
+                elif expected < MAX_BALANCE_CORRECTION:
+                    fixes[i] = FIX_BALANCE
+                if fixes[i]:
+                    amt = corrected[i] = expected
+
+            if d > 0:
+                new_credit[i] = True
+            elif d < 0:
+                new_credit[i] = False
+
+            if d != (amt if new_credit[i] else -amt):
+                breaks.append(i)
+
+        rupee_str = str(amt // 100)
+        if len(rupee_str) >= 4:
+            leading[i] = int(rupee_str[:2])
+            repeated[i] = rupee_str[0] == rupee_str[1]
+        large[i] = amt > LARGE_AMOUNT
+
+    return corrected, fixes, new_credit, delta, breaks, repeated, large, leading
+
+
+def analyze_columns(amounts, balances, is_credit, fix_amounts=True):
+    """
+    Run the continuity checks over whole columns.
+
+    Args:
+        amounts: Amounts in paise (non-negative)
+        balances: Running balances in paise, None where missing
+        is_credit: True for credits, False for debits
+        fix_amounts: Whether to correct amounts from the balance delta
+
+    Returns:
+        (corrected, fixes, is_credit, deltas, breaks, repeated, large, leading)
+        as plain lists; breaks holds the indices of rows whose movement still
+        doesn't match the balance change.
+    """
+    np = _load_numpy() if len(amounts) >= NUMPY_MIN_ROWS else False
+    if np:
+        return _analyze_numpy(np, amounts, balances, is_credit, fix_amounts)
+    return _analyze_python(amounts, balances, is_credit, fix_amounts)
+
+
+def validate_balances(transactions, fix_amounts=True, flag_anomalies=True):
+    """
+    Validate a statement's transactions (in statement order) in place.
+
+    Fixes transaction types from the balance direction, optionally corrects
+    mis-read amounts and flags suspicious ones.
+
+    Returns a summary report for the parser output.
+    """
+    if not transactions:
+        return {'checked': 0, 'amountsCorrected': 0, 'typesCorrected': 0, 'flagged': 0, 'breaks': []}
+
+    amounts = [t.amount for t in transactions]
+    balances = [t.balance for t in transactions]
+    is_credit = [t.transaction_type == 'credit' for t in transactions]
+
+    corrected, fixes, new_credit, _, breaks, repeated, large, leading = analyze_columns(
+        amounts, balances, is_credit, fix_amounts)
+
+    amounts_corrected = 0
+    types_corrected = 0
+    flagged = 0
+    for i, txn in enumerate(transactions):
+        if fixes[i]:
+            print(f"Fixing amount ({FIX_LABELS[fixes[i]]}): {from_paise(txn.amount)} -> {from_paise(corrected[i])}",
+                  file=sys.stderr)
+            txn.original_amount = txn.amount
+            txn.amount = corrected[i]
+            amounts_corrected += 1
+
+        if new_credit[i] != is_credit[i]:
+            txn.transaction_type = 'credit' if new_credit[i] else 'debit'
+            types_corrected += 1
+
+        if flag_anomalies and (repeated[i] or large[i]):
+            if large[i]:
+                txn.suspicious_reason = "Large amount - please verify"
+            else:
+                txn.suspicious_reason = f"First two digits are same ({leading[i]})"
+            flagged += 1
+
+    return {
+        'checked': len(transactions),
+        'amountsCorrected': amounts_corrected,
+        'typesCorrected': types_corrected,
+        'flagged': flagged,
+        'breaks': breaks,
+    }
+
+
+def validate_statement_batch(statements):
+    """
+    Check balance continuity across several statements of the same account.
+
+    Args:
+        statements: List of transaction record lists, one per statement
+
+    Returns:
+        {"statements": int, "transactions": int,
+         "breaks": [{"statement": int, "index": int, "boundary": bool}, ...]}
+    """
+    ordered = [s for s in statements if s]
+    ordered.sort(key=lambda s: (s[0].date is None, s[0].date or 0))
+
+    amounts = []
+    balances = []
+    is_credit = []
+    owners = []
+    for stmt_idx, stmt in enumerate(ordered):
+        for row_idx, txn in enumerate(stmt):
+            amounts.append(txn.amount)
+            balances.append(txn.balance)
+            is_credit.append(txn.transaction_type == 'credit')
+            owners.append((stmt_idx, row_idx))
+
+    breaks = analyze_columns(amounts, balances, is_credit, fix_amounts=False)[4]
+
+    return {
+        'statements': len(ordered),
+        'transactions': len(amounts),
+        'breaks': [
+            {'statement': owners[i][0], 'index': owners[i][1], 'boundary': owners[i][1] == 0}
+            for i in breaks
+        ],
+    }
+
+
+def main(argv=None):
+    try:
+        payload = json.load(sys.stdin)
+        statements = [
+            [TransactionRecord.from_dict(t) for t in stmt.get('transactions', [])]
+            for stmt in payload.get('statements', [])
+        ]
+        print(json.dumps({'success': True, **validate_statement_batch(statements)}))
+    except Exception as e:
+        print(json.dumps({'success': False, 'error': str(e)}))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Built-in category suggestions for parsed transactions.
+
+The keyword rules live in category_rules.json, shared with the server's
+categorization engine (services/category-service.ts). They are compiled
+into one anchored regex whose alternatives are tried in rule order, so a
+single search finds the first matching rule, and results are memoized by
+normalized text. Patterns are word-bounded (\\bRENT\\b, not RENT inside
+CURRENT); brand names are bounded at the start only, to match VPAs like
+SWIGGYINSTAMART@AXL.
+
+Decoded narrations (see narration_decoder.py) are matched on counterparty
+and remark only, so IFSC codes, bank names and references can't trigger
+a rule.
+"""
+
+import os
+import re
+import json
+from functools import lru_cache
+
+WHITESPACE = re.compile(r'\s+')
+RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'category_rules.json')
+
+
+@lru_cache(maxsize=1)
+def compiled_rules():
+    """(matcher, category names by rule group) for the built-in rules"""
+    with open(RULES_PATH, 'r', encoding='utf-8') as f:
+        rules = json.load(f)
+
+    alternatives = [
+        rf"(?=.*?(?:{'|'.join(rule['patterns'])}))(?P<r{i}>)"
+        for i, rule in enumerate(rules)
+    ]
+    matcher = re.compile(rf"^(?:{'|'.join(alternatives)})", re.I | re.S)
+    return matcher, {f'r{i}': rule['category'] for i, rule in enumerate(rules)}
+
+
+def category_text(narration, fields=None):
+    """Text the rules are matched against, whitespace-normalized"""
+    if fields:
+        parts = [fields.get('counterpartyName'), fields.get('counterpartyAccount'), fields.get('remark')]
+        narration = '/'.join(p for p in parts if p)  # No spaces between fields, like the raw narration
+    return WHITESPACE.sub(' ', narration.upper()) if narration else ''
+
+
+@lru_cache(maxsize=8192)
+def _category_for_text(text):
+    matcher, names = compiled_rules()
+    match = matcher.search(text)
+    return names[match.lastgroup] if match else None
+
+
+def suggest_category(narration, fields=None):
+    """Name of the first built-in rule matching a transaction, or None"""
+    text = category_text(narration, fields)
+    return _category_for_text(text) if text else None
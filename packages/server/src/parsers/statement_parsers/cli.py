@@ -0,0 +1,41 @@
+"""
+Single entry point for the statement parser commands:
+    python -m statement_parsers <command> [args...]
+
+Commands that read a PDF take `-` in place of its path to read it (and the
+job parameters) from stdin; see common.py.
+
+Only the module for the requested command is imported, and none of them
+import pdfplumber until a PDF is opened.
+"""
+
+import sys
+import json
+from importlib import import_module
+
+# Command name -> module in this package (each exposes main(argv))
+COMMANDS = {
+    'hdfc': 'hdfc_pdf_parser',
+    'kotak': 'kotak_pdf_parser',
+    'detect': 'pdf_detector',
+    'fingerprint': 'layout_fingerprint',
+    'extract-template': 'template_extractor',
+    'parse-template': 'template_parser',
+    'validate-balances': 'balance_validation',
+    'check-imports': 'import_budget',
+    'check-narrations': 'narration_decoder',
+    'bench-hdfc-lines': 'hdfc_line_benchmark',
+}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in COMMANDS:
+        print(json.dumps({
+            'error': f"Usage: python -m statement_parsers <{'|'.join(COMMANDS)}> [args...]",
+            'success': False,
+        }))
+        sys.exit(1)
+
+    module = import_module(f'.{COMMANDS[argv[0]]}', __package__)
+    module.main(argv[1:])
@@ -0,0 +1,129 @@
+"""
+Helpers shared by the statement parser commands.
+
+pdfplumber (and the pdfminer/PIL graph behind it) is imported only when a
+PDF is actually opened, so argument errors and other early exits stay cheap.
+
+Every command that takes a PDF accepts `-` in place of the path: the job is
+then read from stdin as one line of JSON parameters (password, mappings)
+followed by the raw PDF bytes, and the document is opened from memory.
+"""
+
+import io
+import os
+import sys
+import json
+import stat
+
+# PDF argument meaning "read the job from stdin"
+STDIN = '-'
+
+
+def read_stdin_job(stream=None):
+    """
+    Read a job sent on stdin: a JSON line of parameters, then the PDF bytes.
+    Returns (pdf_bytes, params).
+    """
+    stream = stream or sys.stdin.buffer
+    header = stream.readline()
+    params = json.loads(header) if header.strip() else {}
+    return stream.read(), params
+
+
+def resolve_source(pdf_path, password=None):
+    """
+    Resolve a command's PDF argument to (source, password, params). For STDIN
+    the source is the PDF bytes and the password comes from the job; any
+    other argument is a file path and is returned unchanged.
+    """
+    if pdf_path != STDIN:
+        return pdf_path, password, {}
+    data, params = read_stdin_job()
+    return data, params.get('password') or password, params
+
+
+def app_data_dir():
+    """The server's data directory: beside DATABASE_PATH, else packages/data (as in db/index.ts)"""
+    database_path = os.environ.get('DATABASE_PATH')
+    if database_path:
+        return os.path.dirname(os.path.abspath(database_path))
+    return os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', '..', 'data'))
+
+
+def private_directory(directory):
+    """
+    Create `directory` for this user only, or check that an existing one is
+    a real directory owned by this user and closed to everyone else.
+    Returns the directory, or None when it can't be trusted.
+    """
+    try:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        st = os.lstat(directory)
+    except OSError:
+        return None
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        return None
+    return directory
+
+
+def pdf_stream(source):
+    """Binary file object for a PDF source (file path or bytes)"""
+    if isinstance(source, (bytes, bytearray)):
+        return io.BytesIO(source)
+    return open(source, 'rb')
+
+
+def open_pdf(source, password=None):
+    """
+    Open a PDF (file path or bytes) with pdfplumber, importing it on first
+    use. Page layout goes through the shared on-disk layout cache (see
+    layout_cache.py).
+    """
+    import pdfplumber
+    from .layout_cache import cached_document
+
+    open_kwargs = {'password': password} if password else {}
+    pdf = pdfplumber.open(io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source, **open_kwargs)
+    try:
+        return cached_document(pdf, source)
+    except Exception:
+        pdf.close()
+        raise
+
+
+def parse_args(argv):
+    """
+    Split statement parser CLI args into (pdf_path, password, options).
+    A `-` path reads the job from stdin (see resolve_source), so pdf_path is
+    then the PDF bytes.
+
+    Options: --preview N (or --preview=N), --metadata-only, and the
+    watermark of an earlier import: --since YYYY-MM-DD [--since-balance N]
+    (see watermark.py).
+    """
+    positional = []
+    options = {'preview': None, 'metadata_only': False, 'since': None, 'since_balance': None}
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg == '--metadata-only':
+            options['metadata_only'] = True
+        elif arg == '--preview' and i + 1 < len(argv):
+            options['preview'] = int(argv[i + 1])
+            i += 2
+            continue
+        elif arg in ('--since', '--since-balance') and i + 1 < len(argv):
+            options[arg[2:].replace('-', '_')] = argv[i + 1]
+            i += 2
+            continue
+        elif arg.startswith('--preview='):
+            options['preview'] = int(arg.split('=', 1)[1])
+        else:
+            positional.append(arg)
+        i += 1
+
+    pdf_path = positional[0] if positional else None
+    password = positional[1] if len(positional) > 1 else None
+    if pdf_path is not None:
+        pdf_path, password, _ = resolve_source(pdf_path, password)
+    return pdf_path, password, options
@@ -0,0 +1,176 @@
+"""
+Benchmark of HDFC statement line parsing on a large synthetic statement.
+
+Compares the single-grammar parser (hdfc_pdf_parser.parse_statement_lines)
+with the previous per-line skip-list/regex/split parser, kept here as
+legacy_parse_lines, and checks both find the same transactions:
+    python -m statement_parsers bench-hdfc-lines [--rows N] [--runs N]
+
+Only text parsing is timed; PDF layout is not involved.
+"""
+
+import re
+import sys
+import json
+import time
+import random
+
+from .hdfc_pdf_parser import parse_statement_lines, parse_date, row_date
+from .transaction_records import TransactionRecord, parse_paise, date_to_ordinal
+
+ROWS_PER_PAGE = 40
+
+PAGE_HEADER = [
+    'HDFC Bank Limited',
+    'AccountBranch : SARJAPURROAD',
+    'AccountNo : 50100156157526',
+    'From : 01/04/2025 To : 31/03/2026',
+    'Date Narration Chq./Ref.No. ValueDt WithdrawalAmt. DepositAmt. ClosingBalance',
+]
+
+PAGE_FOOTER = [
+    'PageNo.: {page}',
+    '*Closing balance includes funds earmarked for hold and uncleared funds',
+    'Contents of this statement will be considered correct if no error is reported within 30 days',
+    'Registered Office Address: HDFC Bank House, Senapati Bapat Marg, Lower Parel, Mumbai 400013',
+]
+
+
+def synthetic_lines(rows, seed=1):
+    """Text lines of an HDFC statement with `rows` transactions; every fifth narration wraps"""
+    rng = random.Random(seed)
+    lines = []
+    balance = 10_00_000.00
+    page = 1
+    for i in range(rows):
+        if i % ROWS_PER_PAGE == 0:
+            if i:
+                lines.extend(f.format(page=page) for f in PAGE_FOOTER)
+                page += 1
+            lines.extend(PAGE_HEADER)
+
+        day = f'{1 + (i // 30) % 28:02d}/{1 + (i // 840) % 12:02d}/25'
+        amount = round(rng.uniform(10, 50000), 2)
+        if i % 3 == 0:
+            balance += amount
+            narration = f'NEFT CR-ACME CORP SALARY {i}'
+        else:
+            balance -= amount
+            narration = f'UPI-SHOP{i}-shop{i}@okaxis-PAYMENT'
+        lines.append(f'{day} {narration} {1000000000 + i:016d} {day} {amount:,.2f} {balance:,.2f}')
+        if i % 5 == 0:
+            lines.append(f'FROM UPI REF {i:012d}')
+
+    lines.extend(f.format(page=page) for f in PAGE_FOOTER)
+    return lines
+
+
+def legacy_parse_lines(lines):
+    """The line parser before the single grammar (continuation lines dropped)"""
+    transactions = []
+    for line in lines:
+        if any(skip in line for skip in ['Narration', 'PageNo', 'HDFC Bank', 'Statement',
+                                           'Closing balance', 'Contents of', 'Registered Office']):
+            continue
+
+        txn_match = re.match(r'^(\d{2}/\d{2}/\d{2})\s+(.+)', line)
+        if not txn_match:
+            continue
+
+        date_str = txn_match.group(1)
+        rest = txn_match.group(2)
+
+        ref_match = re.search(r'\s+([A-Z]{0,10}\d{10,})\s+', rest)
+        if not ref_match:
+            continue
+
+        reference = ref_match.group(1)
+        narration = rest[:ref_match.start()].strip()
+        after_ref = rest[ref_match.end():].strip()
+
+        amounts_match = re.match(r'(\d{2}/\d{2}/\d{2})\s+(.+)', after_ref)
+        if not amounts_match:
+            continue
+
+        value_date = amounts_match.group(1)
+        numeric_values = []
+        for part in amounts_match.group(2).split():
+            val = parse_paise(part)
+            if val is not None:
+                numeric_values.append(val)
+
+        withdrawal = None
+        deposit = None
+        balance = numeric_values[-1] if numeric_values else None
+
+        if len(numeric_values) == 2:
+            desc_lower = narration.lower()
+            if any(kw in desc_lower for kw in ['neft cr', 'credit', 'received', 'interest paid', 'tpt-', 'neftcr']):
+                deposit = numeric_values[0]
+            else:
+                withdrawal = numeric_values[0]
+        elif len(numeric_values) == 3:
+            withdrawal = numeric_values[0] if numeric_values[0] > 0 else None
+            deposit = numeric_values[1] if numeric_values[1] > 0 else None
+
+        if withdrawal is None and deposit is None:
+            continue
+
+        transactions.append(TransactionRecord(
+            date=date_to_ordinal(parse_date(date_str)),
+            value_date=date_to_ordinal(parse_date(value_date)),
+            description=narration,
+            reference=reference,
+            amount=withdrawal if withdrawal else deposit,
+            transaction_type='debit' if withdrawal else 'credit',
+            balance=balance,
+        ))
+    return transactions
+
+
+def lines_per_second(parse, lines, runs):
+    """Best of `runs` timings, as lines parsed per second"""
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        parse(lines)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(lines) / best
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    rows = 100_000
+    runs = 3
+    for i, arg in enumerate(argv):
+        if arg == '--rows' and i + 1 < len(argv):
+            rows = int(argv[i + 1])
+        elif arg == '--runs' and i + 1 < len(argv):
+            runs = int(argv[i + 1])
+
+    lines = synthetic_lines(rows)
+    legacy = legacy_parse_lines(lines)
+    grammar = parse_statement_lines(lines)
+
+    key = lambda t: (t.date, t.value_date, t.reference, t.amount, t.transaction_type, t.balance)
+    same_rows = [key(t) for t in legacy] == [key(t) for t in grammar]
+    continued = sum(1 for t in grammar if ' FROM UPI REF ' in t.description)
+
+    before = lines_per_second(legacy_parse_lines, lines, runs)
+
+    def grammar_cold(lines):
+        row_date.cache_clear()  # Don't carry parsed dates over between runs
+        return parse_statement_lines(lines)
+
+    after = lines_per_second(grammar_cold, lines, runs)
+
+    print(json.dumps({
+        'success': same_rows and len(grammar) == rows,
+        'lines': len(lines),
+        'transactions': len(grammar),
+        'sameTransactions': same_rows,
+        'mergedContinuations': continued,
+        'linesPerSecond': {'before': round(before), 'after': round(after)},
+        'speedup': round(after / before, 2),
+    }, indent=2))
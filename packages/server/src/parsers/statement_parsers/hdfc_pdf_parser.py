@@ -0,0 +1,621 @@
+#!/usr/bin/env python3
+"""
+HDFC Bank PDF Statement Parser using pdfplumber
+This script extracts transactions and account metadata from HDFC bank PDF statements.
+"""
+
+import sys
+import json
+from datetime import datetime
+import re
+from functools import lru_cache
+from .transaction_records import TransactionRecord, parse_paise, date_to_ordinal, from_paise
+from .balance_validation import validate_balances
+from .statement_regions import header_region, footer_region
+from .common import open_pdf, parse_args
+from .watermark import parse_watermark, first_new_page, trim_to_watermark, watermark_report
+from .page_classifier import text_pages, numbered_text_pages, ocr_pages, scanned_result
+
+# Compact (whitespace-free) text of a transaction row: starts with DD/MM/YY
+TRANSACTION_ROW = re.compile(r'\d{2}/\d{2}/\d{2}(?!\d)')
+
+def parse_date(date_str):
+    """Parse date string to ISO format"""
+    if not date_str:
+        return None
+
+    # Try different date formats
+    formats = [
+        '%d/%m/%y',  # 07/04/25
+        '%d/%m/%Y',  # 07/04/2025
+        '%d %b %Y',  # 01 Feb 2026
+        '%d %B %Y',  # 01 February 2026
+    ]
+
+    for fmt in formats:
+        try:
+            dt = datetime.strptime(date_str.strip(), fmt)
+            # Handle 2-digit year
+            if dt.year < 100:
+                dt = dt.replace(year=dt.year + 2000)
+            return dt.strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+    return None
+
+def extract_account_metadata(pdf, first_page=None):
+    """
+    Extract account holder info and account details from the HDFC statement.
+    `first_page` may be a cropped header region of page 1.
+    """
+    metadata = {
+        'accountNumber': None,
+        'accountType': None,
+        'accountStatus': None,
+        'accountHolderName': None,
+        'address': None,
+        'bankName': 'HDFC Bank',
+        'branch': None,
+        'ifscCode': None,
+        'micrCode': None,
+        'currency': 'INR',
+        'customerId': None,
+        'email': None,
+        'statementPeriod': {
+            'from': None,
+            'to': None
+        },
+        'openingBalance': None,
+        'closingBalance': None,
+    }
+
+    # Get text from first page
+    first_page = first_page or pdf.pages[0]
+    text = first_page.extract_text() or ''
+
+    # Account Number - HDFC format: AccountNo : 50100156157526
+    acc_match = re.search(r'AccountNo\s*:\s*(\d{10,})', text.replace(' ', ''))
+    if acc_match:
+        metadata['accountNumber'] = acc_match.group(1)
+    else:
+        # Try with spaces
+        acc_match2 = re.search(r'Account\s*No\.?\s*[:\s]*(\d{10,})', text, re.I)
+        if acc_match2:
+            metadata['accountNumber'] = acc_match2.group(1)
+
+    # Account Type - HDFC format: AccountType : SAVINGSA/C-SBMAX(193)
+    type_match = re.search(r'AccountType\s*:\s*([A-Z0-9\-\/\(\)\s]+)', text)
+    if type_match:
+        acc_type = type_match.group(1).strip()
+        if 'SAVING' in acc_type.upper():
+            metadata['accountType'] = 'savings'
+        elif 'CURRENT' in acc_type.upper():
+            metadata['accountType'] = 'current'
+        else:
+            metadata['accountType'] = acc_type
+
+    # Account Status - HDFC format: AccountStatus : Regular
+    status_match = re.search(r'AccountStatus\s*:\s*(\w+)', text)
+    if status_match:
+        metadata['accountStatus'] = status_match.group(1)
+
+    # Account Holder Name - HDFC format: MR. GAURAVCHANCHAL (with spaces removed)
+    # Look for name after State line
+    name_match = re.search(r'State\s*:\s*[A-Z]+\s*\n((?:MR\.?|MRS\.?|MS\.?)\s*[A-Z][A-Z]+)', text)
+    if name_match:
+        raw_name = name_match.group(1).strip()
+        # Clean up the name - remove title prefixes
+        raw_name = re.sub(r'^MR\.?\s*', '', raw_name, flags=re.I)
+        raw_name = re.sub(r'^MRS\.?\s*', '', raw_name, flags=re.I)
+        raw_name = re.sub(r'^MS\.?\s*', '', raw_name, flags=re.I)
+        raw_name = raw_name.strip()
+        # Split concatenated names (GAURAVCHANCHAL -> GAURAV CHANCHAL)
+        # Use uppercase boundaries
+        if ' ' not in raw_name and len(raw_name) > 5:
+            # Split by looking at where lowercase vowel is followed by uppercase consonant
+            # For GAURAVCHANCHAL, we want to split at V (GAURAV + CHANCHAL)
+            split_name = re.sub(r'([A-Z][a-z]+)([A-Z])', r'\1 \2', raw_name)
+            # If that didn't work, try splitting all-caps names
+            if ' ' not in split_name:
+                # For all-caps like GAURAVCHANCHAL, try common Indian name patterns
+                # Look for common first name endings: AV, AJ, AN, AR, AT, etc.
+                split_name = re.sub(r'(GAURAV|RAHUL|AMIT|ANIL|VIJAY|KUMAR|SHWETA|PRIYA|ARUN|ARJUN)(.*)', r'\1 \2', raw_name, flags=re.I)
+                if ' ' not in split_name or split_name.endswith(' '):
+                    # Generic split - find a good boundary
+                    split_name = raw_name  # Keep original if no pattern matches
+            raw_name = split_name
+        metadata['accountHolderName'] = raw_name.title().strip()
+
+    # Try alternate pattern for name
+    if not metadata['accountHolderName']:
+        # Look for MR./MRS. pattern
+        name_match2 = re.search(r'(MR\.?|MRS\.?|MS\.?)\s*([A-Z][A-Z]+)(?:\s*\n|[A-Z])', text)
+        if name_match2:
+            raw_name = name_match2.group(2)
+            # Apply same splitting logic
+            if ' ' not in raw_name and len(raw_name) > 5:
+                split_name = re.sub(r'(GAURAV|RAHUL|AMIT|ANIL|VIJAY|KUMAR|SHWETA|PRIYA|ARUN|ARJUN)(.*)', r'\1 \2', raw_name, flags=re.I)
+                if ' ' in split_name and not split_name.endswith(' '):
+                    raw_name = split_name
+            metadata['accountHolderName'] = raw_name.title().strip()
+
+    # IFSC Code - HDFC format: RTGS/NEFTIFSC: HDFC0000354
+    ifsc_match = re.search(r'IFSC\s*:\s*([A-Z]{4}0[A-Z0-9]{6})', text, re.I)
+    if ifsc_match:
+        metadata['ifscCode'] = ifsc_match.group(1)
+
+    # MICR Code - HDFC format: MICR:560240015
+    micr_match = re.search(r'MICR\s*:\s*(\d{9})', text, re.I)
+    if micr_match:
+        metadata['micrCode'] = micr_match.group(1)
+
+    # Branch - HDFC format: AccountBranch : SARJAPURROAD
+    branch_match = re.search(r'AccountBranch\s*:\s*([A-Z]+)', text)
+    if branch_match:
+        branch = branch_match.group(1)
+        # Add spaces to camelCase branch name
+        branch = re.sub(r'([a-z])([A-Z])', r'\1 \2', branch)
+        branch = re.sub(r'([A-Z]+)([A-Z][a-z])', r'\1 \2', branch)
+        metadata['branch'] = branch.title()
+
+    # Customer ID
+    cust_match = re.search(r'CustID\s*:\s*(\d+)', text)
+    if cust_match:
+        metadata['customerId'] = cust_match.group(1)
+
+    # Email
+    email_match = re.search(r'Email\s*:\s*([A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,})', text)
+    if email_match:
+        metadata['email'] = email_match.group(1).lower()
+
+    # Address - Reconstruct from the fragmented text
+    # HDFC shows address as: number,street,area + city + state
+    address_parts = []
+
+    # Look for address pattern in text
+    addr_match = re.search(r'(\d+[A-Z0-9,/\s]+(?:AVENUE|ROAD|STREET|RESIDENCY|LAYOUT|PHASE|GATE)[A-Z0-9,/\s]*)', text, re.I)
+    if addr_match:
+        addr_line = addr_match.group(1).strip()
+        # Add spaces around numbers and clean up
+        addr_line = re.sub(r'([0-9]+)', r' \1 ', addr_line)
+        addr_line = re.sub(r'\s+', ' ', addr_line)
+        address_parts.append(addr_line.strip())
+
+    # Get city from Address section
+    city_match = re.search(r'City\s*:\s*([A-Z]+\d*)', text)
+    if city_match:
+        city = city_match.group(1)
+        # Handle BENGALURU560102 -> Bengaluru 560102
+        city_clean = re.sub(r'(\d+)$', r' \1', city)
+        address_parts.append(city_clean.title())
+
+    # Get state
+    state_match = re.search(r'State\s*:\s*([A-Z]+)', text)
+    if state_match:
+        address_parts.append(state_match.group(1).title())
+
+    if address_parts:
+        metadata['address'] = ', '.join(address_parts)
+
+    # Statement Period - HDFC format: From : 01/04/2025 To : 06/02/2026
+    period_match = re.search(r'From\s*:\s*(\d{1,2}/\d{1,2}/\d{4})\s*To\s*:\s*(\d{1,2}/\d{1,2}/\d{4})', text)
+    if period_match:
+        metadata['statementPeriod']['from'] = parse_date(period_match.group(1))
+        metadata['statementPeriod']['to'] = parse_date(period_match.group(2))
+
+    return metadata
+
+# One grammar for every line of the statement text. Transaction rows are
+# captured whole: DD/MM/YY NARRATION REFNO DD/MM/YY [AMT] [AMT] BALANCE.
+# Anything unmatched that follows a transaction row continues its narration.
+AMOUNT = r'-?\d[\d,]*(?:\.\d+)?'
+LINE_GRAMMAR = re.compile(rf"""
+    (?P<transaction>
+        (?P<date>\d{{2}}/\d{{2}}/\d{{2}})\s+
+        (?P<narration>.+?)\s+
+        (?P<reference>[A-Z]{{0,10}}\d{{10,}})\s+
+        (?P<value_date>\d{{2}}/\d{{2}}/\d{{2}})\s+
+        (?P<first>{AMOUNT})(?:\s+(?P<second>{AMOUNT}))?(?:\s+(?P<third>{AMOUNT}))?\s*$
+    )
+    | (?P<header>.*Narration)
+    | (?P<footer>.*(?:Page\s*No|Statement|STATEMENT\s*SUMMARY|Closing\s*[Bb]alance|Opening\s*[Bb]alance
+                   |Contents\s*of|Registered\s*Office|Generated\s*On|HDFC\s*Bank|HDFC\s*BANK\s*LIMITED))
+    | (?P<unparsed>\d{{2}}/\d{{2}}/\d{{2}})
+""", re.X)
+
+# Narration keywords of a single-amount row that make it a deposit
+CREDIT_KEYWORDS = ('neft cr', 'credit', 'received', 'interest paid', 'tpt-', 'neftcr')
+
+@lru_cache(maxsize=4096)
+def row_date(date_str):
+    """Date ordinal of a DD/MM/YY row date (rows repeat a handful of dates)"""
+    return date_to_ordinal(parse_date(date_str))
+
+def parse_statement_lines(lines):
+    """
+    Parse transactions from the text lines of one HDFC statement page.
+    Each line is classified by LINE_GRAMMAR as a transaction row, table
+    header, page header/footer or unparseable dated row; other lines
+    directly below a transaction are continuations of its narration.
+    """
+    transactions = []
+    current = None  # Transaction that continuation lines attach to
+
+    for line in lines:
+        match = LINE_GRAMMAR.match(line)
+        kind = match.lastgroup if match else None
+
+        if kind is None:
+            if current is not None and line.strip():
+                current.description = f'{current.description} {line.strip()}'
+            continue
+
+        current = None
+        if kind != 'transaction':
+            continue
+
+        narration = match.group('narration')
+        amounts = [parse_paise(a) for a in match.group('first', 'second', 'third') if a]
+        balance = amounts[-1]  # Balance is always last
+        withdrawal = None
+        deposit = None
+
+        if len(amounts) == 2:
+            # One amount + balance; HDFC leaves the other column blank,
+            # so tell withdrawals from deposits by narration keywords
+            desc_lower = narration.lower()
+            if any(kw in desc_lower for kw in CREDIT_KEYWORDS):
+                deposit = amounts[0]
+            else:
+                withdrawal = amounts[0]
+        elif len(amounts) == 3:
+            # Withdrawal, Deposit, Balance
+            withdrawal = amounts[0] if amounts[0] > 0 else None
+            deposit = amounts[1] if amounts[1] > 0 else None
+
+        # Skip if no valid amount
+        if withdrawal is None and deposit is None:
+            continue
+
+        current = TransactionRecord(
+            date=row_date(match.group('date')),
+            value_date=row_date(match.group('value_date')),
+            description=narration,
+            reference=match.group('reference'),
+            amount=withdrawal if withdrawal else deposit,
+            transaction_type='debit' if withdrawal else 'credit',
+            balance=balance,
+        )
+        transactions.append(current)
+
+    return transactions
+
+def extract_page_transactions(page):
+    """Extract transactions from the text lines of one HDFC statement page"""
+    text = page.extract_text() or ''
+    return parse_statement_lines(text.split('\n'))
+
+def extract_transactions(pdf):
+    """Extract transactions from HDFC PDF statement (pages with a text layer)"""
+    transactions = []
+
+    for page in text_pages(pdf):
+        transactions.extend(extract_page_transactions(page))
+
+    return transactions
+
+def page_last_date(page):
+    """Date ordinal of the last transaction row on a page, laying out only that row"""
+    rows = extract_page_transactions(footer_region(page, TRANSACTION_ROW))
+    return rows[-1].date if rows else None
+
+def extract_transactions_since(pdf, watermark):
+    """
+    Extract only the transactions after an earlier import's watermark,
+    skipping the pages that end before it. Returns (transactions, report);
+    transactions is None when the watermark has no balance or continuity
+    with it doesn't hold.
+    """
+    pages = pdf.pages
+    if watermark['balance'] is None:
+        return None, watermark_report(watermark, 0, len(pages), 0, None, False)
+
+    first_page = first_new_page(pages, page_last_date, watermark['date'])
+
+    transactions = []
+    for page in pages[first_page:]:
+        transactions.extend(extract_page_transactions(page))
+
+    new_transactions, continuous = trim_to_watermark(transactions, watermark)
+    applied = continuous is True
+    report = watermark_report(watermark, first_page, len(pages),
+                              len(transactions) - len(new_transactions), continuous, applied)
+    return (new_transactions if applied else None), report
+
+def extract_page_transactions_from_tables(page):
+    """Extract transactions from the tables of one HDFC statement page"""
+    transactions = []
+
+    # Try to extract tables
+    tables = page.extract_tables(table_settings={
+        "vertical_strategy": "text",
+        "horizontal_strategy": "text",
+        "snap_tolerance": 5,
+        "join_tolerance": 5,
+    })
+
+    for table in tables:
+        if not table:
+            continue
+
+        for row in table:
+            if not row or len(row) < 5:
+                continue
+
+            # Skip header rows
+            row_str = ' '.join(str(cell or '') for cell in row)
+            if 'Narration' in row_str or 'Date' in row_str:
+                continue
+
+            # Parse row - find date pattern
+            date_val = None
+            for i, cell in enumerate(row):
+                if cell and re.match(r'\d{2}/\d{2}/\d{2}', str(cell)):
+                    date_val = str(cell)
+                    break
+
+            if not date_val:
+                continue
+
+            # Extract fields based on position
+            try:
+                # HDFC table: Date | Narration | Chq/Ref | ValueDt | Withdrawal | Deposit | Balance
+                narration = str(row[1] or '').strip() if len(row) > 1 else ''
+                reference = str(row[2] or '').strip() if len(row) > 2 else ''
+                value_date = str(row[3] or '').strip() if len(row) > 3 else date_val
+
+                # Get amounts from last 3 columns
+                withdrawal = parse_paise(str(row[-3] or '')) if len(row) > 5 else None
+                deposit = parse_paise(str(row[-2] or '')) if len(row) > 4 else None
+                balance = parse_paise(str(row[-1] or '')) if len(row) > 3 else None
+
+                # Determine transaction type
+                if withdrawal and not deposit:
+                    amount = withdrawal
+                    txn_type = 'debit'
+                elif deposit and not withdrawal:
+                    amount = deposit
+                    txn_type = 'credit'
+                elif withdrawal and deposit:
+                    # Both present - unusual, take the larger one
+                    if withdrawal > deposit:
+                        amount = withdrawal
+                        txn_type = 'debit'
+                    else:
+                        amount = deposit
+                        txn_type = 'credit'
+                else:
+                    continue
+
+                transactions.append(TransactionRecord(
+                    date=date_to_ordinal(parse_date(date_val)),
+                    value_date=date_to_ordinal(parse_date(value_date)),
+                    description=narration,
+                    reference=reference,
+                    amount=amount,
+                    transaction_type=txn_type,
+                    balance=balance,
+                ))
+
+            except (IndexError, ValueError):
+                continue
+
+    return transactions
+
+def extract_transactions_from_tables(pdf):
+    """Extract transactions using table extraction for better accuracy (pages with a text layer)"""
+    transactions = []
+
+    for page in text_pages(pdf):
+        transactions.extend(extract_page_transactions_from_tables(page))
+
+    return transactions
+
+def fix_embedded_dates(transactions):
+    """Fix transactions where date is embedded in description"""
+    for txn in transactions:
+        if txn.date is None and txn.description:
+            # Check if description starts with a date pattern
+            date_match = re.match(r'^(\d{2}/\d{2}/\d{2})\s+(.+)', txn.description)
+            if date_match:
+                txn.date = date_to_ordinal(parse_date(date_match.group(1)))
+                txn.description = date_match.group(2)
+    return transactions
+
+def validate_transaction_types(transactions):
+    """Validate and fix transaction types using balance continuity.
+
+    Note: We only fix the transaction TYPE based on balance change, not the amount.
+    The parsed amount from the PDF should be trusted as the source of truth.
+
+    Returns the transactions and the balance validation report.
+    """
+    if not transactions:
+        return transactions, validate_balances([])
+
+    # First fix embedded dates
+    transactions = fix_embedded_dates(transactions)
+
+    # Filter out transactions with None dates
+    valid_transactions = [t for t in transactions if t.date is not None]
+    invalid_transactions = [t for t in transactions if t.date is None]
+
+    # Sort by date to ensure proper order
+    valid_transactions.sort(key=lambda x: x.date)
+
+    # If balance decreased it's a debit, if it increased it's a credit.
+    # Only fix the transaction type, NOT the amount.
+    report = validate_balances(valid_transactions, fix_amounts=False, flag_anomalies=False)
+
+    return valid_transactions + invalid_transactions, report
+
+def compute_opening_balance(metadata, transactions):
+    """Set opening balance from first transaction's balance minus/plus amount"""
+    first_txn = transactions[0]
+    if first_txn.balance and first_txn.amount:
+        if first_txn.transaction_type == 'debit':
+            metadata['openingBalance'] = from_paise(first_txn.balance + first_txn.amount)
+        else:
+            metadata['openingBalance'] = from_paise(first_txn.balance - first_txn.amount)
+
+def preview_statement(pdf, metadata, limit):
+    """
+    Parse only as many pages as needed for the first `limit` transactions.
+    Skips the closing balance, which needs the last page.
+    """
+    transactions = []
+    read = []
+
+    # Scanned and blank pages are never laid out
+    for number, page in numbered_text_pages(pdf):
+        transactions.extend(extract_page_transactions(page))
+        read.append(page)
+        if len(transactions) >= limit:
+            pages_parsed = number
+            break
+    else:
+        pages_parsed = len(pdf.pages)
+
+    # Same fallback as the full parse, bounded to the pages already read
+    if len(transactions) < min(5, limit):
+        table_transactions = []
+        for page in read:
+            table_transactions.extend(extract_page_transactions_from_tables(page))
+        if len(table_transactions) > len(transactions):
+            transactions = table_transactions
+
+    # Complete only when every page was read and the limit dropped no rows
+    complete = pages_parsed == len(pdf.pages) and len(transactions) <= limit
+    transactions, _ = validate_transaction_types(transactions[:limit])
+
+    if transactions:
+        compute_opening_balance(metadata, transactions)
+
+    return {
+        'success': True,
+        'preview': True,
+        'complete': complete,
+        'pagesParsed': pages_parsed,
+        'pageCount': len(pdf.pages),
+        'metadata': metadata,
+        'transactions': [t.to_dict(include_value_date=True) for t in transactions],
+        'count': len(transactions),
+    }
+
+def extract_statement_metadata(pdf):
+    """
+    Read account metadata, period and opening/closing balance without
+    parsing the transaction pages: only the header (plus first row) of
+    page 1 and the last row of the final page are laid out.
+    """
+    header = header_region(pdf.pages[0], TRANSACTION_ROW, rows=1)
+    metadata = extract_account_metadata(pdf, header)
+
+    first_rows = extract_page_transactions(header)
+    if first_rows:
+        compute_opening_balance(metadata, first_rows)
+
+    last_rows = extract_page_transactions(footer_region(pdf.pages[-1], TRANSACTION_ROW))
+    if last_rows:
+        metadata['closingBalance'] = from_paise(last_rows[-1].balance)
+
+    return {
+        'success': True,
+        'metadataOnly': True,
+        'pageCount': len(pdf.pages),
+        'metadata': metadata,
+        'actualBalance': metadata['closingBalance'],
+    }
+
+def main(argv=None):
+    pdf_path, password, options = parse_args(sys.argv[1:] if argv is None else argv)
+    if not pdf_path:
+        print(json.dumps({'error': 'No PDF file path provided'}))
+        sys.exit(1)
+
+    try:
+        # Open with password if provided
+        with open_pdf(pdf_path, password) as pdf:
+            # Metadata only: header of page 1 and end of the last page, so only
+            # those two are classified
+            if options['metadata_only']:
+                scanned = scanned_result(pdf, [0, -1])
+                if scanned:
+                    print(json.dumps(scanned))
+                    sys.exit(1)
+                print(json.dumps(extract_statement_metadata(pdf)))
+                return
+
+            # Scanned statement: nothing to lay out, it needs OCR
+            scanned = scanned_result(pdf)
+            if scanned:
+                print(json.dumps(scanned))
+                sys.exit(1)
+
+            # Extract metadata
+            metadata = extract_account_metadata(pdf)
+
+            # Preview: first N transactions only
+            if options['preview'] is not None:
+                print(json.dumps(preview_statement(pdf, metadata, options['preview'])))
+                return
+
+            # Overlapping statement: parse only the pages after the watermark,
+            # or everything when it doesn't line up with the parsed rows
+            watermark = parse_watermark(options)
+            transactions, since = extract_transactions_since(pdf, watermark) if watermark else (None, None)
+
+            # Extract transactions - try text-based extraction first (more reliable)
+            if transactions is None:
+                transactions = extract_transactions(pdf)
+
+            # If text extraction didn't work well, try table-based as fallback
+            # (not needed when the rows lined up with the watermark)
+            if len(transactions) < 5 and not (since and since['applied']):
+                table_transactions = extract_transactions_from_tables(pdf)
+                if len(table_transactions) > len(transactions):
+                    transactions = table_transactions
+
+            # Validate and fix transaction types using balance continuity
+            transactions, validation = validate_transaction_types(transactions)
+
+            # Set closing balance from last transaction
+            if transactions:
+                metadata['closingBalance'] = from_paise(transactions[-1].balance)
+                compute_opening_balance(metadata, transactions)
+
+            result = {
+                'success': True,
+                'metadata': metadata,
+                'transactions': [t.to_dict(include_value_date=True) for t in transactions],
+                'count': len(transactions),
+                'actualBalance': metadata.get('closingBalance', 0),
+                'validation': validation,
+            }
+            if since:
+                result['watermark'] = since
+            scanned_pages = ocr_pages(pdf)
+            if scanned_pages:
+                result['ocrPages'] = scanned_pages
+            print(json.dumps(result))
+    except Exception as e:
+        import traceback
+        print(json.dumps({
+            'error': str(e),
+            'traceback': traceback.format_exc(),
+            'success': False
+        }))
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
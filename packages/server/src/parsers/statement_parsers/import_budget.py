@@ -0,0 +1,89 @@
+"""
+Import-time budget for the parser commands.
+
+Imports each command module in a fresh interpreter under `-X importtime`
+and fails when one takes longer than the budget or pulls in a heavy
+dependency at import time:
+    python -m statement_parsers check-imports [--budget-ms N] [--runs N]
+
+Run it after touching module-level imports so cold starts stay fast.
+`npm test` in packages/server runs it with check-narrations.
+"""
+
+import os
+import sys
+import json
+import subprocess
+
+# Cumulative import time allowed per command module, in milliseconds
+IMPORT_BUDGET_MS = 100
+
+# Packages that must only be imported on the paths that use them
+HEAVY_MODULES = ('pdfplumber', 'pdfminer', 'PIL', 'numpy', 'pypdfium2')
+
+PACKAGE = __package__ or 'statement_parsers'
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_import(module, runs=3):
+    """
+    Import `module` in fresh interpreters; return (best cumulative ms, heavy modules seen).
+    """
+    best = None
+    heavy = set()
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+            cwd=PACKAGE_ROOT, capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f'Importing {module} failed: {result.stderr.strip().splitlines()[-1:]}')
+
+        cumulative = None
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or '|' not in line:
+                continue
+            _, total, name = line.split('|')
+            name = name.strip()
+            if name.split('.')[0] in HEAVY_MODULES:
+                heavy.add(name.split('.')[0])
+            if name == module:
+                cumulative = int(total) / 1000
+
+        if cumulative is not None and (best is None or cumulative < best):
+            best = cumulative
+
+    return best, sorted(heavy)
+
+
+def main(argv=None):
+    from .cli import COMMANDS
+
+    argv = sys.argv[1:] if argv is None else argv
+    budget = IMPORT_BUDGET_MS
+    runs = 3
+    for i, arg in enumerate(argv):
+        if arg == '--budget-ms' and i + 1 < len(argv):
+            budget = float(argv[i + 1])
+        elif arg == '--runs' and i + 1 < len(argv):
+            runs = int(argv[i + 1])
+
+    modules = {}
+    failures = []
+    for command, module_name in COMMANDS.items():
+        module = f'{PACKAGE}.{module_name}'
+        ms, heavy = measure_import(module, runs)
+        modules[command] = {'module': module, 'ms': ms, 'heavyImports': heavy}
+        if heavy:
+            failures.append(f"{command} imports {', '.join(heavy)} at module level")
+        if ms is not None and ms > budget:
+            failures.append(f'{command} takes {ms:.1f}ms to import (budget {budget}ms)')
+
+    print(json.dumps({
+        'success': not failures,
+        'budgetMs': budget,
+        'modules': modules,
+        'failures': failures,
+    }, indent=2))
+    if failures:
+        sys.exit(1)
@@ -0,0 +1,541 @@
+#!/usr/bin/env python3
+"""
+Kotak Bank PDF Statement Parser using pdfplumber
+This script extracts transactions and account metadata from Kotak bank statements.
+Handles SWEEP TRANSFER specially - adjusts balances to reflect actual available funds.
+"""
+
+import sys
+import json
+from datetime import datetime
+import re
+from .transaction_records import TransactionRecord, parse_paise, date_to_ordinal, from_paise
+from .balance_validation import validate_balances
+from .statement_regions import header_region, footer_region
+from .common import open_pdf, parse_args
+from .page_classifier import text_pages, numbered_text_pages, ocr_pages, scanned_result
+
+# Compact (whitespace-free) text of a transaction row: serial number, then DD Mon YYYY
+TRANSACTION_ROW = re.compile(r'\d{1,5}\d{1,2}(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\d{4}', re.I)
+
+def parse_indian_amount(amount_str):
+    """Parse Indian formatted amount string to float"""
+    if not amount_str or amount_str.strip() in ['-', '']:
+        return None
+    # Remove commas and parse
+    cleaned = amount_str.replace(',', '').strip()
+    try:
+        return float(cleaned)
+    except ValueError:
+        return None
+
+def reverse_name_order(name):
+    """
+    Reverse name from 'Last First' to 'First Last' format.
+    Kotak statements show name as 'Chanchal Gaurav' but we want 'Gaurav Chanchal'.
+    Only applies to personal names, not company names.
+    """
+    if not name:
+        return name
+
+    # Don't reverse if it looks like a company name
+    company_keywords = ['TECHNOLOGIES', 'CONSULTANT', 'PRIVATE', 'LIMITED', 'LTD', 'PVT',
+                       'SOLUTIONS', 'SERVICES', 'ENTERPRISES', 'CORPORATION', 'CORP',
+                       'INDUSTRIES', 'TRADING', 'EXPORTS', 'IMPORTS', 'LLC', 'INC']
+    name_upper = name.upper()
+    if any(keyword in name_upper for keyword in company_keywords):
+        return name  # Don't reverse company names
+
+    parts = name.split()
+    if len(parts) == 2:
+        # Simple case: "Last First" -> "First Last"
+        return f"{parts[1]} {parts[0]}"
+    elif len(parts) == 3:
+        # Three parts: "Last Middle First" -> "First Middle Last"
+        return f"{parts[2]} {parts[1]} {parts[0]}"
+    return name
+
+def parse_date(date_str):
+    """Parse date string to ISO format"""
+    if not date_str:
+        return None
+
+    # Try different date formats
+    formats = [
+        '%d %b %Y',  # 01 Feb 2026
+        '%d %B %Y',  # 01 February 2026
+        '%d/%m/%Y',  # 01/02/2026
+    ]
+
+    for fmt in formats:
+        try:
+            dt = datetime.strptime(date_str.strip(), fmt)
+            return dt.strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+    return None
+
+def extract_account_metadata(pdf, first_page=None):
+    """
+    Extract account holder info and account details from the statement.
+    `first_page` may be a cropped header region of page 1.
+    """
+    metadata = {
+        'accountNumber': None,
+        'accountType': None,
+        'accountStatus': None,  # Individual, Joint, etc.
+        'accountHolderName': None,
+        'address': None,
+        'bankName': 'Kotak Mahindra Bank',
+        'branch': None,
+        'ifscCode': None,
+        'micrCode': None,
+        'currency': 'INR',
+        'statementPeriod': {
+            'from': None,
+            'to': None
+        },
+        'openingBalance': None,
+        'closingBalance': None,
+    }
+
+    # Get text from first page
+    first_page = first_page or pdf.pages[0]
+    text = first_page.extract_text() or ''
+
+    # Account Number
+    acc_match = re.search(r'Account\s*No\.?\s*[:\s]*(\d{10,})', text, re.I)
+    if acc_match:
+        metadata['accountNumber'] = acc_match.group(1)
+
+    # Account Type
+    type_match = re.search(r'Account\s*Type\s*[:\s]*(Savings|Current|Salary)', text, re.I)
+    if type_match:
+        metadata['accountType'] = type_match.group(1).lower()
+
+    # Account Status (Individual, Joint, etc.)
+    status_match = re.search(r'Account\s*Status\s*[:\s]*(Individual|Joint|Corporate|Proprietary|Partnership)', text, re.I)
+    if status_match:
+        metadata['accountStatus'] = status_match.group(1).title()
+    else:
+        # Try alternate pattern
+        status_match2 = re.search(r'Status\s*[:\s]*(Individual|Joint|Active|Dormant)', text, re.I)
+        if status_match2:
+            metadata['accountStatus'] = status_match2.group(1).title()
+
+    # Account Holder Name (usually at the top after bank header)
+    # Pattern: Look for name before CRN or Account No
+    # NOTE: Kotak shows name as "Last First" - we need to reverse to "First Last"
+    # Skip common prefix words like "Account", "Mr", "Mrs", etc.
+    name_match = re.search(r'Account Statement\s*[\d\s\w-]+\n+(?:Account\s+)?([A-Z][a-z]+\s+[A-Z][a-z]+(?:\s+[A-Z][a-z]+)?)', text)
+    if name_match:
+        raw_name = name_match.group(1).strip()
+        # Remove any "Account" prefix if it slipped through
+        raw_name = re.sub(r'^Account\s+', '', raw_name, flags=re.I)
+        metadata['accountHolderName'] = reverse_name_order(raw_name)
+    else:
+        # Try another pattern - name after period line
+        name_match2 = re.search(r'\d{4}\s*\n+(?:Account\s+)?([A-Z][a-zA-Z]+\s+[A-Z][a-zA-Z]+)', text)
+        if name_match2:
+            raw_name = name_match2.group(1).strip()
+            # Remove any "Account" prefix if it slipped through
+            raw_name = re.sub(r'^Account\s+', '', raw_name, flags=re.I)
+            metadata['accountHolderName'] = reverse_name_order(raw_name)
+
+    # IFSC Code
+    ifsc_match = re.search(r'IFSC\s*Code\s*[:\s]*([A-Z]{4}0[A-Z0-9]{6})', text, re.I)
+    if ifsc_match:
+        metadata['ifscCode'] = ifsc_match.group(1)
+
+    # MICR Code
+    micr_match = re.search(r'MICR\s*[:\s]*(\d{9})', text, re.I)
+    if micr_match:
+        metadata['micrCode'] = micr_match.group(1)
+
+    # Branch
+    branch_match = re.search(r'Branch\s*[:\s]*([A-Za-z\s]+?)(?:\n|Branch)', text, re.I)
+    if branch_match:
+        metadata['branch'] = branch_match.group(1).strip()
+
+    # Address - Look for address block ending with pincode pattern and India
+    # The address typically has: street, area, city - pincode, state - India
+    # Pattern: Find lines ending with "State - India" preceded by "City - 6digits"
+    address_match = re.search(
+        r'([A-Za-z0-9][A-Za-z0-9\s,./\-]+\n(?:[A-Za-z0-9][A-Za-z0-9\s,./\-]+\n)*[A-Za-z\s]+[-–]\s*\d{6}\s*\n[A-Za-z\s]+[-–]\s*India)',
+        text, re.M | re.I
+    )
+
+    if address_match:
+        raw_address = address_match.group(1).strip()
+        # Filter out lines that look like account metadata
+        lines = raw_address.split('\n')
+        address_lines = []
+        skip_keywords = ['Account No', 'Account Type', 'CRN', 'Branch', 'Phone',
+                        'Nominee', 'Status', 'IFSC', 'MICR', 'Statement']
+        for line in lines:
+            line = line.strip()
+            if line and not any(kw.lower() in line.lower() for kw in skip_keywords):
+                # Skip date ranges like "07 May 2025 - 07 Feb 2026"
+                if not re.match(r'^\d{1,2}\s+\w+\s+\d{4}\s*[-–]', line):
+                    address_lines.append(line)
+        if address_lines:
+            # Join and clean up stray punctuation
+            address = ', '.join(address_lines)
+            # Remove standalone dots or commas
+            address = re.sub(r',\s*\.,', ',', address)
+            address = re.sub(r',\s*\.$', '', address)
+            address = re.sub(r'\.,\s*', ', ', address)
+            address = re.sub(r',\s*,', ',', address)
+            metadata['address'] = address.strip(', .')
+
+    # Statement Period (from filename or header)
+    period_match = re.search(r'(\d{1,2}\s+[A-Za-z]+\s+\d{4})\s*[-–]\s*(\d{1,2}\s+[A-Za-z]+\s+\d{4})', text)
+    if period_match:
+        metadata['statementPeriod']['from'] = parse_date(period_match.group(1))
+        metadata['statementPeriod']['to'] = parse_date(period_match.group(2))
+
+    return metadata
+
+def extract_page_transactions(page):
+    """Extract transactions from the transaction table of one Kotak statement page"""
+    transactions = []
+
+    # Extract table with explicit settings for better column detection
+    table = page.extract_table(table_settings={
+        "vertical_strategy": "lines",
+        "horizontal_strategy": "lines",
+        "snap_tolerance": 3,
+        "join_tolerance": 3,
+    })
+
+    if not table:
+        # Fallback: try text-based extraction
+        table = page.extract_table(table_settings={
+            "vertical_strategy": "text",
+            "horizontal_strategy": "text",
+        })
+
+    if not table:
+        return transactions
+
+    # Find header row to identify columns
+    header_idx = None
+    for i, row in enumerate(table):
+        if row and any(cell and 'Date' in str(cell) for cell in row):
+            header_idx = i
+            break
+
+    if header_idx is None:
+        return transactions
+
+    # Process transaction rows
+    for row in table[header_idx + 1:]:
+        if not row or len(row) < 5:
+            continue
+
+        # Skip non-data rows
+        row_str = ' '.join(str(cell or '') for cell in row)
+        if 'Opening Balance' in row_str or 'End of Statement' in row_str:
+            continue
+
+        # Kotak format: #, Date, Description, Chq/Ref, Withdrawal, Deposit, Balance
+        # Try to identify columns by position
+        try:
+            # Find date column (contains month abbreviation)
+            date_val = None
+            date_idx = None
+            for i, cell in enumerate(row):
+                if cell and re.search(r'\d{1,2}\s+(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+\d{4}', str(cell), re.I):
+                    date_val = str(cell).strip()
+                    date_idx = i
+                    break
+
+            if not date_val:
+                continue
+
+            # Description is usually after date
+            description = str(row[date_idx + 1] or '').strip() if date_idx + 1 < len(row) else ''
+
+            # Reference/Chq number
+            reference = str(row[date_idx + 2] or '').strip() if date_idx + 2 < len(row) else ''
+
+            # Withdrawal (debit) and Deposit (credit) columns
+            # Usually the last 3 columns are: Withdrawal, Deposit, Balance
+            withdrawal = None
+            deposit = None
+            balance = None
+
+            # Work backwards from the end
+            numeric_cols = []
+            for i in range(len(row) - 1, date_idx + 2, -1):
+                val = parse_paise(str(row[i] or ''))
+                if val is not None:
+                    numeric_cols.insert(0, (i, val))
+
+            # Assign based on position (Balance, Deposit, Withdrawal from right to left)
+            if len(numeric_cols) >= 1:
+                balance = numeric_cols[-1][1]
+            if len(numeric_cols) >= 2:
+                # Second from right could be deposit or withdrawal
+                deposit_or_withdrawal = numeric_cols[-2][1]
+            if len(numeric_cols) >= 3:
+                # If we have 3 numeric values, middle is deposit, first is withdrawal
+                withdrawal = numeric_cols[-3][1] if numeric_cols[-3][1] else None
+                deposit = numeric_cols[-2][1] if numeric_cols[-2][1] else None
+            elif len(numeric_cols) == 2:
+                # Only 2 values: amount and balance
+                # Determine type from description or later validation
+                deposit_or_withdrawal = numeric_cols[-2][1]
+                # For now, assume it's withdrawal unless description suggests credit
+                desc_lower = description.lower()
+                if 'neft cr' in desc_lower or 'received' in desc_lower or 'credit' in desc_lower:
+                    deposit = deposit_or_withdrawal
+                else:
+                    withdrawal = deposit_or_withdrawal
+
+            # Skip if no valid amount
+            if withdrawal is None and deposit is None:
+                continue
+
+            amount = withdrawal if withdrawal else deposit
+            txn_type = 'debit' if withdrawal else 'credit'
+
+            transactions.append(TransactionRecord(
+                date=date_to_ordinal(parse_date(date_val)),
+                description=description,
+                reference=reference if reference and reference != '-' else None,
+                amount=amount,
+                transaction_type=txn_type,
+                balance=balance,
+                raw_withdrawal=withdrawal,
+                raw_deposit=deposit,
+            ))
+
+        except (IndexError, ValueError) as e:
+            continue
+
+    return transactions
+
+def extract_transactions(pdf_path, password=None):
+    """Extract transactions from Kotak PDF statement (pages with a text layer)"""
+    transactions = []
+
+    with open_pdf(pdf_path, password) as pdf:
+        for page in text_pages(pdf):
+            transactions.extend(extract_page_transactions(page))
+
+    # Validate and fix amounts using balance continuity, then flag suspicious amounts
+    report = validate_balances(transactions, fix_amounts=True, flag_anomalies=True)
+
+    return transactions, report
+
+def handle_sweep_transfers(transactions):
+    """
+    Handle SWEEP TRANSFER transactions:
+    - SWEEP TRANSFER TO [account]: Money moved to linked FD (not a real withdrawal)
+    - SWEEP TRANSFER FROM [account]: Money retrieved from linked FD
+
+    Returns:
+    - Regular transactions (excluding sweep)
+    - Sweep transactions separately
+    - Cumulative sweep balance
+    - Adjusted balances for transactions after sweep
+    """
+    regular_transactions = []
+    sweep_transactions = []
+    cumulative_sweep = 0
+
+    for txn in transactions:
+        desc = txn.description or ''
+
+        # Check for SWEEP TRANSFER TO (money going to FD)
+        sweep_to_match = re.search(r'SWEEP\s+TRANSFER\s+TO\s*\[(\d+)\]', desc, re.I)
+        if sweep_to_match:
+            txn.sweep_type = 'to_fd'
+            txn.sweep_account_number = sweep_to_match.group(1)
+            cumulative_sweep += txn.amount
+            sweep_transactions.append(txn)
+            continue
+
+        # Check for SWEEP TRANSFER FROM (money coming back from FD)
+        sweep_from_match = re.search(r'SWEEP\s+TRANSFER\s+FROM\s*\[(\d+)\]', desc, re.I)
+        if sweep_from_match:
+            txn.sweep_type = 'from_fd'
+            txn.sweep_account_number = sweep_from_match.group(1)
+            cumulative_sweep -= txn.amount
+            sweep_transactions.append(txn)
+            continue
+
+        # Regular transaction - adjust balance if we have cumulative sweep
+        if cumulative_sweep > 0 and txn.balance is not None:
+            txn.shown_balance = txn.balance
+            txn.balance = txn.balance + cumulative_sweep
+            txn.sweep_adjustment = cumulative_sweep
+
+        regular_transactions.append(txn)
+
+    return regular_transactions, sweep_transactions, cumulative_sweep
+
+def extract_opening_balance(pages):
+    """Extract opening balance from the given statement pages (or page regions)"""
+    for page in pages:
+        text = page.extract_text() or ''
+
+        # Look for Opening Balance row
+        opening_match = re.search(r'Opening\s+Balance.*?([\d,]+\.\d{2})\s*$', text, re.M | re.I)
+        if opening_match:
+            return parse_indian_amount(opening_match.group(1))
+
+    return None
+
+def extract_closing_balance(region):
+    """Extract closing balance from the end of the last page"""
+    text = region.extract_text() or ''
+
+    closing_match = re.search(r'Closing\s+Balance.*?(-?[\d,]+\.\d{2})', text, re.I)
+    if closing_match:
+        return parse_indian_amount(closing_match.group(1))
+
+    # Otherwise the balance column of the last transaction row
+    balances = re.findall(r'(-?[\d,]+\.\d{2})\s*$', text, re.M)
+    if balances:
+        return parse_indian_amount(balances[-1])
+
+    return None
+
+def preview_statement(pdf, metadata, limit):
+    """
+    Parse only as many pages as needed for the first `limit` transactions.
+    Skips the closing balance, which needs the last page.
+    """
+    transactions = []
+    read = []
+
+    # Scanned and blank pages are never laid out
+    for number, page in numbered_text_pages(pdf):
+        transactions.extend(extract_page_transactions(page))
+        read.append(page)
+        if len(transactions) >= limit:
+            pages_parsed = number
+            break
+    else:
+        pages_parsed = len(pdf.pages)
+
+    metadata['openingBalance'] = extract_opening_balance(read)
+
+    # Complete only when every page was read and the limit dropped no rows
+    complete = pages_parsed == len(pdf.pages) and len(transactions) <= limit
+    transactions = transactions[:limit]
+    validate_balances(transactions, fix_amounts=True, flag_anomalies=True)
+    transactions, sweep_transactions, cumulative_sweep = handle_sweep_transfers(transactions)
+
+    return {
+        'success': True,
+        'preview': True,
+        'complete': complete,
+        'pagesParsed': pages_parsed,
+        'pageCount': len(pdf.pages),
+        'metadata': metadata,
+        'transactions': [t.to_dict(include_raw=True) for t in transactions],
+        'sweepTransactions': [t.to_dict(include_raw=True) for t in sweep_transactions],
+        'sweepBalance': from_paise(cumulative_sweep),
+        'count': len(transactions),
+        'sweepCount': len(sweep_transactions),
+    }
+
+def extract_statement_metadata(pdf):
+    """
+    Read account metadata, period and opening/closing balance without
+    parsing the transaction tables: only the header of page 1 and the last
+    row of the final page are laid out.
+
+    The closing balance is as printed; sweep adjustments need the full parse.
+    """
+    header = header_region(pdf.pages[0], TRANSACTION_ROW)
+    metadata = extract_account_metadata(pdf, header)
+    metadata['openingBalance'] = extract_opening_balance([header])
+    metadata['closingBalance'] = extract_closing_balance(footer_region(pdf.pages[-1], TRANSACTION_ROW))
+
+    return {
+        'success': True,
+        'metadataOnly': True,
+        'pageCount': len(pdf.pages),
+        'metadata': metadata,
+        'actualBalance': metadata['closingBalance'],
+    }
+
+def main(argv=None):
+    pdf_path, password, options = parse_args(sys.argv[1:] if argv is None else argv)
+    if not pdf_path:
+        print(json.dumps({'error': 'No PDF file path provided'}))
+        sys.exit(1)
+
+    try:
+        # Open with password if provided
+        with open_pdf(pdf_path, password) as pdf:
+            # Metadata only: header of page 1 and end of the last page, so only
+            # those two are classified
+            if options['metadata_only']:
+                scanned = scanned_result(pdf, [0, -1])
+                if scanned:
+                    print(json.dumps(scanned))
+                    sys.exit(1)
+                print(json.dumps(extract_statement_metadata(pdf)))
+                return
+
+            # Scanned statement: nothing to lay out, it needs OCR
+            scanned = scanned_result(pdf)
+            if scanned:
+                print(json.dumps(scanned))
+                sys.exit(1)
+
+            # Extract metadata
+            metadata = extract_account_metadata(pdf)
+
+            # Preview: first N transactions only
+            if options['preview'] is not None:
+                print(json.dumps(preview_statement(pdf, metadata, options['preview'])))
+                return
+
+            # Extract opening balance
+            metadata['openingBalance'] = extract_opening_balance(pdf.pages)
+            scanned_pages = ocr_pages(pdf)
+
+        # Extract transactions (this reopens the PDF, but that's fine)
+        all_transactions, validation = extract_transactions(pdf_path, password)
+
+        # Handle sweep transfers
+        transactions, sweep_transactions, cumulative_sweep = handle_sweep_transfers(all_transactions)
+
+        # Set closing balance from last transaction
+        if transactions:
+            metadata['closingBalance'] = from_paise(transactions[-1].balance)
+
+        # Calculate actual balance (including sweep)
+        actual_balance = metadata['closingBalance'] or 0
+
+        result = {
+            'success': True,
+            'metadata': metadata,
+            'transactions': [t.to_dict(include_raw=True) for t in transactions],
+            'sweepTransactions': [t.to_dict(include_raw=True) for t in sweep_transactions],
+            'sweepBalance': from_paise(cumulative_sweep),
+            'actualBalance': actual_balance,
+            'count': len(transactions),
+            'sweepCount': len(sweep_transactions),
+            'validation': validation,
+        }
+        if scanned_pages:
+            result['ocrPages'] = scanned_pages
+        print(json.dumps(result))
+    except Exception as e:
+        import traceback
+        print(json.dumps({
+            'error': str(e),
+            'traceback': traceback.format_exc(),
+            'success': False
+        }))
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
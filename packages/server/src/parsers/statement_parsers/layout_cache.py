@@ -0,0 +1,280 @@
+"""
+On-disk cache of page layout results shared by all parser commands.
+
+pdfminer layout analysis dominates the cost of every command, and an upload
+usually goes through several of them (detect, then preview, then the full
+parse; or extract-template, then parse-template). Page text, words, chars
+and tables are cached per (document hash, page, kind, settings) so later
+passes over the same document skip layout entirely.
+
+Entries are marshal + zlib blobs, one file per key, written atomically.
+Expired entries and anything over the size cap (oldest first) are pruned
+when a document that wrote to the cache is closed.
+
+marshal is only safe on data this process wrote, so the cache directory
+must be owned by the server's user and closed to everyone else; otherwise
+caching is off. Encrypted documents are never cached, so a password-
+protected statement's text isn't left on disk.
+
+Environment:
+    LAYOUT_CACHE_DIR        cache directory (default: layout-cache in the app data dir)
+    LAYOUT_CACHE_TTL        seconds an entry stays valid (default: 86400)
+    LAYOUT_CACHE_MAX_BYTES  total size cap (default: 256MB)
+    LAYOUT_CACHE=off        disable the cache
+"""
+
+import os
+import time
+import zlib
+import marshal
+import hashlib
+
+from .common import app_data_dir, private_directory
+
+# Bump when the layout of cached entries changes
+CACHE_VERSION = 1
+
+DEFAULT_TTL = 24 * 60 * 60
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Char fields kept in the cache; enough for text, words and region cropping
+CHAR_FIELDS = (
+    'text', 'fontname', 'size', 'adv', 'upright', 'x0', 'y0', 'x1', 'y1',
+    'width', 'height', 'top', 'bottom', 'doctop', 'matrix', 'page_number',
+    'object_type',
+)
+
+
+def _settings_key(kind, settings):
+    """Short digest of an extraction kind and its settings"""
+    import pdfplumber
+
+    raw = repr((CACHE_VERSION, pdfplumber.__version__, kind, sorted((settings or {}).items())))
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:12]
+
+
+def _pack_chars(chars):
+    return [tuple(c.get(f) for f in CHAR_FIELDS) for c in chars]
+
+
+def _unpack_chars(rows):
+    return [dict(zip(CHAR_FIELDS, row)) for row in rows]
+
+
+class LayoutCache:
+    """Cache entries for a single document"""
+
+    def __init__(self, directory, doc_hash, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.doc_hash = doc_hash
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.written = False
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, page_number, kind, settings):
+        name = f'{self.doc_hash}-p{page_number}-{kind}-{_settings_key(kind, settings)}.bin'
+        return os.path.join(self.directory, name)
+
+    def get_or_compute(self, page_number, kind, settings, compute):
+        """Return the cached value for this key, computing and storing it on a miss"""
+        path = self._path(page_number, kind, settings)
+        try:
+            if time.time() - os.stat(path).st_mtime <= self.ttl:
+                with open(path, 'rb') as f:
+                    value = marshal.loads(zlib.decompress(f.read()))
+                self.hits += 1
+                return value
+        except (OSError, ValueError, EOFError, TypeError, zlib.error):
+            pass
+
+        self.misses += 1
+        value = compute()
+        self._write(path, value)
+        return value
+
+    def _write(self, path, value):
+        try:
+            blob = zlib.compress(marshal.dumps(value), 6)
+        except ValueError:
+            return  # Value holds a type marshal can't store; just don't cache it
+
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        try:
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(blob)
+            os.replace(tmp_path, path)
+            self.written = True
+        except OSError:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+
+    def prune(self):
+        """Drop expired entries, then the oldest ones until under the size cap"""
+        now = time.time()
+        entries = []
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if now - st.st_mtime > self.ttl:
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+            else:
+                entries.append((st.st_mtime, st.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+                total -= size
+            except OSError:
+                pass
+
+
+class CachedRegion:
+    """A bounding-box view of a cached page, built from its cached chars"""
+
+    def __init__(self, chars, bbox):
+        self.chars = chars
+        self.bbox = bbox
+        self.width = bbox[2] - bbox[0]
+        self.height = bbox[3] - bbox[1]
+
+    def extract_text(self, **kwargs):
+        from pdfplumber.utils import chars_to_textmap
+
+        options = {'layout_bbox': self.bbox, 'layout_width': self.width, 'layout_height': self.height}
+        options.update(kwargs)
+        return chars_to_textmap(self.chars, **options).as_string
+
+    def within_bbox(self, bbox, relative=False, strict=True):
+        return _region_within(self, bbox)
+
+
+def _region_within(source, bbox):
+    """Chars of `source` lying fully inside `bbox`, as a CachedRegion"""
+    x0, top, x1, bottom = bbox
+    chars = [
+        c for c in source.chars
+        if c['x0'] >= x0 and c['x1'] <= x1 and c['top'] >= top and c['bottom'] <= bottom
+    ]
+    return CachedRegion(chars, bbox)
+
+
+class CachedPage:
+    """
+    Stand-in for a pdfplumber page that answers layout queries from the cache.
+    The underlying page is only laid out on a cache miss.
+    """
+
+    def __init__(self, cache, page):
+        self._cache = cache
+        self._page = page
+        self._chars = None
+        self.page_obj = page.page_obj  # Raw page objects, for page_classifier
+        self.page_number = page.page_number
+        self.width = page.width
+        self.height = page.height
+        self.bbox = page.bbox
+
+    @property
+    def chars(self):
+        if self._chars is None:
+            rows = self._cache.get_or_compute(
+                self.page_number, 'chars', None, lambda: _pack_chars(self._page.chars))
+            self._chars = _unpack_chars(rows)
+        return self._chars
+
+    def extract_text(self, **kwargs):
+        return self._cache.get_or_compute(
+            self.page_number, 'text', kwargs, lambda: self._page.extract_text(**kwargs))
+
+    def extract_words(self, **kwargs):
+        return self._cache.get_or_compute(
+            self.page_number, 'words', kwargs, lambda: self._page.extract_words(**kwargs))
+
+    def extract_table(self, table_settings=None):
+        return self._cache.get_or_compute(
+            self.page_number, 'table', table_settings, lambda: self._page.extract_table(table_settings))
+
+    def extract_tables(self, table_settings=None):
+        return self._cache.get_or_compute(
+            self.page_number, 'tables', table_settings, lambda: self._page.extract_tables(table_settings))
+
+    def within_bbox(self, bbox, relative=False, strict=True):
+        return _region_within(self, bbox)
+
+
+class CachedDocument:
+    """Wraps an open pdfplumber PDF so its pages go through the layout cache"""
+
+    def __init__(self, pdf, cache):
+        self._pdf = pdf
+        self.cache = cache
+        self.metadata = pdf.metadata
+        self.pages = [CachedPage(cache, page) for page in pdf.pages]
+
+    def close(self):
+        self._pdf.close()
+        if self.cache.written:
+            self.cache.prune()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def document_hash(source):
+    """SHA-256 of the document bytes (file path or bytes)"""
+    if isinstance(source, (bytes, bytearray)):
+        return hashlib.sha256(source).hexdigest()
+    digest = hashlib.sha256()
+    with open(source, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_directory():
+    """Cache directory, private to this user; None if disabled or not private"""
+    if os.environ.get('LAYOUT_CACHE', '').lower() in ('off', '0', 'false'):
+        return None
+    return private_directory(os.environ.get('LAYOUT_CACHE_DIR') or os.path.join(app_data_dir(), 'layout-cache'))
+
+
+def cached_document(pdf, source):
+    """
+    Wrap `pdf` with the layout cache, or return it unchanged when caching is
+    off or the document is encrypted
+    """
+    if getattr(pdf.doc, 'encryption', None):
+        return pdf
+    directory = cache_directory()
+    if directory is None:
+        return pdf
+
+    cache = LayoutCache(
+        directory,
+        document_hash(source),
+        ttl=int(os.environ.get('LAYOUT_CACHE_TTL') or DEFAULT_TTL),
+        max_bytes=int(os.environ.get('LAYOUT_CACHE_MAX_BYTES') or DEFAULT_MAX_BYTES),
+    )
+    return CachedDocument(pdf, cache)
@@ -0,0 +1,359 @@
+"""
+Structural fingerprints of statement PDFs and the index of known layouts.
+
+Statements from one generator share a font set, page size, producer string
+and table ruling. Those are read straight from the PDF objects (document
+info, first page resources and its raw content stream), so fingerprinting
+needs no layout analysis and costs little more than opening the document.
+
+Whenever detection or template matching succeeds, the fingerprint is
+recorded against its route (bank, file type, parser, learned templates and
+their column geometry). Later uploads with a known fingerprint go straight
+to the right extractor. A bank route needs a couple of agreeing detections
+first, and a fingerprint seen with two different banks or file types is
+marked ambiguous and no longer routed to a bank. The features are generic
+(a report generator, its fonts, A4), so another bank's statements can
+share them: a bank route is only followed when the header of page 1 names
+that bank, and otherwise text detection runs and records its own result.
+That check lays out the characters of page 1, so a routed upload still
+pays for one page of layout (not the document's, as text detection does).
+
+Entries are kept per user (the `user` job parameter or --user), so one
+user's uploads never route another's. Recording holds an exclusive lock
+on the index for its read-modify-write, so concurrent uploads don't lose
+each other's entries; lookups read the atomically replaced file unlocked.
+
+    python -m statement_parsers fingerprint <pdf_path|-> [password] [--user U]
+    python -m statement_parsers fingerprint --record <fingerprint> [--user U] [--bank B]
+        [--file-type T] [--parser P] [--template-id ID] [--columns JSON]
+
+Environment:
+    LAYOUT_INDEX_PATH   index file (default: layout-index.json in the app data dir)
+    LAYOUT_INDEX=off    disable lookups and recording
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import fcntl
+import hashlib
+from contextlib import contextmanager
+
+from .common import app_data_dir, open_pdf, pdf_stream, resolve_source
+from .statement_regions import page_lines
+
+# Bump when the fingerprint features change; old entries then never match
+FINGERPRINT_VERSION = 1
+
+# Agreeing text detections needed before a fingerprint routes to a bank on its own.
+# Learned templates route immediately: the user confirmed them.
+MIN_CONFIRMATIONS = 2
+
+# Oldest entries beyond this are dropped when the index is written
+MAX_ENTRIES = 2000
+
+# Statement parser command for banks that have a dedicated one
+BANK_PARSERS = {
+    'hdfc': 'hdfc',
+    'kotak': 'kotak',
+}
+
+# Header text (lowercase, spaces removed) naming each bank
+BANK_HEADERS = {
+    'hdfc': ('hdfc',),
+    'hdfc_infinia': ('hdfc',),
+    'kotak': ('kotak',),
+    'icici': ('icici',),
+    'sbi': ('statebank', 'sbi'),
+    'axis': ('axis',),
+}
+
+# The header ends at the first line opening with a date (01/04/25, 01 Jan 2025)
+ROW_START = re.compile(r'\d*?\d{1,2}(?:[/\-.]\d{1,2}[/\-.]|[A-Za-z]{3}-?)\d{2,4}')
+MAX_HEADER_LINES = 25
+
+RECT_OP = re.compile(rb'\sre\s')
+LINE_OP = re.compile(rb'\sl\s')
+VERSION_NOISE = re.compile(r'[\d.:+\-/()©]+')
+
+
+def _text(value):
+    """Decode a PDF info/name value to plain text"""
+    from pdfminer.pdftypes import resolve1
+    from pdfminer.psparser import PSLiteral
+    from pdfminer.utils import decode_text
+
+    value = resolve1(value)
+    if isinstance(value, PSLiteral):
+        return str(value.name)
+    if isinstance(value, bytes):
+        return decode_text(value)
+    return '' if value is None else str(value)
+
+
+def _generator(value):
+    """Producer/creator string without version numbers and dates"""
+    return ' '.join(VERSION_NOISE.sub(' ', _text(value)).split()).lower()
+
+
+def _bucket(count):
+    """0 for none, 1 for a few, 2 for a ruled table"""
+    return 0 if count == 0 else (1 if count < 10 else 2)
+
+
+def _page_features(page):
+    """Fonts, image count, size and ruling of one page, from its objects only"""
+    from pdfminer.pdftypes import resolve1
+
+    resources = resolve1(page.resources) or {}
+    fonts = set()
+    for ref in (resolve1(resources.get('Font')) or {}).values():
+        name = _text((resolve1(ref) or {}).get('BaseFont'))
+        fonts.add(name.split('+', 1)[-1])  # Drop the subset prefix (ABCDEF+Arial)
+
+    images = 0
+    for ref in (resolve1(resources.get('XObject')) or {}).values():
+        if _text((resolve1(ref) or {}).get('Subtype')) == 'Image':
+            images += 1
+
+    rects = lines = 0
+    for stream in page.contents:
+        data = resolve1(stream).get_data()
+        rects += len(RECT_OP.findall(data))
+        lines += len(LINE_OP.findall(data))
+
+    x0, y0, x1, y1 = page.mediabox
+    return {
+        'size': [round(x1 - x0), round(y1 - y0)],
+        'fonts': sorted(fonts),
+        'images': images,
+        'ruling': [_bucket(rects), _bucket(lines)],
+    }
+
+
+def compute_fingerprint(pdf_path, password=None):
+    """
+    Fingerprint a PDF from its document info and first page objects.
+    Returns (fingerprint, features).
+    """
+    from pdfminer.pdfparser import PDFParser
+    from pdfminer.pdfdocument import PDFDocument
+    from pdfminer.pdfpage import PDFPage
+
+    with pdf_stream(pdf_path) as f:
+        doc = PDFDocument(PDFParser(f), password=password or '')
+        info = doc.info[0] if doc.info else {}
+        first_page = next(PDFPage.create_pages(doc), None)
+        if first_page is None:
+            raise ValueError('PDF has no pages')
+
+        features = {
+            'producer': _generator(info.get('Producer')),
+            'creator': _generator(info.get('Creator')),
+            **_page_features(first_page),
+        }
+
+    raw = json.dumps([FINGERPRINT_VERSION, features], sort_keys=True)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:20], features
+
+
+def index_path():
+    """Index file from the environment; None if disabled"""
+    if os.environ.get('LAYOUT_INDEX', '').lower() in ('off', '0', 'false'):
+        return None
+    return os.environ.get('LAYOUT_INDEX_PATH') or os.path.join(app_data_dir(), 'layout-index.json')
+
+
+def _entry_key(fingerprint, user=None):
+    return f'{user}:{fingerprint}' if user else fingerprint
+
+
+@contextmanager
+def index_lock(path):
+    """Exclusive lock on the index (a sidecar .lock file) for a read-modify-write"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    fd = os.open(f'{path}.lock', os.O_WRONLY | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)  # Releases the lock
+
+
+def load_index(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+        return entries if isinstance(entries, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def save_index(path, entries):
+    """Write the index atomically, keeping the most recently updated entries"""
+    if len(entries) > MAX_ENTRIES:
+        newest = sorted(entries.items(), key=lambda item: item[1].get('updatedAt', 0), reverse=True)
+        entries = dict(newest[:MAX_ENTRIES])
+
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+
+def lookup_route(fingerprint, user=None):
+    """
+    Known route for a fingerprint, or None when unknown. Bank routes need
+    MIN_CONFIRMATIONS agreeing detections; ambiguous entries route templates only.
+    """
+    path = index_path()
+    if path is None:
+        return None
+    entry = load_index(path).get(_entry_key(fingerprint, user))
+    if not entry:
+        return None
+
+    route = {'templates': entry['templates']} if entry.get('templates') else {}
+    if not entry.get('ambiguous') and entry.get('confirmations', 0) >= MIN_CONFIRMATIONS:
+        route.update(bank=entry.get('bank'), fileType=entry.get('fileType'), parser=entry.get('parser'))
+    return route or None
+
+
+def record_route(fingerprint, bank=None, file_type=None, parser=None, template_id=None, columns=None, user=None):
+    """
+    Remember where a fingerprint routes. Bank routes and learned templates
+    are kept side by side; a conflicting bank or file type marks the entry ambiguous.
+    """
+    path = index_path()
+    if path is None or not fingerprint:
+        return None
+
+    try:
+        with index_lock(path):
+            return _record_locked(path, _entry_key(fingerprint, user), bank, file_type, parser, template_id, columns)
+    except OSError:
+        return None
+
+
+def _record_locked(path, key, bank, file_type, parser, template_id, columns):
+    entries = load_index(path)
+    entry = entries.get(key) or {}
+
+    if bank or file_type:
+        if 'confirmations' in entry and (entry.get('bank'), entry.get('fileType')) != (bank, file_type):
+            entry['ambiguous'] = True
+        else:
+            entry['bank'] = bank
+            entry['fileType'] = file_type
+            entry['parser'] = parser or BANK_PARSERS.get(bank)
+            entry['confirmations'] = entry.get('confirmations', 0) + 1
+
+    if template_id:
+        templates = entry.setdefault('templates', {})
+        template = templates.setdefault(template_id, {})
+        if columns:
+            template['columns'] = columns
+
+    entry['updatedAt'] = int(time.time())
+    entries[key] = entry
+    save_index(path, entries)
+    return entry
+
+
+def header_names_bank(pdf_path, password, bank):
+    """Whether the header of page 1 (the lines above its first transaction row) names `bank`"""
+    markers = BANK_HEADERS.get(bank, (bank,))
+    try:
+        with open_pdf(pdf_path, password) as pdf:
+            lines = page_lines(pdf.pages[0])
+    except Exception:
+        return False
+
+    for _, _, text in lines[:MAX_HEADER_LINES]:
+        if ROW_START.match(text):
+            break
+        text = text.lower()
+        if any(marker in text for marker in markers):
+            return True
+    return False
+
+
+def confirmed_route(fingerprint, pdf_path, password=None, user=None):
+    """
+    lookup_route, with the bank route dropped when the header doesn't name
+    the bank. The detection that follows records the real bank, which marks
+    the entry ambiguous.
+    """
+    route = lookup_route(fingerprint, user)
+    if route and route.get('bank') and not header_names_bank(pdf_path, password, route['bank']):
+        route = {'templates': route['templates']} if route.get('templates') else None
+    return route
+
+
+def fingerprint_pdf(pdf_path, password=None, user=None):
+    """Fingerprint a PDF and look up its (header-confirmed) route"""
+    try:
+        fingerprint, features = compute_fingerprint(pdf_path, password)
+    except Exception as e:
+        error_msg = str(e).lower()
+        if 'password' in error_msg or 'encrypt' in error_msg:
+            return {'error': 'password_error', 'success': False}
+        return {'error': str(e), 'success': False}
+
+    return {
+        'success': True,
+        'fingerprint': fingerprint,
+        'features': features,
+        'route': confirmed_route(fingerprint, pdf_path, password, user),
+    }
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    positional = []
+    options = {}
+    flags = {
+        '--bank': 'bank', '--file-type': 'file_type', '--parser': 'parser',
+        '--template-id': 'template_id', '--columns': 'columns', '--user': 'user',
+    }
+    record = False
+    i = 0
+    while i < len(argv):
+        if argv[i] == '--record':
+            record = True
+        elif argv[i] in flags and i + 1 < len(argv):
+            options[flags[argv[i]]] = argv[i + 1]
+            i += 1
+        else:
+            positional.append(argv[i])
+        i += 1
+
+    if not positional:
+        print(json.dumps({
+            'error': 'Usage: fingerprint <pdf_path|-> [password] | fingerprint --record <fingerprint> [--bank B] ...',
+            'success': False,
+        }))
+        sys.exit(1)
+
+    if record:
+        if 'columns' in options:
+            options['columns'] = json.loads(options['columns'])
+        entry = record_route(positional[0], **options)
+        print(json.dumps({'success': entry is not None, 'fingerprint': positional[0], 'route': entry}))
+        return
+
+    source, password, params = resolve_source(positional[0], positional[1] if len(positional) > 1 else None)
+    print(json.dumps(fingerprint_pdf(source, password, params.get('user') or options.get('user'))))
+
+
+if __name__ == '__main__':
+    main()
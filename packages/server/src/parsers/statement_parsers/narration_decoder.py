@@ -0,0 +1,141 @@
+"""
+Structured decoding of UPI/NEFT/IMPS/RTGS narrations.
+
+Bank narrations pack the payment channel, counterparty, their VPA or
+account, the bank reference (RRN/UTR) and a free-text remark into one
+string, separated by '-' (HDFC) or '/' (Kotak, ICICI):
+    UPI-SWIGGY-SWIGGY@ICICI-ICIC0DC0099-512345678901-PAYMENT
+    NEFT CR-YESB0000001-ACME CORP-SALARY APR-YESBN12025040112345
+    IMPS-512345678901-JOHN DOE-HDFC-XXXXXXXX1234-RENT
+    UPI/SWIGGY LIMITED/512345678901/UPI Intent
+    MB: Sent NEFT/ ACME TRADERS/ HDFC BANK
+
+Parsers decode each narration once, at output time, so downstream
+matching and categorization read the fields instead of re-running regexes.
+
+The counterparty is the first name-like token after the channel. Bank
+names are only dropped after it (or after the VPA/account), since many
+merchants share one (AIRTEL, PAYTM, UNION CAFE). CHECK_CASES holds known
+narrations and their decoding:
+    python -m statement_parsers check-narrations
+"""
+
+import re
+import sys
+import json
+
+CHANNEL = re.compile(r'\b(UPI|NEFT|IMPS|RTGS)\b(?:\s*(?:CR|DR))?\s*([-/:])\s*', re.I)
+
+VPA = re.compile(r'[\w.\-]+@[A-Za-z][\w.]*')
+IFSC = re.compile(r'[A-Z]{4}0[A-Z0-9]{6}')
+MASKED_ACCOUNT = re.compile(r'[X*]{2,}\d{3,}', re.I)
+ACCOUNT_NUMBER = re.compile(r'\d{9,18}')
+# RRN (12 digits) or UTR (bank prefix + digits); never contains spaces
+REFERENCE = re.compile(r'(?=[A-Z0-9]*\d{6})[A-Z0-9]{10,22}')
+# Transfer-type codes that carry no information about the counterparty
+TRANSFER_CODES = re.compile(r'P2[AMP]|NA|UPI|IMPS|NEFT|RTGS|CR|DR|INB|MB|NETBANK', re.I)
+BANK_NAME = re.compile(
+    r'(?:HDFC|ICICI|SBI|AXIS|KOTAK|YES|IDFC|IDBI|PNB|BOB|CANARA|UNION|INDUSIND|FEDERAL|RBL|AU|PAYTM|AIRTEL)'
+    r'(?:\s*BANK(?:\s*(?:LTD|LIMITED))?)?|.*\bBANK(?:\s*(?:LTD|LIMITED))?',
+    re.I,
+)
+
+
+def decode_narration(narration):
+    """
+    Decode a payment narration into
+    {channel, counterpartyName, counterpartyAccount, bankReference, remark},
+    or None when it isn't a UPI/NEFT/IMPS/RTGS narration.
+    """
+    if not narration:
+        return None
+    channel = CHANNEL.search(narration)
+    if not channel:
+        return None
+
+    rest = narration[channel.end():]
+    separator = channel.group(2) if channel.group(2) != ':' else '/'
+    tokens = rest.split(separator)
+    if len(tokens) < 2:
+        tokens = re.split(r'[-/]', rest)
+    tokens = [t.strip() for t in tokens if t.strip()]
+
+    fields = {
+        'channel': channel.group(1).upper(),
+        'counterpartyName': None,
+        'counterpartyAccount': None,
+        'bankReference': None,
+        'remark': None,
+    }
+    remarks = []
+
+    for token in tokens:
+        if VPA.fullmatch(token):
+            fields['counterpartyAccount'] = fields['counterpartyAccount'] or token.lower()
+        elif MASKED_ACCOUNT.fullmatch(token):
+            fields['counterpartyAccount'] = fields['counterpartyAccount'] or token.upper()
+        elif IFSC.fullmatch(token) or TRANSFER_CODES.fullmatch(token):
+            continue
+        elif BANK_NAME.fullmatch(token) and (fields['counterpartyName'] or fields['counterpartyAccount']):
+            continue  # The counterparty's bank; in first position it's the counterparty
+        elif REFERENCE.fullmatch(token):
+            if fields['bankReference'] is None:
+                fields['bankReference'] = token
+            elif ACCOUNT_NUMBER.fullmatch(token) and fields['counterpartyAccount'] is None:
+                fields['counterpartyAccount'] = token
+        elif not any(c.isalpha() for c in token):
+            continue
+        elif fields['counterpartyName'] is None:
+            fields['counterpartyName'] = ' '.join(token.split())
+        else:
+            remarks.append(' '.join(token.split()))
+
+    if remarks:
+        fields['remark'] = ' '.join(remarks)
+    return fields
+
+
+# (narration, expected decoding) pairs checked by check-narrations
+CHECK_CASES = [
+    ('UPI-SWIGGY-SWIGGY@ICICI-ICIC0DC0099-512345678901-PAYMENT', {
+        'channel': 'UPI', 'counterpartyName': 'SWIGGY', 'counterpartyAccount': 'swiggy@icici',
+        'bankReference': '512345678901', 'remark': 'PAYMENT'}),
+    ('NEFT CR-YESB0000001-ACME CORP-SALARY APR-YESBN12025040112345', {
+        'channel': 'NEFT', 'counterpartyName': 'ACME CORP', 'counterpartyAccount': None,
+        'bankReference': 'YESBN12025040112345', 'remark': 'SALARY APR'}),
+    ('IMPS-512345678901-JOHN DOE-HDFC-XXXXXXXX1234-RENT', {
+        'channel': 'IMPS', 'counterpartyName': 'JOHN DOE', 'counterpartyAccount': 'XXXXXXXX1234',
+        'bankReference': '512345678901', 'remark': 'RENT'}),
+    ('UPI/SWIGGY LIMITED/512345678901/UPI Intent', {
+        'channel': 'UPI', 'counterpartyName': 'SWIGGY LIMITED', 'counterpartyAccount': None,
+        'bankReference': '512345678901', 'remark': 'UPI Intent'}),
+    ('MB: Sent NEFT/ ACME TRADERS/ HDFC BANK', {
+        'channel': 'NEFT', 'counterpartyName': 'ACME TRADERS', 'counterpartyAccount': None,
+        'bankReference': None, 'remark': None}),
+    # Merchants named like banks
+    ('UPI-AIRTEL-AIRTEL.PAYU@HDFCBANK-HDFC0000499-512345678901-PAYMENT FROM PHONE', {
+        'channel': 'UPI', 'counterpartyName': 'AIRTEL', 'counterpartyAccount': 'airtel.payu@hdfcbank',
+        'bankReference': '512345678901', 'remark': 'PAYMENT FROM PHONE'}),
+    ('UPI-UNION-UNIONCAFE@YBL-YESB0YBLUPI-512345678902-LUNCH', {
+        'channel': 'UPI', 'counterpartyName': 'UNION', 'counterpartyAccount': 'unioncafe@ybl',
+        'bankReference': '512345678902', 'remark': 'LUNCH'}),
+    ('UPI/PAYTM/512345678903/Recharge', {
+        'channel': 'UPI', 'counterpartyName': 'PAYTM', 'counterpartyAccount': None,
+        'bankReference': '512345678903', 'remark': 'Recharge'}),
+]
+
+
+def main(argv=None):
+    failures = []
+    for narration, expected in CHECK_CASES:
+        decoded = decode_narration(narration)
+        if decoded != expected:
+            failures.append({'narration': narration, 'expected': expected, 'decoded': decoded})
+
+    print(json.dumps({
+        'success': not failures,
+        'cases': len(CHECK_CASES),
+        'failures': failures,
+    }, indent=2))
+    if failures:
+        sys.exit(1)
@@ -0,0 +1,210 @@
+"""
+Classify statement pages from their content streams, before any layout.
+
+A page that shows text (Tj, TJ, ' or " operators, directly or through a
+form XObject) has a text layer. A page without one whose painted images
+cover most of the page is a scan: text and table extraction can only come
+back empty there, so the parsers skip it and report it as needing OCR.
+Anything else without text (blank pages, a lone logo) is skipped too.
+
+Only the raw content streams are read, so classifying a page costs a
+stream decode and a regex scan; layout analysis never runs for pages that
+can't produce rows. Any page that can't be read is treated as text.
+"""
+
+import re
+import weakref
+
+TEXT = 'text'
+SCANNED = 'scanned'
+BLANK = 'blank'
+
+# Share of the page images must cover for a textless page to count as a scan
+MIN_SCAN_COVERAGE = 0.5
+
+# Form XObjects nest; deeper ones are treated as text
+MAX_FORM_DEPTH = 4
+
+# A string operand followed by a text-showing operator
+TEXT_SHOW = re.compile(rb"""(?:\)|>|\])\s*(?:Tj|TJ|'|")""")
+
+TOKEN = re.compile(rb"""
+    (?P<skip>\s+|%[^\r\n]*)
+  | (?P<name>/[^\s/\[\]()<>{}%]*)
+  | (?P<number>[-+]?(?:\d+\.?\d*|\.\d+))
+  | (?P<string>\((?:\\.|[^\\()])*\)|<[0-9A-Fa-f\s]*>)
+  | (?P<op>[A-Za-z'"*]+|<<|>>|[\[\]{}])
+""", re.X | re.S)
+
+INLINE_IMAGE_END = re.compile(rb'\sEI(?=\s|$)')
+
+IDENTITY = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+# page_kinds results by document, so several passes classify once
+_kinds_by_pdf = weakref.WeakKeyDictionary()
+
+
+class _HasText(Exception):
+    """Raised from the content walk as soon as text is shown"""
+
+
+def _name(value):
+    from pdfminer.pdftypes import resolve1
+    from pdfminer.psparser import PSLiteral
+
+    value = resolve1(value)
+    return value.name if isinstance(value, PSLiteral) else value
+
+
+def _multiply(m, n):
+    """Matrix product m x n of two PDF matrices (a b c d e f)"""
+    a, b, c, d, e, f = m
+    a2, b2, c2, d2, e2, f2 = n
+    return (
+        a * a2 + b * c2, a * b2 + b * d2,
+        c * a2 + d * c2, c * b2 + d * d2,
+        e * a2 + f * c2 + e2, e * b2 + f * d2 + f2,
+    )
+
+
+def _stream_data(streams):
+    from pdfminer.pdftypes import resolve1
+
+    return b'\n'.join(resolve1(stream).get_data() for stream in streams)
+
+
+def _image_area(data, resources, ctm, depth):
+    """
+    Area (in page units) of the images painted by a content stream. Raises
+    _HasText when the stream, or a form it paints, shows text.
+    """
+    from pdfminer.pdftypes import resolve1
+
+    if TEXT_SHOW.search(data):
+        raise _HasText()
+
+    xobjects = resolve1((resources or {}).get('XObject')) or {}
+    area = 0.0
+    stack = []
+    operands = []
+    pos = 0
+    while pos < len(data):
+        match = TOKEN.match(data, pos)
+        if not match:
+            pos += 1  # Unparsed byte (e.g. a nested string); skip it
+            continue
+        pos = match.end()
+        kind = match.lastgroup
+        if kind == 'skip':
+            continue
+        if kind != 'op':
+            operands.append(match.group())
+            continue
+
+        op = match.group()
+        if op == b'q':
+            stack.append(ctm)
+        elif op == b'Q':
+            ctm = stack.pop() if stack else ctm
+        elif op == b'cm' and len(operands) >= 6:
+            try:
+                ctm = _multiply(tuple(float(x) for x in operands[-6:]), ctm)
+            except ValueError:
+                pass
+        elif op == b'Do' and operands and operands[-1].startswith(b'/'):
+            xobject = resolve1(xobjects.get(operands[-1][1:].decode('latin-1')))
+            subtype = _name(xobject.get('Subtype')) if xobject is not None else None
+            if subtype == 'Image':
+                area += abs(ctm[0] * ctm[3] - ctm[1] * ctm[2])
+            elif subtype == 'Form':
+                if depth >= MAX_FORM_DEPTH:
+                    raise _HasText()
+                matrix = tuple(resolve1(xobject.get('Matrix')) or IDENTITY)
+                area += _image_area(
+                    xobject.get_data(),
+                    resolve1(xobject.get('Resources')) or resources,
+                    _multiply(matrix, ctm),
+                    depth + 1,
+                )
+        elif op == b'BI':
+            # Inline image: unit square in the current matrix; skip its data
+            end = INLINE_IMAGE_END.search(data, pos)
+            pos = end.end() if end else len(data)
+            area += abs(ctm[0] * ctm[3] - ctm[1] * ctm[2])
+        operands = []
+
+    return area
+
+
+def classify_page(page):
+    """TEXT, SCANNED or BLANK for a pdfplumber (or layout cache) page"""
+    from pdfminer.pdftypes import resolve1
+
+    page_obj = page.page_obj
+    try:
+        data = _stream_data(page_obj.contents)
+        x0, y0, x1, y1 = page_obj.mediabox
+        page_area = abs((x1 - x0) * (y1 - y0)) or 1.0
+        area = _image_area(data, resolve1(page_obj.resources), IDENTITY, 0)
+    except _HasText:
+        return TEXT
+    except Exception:
+        return TEXT  # Unreadable content: let the extractors try
+
+    return SCANNED if area / page_area >= MIN_SCAN_COVERAGE else BLANK
+
+
+def page_kinds(pdf):
+    """Kind of every page of an open document, in page order"""
+    try:
+        kinds = _kinds_by_pdf.get(pdf)
+    except TypeError:
+        kinds = None
+    if kinds is None:
+        kinds = [classify_page(page) for page in pdf.pages]
+        try:
+            _kinds_by_pdf[pdf] = kinds
+        except TypeError:
+            pass
+    return kinds
+
+
+def text_pages(pdf):
+    """The pages that have a text layer"""
+    return [page for page, kind in zip(pdf.pages, page_kinds(pdf)) if kind == TEXT]
+
+
+def numbered_text_pages(pdf):
+    """(1-based page number, page) for the pages that have a text layer"""
+    return [(i + 1, page) for i, (page, kind) in enumerate(zip(pdf.pages, page_kinds(pdf))) if kind == TEXT]
+
+
+def ocr_pages(pdf):
+    """1-based numbers of the scanned pages"""
+    return [i + 1 for i, kind in enumerate(page_kinds(pdf)) if kind == SCANNED]
+
+
+def scanned_result(pdf, page_indexes=None):
+    """
+    Error result for a document with no text layer at all, or None when
+    some page has text. With page_indexes (0-based, negative from the end),
+    only those pages are classified: enough for a pass that reads nothing else.
+    """
+    scope = 'no page' if page_indexes is None else 'no page read'
+    if page_indexes is None:
+        if TEXT in page_kinds(pdf):
+            return None
+        pages = ocr_pages(pdf)
+    else:
+        indexes = sorted({i % len(pdf.pages) for i in page_indexes}) if pdf.pages else []
+        kinds = [classify_page(pdf.pages[i]) for i in indexes]
+        if TEXT in kinds:
+            return None
+        pages = [i + 1 for i, kind in zip(indexes, kinds) if kind == SCANNED]
+    return {
+        'error': f"Scanned statement: {scope} has a text layer" if pages else f"{scope.capitalize()} has a text layer",
+        'scanned': bool(pages),
+        'ocrPages': pages,
+        'pageCount': len(pdf.pages),
+        'success': False,
+    }
@@ -6,23 +6,75 @@ Detects bank from password-protected PDFs
 
 import sys
 import json
-import pdfplumber
 
+from .common import open_pdf, resolve_source
+from .page_classifier import classify_page, TEXT, SCANNED
+from .layout_fingerprint import compute_fingerprint, confirmed_route, record_route
 
-def detect_bank(pdf_path: str, password: str = None) -> dict:
+BANK_NAMES = {
+    'hdfc': 'HDFC Bank',
+    'hdfc_infinia': 'HDFC Infinia Credit Card',
+    'kotak': 'Kotak Mahindra Bank',
+    'icici': 'ICICI Bank',
+    'sbi': 'State Bank of India',
+    'axis': 'Axis Bank'
+}
+
+
+def detect_bank(pdf_path: str, password: str = None, user: str = None) -> dict:
+    """
+    Detect bank from PDF. Known layouts are routed by their structural
+    fingerprint once the page 1 header names the bank; otherwise the text
+    is scored and a confident result is recorded against the fingerprint.
+    """
+    try:
+        fingerprint, _ = compute_fingerprint(pdf_path, password)
+    except Exception:
+        fingerprint = None  # Text detection reports password and read errors
+
+    route = confirmed_route(fingerprint, pdf_path, password, user) if fingerprint else None
+    if route and route.get('bank'):
+        return {
+            "bank": route['bank'],
+            "confidence": "high",
+            "details": f"{BANK_NAMES.get(route['bank'], route['bank'])} detected from known layout",
+            "fileType": route.get('fileType') or "bank_statement",
+            "parser": route.get('parser'),
+            "fingerprint": fingerprint,
+        }
+
+    result = detect_bank_from_text(pdf_path, password)
+    if fingerprint:
+        result["fingerprint"] = fingerprint
+        if result.get("bank") and result["confidence"] == "high":
+            record_route(fingerprint, bank=result["bank"], file_type=result["fileType"], user=user)
+    return result
+
+
+def detect_bank_from_text(pdf_path: str, password: str = None) -> dict:
     """
     Detect bank from PDF text content
     Returns: {"bank": "kotak"|"hdfc"|"icici"|"sbi"|"axis"|null, "confidence": "high"|"medium"|"low", "details": str}
     """
     try:
-        open_kwargs = {'password': password} if password else {}
-
-        with pdfplumber.open(pdf_path, **open_kwargs) as pdf:
+        with open_pdf(pdf_path, password) as pdf:
             # Extract text from first few pages (usually enough for header detection)
+            pages = pdf.pages[:3]
+            kinds = [classify_page(page) for page in pages]
+            if TEXT not in kinds and SCANNED in kinds:
+                return {
+                    "bank": None,
+                    "confidence": "low",
+                    "details": "Scanned PDF: no text layer, needs OCR",
+                    "fileType": "unknown",
+                    "scanned": True,
+                }
+
             text = ""
-            for i, page in enumerate(pdf.pages[:3]):
-                page_text = page.extract_text() or ""
-                text += page_text.lower() + "\n"
+            for page, kind in zip(pages, kinds):
+                if kind == TEXT:
+                    page_text = page.extract_text() or ""
+                    text += page_text.lower() + "\n"
 
             # Scoring system for bank detection
             scores = {}
@@ -121,18 +173,10 @@ def detect_bank(pdf_path: str, password: str = None) -> dict:
 
                 confidence = 'high' if score >= 8 else ('medium' if score >= 4 else 'low')
 
-                bank_names = {
-                    'hdfc': 'HDFC Bank',
-                    'kotak': 'Kotak Mahindra Bank',
-                    'icici': 'ICICI Bank',
-                    'sbi': 'State Bank of India',
-                    'axis': 'Axis Bank'
-                }
-
                 return {
                     "bank": bank,
                     "confidence": confidence,
-                    "details": f"{bank_names.get(bank, bank)} detected from PDF",
+                    "details": f"{BANK_NAMES.get(bank, bank)} detected from PDF",
                     "fileType": "bank_statement"
                 }
 
@@ -171,15 +215,15 @@ def detect_bank(pdf_path: str, password: str = None) -> dict:
         }
 
 
-def main():
-    if len(sys.argv) < 2:
-        print(json.dumps({"error": "Usage: pdf_detector.py <pdf_path> [password]"}))
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) < 1:
+        print(json.dumps({"error": "Usage: detect <pdf_path|-> [password]"}))
         sys.exit(1)
 
-    pdf_path = sys.argv[1]
-    password = sys.argv[2] if len(sys.argv) > 2 else None
+    pdf_path, password, params = resolve_source(argv[0], argv[1] if len(argv) > 1 else None)
 
-    result = detect_bank(pdf_path, password)
+    result = detect_bank(pdf_path, password, params.get('user'))
     print(json.dumps(result))
 
 
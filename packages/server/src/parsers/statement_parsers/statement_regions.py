@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Page regions for reading statement headers and footers.
+
+Account metadata lives above the first transaction row of page 1 and the
+closing balance sits at the end of the last page. These helpers find those
+rows from the page's raw characters (no word or table layout) and crop the
+page to just that region, so metadata lookups never touch the other pages.
+
+Row patterns are matched against line text with whitespace removed, since
+raw characters don't always carry the spaces between words.
+"""
+
+# Characters whose tops differ by less than this belong to the same line
+LINE_TOLERANCE = 3
+
+
+def page_lines(page):
+    """Group a page's characters into lines: [(top, bottom, compact_text)]"""
+    lines = []
+    for char in sorted(page.chars, key=lambda c: (c['top'], c['x0'])):
+        if lines and char['top'] - lines[-1][0] <= LINE_TOLERANCE:
+            lines[-1][1] = max(lines[-1][1], char['bottom'])
+            lines[-1][2].append(char)
+        else:
+            lines.append([char['top'], char['bottom'], [char]])
+
+    return [
+        (top, bottom, ''.join(c['text'] for c in sorted(chars, key=lambda c: c['x0'])).replace(' ', ''))
+        for top, bottom, chars in lines
+    ]
+
+
+def _span(page):
+    """Horizontal extent of the page, widened to any text running past its edges"""
+    left = min([page.bbox[0]] + [c['x0'] for c in page.chars])
+    right = max([page.bbox[2]] + [c['x1'] for c in page.chars])
+    return left, right
+
+
+def header_region(page, row_pattern, rows=0):
+    """
+    Crop a page to everything above its first transaction row.
+
+    Args:
+        page: pdfplumber page (normally page 1)
+        row_pattern: Compiled regex matching the compact text of a transaction row
+        rows: Number of transaction rows to keep below the header
+
+    Returns the whole page when no transaction row is found.
+    """
+    lines = page_lines(page)
+    for i, (top, _, text) in enumerate(lines):
+        if row_pattern.match(text):
+            end = i + rows
+            if end >= len(lines):
+                return page
+            left, right = _span(page)
+            return page.within_bbox((left, page.bbox[1], right, lines[end][0]), strict=False)
+    return page
+
+
+def footer_region(page, row_pattern):
+    """
+    Crop a page to its last transaction row and everything below it.
+
+    Returns the whole page when no transaction row is found.
+    """
+    lines = page_lines(page)
+    for top, _, text in reversed(lines):
+        if row_pattern.match(text):
+            left, right = _span(page)
+            return page.within_bbox((left, top, right, page.bbox[3]), strict=False)
+    return page
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+PDF Template Extractor
+Extracts table structure and patterns from PDFs for template learning
+"""
+
+import sys
+import json
+import re
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+
+from .common import open_pdf, resolve_source
+from .layout_fingerprint import compute_fingerprint
+from .page_classifier import text_pages, scanned_result
+
+
+# Date formats a template can be learned with, most specific first.
+# Keys match the format names understood by template_parser.py.
+DATE_FORMATS = [
+    ('DD/MM/YYYY', '%d/%m/%Y'),
+    ('DD-MM-YYYY', '%d-%m-%Y'),
+    ('DD.MM.YYYY', '%d.%m.%Y'),
+    ('DD/MM/YY', '%d/%m/%y'),
+    ('DD-MM-YY', '%d-%m-%y'),
+    ('MM/DD/YYYY', '%m/%d/%Y'),
+    ('YYYY-MM-DD', '%Y-%m-%d'),
+    ('YYYY/MM/DD', '%Y/%m/%d'),
+    ('DD-MMM-YYYY', '%d-%b-%Y'),
+    ('DD-MMM-YY', '%d-%b-%y'),
+    ('DD MMM YYYY', '%d %b %Y'),
+    ('DD MMMM YYYY', '%d %B %Y'),
+    ('MMM DD, YYYY', '%b %d, %Y'),
+]
+
+CURRENCY_SYMBOLS = '₹$€£'
+
+
+def detect_value_type(value: str) -> str:
+    """Detect the type of a value"""
+    if not value or not value.strip():
+        return 'unknown'
+
+    s = value.strip()
+
+    # Date patterns
+    date_patterns = [
+        r'^\d{1,2}[-/]\d{1,2}[-/]\d{2,4}$',
+        r'^\d{2,4}[-/]\d{1,2}[-/]\d{1,2}$',
+        r'^\d{1,2}-[A-Za-z]{3}-\d{2,4}$',
+        r'^[A-Za-z]{3}\s+\d{1,2},?\s+\d{4}$',
+        r'^\d{1,2}\s+[A-Za-z]{3,9}\s+\d{4}$',
+    ]
+    for pattern in date_patterns:
+        if re.match(pattern, s):
+            return 'date'
+
+    # Amount patterns (with currency symbols, western or Indian digit grouping)
+    amount_patterns = [
+        r'^[₹$€£]?\s*-?\d{1,3}(,\d{2,3})*(\.\d{1,2})?$',
+        r'^-?\d{1,3}(,\d{2,3})*(\.\d{1,2})?\s*(cr|dr|CR|DR|Cr|Dr)?$',
+        r'^\(?[₹$€£]?\s*\d{1,3}(,\d{2,3})*(\.\d{1,2})?\)?$',
+    ]
+    for pattern in amount_patterns:
+        if re.match(pattern, s):
+            return 'amount'
+
+    # Plain numbers
+    if re.match(r'^-?\d+(\.\d+)?$', s):
+        return 'number'
+
+    return 'text'
+
+
+def infer_date_format(values: List[str]) -> Optional[str]:
+    """Find the single date format that parses every sample value"""
+    samples = [v.strip() for v in values if v and v.strip()]
+    if not samples:
+        return None
+
+    for key, fmt in DATE_FORMATS:
+        try:
+            for s in samples:
+                datetime.strptime(s, fmt)
+        except ValueError:
+            continue
+        return key
+
+    return None
+
+
+def infer_amount_format(values: List[str]) -> Optional[str]:
+    """
+    Infer the amount convention used by a column.
+
+    Returns a format spec understood by template_parser.py, e.g.
+    "sign=drcr;currency=₹;thousands=,", or "plain" for bare numbers.
+    """
+    samples = [v.strip() for v in values if v and v.strip()]
+    if not samples:
+        return None
+
+    sign = None
+    currency = None
+    thousands = None
+    decimal = None
+
+    for s in samples:
+        if re.search(r'(dr|cr)$', s, re.I):
+            sign = 'drcr'
+        elif s.startswith('(') and s.endswith(')') and sign != 'drcr':
+            sign = 'parens'
+        elif s.startswith('-') and sign is None:
+            sign = 'minus'
+
+        for symbol in CURRENCY_SYMBOLS:
+            if symbol in s:
+                currency = symbol
+
+        # European style 1.234,56 uses '.' for thousands and ',' for decimals
+        if re.search(r'\d\.\d{3},\d{1,2}\b', s) or (re.search(r',\d{1,2}$', s) and '.' not in s):
+            thousands, decimal = '.', ','
+        elif ',' in s and decimal is None:
+            thousands = ','
+
+    parts = []
+    if sign:
+        parts.append(f'sign={sign}')
+    if currency:
+        parts.append(f'currency={currency}')
+    if thousands:
+        parts.append(f'thousands={thousands}')
+    if decimal:
+        parts.append(f'decimal={decimal}')
+
+    return ';'.join(parts) if parts else 'plain'
+
+
+def infer_column_format(column_type: str, values: List[str]) -> Optional[str]:
+    """Infer the exact value format of a column from its samples"""
+    if column_type == 'date':
+        return infer_date_format(values)
+    if column_type in ('amount', 'number'):
+        return infer_amount_format(values)
+    return None
+
+
+def extract_text_patterns(text: str) -> List[str]:
+    """Extract bank/institution patterns from PDF text"""
+    patterns = []
+    text_lower = text.lower()
+
+    # Common bank patterns
+    bank_patterns = [
+        'hdfc bank', 'icici bank', 'sbi', 'state bank of india',
+        'axis bank', 'kotak mahindra', 'yes bank', 'idfc first',
+        'federal bank', 'karnataka bank', 'canara bank', 'punjab national bank',
+        'bank of baroda', 'union bank', 'indian bank',
+    ]
+
+    for bank in bank_patterns:
+        if bank in text_lower:
+            patterns.append(bank)
+
+    # Credit card patterns
+    if 'credit card' in text_lower:
+        patterns.append('credit card')
+    if 'statement' in text_lower:
+        patterns.append('statement')
+
+    return list(set(patterns))[:10]  # Limit to 10 patterns
+
+
+def find_header_row(rows: List[List[str]]) -> int:
+    """Find the row that contains table headers"""
+    header_keywords = [
+        'date', 'amount', 'balance', 'narration', 'description',
+        'debit', 'credit', 'reference', 'particulars', 'withdrawal', 'deposit'
+    ]
+
+    for i, row in enumerate(rows[:15]):  # Check first 15 rows
+        if not row:
+            continue
+
+        row_text = ' '.join(str(cell).lower() for cell in row if cell)
+
+        # Count keyword matches
+        matches = sum(1 for kw in header_keywords if kw in row_text)
+
+        if matches >= 2:  # At least 2 header keywords
+            return i
+
+    return 0  # Default to first row
+
+
+def column_geometry(page, headers: List[str]) -> List[Dict[str, Any]]:
+    """Left edge of each header on the page its table came from (None when not found)"""
+    words = page.extract_words()
+    columns = []
+    for header in headers:
+        first_word = header.split()[0] if header.split() else None
+        x0 = next((round(w['x0'], 1) for w in words if w['text'] == first_word), None)
+        columns.append({"header": header, "x0": x0})
+    return columns
+
+
+def extract_template(pdf_path: str, password: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Extract template structure from PDF
+
+    Returns:
+        {
+            "headers": [...],
+            "column_types": [...],
+            "column_formats": [...],
+            "sample_rows": [...],
+            "row_count": int,
+            "header_row_index": int,
+            "text_patterns": [...],
+            "fingerprint": str | None,
+            "column_geometry": [{"header": str, "x0": float | None}, ...],
+        }
+    """
+    try:
+        import pdfplumber
+    except ImportError:
+        return {"error": "pdfplumber not installed. Run: pip install pdfplumber"}
+
+    try:
+        # Open PDF (with password if provided)
+        with open_pdf(pdf_path, password) as pdf:
+            scanned = scanned_result(pdf)
+            if scanned:
+                return scanned
+
+            all_text = ""
+            all_tables = []
+            table_pages = []
+
+            # Extract text and tables from the pages with a text layer
+            for page in text_pages(pdf):
+                text = page.extract_text() or ""
+                all_text += text + "\n"
+
+                tables = page.extract_tables()
+                for table in tables:
+                    if table and len(table) > 1:  # At least 2 rows
+                        all_tables.append(table)
+                        table_pages.append(page)
+
+            if not all_tables:
+                return {"error": "No tables found in PDF"}
+
+            # Use the largest table (likely the transaction table)
+            main_index = max(range(len(all_tables)), key=lambda i: len(all_tables[i]))
+            main_table = all_tables[main_index]
+
+            # Find header row
+            header_row_index = find_header_row(main_table)
+            headers = [str(cell).strip() if cell else f"Column_{i}"
+                      for i, cell in enumerate(main_table[header_row_index])]
+
+            # Get data rows (after header)
+            data_rows = main_table[header_row_index + 1:]
+
+            # Filter out empty rows
+            data_rows = [row for row in data_rows
+                        if any(cell and str(cell).strip() for cell in row)]
+
+            if not data_rows:
+                return {"error": "No data rows found in table"}
+
+            # Detect column types and the exact format of each column
+            column_types = []
+            column_formats = []
+            for col_idx in range(len(headers)):
+                values = []
+                types = []
+                for row in data_rows[:20]:  # Check first 20 rows
+                    if col_idx < len(row) and row[col_idx]:
+                        values.append(str(row[col_idx]))
+                        types.append(detect_value_type(values[-1]))
+
+                # Get most common type
+                if types:
+                    type_counts = {}
+                    for t in types:
+                        type_counts[t] = type_counts.get(t, 0) + 1
+                    column_type = max(type_counts.items(), key=lambda x: x[1])[0]
+                else:
+                    column_type = 'unknown'
+
+                # Only infer from cells of the winning type so stray
+                # header/footer cells don't spoil the format
+                typed_values = [v for v, t in zip(values, types) if t == column_type]
+                column_types.append(column_type)
+                column_formats.append(infer_column_format(column_type, typed_values))
+
+            # Get sample rows (first 5)
+            sample_rows = []
+            for row in data_rows[:5]:
+                sample_rows.append([str(cell).strip() if cell else "" for cell in row])
+
+            # Extract text patterns for detection
+            text_patterns = extract_text_patterns(all_text)
+
+            # Structural fingerprint, so uploads with this layout can be routed to the template
+            try:
+                fingerprint, _ = compute_fingerprint(pdf_path, password)
+            except Exception:
+                fingerprint = None
+
+            return {
+                "headers": headers,
+                "column_types": column_types,
+                "column_formats": column_formats,
+                "sample_rows": sample_rows,
+                "row_count": len(data_rows),
+                "header_row_index": header_row_index,
+                "text_patterns": text_patterns,
+                "fingerprint": fingerprint,
+                "column_geometry": column_geometry(table_pages[main_index], headers),
+            }
+
+    except Exception as e:
+        error_msg = str(e).lower()
+        if 'password' in error_msg or 'encrypt' in error_msg:
+            return {"error": "PDF is password protected. Please provide the correct password."}
+        return {"error": str(e)}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) < 1:
+        print(json.dumps({"error": "Usage: extract-template <pdf_path|-> [password]"}))
+        sys.exit(1)
+
+    pdf_path, password, _ = resolve_source(argv[0], argv[1] if len(argv) > 1 else None)
+
+    result = extract_template(pdf_path, password)
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+"""
+PDF Template Parser
+Parses PDFs using learned template mappings
+"""
+
+import sys
+import json
+import re
+from datetime import date, datetime
+from typing import List, Dict, Any, Optional
+
+from .common import open_pdf, resolve_source, STDIN
+from .page_classifier import text_pages, scanned_result
+from .narration_decoder import decode_narration
+from .categorize import suggest_category
+
+
+def parse_date(value: str, date_format: Optional[str] = None) -> Optional[str]:
+    """Parse date string to YYYY-MM-DD format"""
+    if not value or not value.strip():
+        return None
+
+    s = value.strip()
+
+    # Format mapping
+    format_map = {
+        'DD/MM/YYYY': '%d/%m/%Y',
+        'DD-MM-YYYY': '%d-%m-%Y',
+        'DD/MM/YY': '%d/%m/%y',
+        'DD-MM-YY': '%d-%m-%y',
+        'YYYY-MM-DD': '%Y-%m-%d',
+        'MM/DD/YYYY': '%m/%d/%Y',
+        'DD-MMM-YYYY': '%d-%b-%Y',
+        'DD-MMM-YY': '%d-%b-%y',
+        'DD.MM.YYYY': '%d.%m.%Y',
+        'YYYY/MM/DD': '%Y/%m/%d',
+        'DD MMM YYYY': '%d %b %Y',
+        'DD MMMM YYYY': '%d %B %Y',
+        'MMM DD, YYYY': '%b %d, %Y',
+    }
+
+    # Try specified format first
+    if date_format and date_format in format_map:
+        try:
+            dt = datetime.strptime(s, format_map[date_format])
+            return dt.strftime('%Y-%m-%d')
+        except ValueError:
+            pass
+
+    # Try common formats
+    formats = [
+        '%d/%m/%Y', '%d-%m-%Y', '%d/%m/%y', '%d-%m-%y',
+        '%Y-%m-%d', '%m/%d/%Y', '%d-%b-%Y', '%d-%b-%y',
+        '%d/%m/%Y', '%d %b %Y', '%d %B %Y',
+    ]
+
+    for fmt in formats:
+        try:
+            dt = datetime.strptime(s, fmt)
+            return dt.strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+
+    return None
+
+
+def parse_amount(value: str) -> Optional[float]:
+    """Parse amount string to float"""
+    if value is None or value == '':
+        return None
+
+    s = str(value).strip()
+    if not s:
+        return None
+
+    # Check for DR/CR suffix
+    is_debit = bool(re.search(r'\s*(dr|DR|Dr)\s*$', s))
+    is_credit = bool(re.search(r'\s*(cr|CR|Cr)\s*$', s))
+    s = re.sub(r'\s*(dr|DR|Dr|cr|CR|Cr)\s*$', '', s)
+
+    # Check for negative in parentheses
+    is_negative = s.startswith('(') and s.endswith(')')
+    if is_negative:
+        s = s[1:-1]
+
+    # Remove currency symbols and spaces
+    s = re.sub(r'[₹$€£\s]', '', s)
+
+    # Remove commas
+    s = s.replace(',', '')
+
+    # Handle minus sign
+    has_minus = s.startswith('-')
+    if has_minus:
+        s = s[1:]
+
+    try:
+        num = float(s)
+    except ValueError:
+        return None
+
+    # Apply sign
+    if is_negative or has_minus or is_debit:
+        return -abs(num)
+    elif is_credit:
+        return abs(num)
+
+    return num
+
+
+MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'sept': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+    'january': 1, 'february': 2, 'march': 3, 'april': 4, 'june': 6, 'july': 7,
+    'august': 8, 'september': 9, 'october': 10, 'november': 11, 'december': 12,
+}
+
+# Format tokens -> (regex fragment, component)
+DATE_TOKENS = {
+    'YYYY': (r'(\d{4})', 'year'),
+    'YY': (r'(\d{2})', 'year2'),
+    'MMMM': (r'([A-Za-z]+)', 'month_name'),
+    'MMM': (r'([A-Za-z]{3,4})', 'month_name'),
+    'MM': (r'(\d{1,2})', 'month'),
+    'DD': (r'(\d{1,2})', 'day'),
+}
+
+
+def compile_date_converter(date_format: Optional[str]):
+    """
+    Build a converter for one learned date format (e.g. "DD/MM/YYYY").
+
+    The format is compiled to a single regex once per column, so each cell
+    costs one match instead of a strptime attempt per candidate format.
+    Cells that don't fit fall back to parse_date().
+    """
+    if not date_format or date_format == 'auto':
+        return lambda value: parse_date(value)
+
+    tokens = re.findall(r'YYYY|YY|MMMM|MMM|MM|DD|.', date_format)
+    pattern = ''
+    components = []
+    for token in tokens:
+        if token in DATE_TOKENS:
+            fragment, component = DATE_TOKENS[token]
+            pattern += fragment
+            components.append(component)
+        elif token == ' ':
+            pattern += r'\s+'
+        elif token == ',':
+            pattern += ',?'
+        else:
+            pattern += re.escape(token)
+
+    if len(components) != 3 or 'day' not in components:
+        return lambda value: parse_date(value, date_format)
+
+    regex = re.compile(f'^{pattern}$')
+
+    def convert(value: str) -> Optional[str]:
+        match = regex.match(value.strip())
+        if not match:
+            return parse_date(value, date_format)
+
+        day = month = year = None
+        for component, raw in zip(components, match.groups()):
+            if component == 'day':
+                day = int(raw)
+            elif component == 'month':
+                month = int(raw)
+            elif component == 'month_name':
+                month = MONTHS.get(raw.lower())
+            elif component == 'year':
+                year = int(raw)
+            else:
+                # Same pivot as strptime's %y
+                year = int(raw) + (2000 if int(raw) < 69 else 1900)
+
+        if not (month and 1 <= month <= 12 and 1 <= day <= 31):
+            return parse_date(value, date_format)
+        try:
+            return date(year, month, day).isoformat()
+        except ValueError:
+            return parse_date(value, date_format)
+
+    return convert
+
+
+def compile_amount_converter(amount_format: Optional[str]):
+    """
+    Build a converter for one learned amount convention.
+
+    The format is a spec produced by template_extractor.py, e.g.
+    "sign=drcr;currency=₹;thousands=,". Only the clean-up steps the column
+    actually needs are applied; cells that don't fit fall back to
+    parse_amount().
+    """
+    if not amount_format:
+        return parse_amount
+
+    options = {}
+    if amount_format != 'plain':
+        for part in amount_format.split(';'):
+            key, _, val = part.partition('=')
+            options[key] = val
+
+    sign = options.get('sign')
+    currency = options.get('currency')
+    thousands = options.get('thousands')
+    decimal = options.get('decimal', '.')
+
+    def convert(value: str) -> Optional[float]:
+        s = value.strip()
+        if not s:
+            return None
+
+        negative = False
+        suffixed = False
+        if sign == 'drcr':
+            suffix = s[-2:].lower()
+            if suffix in ('dr', 'cr'):
+                negative = suffix == 'dr'
+                suffixed = True
+                s = s[:-2].rstrip()
+        # Unsuffixed cells in a Dr/Cr column keep their own sign: -100.00 or (100.00)
+        if not suffixed and sign in ('parens', 'drcr') and s[0] == '(' and s[-1] == ')':
+            negative = True
+            s = s[1:-1]
+
+        if currency:
+            s = s.replace(currency, '')
+        if thousands:
+            s = s.replace(thousands, '')
+        if decimal != '.':
+            s = s.replace(decimal, '.')
+
+        try:
+            num = float(s)
+        except ValueError:
+            return parse_amount(value)
+
+        if suffixed and not negative:
+            return abs(num)
+        return -abs(num) if negative else num
+
+    return convert
+
+
+def get_column_index(source: str) -> Optional[int]:
+    """Get column index from a mapping source like "col_3"""
+    match = re.match(r'^col_(\d+)$', source)
+    if match:
+        return int(match.group(1))
+    return None
+
+
+def get_column_value(row: List[Any], source: str) -> Any:
+    """Get column value from row by source"""
+    index = get_column_index(source)
+    if index is not None and index < len(row):
+        return row[index]
+    return None
+
+
+DATE_FIELDS = ('date', 'valueDate')
+AMOUNT_FIELDS = ('withdrawal', 'deposit', 'amount', 'balance')
+
+
+def compile_mappings(mappings: Dict[str, Any]) -> List[tuple]:
+    """Resolve each mapped field to (field, column index, converter) once per parse"""
+    compiled = []
+    for field, mapping in mappings.items():
+        index = get_column_index(mapping.get('source', ''))
+        fmt = mapping.get('format')
+        if field in DATE_FIELDS:
+            converter = compile_date_converter(fmt)
+        elif field in AMOUNT_FIELDS:
+            converter = compile_amount_converter(fmt)
+        else:
+            converter = None
+        compiled.append((field, index, converter))
+    return compiled
+
+
+def parse_pdf_with_template(pdf_path: str, mappings: Dict[str, Any], password: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Parse PDF using template mappings
+
+    Args:
+        pdf_path: Path to PDF file, or its bytes
+        mappings: Field mappings from template
+        password: Optional password for encrypted PDF
+
+    Returns:
+        {
+            "transactions": [...],
+            "errors": [...],
+            "rows_processed": int,
+            "rows_skipped": int,
+        }
+    """
+    try:
+        import pdfplumber
+    except ImportError:
+        return {"error": "pdfplumber not installed. Run: pip install pdfplumber"}
+
+    try:
+        with open_pdf(pdf_path, password) as pdf:
+            scanned = scanned_result(pdf)
+            if scanned:
+                return scanned
+
+            all_tables = []
+
+            for page in text_pages(pdf):
+                tables = page.extract_tables()
+                for table in tables:
+                    if table and len(table) > 1:
+                        all_tables.extend(table)
+
+            if not all_tables:
+                return {"error": "No tables found in PDF"}
+
+            # Skip header row (assumed to be first row with common header keywords)
+            header_keywords = ['date', 'amount', 'balance', 'narration', 'description', 'debit', 'credit']
+            start_row = 0
+            for i, row in enumerate(all_tables[:5]):
+                if row:
+                    row_text = ' '.join(str(cell).lower() for cell in row if cell)
+                    if any(kw in row_text for kw in header_keywords):
+                        start_row = i + 1
+                        break
+
+            transactions = []
+            errors = []
+            rows_skipped = 0
+
+            # One specialized converter per mapped column
+            columns = compile_mappings(mappings)
+
+            for row_idx, row in enumerate(all_tables[start_row:], start=start_row + 1):
+                # Skip empty rows
+                if not row or not any(cell and str(cell).strip() for cell in row):
+                    rows_skipped += 1
+                    continue
+
+                try:
+                    txn = {'raw_data': {}}
+
+                    for field, index, converter in columns:
+                        value = row[index] if index is not None and index < len(row) else None
+
+                        # Store raw value
+                        txn['raw_data'][field] = str(value) if value else None
+
+                        if field in DATE_FIELDS:
+                            parsed = converter(str(value)) if value else None
+                            if parsed:
+                                txn[field] = parsed
+
+                        elif field == 'narration':
+                            txn['narration'] = str(value).strip() if value else ''
+
+                        elif field in ('withdrawal', 'deposit'):
+                            amount = converter(str(value)) if value else None
+                            if amount is not None and amount != 0:
+                                txn[field] = abs(amount)
+
+                        elif field in AMOUNT_FIELDS:
+                            amount = converter(str(value)) if value else None
+                            if amount is not None:
+                                txn[field] = amount
+
+                        elif field in ('reference', 'transactionType', 'category', 'merchant', 'cardNumber'):
+                            if value:
+                                txn[field] = str(value).strip()
+
+                    # Validate required fields
+                    if not txn.get('date'):
+                        errors.append(f"Row {row_idx}: Missing or invalid date")
+                        rows_skipped += 1
+                        continue
+
+                    if not txn.get('narration') and not txn.get('merchant'):
+                        errors.append(f"Row {row_idx}: Missing narration/description")
+                        rows_skipped += 1
+                        continue
+
+                    if (txn.get('withdrawal') is None and
+                        txn.get('deposit') is None and
+                        txn.get('amount') is None):
+                        errors.append(f"Row {row_idx}: Missing amount")
+                        rows_skipped += 1
+                        continue
+
+                    narration_fields = decode_narration(txn.get('narration'))
+                    if narration_fields is not None:
+                        txn['narrationFields'] = narration_fields
+                    category = suggest_category(txn.get('narration'), narration_fields)
+                    if category is not None:
+                        txn['suggestedCategory'] = category
+
+                    transactions.append(txn)
+
+                except Exception as e:
+                    errors.append(f"Row {row_idx}: {str(e)}")
+                    rows_skipped += 1
+
+            return {
+                "transactions": transactions,
+                "errors": errors[:50],  # Limit errors
+                "rows_processed": len(all_tables) - start_row,
+                "rows_skipped": rows_skipped,
+            }
+
+    except Exception as e:
+        error_msg = str(e).lower()
+        if 'password' in error_msg or 'encrypt' in error_msg:
+            return {"error": "PDF is password protected. Please provide the correct password."}
+        return {"error": str(e)}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    # With `-`, the mappings and password come with the PDF on stdin
+    if not argv or (argv[0] != STDIN and len(argv) < 2):
+        print(json.dumps({"error": "Usage: parse-template <pdf_path> <mappings_json> [password] | parse-template -"}))
+        sys.exit(1)
+
+    pdf_path, password, params = resolve_source(argv[0], argv[2] if len(argv) > 2 else None)
+    mappings = params['mappings'] if argv[0] == STDIN else json.loads(argv[1])
+
+    result = parse_pdf_with_template(pdf_path, mappings, password)
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
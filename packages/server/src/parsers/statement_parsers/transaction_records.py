@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Compact transaction records shared by the bank statement parsers.
+
+Parsers keep transactions as TransactionRecord objects while they work:
+amounts and balances are integer paise and dates are proleptic ordinals,
+so balance-continuity checks are exact integer math and each row costs a
+fixed set of slots instead of a dict. Records are converted to the JSON
+shape the TypeScript wrappers expect only at output time (to_dict), which
+is also where each narration is decoded into structured payment fields
+and given a built-in category suggestion.
+"""
+
+from datetime import date
+
+from .narration_decoder import decode_narration
+from .categorize import suggest_category
+
+
+def parse_paise(amount_str):
+    """Parse an Indian formatted amount string ("1,23,456.78") to integer paise"""
+    if not amount_str or amount_str.strip() in ['-', '']:
+        return None
+    cleaned = amount_str.replace(',', '').strip()
+
+    negative = cleaned.startswith('-')
+    digits = cleaned[1:] if negative else cleaned
+    whole, _, frac = digits.partition('.')
+    try:
+        if whole.isdigit() and (not frac or (frac.isdigit() and len(frac) <= 2)):
+            value = int(whole) * 100 + int(frac.ljust(2, '0') or 0)
+        else:
+            # Odd formats (exponents, 3+ decimals) - round via float
+            value = abs(round(float(digits) * 100))
+    except ValueError:
+        return None
+    return -value if negative else value
+
+
+def to_paise(amount):
+    """Convert a rupee float to integer paise"""
+    if amount is None:
+        return None
+    return round(amount * 100)
+
+
+def from_paise(paise):
+    """Convert integer paise back to a rupee float for JSON output"""
+    if paise is None:
+        return None
+    return paise / 100
+
+
+def date_to_ordinal(iso_date):
+    """Convert a YYYY-MM-DD string to a date ordinal"""
+    if not iso_date:
+        return None
+    return date.fromisoformat(iso_date).toordinal()
+
+
+def ordinal_to_date(ordinal):
+    """Convert a date ordinal back to a YYYY-MM-DD string"""
+    if ordinal is None:
+        return None
+    return date.fromordinal(ordinal).isoformat()
+
+
+class TransactionRecord:
+    """A single parsed transaction. Amounts in paise, dates as ordinals."""
+
+    __slots__ = (
+        'date', 'value_date', 'description', 'reference', 'amount',
+        'transaction_type', 'balance', 'raw_withdrawal', 'raw_deposit',
+        'original_amount', 'suspicious_reason', 'sweep_type',
+        'sweep_account_number', 'shown_balance', 'sweep_adjustment',
+    )
+
+    def __init__(self, date, description, reference, amount, transaction_type,
+                 balance, value_date=None, raw_withdrawal=None, raw_deposit=None):
+        self.date = date
+        self.value_date = value_date
+        self.description = description
+        self.reference = reference
+        self.amount = amount
+        self.transaction_type = transaction_type
+        self.balance = balance
+        self.raw_withdrawal = raw_withdrawal
+        self.raw_deposit = raw_deposit
+        self.original_amount = None
+        self.suspicious_reason = None
+        self.sweep_type = None
+        self.sweep_account_number = None
+        self.shown_balance = None
+        self.sweep_adjustment = None
+
+    @classmethod
+    def from_dict(cls, txn):
+        """Build a record from a transaction in parser JSON shape"""
+        raw = txn.get('raw') or {}
+        return cls(
+            date=date_to_ordinal(txn.get('date')),
+            value_date=date_to_ordinal(txn.get('valueDate')),
+            description=txn.get('description'),
+            reference=txn.get('reference'),
+            amount=to_paise(txn.get('amount')) or 0,
+            transaction_type=txn.get('transactionType'),
+            balance=to_paise(txn.get('balance')),
+            raw_withdrawal=to_paise(raw.get('withdrawal')),
+            raw_deposit=to_paise(raw.get('deposit')),
+        )
+
+    def to_dict(self, include_value_date=False, include_raw=False):
+        """Convert to the JSON transaction shape emitted by the parser scripts"""
+        txn = {'date': ordinal_to_date(self.date)}
+        if include_value_date:
+            txn['valueDate'] = ordinal_to_date(self.value_date)
+        txn['description'] = self.description
+        narration_fields = decode_narration(self.description)
+        if narration_fields is not None:
+            txn['narrationFields'] = narration_fields
+        category = suggest_category(self.description, narration_fields)
+        if category is not None:
+            txn['suggestedCategory'] = category
+        txn['reference'] = self.reference
+        txn['amount'] = from_paise(self.amount)
+        txn['transactionType'] = self.transaction_type
+        txn['balance'] = from_paise(self.balance)
+        if include_raw:
+            txn['raw'] = {
+                'withdrawal': from_paise(self.raw_withdrawal),
+                'deposit': from_paise(self.raw_deposit),
+            }
+        if self.original_amount is not None:
+            txn['amountCorrected'] = True
+            txn['originalAmount'] = from_paise(self.original_amount)
+        if self.suspicious_reason is not None:
+            txn['suspicious'] = True
+            txn['suspiciousReason'] = self.suspicious_reason
+        if self.sweep_type is not None:
+            txn['isSweep'] = True
+            txn['sweepType'] = self.sweep_type
+            txn['sweepAccountNumber'] = self.sweep_account_number
+        if self.sweep_adjustment is not None:
+            txn['shownBalance'] = from_paise(self.shown_balance)
+            txn['sweepAdjustment'] = from_paise(self.sweep_adjustment)
+        return txn
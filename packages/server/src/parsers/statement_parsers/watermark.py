@@ -0,0 +1,96 @@
+"""
+Incremental parsing of statements that overlap an earlier import.
+
+A year-to-date download each month repeats every page already imported.
+Given the account's watermark (date and balance after the last imported
+transaction), the parser walks back from the last page reading only the
+final row of each page (see statement_regions.footer_region) until it
+reaches a page that ends before the watermark date. Only the pages after
+it are parsed.
+
+The parsed rows are then cut at the watermark. Rows on the watermark date
+are dropped up to the first one whose balance equals the watermark balance;
+later rows that return to that balance (+X then -X) may be new, so they are
+kept and left to duplicate marking.
+Continuity is checked at that boundary: either such a row exists or the
+first new row opens at the watermark balance. Callers fall back to a full
+parse when it doesn't hold, or when the watermark has no balance to check
+(a date alone can't tell which rows on that date were imported).
+
+    python -m statement_parsers hdfc <pdf> [password] --since YYYY-MM-DD [--since-balance N]
+"""
+
+from .transaction_records import date_to_ordinal, parse_paise, ordinal_to_date, from_paise
+
+
+def parse_watermark(options):
+    """Watermark {'date': ordinal, 'balance': paise or None} from CLI options, or None"""
+    if not options.get('since'):
+        return None
+    return {
+        'date': date_to_ordinal(options['since']),
+        'balance': parse_paise(options.get('since_balance')),
+    }
+
+
+def first_new_page(pages, page_last_date, watermark_date):
+    """
+    Index of the first page that may hold rows on or after the watermark
+    date. Pages are probed from the end with page_last_date(page), which
+    returns the date ordinal of a page's last row (None if it has none).
+    """
+    for i in range(len(pages) - 1, -1, -1):
+        last_date = page_last_date(pages[i])
+        if last_date is not None and last_date < watermark_date:
+            return i + 1
+    return 0
+
+
+def opening_balance(txn):
+    """Balance before a transaction, from its closing balance and amount"""
+    if txn.balance is None or txn.amount is None:
+        return None
+    return txn.balance + txn.amount if txn.transaction_type == 'debit' else txn.balance - txn.amount
+
+
+def trim_to_watermark(transactions, watermark):
+    """
+    Drop the rows already imported (statement order).
+    Returns (new_transactions, continuous); continuous is None when the
+    watermark has no balance to check against.
+    """
+    date, balance = watermark['date'], watermark['balance']
+    boundary = -1
+    matched = False
+    for i, txn in enumerate(transactions):
+        if txn.date is None:
+            continue
+        if txn.date > date:
+            break
+        if txn.date < date:
+            boundary = i
+        elif balance is not None and not matched and txn.balance == balance:
+            boundary = i
+            matched = True
+
+    new_transactions = transactions[boundary + 1:]
+    if balance is None:
+        return new_transactions, None
+    if matched:
+        return new_transactions, True
+    if new_transactions:
+        return new_transactions, opening_balance(new_transactions[0]) == balance
+    return new_transactions, boundary >= 0 and transactions[boundary].balance == balance
+
+
+def watermark_report(watermark, first_page, page_count, skipped_rows, continuous, applied):
+    """JSON-ready summary of how the watermark was used"""
+    return {
+        'since': ordinal_to_date(watermark['date']),
+        'sinceBalance': from_paise(watermark['balance']) if watermark['balance'] is not None else None,
+        'applied': applied,
+        'continuous': continuous,
+        'pagesSkipped': first_page if applied else 0,
+        'pagesParsed': page_count - first_page if applied else page_count,
+        'transactionsSkipped': skipped_rows if applied else 0,
+    }
@@ -59,10 +59,10 @@ function detectDateFormat(dateStr: string): string {
  * Extract template structure from PDF file
  */
 export async function extractTemplateFromPDF(filePath: string, password?: string): Promise<ExtractionResult> {
-  const scriptPath = path.join(__dirname, 'template_extractor.py');
+  const packagePath = path.join(__dirname, 'statement_parsers');
 
-  // Check if script exists
-  if (!fs.existsSync(scriptPath)) {
+  // Check if the parser package exists
+  if (!fs.existsSync(packagePath)) {
     throw new Error('PDF extractor script not found');
   }
 
@@ -71,7 +71,8 @@ export async function extractTemplateFromPDF(filePath: string, password?: string
       ? `"${filePath}" "${password}"`
       : `"${filePath}"`;
 
-    const result = execSync(`python3 "${scriptPath}" ${args}`, {
+    const result = execSync(`python3 -m statement_parsers extract-template ${args}`, {
+      cwd: __dirname, // Parent of the statement_parsers package
       encoding: 'utf-8',
       maxBuffer: 50 * 1024 * 1024, // 50MB
       timeout: 60000, // 60 seconds
@@ -89,6 +90,7 @@ export async function extractTemplateFromPDF(filePath: string, password?: string
       index,
       name: header,
       type: parsed.column_types?.[index] || 'unknown',
+      format: parsed.column_formats?.[index] || undefined,
       sampleValues: (parsed.sample_rows || []).map((row: any[]) =>
         row[index] !== null && row[index] !== undefined ? String(row[index]) : ''
       ).filter((v: string) => v !== '').slice(0, 5),
@@ -101,8 +103,10 @@ export async function extractTemplateFromPDF(filePath: string, password?: string
       if (suggestedField) {
         const mapping: { source: string; format?: string } = { source: `col_${i}` };
 
-        // Add date format if applicable
-        if (suggestedField === 'date' || suggestedField === 'valueDate') {
+        // Use the format learned for this column; fall back to sniffing a sample date
+        if (columns[i]?.format) {
+          mapping.format = columns[i].format;
+        } else if (suggestedField === 'date' || suggestedField === 'valueDate') {
           const sampleDate = columns[i]?.sampleValues?.find((v: string) =>
             /^\d{1,2}[-\/]\d{1,2}[-\/]\d{2,4}$/.test(v)
           );
@@ -122,6 +126,9 @@ export async function extractTemplateFromPDF(filePath: string, password?: string
         sampleRows: parsed.sample_rows || [],
         rowCount: parsed.row_count || 0,
         headerRowIndex: parsed.header_row_index || 0,
+        layout: parsed.fingerprint
+          ? { fingerprint: parsed.fingerprint, columnGeometry: parsed.column_geometry || [] }
+          : undefined,
       },
       suggestedMappings,
       detectionPatterns: {
@@ -5,12 +5,14 @@
 
 import * as XLSX from 'xlsx';
 import { SYSTEM_FIELDS, SystemFieldKey } from '../db/schema/templates.js';
+import { ColumnGeometry } from './layout-fingerprint.js';
 
 export interface ExtractedField {
   index: number;
   name: string;
   type: 'text' | 'date' | 'amount' | 'number' | 'unknown';
   sampleValues: string[];
+  format?: string; // Learned date format or amount convention (PDF templates)
 }
 
 export interface ExtractionResult {
@@ -20,6 +22,10 @@ export interface ExtractionResult {
     sampleRows: any[][];
     rowCount: number;
     headerRowIndex: number;
+    layout?: {                 // PDFs only: layout fingerprint and where each header column starts
+      fingerprint: string;
+      columnGeometry: ColumnGeometry[];
+    };
   };
   suggestedMappings: Record<string, { source: string; format?: string }>;
   detectionPatterns: {
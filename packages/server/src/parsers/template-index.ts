@@ -0,0 +1,220 @@
+/**
+ * Template Signature Index
+ * Compiles the detection patterns of all of a user's learned templates into
+ * one index, so matching an upload is a single scan of its content and
+ * filename instead of one substring/regex test per pattern per template.
+ */
+
+import { LearnedTemplate } from '../db/schema/templates.js';
+
+// Scores match the original per-template loop
+const TEXT_PATTERN_SCORE = 10;
+const FILENAME_SUBSTRING_SCORE = 5;
+const FILENAME_REGEX_SCORE = 8;
+const FILE_TYPE_SCORE = 3;
+
+const REGEX_META = /[.*+?^${}()|[\]\\]/;
+
+/**
+ * Aho-Corasick automaton over lowercased patterns: one pass over the input
+ * reports every pattern it contains, however many patterns there are.
+ */
+export class PatternAutomaton {
+  private next: Array<Map<string, number>> = [new Map()];
+  private fail: number[] = [0];
+  private output: number[][] = [[]];
+  private emptyPatterns: number[] = [];
+
+  constructor(patterns: string[]) {
+    patterns.forEach((pattern, id) => {
+      if (!pattern) {
+        this.emptyPatterns.push(id); // ''.includes('') is true: always matches
+        return;
+      }
+      let node = 0;
+      for (const ch of pattern) {
+        let child = this.next[node].get(ch);
+        if (child === undefined) {
+          child = this.next.length;
+          this.next.push(new Map());
+          this.fail.push(0);
+          this.output.push([]);
+          this.next[node].set(ch, child);
+        }
+        node = child;
+      }
+      this.output[node].push(id);
+    });
+
+    // Breadth-first failure links; each node inherits its fallback's outputs
+    const queue = [...this.next[0].values()];
+    while (queue.length > 0) {
+      const node = queue.shift()!;
+      for (const [ch, child] of this.next[node]) {
+        let f = this.fail[node];
+        while (f !== 0 && !this.next[f].has(ch)) f = this.fail[f];
+        const target = this.next[f].get(ch);
+        this.fail[child] = target !== undefined && target !== child ? target : 0;
+        this.output[child] = this.output[child].concat(this.output[this.fail[child]]);
+        queue.push(child);
+      }
+    }
+  }
+
+  /** Ids of the patterns found in `text` (already lowercased) */
+  scan(text: string): Set<number> {
+    const found = new Set<number>(this.emptyPatterns);
+    let node = 0;
+    for (const ch of text) {
+      while (node !== 0 && !this.next[node].has(ch)) node = this.fail[node];
+      node = this.next[node].get(ch) ?? 0;
+      for (const id of this.output[node]) found.add(id);
+    }
+    return found;
+  }
+}
+
+export interface TemplateIndex {
+  size: number;
+  fileTypes: string[];
+  textPatterns: PatternAutomaton;
+  textOwners: Array<Array<[number, number]>>;     // pattern id -> [template position, points]
+  filenamePatterns: PatternAutomaton;
+  filenameOwners: Array<Array<[number, number]>>;
+  filenameRegexes: Array<{ regex: RegExp; position: number }>; // non-literal filename patterns only
+}
+
+export interface TemplateMatchInput {
+  content?: string;
+  filename?: string;
+  fileType?: string; // Adds a small bonus for templates learned from the same file type
+}
+
+/**
+ * Group patterns by lowercased text, remembering which templates own them
+ */
+function addPattern(
+  ids: Map<string, number>,
+  owners: Array<Array<[number, number]>>,
+  pattern: string,
+  position: number,
+  points: number
+) {
+  const key = pattern.toLowerCase();
+  let id = ids.get(key);
+  if (id === undefined) {
+    id = owners.length;
+    ids.set(key, id);
+    owners.push([]);
+  }
+  owners[id].push([position, points]);
+}
+
+/**
+ * Compile templates' detection patterns into a signature index
+ */
+export function compileTemplateIndex(templates: LearnedTemplate[]): TemplateIndex {
+  const textIds = new Map<string, number>();
+  const textOwners: Array<Array<[number, number]>> = [];
+  const filenameIds = new Map<string, number>();
+  const filenameOwners: Array<Array<[number, number]>> = [];
+  const filenameRegexes: Array<{ regex: RegExp; position: number }> = [];
+
+  templates.forEach((template, position) => {
+    const patterns = JSON.parse(template.detectionPatterns || '{}');
+
+    for (const pattern of patterns.textPatterns || []) {
+      addPattern(textIds, textOwners, pattern, position, TEXT_PATTERN_SCORE);
+    }
+
+    for (const pattern of patterns.filenamePatterns || []) {
+      // A pattern without regex syntax matches as a regex exactly when it matches as a substring
+      const literal = !REGEX_META.test(pattern);
+      addPattern(filenameIds, filenameOwners, pattern, position,
+        FILENAME_SUBSTRING_SCORE + (literal ? FILENAME_REGEX_SCORE : 0));
+      if (!literal) {
+        try {
+          filenameRegexes.push({ regex: new RegExp(pattern, 'i'), position });
+        } catch {
+          // Invalid regex, skip
+        }
+      }
+    }
+  });
+
+  return {
+    size: templates.length,
+    fileTypes: templates.map(t => t.fileType),
+    textPatterns: new PatternAutomaton([...textIds.keys()]),
+    textOwners,
+    filenamePatterns: new PatternAutomaton([...filenameIds.keys()]),
+    filenameOwners,
+    filenameRegexes,
+  };
+}
+
+/**
+ * Score every template against one upload in a single scan.
+ * Returns positions (into the compiled template list) with a positive score, best first.
+ */
+export function rankTemplates(
+  index: TemplateIndex,
+  input: TemplateMatchInput
+): Array<{ position: number; score: number }> {
+  const scores = new Array<number>(index.size).fill(0);
+
+  if (input.content) {
+    for (const id of index.textPatterns.scan(input.content.toLowerCase())) {
+      for (const [position, points] of index.textOwners[id]) scores[position] += points;
+    }
+  }
+
+  if (input.filename) {
+    for (const id of index.filenamePatterns.scan(input.filename.toLowerCase())) {
+      for (const [position, points] of index.filenameOwners[id]) scores[position] += points;
+    }
+    for (const { regex, position } of index.filenameRegexes) {
+      if (regex.test(input.filename)) scores[position] += FILENAME_REGEX_SCORE;
+    }
+  }
+
+  if (input.fileType) {
+    index.fileTypes.forEach((fileType, position) => {
+      if (fileType === input.fileType) scores[position] += FILE_TYPE_SCORE;
+    });
+  }
+
+  return scores
+    .map((score, position) => ({ position, score }))
+    .filter(candidate => candidate.score > 0)
+    .sort((a, b) => b.score - a.score); // Stable: ties keep template order
+}
+
+// Compiled indexes per user, rebuilt only when their templates' patterns change
+const userIndexes = new Map<string, { signature: string; index: TemplateIndex }>();
+
+function templateSignature(templates: LearnedTemplate[]): string {
+  return templates.map(t => `${t.id}\u0000${t.fileType}\u0000${t.detectionPatterns}`).join('\u0001');
+}
+
+/**
+ * Rank a user's templates against an upload, best first, reusing the
+ * compiled index while the templates' detection patterns are unchanged
+ */
+export function matchTemplates<T extends LearnedTemplate>(
+  userId: string,
+  templates: T[],
+  input: TemplateMatchInput
+): Array<{ template: T; score: number }> {
+  const signature = templateSignature(templates);
+  let cached = userIndexes.get(userId);
+  if (!cached || cached.signature !== signature) {
+    cached = { signature, index: compileTemplateIndex(templates) };
+    userIndexes.set(userId, cached);
+  }
+
+  return rankTemplates(cached.index, input).map(({ position, score }) => ({
+    template: templates[position],
+    score,
+  }));
+}
@@ -4,12 +4,13 @@
  */
 
 import * as XLSX from 'xlsx';
-import { execSync } from 'child_process';
 import * as path from 'path';
 import * as fs from 'fs';
-import * as os from 'os';
 import { fileURLToPath } from 'url';
 import { LearnedTemplate } from '../db/schema/templates.js';
+import { compileTemplateIndex, rankTemplates } from './template-index.js';
+import { NarrationFields } from './narration-fields.js';
+import { runStatementParser } from './statement-parser-runner.js';
 import dayjs from 'dayjs';
 import customParseFormat from 'dayjs/plugin/customParseFormat.js';
 
@@ -32,6 +33,8 @@ export interface ParsedTransaction {
   merchant?: string;
   cardNumber?: string;
   rawData?: Record<string, any>;
+  narrationFields?: NarrationFields; // Decoded UPI/NEFT/IMPS/RTGS details (PDF templates)
+  suggestedCategory?: string; // Built-in category rule match (PDF templates)
 }
 
 export interface TemplateParseResult {
@@ -333,26 +336,21 @@ async function parseExcelWithTemplate(
  * Parse PDF file using template
  */
 async function parsePDFWithTemplate(
-  filePath: string,
+  buffer: Buffer,
   template: LearnedTemplate,
   password?: string
 ): Promise<TemplateParseResult> {
-  const scriptPath = path.join(__dirname, 'template_parser.py');
+  const packagePath = path.join(__dirname, 'statement_parsers');
 
-  // Check if script exists
-  if (!fs.existsSync(scriptPath)) {
+  // Check if the parser package exists
+  if (!fs.existsSync(packagePath)) {
     throw new Error('PDF parser script not found');
   }
 
   const mappings = JSON.parse(template.fieldMappings);
 
   try {
-    const args = password
-      ? `"${filePath}" '${JSON.stringify(mappings)}' "${password}"`
-      : `"${filePath}" '${JSON.stringify(mappings)}'`;
-
-    const result = execSync(`python3 "${scriptPath}" ${args}`, {
-      encoding: 'utf-8',
+    const result = await runStatementParser('parse-template', buffer, { mappings, password }, {
       maxBuffer: 50 * 1024 * 1024,
       timeout: 120000,
     });
@@ -381,23 +379,12 @@ async function parsePDFWithTemplate(
 export async function parseWithTemplate(
   buffer: Buffer,
   template: LearnedTemplate,
-  filePath?: string,
   password?: string
 ): Promise<TemplateParseResult> {
   const fileType = template.fileType;
 
   if (fileType === 'pdf') {
-    if (!filePath) {
-      // Create temp file
-      const tempPath = path.join(os.tmpdir(), `parse-${Date.now()}.pdf`);
-      fs.writeFileSync(tempPath, buffer);
-      try {
-        return await parsePDFWithTemplate(tempPath, template, password);
-      } finally {
-        fs.unlinkSync(tempPath);
-      }
-    }
-    return parsePDFWithTemplate(filePath, template, password);
+    return parsePDFWithTemplate(buffer, template, password);
   }
 
   if (fileType === 'xlsx' || fileType === 'xls' || fileType === 'csv') {
@@ -415,36 +402,9 @@ export function matchesTemplate(
   filename: string,
   template: LearnedTemplate
 ): { matched: boolean; confidence: number } {
-  const patterns = JSON.parse(template.detectionPatterns);
-  let score = 0;
-
-  // Check text patterns
-  if (patterns.textPatterns && content) {
-    const contentLower = content.toLowerCase();
-    for (const pattern of patterns.textPatterns) {
-      if (contentLower.includes(pattern.toLowerCase())) {
-        score += 10;
-      }
-    }
-  }
-
-  // Check filename patterns
-  if (patterns.filenamePatterns && filename) {
-    const filenameLower = filename.toLowerCase();
-    for (const pattern of patterns.filenamePatterns) {
-      if (filenameLower.includes(pattern.toLowerCase())) {
-        score += 5;
-      }
-      try {
-        const regex = new RegExp(pattern, 'i');
-        if (regex.test(filename)) {
-          score += 8;
-        }
-      } catch {
-        // Invalid regex, skip
-      }
-    }
-  }
+  // Same scoring as the multi-template index (see template-index.ts)
+  const [match] = rankTemplates(compileTemplateIndex([template]), { content, filename });
+  const score = match?.score ?? 0;
 
   return {
     matched: score >= 10,
@@ -3,6 +3,7 @@ import multer from 'multer';
 import path from 'path';
 import fs from 'fs';
 import { fileURLToPath } from 'url';
+import { getReadPoolStats } from '../services/read-pool.js';
 
 const __dirname = path.dirname(fileURLToPath(import.meta.url));
 const router = Router();
@@ -158,4 +159,9 @@ router.get('/download-db', async (_req, res) => {
   }
 });
 
+// GET /api/admin/read-pool - Read pool usage and per-task query timings
+router.get('/read-pool', (_req, res) => {
+  res.json(getReadPoolStats());
+});
+
 export default router;
@@ -14,6 +14,7 @@ import {
   type BizType,
 } from '../services/business-enrichment.js';
 import { extractGSTInfo } from '../services/invoice-parser.js';
+import { storedNarrationFields } from '../parsers/narration-fields.js';
 import {
   GEARUP_OWNER_EMAIL,
   checkGearupAccess,
@@ -714,7 +715,8 @@ router.post('/enrich', async (req, res) => {
       const autoEnrichment = enrichTransaction(
         tx.narration,
         tx.transactionType as 'credit' | 'debit',
-        tx.amount
+        tx.amount,
+        storedNarrationFields(tx)
       );
 
       // Override with learned mappings if available
@@ -3,6 +3,7 @@ import { v4 as uuidv4 } from 'uuid';
 import { z } from 'zod';
 import { db, categories } from '../db/index.js';
 import { eq, and } from 'drizzle-orm';
+import { invalidateCategoryCache } from '../services/category-service.js';
 
 const router = Router();
 
@@ -61,6 +62,7 @@ router.post('/', async (req, res) => {
     };
 
     await db.insert(categories).values(newCategory);
+    invalidateCategoryCache();
     res.status(201).json(newCategory);
   } catch (error) {
     if (error instanceof z.ZodError) {
@@ -96,6 +98,7 @@ router.put('/:id', async (req, res) => {
       .update(categories)
       .set({ ...data, updatedAt: now })
       .where(and(eq(categories.id, req.params.id), eq(categories.userId, req.userId!)));
+    invalidateCategoryCache();
 
     const updated = await db
       .select()
@@ -132,6 +135,7 @@ router.delete('/:id', async (req, res) => {
     }
 
     await db.delete(categories).where(and(eq(categories.id, req.params.id), eq(categories.userId, req.userId!)));
+    invalidateCategoryCache();
     res.json({ success: true });
   } catch (error) {
     console.error('Error deleting category:', error);
@@ -1,8 +1,9 @@
 import { Router } from 'express';
 import { z } from 'zod';
 import { db, creditCardTransactions, creditCardStatements, cardHolders, accounts } from '../db/index.js';
-import { eq, desc, and, gte, lte, sql, isNotNull, like, or } from 'drizzle-orm';
+import { eq, desc, and, gte, lte, sql, isNotNull, or } from 'drizzle-orm';
 import * as gmailService from '../services/gmail-service.js';
+import { searchCondition } from '../services/transaction-search.js';
 import * as gmailSyncService from '../services/gmail-sync-service.js';
 
 const router = Router();
@@ -180,7 +181,8 @@ router.get('/:id/transactions', async (req, res) => {
       conditions.push(eq(creditCardTransactions.isEmi, true));
     }
     if (search) {
-      conditions.push(like(creditCardTransactions.description, `%${search}%`));
+      const condition = searchCondition('creditCard', search);
+      if (condition) conditions.push(condition);
     }
 
     const transactions = await db
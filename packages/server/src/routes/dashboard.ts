@@ -1,19 +1,6 @@
 import { Router } from 'express';
 import { z } from 'zod';
-import {
-  getDashboardStats,
-  getCashFlowData,
-  getExpenseBreakdown,
-  getVyaparExpenseBreakdown,
-  getRecentTransactions,
-  getTransactionTrends,
-  getCategoryTrends,
-  getVyaparSummary,
-  getVyaparTrends,
-  getTopCustomers,
-  getPendingReceivables,
-  getTopSellingItems,
-} from '../services/report-service.js';
+import { runRead } from '../services/read-pool.js';
 import { format, startOfMonth, endOfMonth } from 'date-fns';
 import { getGearupDataUserId } from '../utils/gearup-auth.js';
 
@@ -37,15 +24,19 @@ router.get('/', async (req, res) => {
       .parse(req.query);
 
     const dataUserId = await resolveUserId(req);
-    const stats = await getDashboardStats(month, dataUserId);
-    const cashFlow = await getCashFlowData(6, dataUserId);
-    const recentTransactions = await getRecentTransactions(5, dataUserId);
 
     // Get expense breakdown for current month
     const now = month ? new Date(month + '-01') : new Date();
     const startDate = format(startOfMonth(now), 'yyyy-MM-dd');
     const endDate = format(endOfMonth(now), 'yyyy-MM-dd');
-    const expenseBreakdown = await getVyaparExpenseBreakdown(startDate, endDate, dataUserId);
+
+    // Independent reads, so they run on separate read pool workers
+    const [stats, cashFlow, recentTransactions, expenseBreakdown] = await Promise.all([
+      runRead('getDashboardStats', month, dataUserId),
+      runRead('getCashFlowData', 6, dataUserId),
+      runRead('getRecentTransactions', 5, dataUserId),
+      runRead('getVyaparExpenseBreakdown', startDate, endDate, dataUserId),
+    ]);
 
     res.json({
       stats,
@@ -69,7 +60,7 @@ router.get('/stats', async (req, res) => {
       .parse(req.query);
 
     const dataUserId = await resolveUserId(req);
-    const stats = await getDashboardStats(month, dataUserId);
+    const stats = await runRead('getDashboardStats', month, dataUserId);
     res.json(stats);
   } catch (error) {
     console.error('Error fetching stats:', error);
@@ -87,7 +78,7 @@ router.get('/cash-flow', async (req, res) => {
       .parse(req.query);
 
     const dataUserId = await resolveUserId(req);
-    const cashFlow = await getCashFlowData(months ? parseInt(months) : 6, dataUserId);
+    const cashFlow = await runRead('getCashFlowData', months ? parseInt(months) : 6, dataUserId);
     res.json(cashFlow);
   } catch (error) {
     console.error('Error fetching cash flow:', error);
@@ -106,7 +97,7 @@ router.get('/expense-breakdown', async (req, res) => {
       .parse(req.query);
 
     const dataUserId = await resolveUserId(req);
-    const breakdown = await getVyaparExpenseBreakdown(startDate, endDate, dataUserId);
+    const breakdown = await runRead('getVyaparExpenseBreakdown', startDate, endDate, dataUserId);
     res.json(breakdown);
   } catch (error) {
     if (error instanceof z.ZodError) {
@@ -127,7 +118,7 @@ router.get('/recent-transactions', async (req, res) => {
       .parse(req.query);
 
     const dataUserId = await resolveUserId(req);
-    const transactions = await getRecentTransactions(limit ? parseInt(limit) : 10, dataUserId);
+    const transactions = await runRead('getRecentTransactions', limit ? parseInt(limit) : 10, dataUserId);
     res.json(transactions);
   } catch (error) {
     console.error('Error fetching recent transactions:', error);
@@ -147,7 +138,8 @@ router.get('/trends', async (req, res) => {
       .parse(req.query);
 
     const dataUserId = await resolveUserId(req);
-    const trends = await getTransactionTrends(
+    const trends = await runRead(
+      'getTransactionTrends',
       startDate,
       endDate,
       granularity || 'daily',
@@ -176,7 +168,8 @@ router.get('/category-trends', async (req, res) => {
       .parse(req.query);
 
     const dataUserId = await resolveUserId(req);
-    const trends = await getCategoryTrends(
+    const trends = await runRead(
+      'getCategoryTrends',
       startDate,
       endDate,
       granularity || 'monthly',
@@ -205,7 +198,8 @@ router.get('/vyapar-trends', async (req, res) => {
       .parse(req.query);
 
     const dataUserId = await resolveUserId(req);
-    const trends = await getVyaparTrends(
+    const trends = await runRead(
+      'getVyaparTrends',
       startDate,
       endDate,
       granularity || 'daily',
@@ -232,7 +226,7 @@ router.get('/vyapar-summary', async (req, res) => {
       .parse(req.query);
 
     const dataUserId = await resolveUserId(req);
-    const summary = await getVyaparSummary(startDate, endDate, dataUserId);
+    const summary = await runRead('getVyaparSummary', startDate, endDate, dataUserId);
     res.json(summary);
   } catch (error) {
     if (error instanceof z.ZodError) {
@@ -255,7 +249,7 @@ router.get('/top-customers', async (req, res) => {
       .parse(req.query);
 
     const dataUserId = await resolveUserId(req);
-    const customers = await getTopCustomers(startDate, endDate, dataUserId, limit ? parseInt(limit) : 5);
+    const customers = await runRead('getTopCustomers', startDate, endDate, dataUserId, limit ? parseInt(limit) : 5);
     res.json(customers);
   } catch (error) {
     if (error instanceof z.ZodError) {
@@ -278,7 +272,7 @@ router.get('/pending-receivables', async (req, res) => {
       .parse(req.query);
 
     const dataUserId = await resolveUserId(req);
-    const receivables = await getPendingReceivables(startDate, endDate, dataUserId, limit ? parseInt(limit) : 5);
+    const receivables = await runRead('getPendingReceivables', startDate, endDate, dataUserId, limit ? parseInt(limit) : 5);
     res.json(receivables);
   } catch (error) {
     if (error instanceof z.ZodError) {
@@ -301,7 +295,7 @@ router.get('/top-items', async (req, res) => {
       .parse(req.query);
 
     const dataUserId = await resolveUserId(req);
-    const items = await getTopSellingItems(startDate, endDate, dataUserId, limit ? parseInt(limit) : 5);
+    const items = await runRead('getTopSellingItems', startDate, endDate, dataUserId, limit ? parseInt(limit) : 5);
     res.json(items);
   } catch (error) {
     if (error instanceof z.ZodError) {
@@ -9,6 +9,7 @@ import fs from 'fs';
 import { fileURLToPath } from 'url';
 import { extractTemplateFromExcel, extractTemplateFromCSV } from '../parsers/template-extractor.js';
 import { extractTemplateFromPDF } from '../parsers/template-extractor-pdf.js';
+import { recordLayoutRoute } from '../parsers/layout-fingerprint.js';
 
 const __dirname = path.dirname(fileURLToPath(import.meta.url));
 
@@ -309,6 +310,14 @@ router.post('/:sessionId/complete', async (req, res) => {
       updatedAt: now,
     });
 
+    // Route later uploads with the same PDF layout straight to this template
+    if (extractedFields.layout?.fingerprint) {
+      recordLayoutRoute(extractedFields.layout.fingerprint, {
+        templateId,
+        columns: extractedFields.layout.columnGeometry,
+      }, req.userId!);
+    }
+
     // Update session
     await db
       .update(templateLearningSessions)
@@ -11,6 +11,7 @@ import {
   getUpcomingEmis,
   calculateLoanProgress,
 } from '../parsers/axis-repayment-schedule-parser.js';
+import { getUsdToInrRate } from '../services/market-data.js';
 
 const router = Router();
 
@@ -69,48 +70,6 @@ const loanGivenDetailSchema = loanGivenDetailBaseSchema.refine((data) => {
   return true;
 });
 
-// Cache for exchange rate (cache for 10 minutes)
-let exchangeRateCache: { rate: number; timestamp: number } | null = null;
-const CACHE_DURATION = 10 * 60 * 1000; // 10 minutes
-
-async function fetchUsdToInrRate(): Promise<number> {
-  // Check cache first
-  if (exchangeRateCache && Date.now() - exchangeRateCache.timestamp < CACHE_DURATION) {
-    return exchangeRateCache.rate;
-  }
-
-  try {
-    // Use Google Finance via a simple fetch (scraping the rate)
-    const response = await fetch(
-      'https://www.google.com/finance/quote/USD-INR'
-    );
-    const html = await response.text();
-
-    // Parse the rate from the HTML (looking for the data attribute or text)
-    const rateMatch = html.match(/data-last-price="([\d.]+)"/);
-    if (rateMatch && rateMatch[1]) {
-      const rate = parseFloat(rateMatch[1]);
-      exchangeRateCache = { rate, timestamp: Date.now() };
-      return rate;
-    }
-
-    // Fallback: try another pattern
-    const altMatch = html.match(/<div[^>]*class="[^"]*YMlKec[^"]*"[^>]*>([\d.]+)<\/div>/);
-    if (altMatch && altMatch[1]) {
-      const rate = parseFloat(altMatch[1]);
-      exchangeRateCache = { rate, timestamp: Date.now() };
-      return rate;
-    }
-
-    // Default fallback rate
-    console.warn('Could not parse exchange rate, using fallback');
-    return exchangeRateCache?.rate || 83.5;
-  } catch (error) {
-    console.error('Error fetching exchange rate:', error);
-    return exchangeRateCache?.rate || 83.5; // Fallback rate
-  }
-}
-
 // Get all loans
 router.get('/', async (req, res) => {
   try {
@@ -1153,7 +1112,7 @@ router.get('/:id/overdue', async (req, res) => {
 // Get current USD to INR exchange rate
 router.get('/exchange-rate/usd-inr', async (_req, res) => {
   try {
-    const rate = await fetchUsdToInrRate();
+    const rate = await getUsdToInrRate();
     res.json({
       from: 'USD',
       to: 'INR',
@@ -1211,7 +1170,7 @@ router.get('/:id/given-details', async (req, res) => {
 
 // Helper function to calculate totals with currency conversion
 async function calculateGivenDetailsTotals(details: any[]) {
-  const exchangeRate = await fetchUsdToInrRate();
+  const exchangeRate = await getUsdToInrRate();
 
   let totalToGetINR = 0;
   let totalToGiveINR = 0;
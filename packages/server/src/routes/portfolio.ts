@@ -1,13 +1,13 @@
 import { Router } from 'express';
 import {
-  calculatePortfolioSummary,
   captureSnapshot,
   getSnapshotHistory,
   getLatestSnapshot,
   createSeedSnapshot,
-  getPerformanceData,
   getStockTrends,
 } from '../services/portfolio-service.js';
+import { getUsdToInrRate } from '../services/market-data.js';
+import { runRead } from '../services/read-pool.js';
 
 const router = Router();
 
@@ -17,7 +17,7 @@ const router = Router();
  */
 router.get('/summary', async (req, res) => {
   try {
-    const summary = await calculatePortfolioSummary(req.userId!);
+    const summary = await runRead('calculatePortfolioSummary', req.userId!, await getUsdToInrRate());
     res.json(summary);
   } catch (error) {
     console.error('Error getting portfolio summary:', error);
@@ -33,7 +33,8 @@ router.get('/summary', async (req, res) => {
 router.get('/snapshots', async (req, res) => {
   try {
     const { startDate, endDate, limit } = req.query;
-    const snapshots = await getSnapshotHistory(
+    const snapshots = await runRead(
+      'getSnapshotHistory',
       req.userId!,
       startDate as string,
       endDate as string,
@@ -151,7 +152,8 @@ router.get('/performance', async (req, res) => {
     }
 
     const { period = 'daily', limit = '30' } = req.query;
-    const data = await getPerformanceData(
+    const data = await runRead(
+      'getPerformanceData',
       req.userId!,
       period as 'daily' | 'weekly' | 'monthly' | 'quarterly',
       parseInt(limit as string)
@@ -186,7 +188,7 @@ router.get('/stock-trends', async (req, res) => {
  */
 router.get('/allocation', async (req, res) => {
   try {
-    const summary = await calculatePortfolioSummary(req.userId!);
+    const summary = await runRead('calculatePortfolioSummary', req.userId!, await getUsdToInrRate());
 
     const allocation = [
       { name: 'US Stocks', value: summary.usStocksValue, color: '#10b981' },
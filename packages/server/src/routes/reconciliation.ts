@@ -21,7 +21,6 @@ async function isVyaparEnabled(userId: string): Promise<boolean> {
   return !!vyaparAccount;
 }
 import {
-  autoReconcile,
   applyMatches,
   manualMatch,
   unmatch,
@@ -32,6 +31,7 @@ import {
 } from '../services/reconciliation-service.js';
 import { reconciliationMatches } from '../db/index.js';
 import { formatReconciliationReport } from '../services/export-service.js';
+import { runRead } from '../services/read-pool.js';
 
 const router = Router();
 
@@ -236,7 +236,7 @@ router.post('/auto-match', async (req, res) => {
     const startDate = `${startMonth}-01`;
     const endDate = `${endMonth}-31`;
 
-    const matches = await autoReconcile(startDate, endDate, accountIds, dataUserId);
+    const matches = await runRead('autoReconcile', startDate, endDate, accountIds, dataUserId);
 
     if (apply && matches.length > 0) {
       const appliedCount = await applyMatches(matches);
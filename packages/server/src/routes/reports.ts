@@ -1,19 +1,19 @@
 import { Router } from 'express';
 import { z } from 'zod';
-import {
-  getMonthlyPL,
-  getExpenseBreakdown,
-  getGSTSummary,
-  getVyaparPL,
-  getVyaparExpenseBreakdown,
-} from '../services/report-service.js';
+import { runRead } from '../services/read-pool.js';
 import {
   exportToCSV,
-  exportToExcel,
-  formatTransactionsForExport,
   formatPLReport,
+  iterateQuery,
+  mergeByDateDesc,
+  streamCSV,
+  streamExcel,
+  transactionExportRow,
+  TRANSACTION_EXPORT_HEADERS,
+  TRANSACTION_EXPORT_WIDTHS,
 } from '../services/export-service.js';
-import { db, bankTransactions, vyaparTransactions, categories } from '../db/index.js';
+import type { TransactionExportFields } from '../services/export-service.js';
+import { db, openReadOnlyConnection, bankTransactions, vyaparTransactions, categories } from '../db/index.js';
 import { between, eq, and, desc, sql } from 'drizzle-orm';
 import { format, startOfMonth, endOfMonth, parseISO } from 'date-fns';
 import { getGearupDataUserId } from '../utils/gearup-auth.js';
@@ -48,7 +48,7 @@ router.get('/pl', async (req, res) => {
       return res.status(400).json({ error: 'Either month or startDate/endDate required' });
     }
 
-    const pl = await getVyaparPL(start, end, dataUserId, minAmount ? parseInt(minAmount) : undefined);
+    const pl = await runRead('getVyaparPL', start, end, dataUserId, minAmount ? parseInt(minAmount) : undefined);
     res.json(pl);
   } catch (error) {
     if (error instanceof z.ZodError) {
@@ -86,7 +86,7 @@ router.get('/pl/export', async (req, res) => {
       return res.status(400).json({ error: 'Either month or startDate/endDate required' });
     }
 
-    const pl = await getVyaparPL(start, end, dataUserId);
+    const pl = await runRead('getVyaparPL', start, end, dataUserId);
 
     if (exportFormat === 'xlsx') {
       const buffer = formatPLReport(pl);
@@ -127,7 +127,7 @@ router.get('/gst', async (req, res) => {
       .parse(req.query);
 
     const dataUserId = (await getGearupDataUserId(req)) || req.userId!;
-    const summary = await getGSTSummary(startDate, endDate, dataUserId);
+    const summary = await runRead('getGSTSummary', startDate, endDate, dataUserId);
     res.json(summary);
   } catch (error) {
     if (error instanceof z.ZodError) {
@@ -150,7 +150,7 @@ router.get('/category-breakdown', async (req, res) => {
       .parse(req.query);
 
     const dataUserId = (await getGearupDataUserId(req)) || req.userId!;
-    const breakdown = await getVyaparExpenseBreakdown(startDate, endDate, dataUserId);
+    const breakdown = await runRead('getVyaparExpenseBreakdown', startDate, endDate, dataUserId);
     res.json(breakdown);
   } catch (error) {
     if (error instanceof z.ZodError) {
@@ -161,8 +161,9 @@ router.get('/category-breakdown', async (req, res) => {
   }
 });
 
-// Export transactions
+// Export transactions (streamed, so memory stays flat for any date range)
 router.get('/transactions/export', async (req, res) => {
+  let reader: ReturnType<typeof openReadOnlyConnection> | undefined;
   try {
     const { startDate, endDate, type, format: exportFormat, accountId } = z
       .object({
@@ -175,10 +176,13 @@ router.get('/transactions/export', async (req, res) => {
       .parse(req.query);
 
     const dataUserId = (await getGearupDataUserId(req)) || req.userId!;
-    let transactions: any[] = [];
     const allCategories = await db.select().from(categories);
     const categoryMap = new Map(allCategories.map(c => [c.id, c.name]));
 
+    // Each source is read lazily in date order and merged below
+    reader = openReadOnlyConnection();
+    const sources: Iterable<TransactionExportFields>[] = [];
+
     if (type === 'bank' || type === 'all') {
       const conditions = [
         between(bankTransactions.date, startDate, endDate),
@@ -188,43 +192,64 @@ router.get('/transactions/export', async (req, res) => {
         conditions.push(eq(bankTransactions.accountId, accountId));
       }
 
-      const bankTxns = await db
-        .select()
+      const fields = {
+        date: bankTransactions.date,
+        narration: bankTransactions.narration,
+        transactionType: bankTransactions.transactionType,
+        amount: bankTransactions.amount,
+        balance: bankTransactions.balance,
+        categoryId: bankTransactions.categoryId,
+        isReconciled: bankTransactions.isReconciled,
+        notes: bankTransactions.notes,
+      };
+      const bankQuery = db
+        .select(fields)
         .from(bankTransactions)
         .where(and(...conditions))
         .orderBy(desc(bankTransactions.date));
 
-      transactions.push(...bankTxns.map(t => ({ ...t, source: 'bank' })));
+      sources.push(iterateQuery<TransactionExportFields>(reader, bankQuery, Object.keys(fields)));
     }
 
     if (type === 'vyapar' || type === 'all') {
-      const vyaparTxns = await db
-        .select()
+      const fields = {
+        date: vyaparTransactions.date,
+        partyName: vyaparTransactions.partyName,
+        description: vyaparTransactions.description,
+        transactionType: vyaparTransactions.transactionType,
+        amount: vyaparTransactions.amount,
+        balance: vyaparTransactions.balance,
+        isReconciled: vyaparTransactions.isReconciled,
+      };
+      const vyaparQuery = db
+        .select(fields)
         .from(vyaparTransactions)
         .where(and(between(vyaparTransactions.date, startDate, endDate), eq(vyaparTransactions.userId, dataUserId)))
         .orderBy(desc(vyaparTransactions.date));
 
-      transactions.push(
-        ...vyaparTxns.map(t => ({
-          ...t,
-          narration: t.partyName || t.description,
-          transactionType: ['Sale', 'Payment-In'].includes(t.transactionType)
-            ? 'credit'
-            : 'debit',
-          source: 'vyapar',
-        }))
+      const vyaparTxns = iterateQuery<TransactionExportFields & { partyName: string | null }>(
+        reader, vyaparQuery, Object.keys(fields)
       );
+      sources.push((function* () {
+        for (const t of vyaparTxns) {
+          yield {
+            ...t,
+            narration: t.partyName || t.description,
+            transactionType: ['Sale', 'Payment-In'].includes(t.transactionType)
+              ? 'credit'
+              : 'debit',
+          };
+        }
+      })());
     }
 
-    // Sort by date
-    transactions.sort(
-      (a, b) => new Date(b.date).getTime() - new Date(a.date).getTime()
-    );
-
-    const exportData = formatTransactionsForExport(transactions, categoryMap);
+    const rows = (function* () {
+      for (const t of mergeByDateDesc(sources)) {
+        yield transactionExportRow(t, categoryMap);
+      }
+    })();
 
     if (exportFormat === 'xlsx') {
-      const buffer = exportToExcel(exportData, 'Transactions');
       res.setHeader(
         'Content-Type',
         'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
@@ -233,22 +258,28 @@ router.get('/transactions/export', async (req, res) => {
         'Content-Disposition',
         `attachment; filename="transactions-${startDate}-${endDate}.xlsx"`
       );
-      res.send(buffer);
+      await streamExcel(res, TRANSACTION_EXPORT_HEADERS, rows, 'Transactions', TRANSACTION_EXPORT_WIDTHS);
     } else {
-      const csv = exportToCSV(exportData);
       res.setHeader('Content-Type', 'text/csv');
       res.setHeader(
         'Content-Disposition',
         `attachment; filename="transactions-${startDate}-${endDate}.csv"`
       );
-      res.send(csv);
+      await streamCSV(res, TRANSACTION_EXPORT_HEADERS, rows);
     }
   } catch (error) {
     if (error instanceof z.ZodError) {
       return res.status(400).json({ error: error.errors });
     }
     console.error('Error exporting transactions:', error);
-    res.status(500).json({ error: 'Failed to export transactions' });
+    if (res.headersSent) {
+      // Part of the file is already sent; cut it off so the download fails
+      res.destroy();
+    } else {
+      res.status(500).json({ error: 'Failed to export transactions' });
+    }
+  } finally {
+    reader?.close();
   }
 });
 
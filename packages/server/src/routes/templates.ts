@@ -3,6 +3,7 @@ import { db, learnedTemplates, templateLearningSessions } from '../db/index.js';
 import { eq, and, desc } from 'drizzle-orm';
 import { v4 as uuidv4 } from 'uuid';
 import { z } from 'zod';
+import { matchTemplates } from '../parsers/template-index.js';
 
 const router = Router();
 
@@ -187,57 +188,17 @@ router.post('/check', async (req, res) => {
         eq(learnedTemplates.isActive, 1)
       ));
 
-    let bestMatch: { template: any; score: number } | null = null;
-
-    for (const template of templates) {
-      const patterns = JSON.parse(template.detectionPatterns || '{}');
-      let score = 0;
-
-      // Check text patterns
-      if (content && patterns.textPatterns) {
-        const contentLower = content.toLowerCase();
-        for (const pattern of patterns.textPatterns) {
-          if (contentLower.includes(pattern.toLowerCase())) {
-            score += 10;
-          }
-        }
-      }
-
-      // Check filename patterns
-      if (filename && patterns.filenamePatterns) {
-        const filenameLower = filename.toLowerCase();
-        for (const pattern of patterns.filenamePatterns) {
-          if (filenameLower.includes(pattern.toLowerCase())) {
-            score += 5;
-          }
-          // Check regex patterns
-          try {
-            const regex = new RegExp(pattern, 'i');
-            if (regex.test(filename)) {
-              score += 8;
-            }
-          } catch {
-            // Invalid regex, skip
-          }
-        }
-      }
-
-      if (score > 0 && (!bestMatch || score > bestMatch.score)) {
-        bestMatch = {
-          template: {
-            ...template,
-            detectionPatterns: patterns,
-            fieldMappings: JSON.parse(template.fieldMappings || '{}'),
-          },
-          score,
-        };
-      }
-    }
+    // One scan of the content/filename against all templates' compiled patterns
+    const [bestMatch] = matchTemplates(req.userId!, templates, { content, filename });
 
     if (bestMatch && bestMatch.score >= 10) {
       res.json({
         matched: true,
-        template: bestMatch.template,
+        template: {
+          ...bestMatch.template,
+          detectionPatterns: JSON.parse(bestMatch.template.detectionPatterns || '{}'),
+          fieldMappings: JSON.parse(bestMatch.template.fieldMappings || '{}'),
+        },
         confidence: bestMatch.score >= 20 ? 'high' : bestMatch.score >= 10 ? 'medium' : 'low',
       });
     } else {
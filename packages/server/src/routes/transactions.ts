@@ -2,8 +2,9 @@ import { Router } from 'express';
 import { v4 as uuidv4 } from 'uuid';
 import { z } from 'zod';
 import { db, bankTransactions, vyaparTransactions, vyaparItemDetails, creditCardTransactions, categories } from '../db/index.js';
-import { eq, and, between, like, desc, asc, or, sql, isNull, inArray } from 'drizzle-orm';
+import { eq, and, between, like, desc, asc, or, sql, isNull, inArray, getTableColumns } from 'drizzle-orm';
 import { getGearupDataUserId } from '../utils/gearup-auth.js';
+import { searchCondition, searchRank } from '../services/transaction-search.js';
 
 const router = Router();
 
@@ -32,7 +33,7 @@ const querySchema = z.object({
   search: z.string().optional(),
   minAmount: z.string().optional(),
   maxAmount: z.string().optional(),
-  sortBy: z.enum(['date', 'amount']).optional(),
+  sortBy: z.enum(['date', 'amount', 'relevance']).optional(), // relevance: best search matches first
   sortOrder: z.enum(['asc', 'desc']).optional(),
   limit: z.string().optional(),
   offset: z.string().optional(),
@@ -62,8 +63,11 @@ router.get('/bank', async (req, res) => {
     if (query.reconciled !== undefined) {
       conditions.push(eq(bankTransactions.isReconciled, query.reconciled === 'true'));
     }
-    if (query.search) {
-      conditions.push(like(bankTransactions.narration, `%${query.search}%`));
+    // Relevance sorting joins the search index; otherwise search is a filter
+    const ranked = query.search && query.sortBy === 'relevance' ? searchRank('bank', query.search) : null;
+    if (query.search && !ranked) {
+      const condition = searchCondition('bank', query.search);
+      if (condition) conditions.push(condition);
     }
     if (query.minAmount) {
       conditions.push(sql`${bankTransactions.amount} >= ${parseFloat(query.minAmount)}`);
@@ -76,9 +80,13 @@ router.get('/bank', async (req, res) => {
     const sortFn = query.sortOrder === 'asc' ? asc : desc;
 
     let dbQuery = db
-      .select()
+      .select(getTableColumns(bankTransactions))
       .from(bankTransactions)
-      .orderBy(sortFn(sortColumn), desc(bankTransactions.createdAt));
+      .orderBy(ranked ? ranked.rank : sortFn(sortColumn), desc(bankTransactions.createdAt));
+
+    if (ranked) {
+      dbQuery = dbQuery.innerJoin(ranked.table, ranked.on) as typeof dbQuery;
+    }
 
     if (conditions.length > 0) {
       dbQuery = dbQuery.where(and(...conditions)) as typeof dbQuery;
@@ -117,19 +125,20 @@ router.get('/vyapar', async (req, res) => {
     if (query.paymentType) {
       conditions.push(eq(vyaparTransactions.paymentType, query.paymentType));
     }
-    if (query.search) {
-      const searchCondition = or(
-        like(vyaparTransactions.partyName, `%${query.search}%`),
-        like(vyaparTransactions.invoiceNumber, `%${query.search}%`),
-        like(vyaparTransactions.description, `%${query.search}%`)
-      );
-      if (searchCondition) conditions.push(searchCondition);
+    const ranked = query.search && query.sortBy === 'relevance' ? searchRank('vyapar', query.search) : null;
+    if (query.search && !ranked) {
+      const condition = searchCondition('vyapar', query.search);
+      if (condition) conditions.push(condition);
     }
 
     let dbQuery = db
-      .select()
+      .select(getTableColumns(vyaparTransactions))
       .from(vyaparTransactions)
-      .orderBy(desc(vyaparTransactions.date), desc(vyaparTransactions.createdAt));
+      .orderBy(ranked ? ranked.rank : desc(vyaparTransactions.date), desc(vyaparTransactions.createdAt));
+
+    if (ranked) {
+      dbQuery = dbQuery.innerJoin(ranked.table, ranked.on) as typeof dbQuery;
+    }
 
     if (conditions.length > 0) {
       dbQuery = dbQuery.where(and(...conditions)) as typeof dbQuery;
@@ -168,14 +177,20 @@ router.get('/credit-card', async (req, res) => {
     if (query.reconciled !== undefined) {
       conditions.push(eq(creditCardTransactions.isReconciled, query.reconciled === 'true'));
     }
-    if (query.search) {
-      conditions.push(like(creditCardTransactions.description, `%${query.search}%`));
+    const ranked = query.search && query.sortBy === 'relevance' ? searchRank('creditCard', query.search) : null;
+    if (query.search && !ranked) {
+      const condition = searchCondition('creditCard', query.search);
+      if (condition) conditions.push(condition);
     }
 
     let dbQuery = db
-      .select()
+      .select(getTableColumns(creditCardTransactions))
       .from(creditCardTransactions)
-      .orderBy(desc(creditCardTransactions.date), desc(creditCardTransactions.createdAt));
+      .orderBy(ranked ? ranked.rank : desc(creditCardTransactions.date), desc(creditCardTransactions.createdAt));
+
+    if (ranked) {
+      dbQuery = dbQuery.innerJoin(ranked.table, ranked.on) as typeof dbQuery;
+    }
 
     if (conditions.length > 0) {
       dbQuery = dbQuery.where(and(...conditions)) as typeof dbQuery;
@@ -6,7 +6,7 @@ import { fileURLToPath } from 'url';
 import { v4 as uuidv4 } from 'uuid';
 import { z } from 'zod';
 import { db, uploads, bankTransactions, vyaparTransactions, vyaparItemDetails, creditCardTransactions, creditCardStatements, cardHolders, accounts, investments, reconciliationMatches } from '../db/index.js';
-import { eq, desc, and, sql, gte, lte, inArray } from 'drizzle-orm';
+import { eq, desc, and, sql, gte, lte, inArray, getTableName } from 'drizzle-orm';
 import {
   parseHDFCStatement,
   convertToDBTransactions as convertHDFC,
@@ -14,6 +14,8 @@ import {
 import {
   parseKotakStatement,
   parseKotakStatementFull,
+  parseKotakStatementMetadata,
+  previewKotakStatement,
   convertToDBTransactions as convertKotak,
   type KotakStatementData,
 } from '../parsers/kotak-parser.js';
@@ -25,7 +27,10 @@ import {
 } from '../parsers/icici-parser.js';
 import {
   parseHDFCPDFStatementFull,
+  parseHDFCPDFStatementMetadata,
+  previewHDFCPDFStatement,
   type HDFCStatementData,
+  type StatementWatermark,
 } from '../parsers/hdfc-pdf-parser.js';
 import {
   parseVyaparReport,
@@ -52,6 +57,8 @@ import {
 import { parseAxisHomeLoanStatement } from '../parsers/axis-home-loan-parser.js';
 import { parseCAMSStatement } from '../parsers/cams-parser.js';
 import { detectFileType, type DetectionResult } from '../parsers/file-detector.js';
+import { narrationColumns } from '../parsers/narration-fields.js';
+import { bulkInsert } from '../services/bulk-import.js';
 
 const __dirname = path.dirname(fileURLToPath(import.meta.url));
 // Use /data/uploads on Railway (persistent volume), otherwise use local data folder
@@ -99,6 +106,88 @@ const upload = multer({
 
 const router = Router();
 
+// Number of transactions returned by a PDF statement preview
+const PREVIEW_ROW_LIMIT = 10;
+// How long a background full parse is kept waiting for its confirm
+const PENDING_PARSE_TTL_MS = 30 * 60 * 1000;
+
+// Full PDF parses started when a preview was cut short, keyed by upload id.
+// The confirm step awaits the parse instead of the client re-sending rows.
+const pendingFullParses = new Map<string, Promise<any[]>>();
+
+// Date and balance after the account's last imported bank transaction (insertion order breaks date ties).
+// None when that row has no balance: a date alone can't place the boundary, so the statement is parsed in full.
+async function accountWatermark(accountId: string | null): Promise<StatementWatermark | null> {
+  if (!accountId) return null;
+  const [last] = await db
+    .select({ date: bankTransactions.date, balance: bankTransactions.balance })
+    .from(bankTransactions)
+    .where(eq(bankTransactions.accountId, accountId))
+    .orderBy(desc(bankTransactions.date), desc(sql`rowid`))
+    .limit(1);
+  return last && last.balance != null ? { date: last.date, balance: last.balance } : null;
+}
+
+type FullParseBank = 'hdfc' | 'kotak';
+
+// Uploads whose full parse can run from the stored file: the PDF statements previewed partially
+function fullParseBank(upload: { bankName: string | null; originalName: string }): FullParseBank | null {
+  if (path.extname(upload.originalName).toLowerCase() !== '.pdf') return null;
+  return upload.bankName === 'hdfc' || upload.bankName === 'kotak' ? upload.bankName : null;
+}
+
+// HDFC statements skip the pages already imported; Kotak's sweep adjustments need every page
+async function parseFullStatement(bankName: FullParseBank, buffer: Buffer, accountId: string | null): Promise<any[]> {
+  return bankName === 'kotak'
+    ? (await parseKotakStatementFull(buffer)).transactions
+    : (await parseHDFCPDFStatementFull(buffer, undefined, await accountWatermark(accountId))).transactions;
+}
+
+function startFullParse(uploadId: string, bankName: FullParseBank, buffer: Buffer, accountId: string) {
+  const fullParse = parseFullStatement(bankName, buffer, accountId);
+  // Errors surface when the confirm step awaits the parse
+  fullParse.catch(() => {});
+
+  pendingFullParses.set(uploadId, fullParse);
+  setTimeout(() => pendingFullParses.delete(uploadId), PENDING_PARSE_TTL_MS).unref();
+}
+
+// Get the full transaction list for a previewed upload, re-parsing the stored file if needed.
+// The background parse was cut at the upload account's watermark, so it's discarded when
+// the import goes to a different account. Null when the upload's bank and file type have
+// no full parser: the client has to send the transactions.
+async function takeFullParse(
+  upload: { id: string; filename: string; originalName: string; bankName: string | null; accountId: string | null },
+  accountId: string
+): Promise<any[] | null> {
+  const pending = pendingFullParses.get(upload.id);
+  pendingFullParses.delete(upload.id);
+  if (pending && accountId === upload.accountId) {
+    return pending;
+  }
+
+  const bankName = fullParseBank(upload);
+  if (!bankName) return null;
+
+  const buffer = fs.readFileSync(path.join(uploadDir, upload.filename));
+  return parseFullStatement(bankName, buffer, accountId);
+}
+
+// Mark each parsed bank transaction as duplicate or new
+async function markDuplicateBankTransactions(accountId: string, transactions: any[]) {
+  const duplicateSignatures = await findDuplicateBankTransactions(accountId, transactions);
+
+  return transactions.map(txn => {
+    // Handle both narration (HDFC) and description (Kotak) field names
+    const narration = txn.narration || txn.description || '';
+    const signature = createTransactionSignature(txn.date, txn.amount, txn.reference, narration);
+    return {
+      ...txn,
+      isDuplicate: duplicateSignatures.has(signature),
+    };
+  });
+}
+
 // Helper function to check for duplicate bank transactions
 async function findDuplicateBankTransactions(
   accountId: string,
@@ -272,37 +361,53 @@ router.post('/bank-statement/preview', upload.single('file'), async (req, res) =
 
     const filePath = req.file.path;
     const buffer = fs.readFileSync(filePath);
+    const uploadId = uuidv4();
+    const isPdf = path.extname(req.file.originalname).toLowerCase() === '.pdf';
 
-    let transactions;
+    let transactions: any[] | undefined;
+    let isPartial = false;
+    let pagesParsed: number | undefined;
+    let pageCount: number | undefined;
 
-    switch (bankName) {
-      case 'hdfc':
-        transactions = parseHDFCStatement(buffer);
-        break;
-      case 'kotak':
-        transactions = await parseKotakStatement(buffer);
-        break;
-      case 'icici':
-        transactions = await parseICICIStatement(buffer);
-        break;
-      default:
-        // Try HDFC format as default for XLS/XLSX
-        transactions = parseHDFCStatement(buffer);
+    // PDF statements: parse only the first pages for the preview, finish the rest in the background
+    if (isPdf && (bankName === 'kotak' || bankName === 'hdfc')) {
+      try {
+        const preview = bankName === 'kotak'
+          ? await previewKotakStatement(buffer, undefined, PREVIEW_ROW_LIMIT)
+          : await previewHDFCPDFStatement(buffer, undefined, PREVIEW_ROW_LIMIT);
+
+        transactions = preview.transactions;
+        isPartial = !preview.complete;
+        pagesParsed = preview.pagesParsed;
+        pageCount = preview.pageCount;
+
+        if (isPartial) {
+          startFullParse(uploadId, bankName, buffer, accountId);
+        }
+      } catch (previewError: any) {
+        console.error('PDF preview failed, falling back to full parse:', previewError?.message);
+      }
     }
 
-    // Check for duplicates
-    const duplicateSignatures = await findDuplicateBankTransactions(accountId, transactions);
+    if (!transactions) {
+      switch (bankName) {
+        case 'hdfc':
+          transactions = parseHDFCStatement(buffer);
+          break;
+        case 'kotak':
+          transactions = await parseKotakStatement(buffer);
+          break;
+        case 'icici':
+          transactions = await parseICICIStatement(buffer);
+          break;
+        default:
+          // Try HDFC format as default for XLS/XLSX
+          transactions = parseHDFCStatement(buffer);
+      }
+    }
 
-    // Mark transactions as duplicate or new
-    const transactionsWithStatus = transactions.map(txn => {
-      // Handle both narration (HDFC) and description (Kotak) field names
-      const narration = (txn as any).narration || (txn as any).description || '';
-      const signature = createTransactionSignature(txn.date, txn.amount, txn.reference, narration);
-      return {
-        ...txn,
-        isDuplicate: duplicateSignatures.has(signature),
-      };
-    });
+    // Check for duplicates and mark transactions as duplicate or new
+    const transactionsWithStatus = await markDuplicateBankTransactions(accountId, transactions);
 
     const newTransactions = transactionsWithStatus.filter(t => !t.isDuplicate);
     const duplicateCount = transactionsWithStatus.filter(t => t.isDuplicate).length;
@@ -310,7 +415,7 @@ router.post('/bank-statement/preview', upload.single('file'), async (req, res) =
     // Store upload record
     const now = new Date().toISOString();
     const uploadRecord = {
-      id: uuidv4(),
+      id: uploadId,
       userId: req.userId!,
       filename: req.file.filename,
       originalName: req.file.originalname,
@@ -335,7 +440,11 @@ router.post('/bank-statement/preview', upload.single('file'), async (req, res) =
       newTransactionCount: newTransactions.length,
       duplicateCount,
       preview: transactionsWithStatus.slice(0, 10),
-      allTransactions: transactionsWithStatus,
+      // Partial previews leave the full list to the confirm step
+      allTransactions: isPartial ? undefined : transactionsWithStatus,
+      isPartial,
+      pagesParsed,
+      pageCount,
     });
   } catch (error: any) {
     console.error('Error previewing bank statement:', error?.message || error);
@@ -347,11 +456,11 @@ router.post('/bank-statement/preview', upload.single('file'), async (req, res) =
 // Confirm bank statement import
 router.post('/bank-statement/confirm', async (req, res) => {
   try {
-    const { uploadId, accountId, transactions, skipDuplicates = true } = z
+    const { uploadId, accountId, skipDuplicates = true, ...body } = z
       .object({
         uploadId: z.string(),
         accountId: z.string(),
-        transactions: z.array(z.any()),
+        transactions: z.array(z.any()).optional(), // Omitted for partial (PDF) previews
         skipDuplicates: z.boolean().optional(),
       })
       .parse(req.body);
@@ -371,6 +480,19 @@ router.post('/bank-statement/confirm', async (req, res) => {
       return res.status(400).json({ error: 'Upload already processed', alreadyImported: true });
     }
 
+    // Partial preview: pick up the background full parse
+    let transactions = body.transactions;
+    if (!transactions) {
+      const fullParse = await takeFullParse(existingUpload[0], accountId);
+      if (!fullParse) {
+        return res.status(409).json({
+          error: 'Transactions are required to import this upload. Please preview the file again.',
+          needsTransactions: true,
+        });
+      }
+      transactions = await markDuplicateBankTransactions(accountId, fullParse);
+    }
+
     const now = new Date().toISOString();
 
     // Filter out duplicates if skipDuplicates is true
@@ -390,7 +512,8 @@ router.post('/bank-statement/confirm', async (req, res) => {
       reference: t.reference || null,
       transactionType: t.transactionType,
       amount: t.amount,
-      balance: t.balance || null,
+      balance: t.balance ?? null,
+      ...narrationColumns(t.narrationFields),
       categoryId: null,
       notes: null,
       isReconciled: false,
@@ -401,11 +524,7 @@ router.post('/bank-statement/confirm', async (req, res) => {
       updatedAt: now,
     }));
 
-    let importedCount = 0;
-    for (const txn of dbTransactions) {
-      await db.insert(bankTransactions).values(txn);
-      importedCount++;
-    }
+    const importedCount = bulkInsert([{ table: bankTransactions, rows: dbTransactions }], 'bank statement').totalRows;
 
     // Update account balance with last transaction balance (from original order)
     // Find the latest transaction by date to get correct closing balance
@@ -741,14 +860,8 @@ router.post('/vyapar/confirm', async (req, res) => {
       updatedAt: now,
     }));
 
-    let importedCount = 0;
-    for (const txn of dbTransactions) {
-      await db.insert(vyaparTransactions).values(txn);
-      importedCount++;
-    }
-
-    // Import item details if provided
-    let itemDetailsImported = 0;
+    // Import item details if provided (new items are inserted with the transactions below)
+    const newItems: any[] = [];
     let itemDetailsUpdated = 0;
     if (itemDetails && itemDetails.length > 0) {
       // Get existing items to check for duplicates and preserve categories
@@ -817,12 +930,18 @@ router.post('/vyapar/confirm', async (req, res) => {
             uploadId,
             createdAt: now,
           };
-          await db.insert(vyaparItemDetails).values(dbItem);
-          itemDetailsImported++;
+          newItems.push(dbItem);
         }
       }
     }
 
+    const imported = bulkInsert([
+      { table: vyaparTransactions, rows: dbTransactions },
+      { table: vyaparItemDetails, rows: newItems },
+    ], 'vyapar report');
+    const importedCount = imported.rows[getTableName(vyaparTransactions)];
+    const itemDetailsImported = imported.rows[getTableName(vyaparItemDetails)];
+
     await db
       .update(uploads)
       .set({
@@ -1253,11 +1372,7 @@ router.post('/credit-card/confirm', async (req, res) => {
       updatedAt: now,
     }));
 
-    let importedCount = 0;
-    for (const txn of dbTransactions) {
-      await db.insert(creditCardTransactions).values(txn);
-      importedCount++;
-    }
+    const importedCount = bulkInsert([{ table: creditCardTransactions, rows: dbTransactions }], 'credit card statement').totalRows;
 
     // Update account balance (negative for credit card outstanding)
     if (statementMetadata?.totalDue) {
@@ -2021,21 +2136,26 @@ router.post('/smart-import', upload.single('file'), async (req, res) => {
       });
     }
 
-    // Step 2: Parse statement with full metadata based on detected bank
+    // Step 2: Parse statement with full metadata based on detected bank.
+    // Kotak and HDFC PDFs read metadata in a quick metadata-only pass for account
+    // matching; the transactions are parsed once the account is known, so HDFC
+    // can skip the pages already imported into it.
     let metadata: any;
     let transactions: any[] = [];
     let sweepTransactions: any[] = [];
     let sweepBalance = 0;
     let actualBalance = 0;
+    let fullParse: ((watermark: StatementWatermark | null) => Promise<{
+      transactions: any[];
+      sweepTransactions: any[];
+      sweepBalance: number;
+      actualBalance: number;
+    }>) | null = null;
 
     switch (detection.bankName) {
       case 'kotak': {
-        const kotakData = await parseKotakStatementFull(buffer, password);
-        metadata = kotakData.metadata;
-        transactions = kotakData.transactions;
-        sweepTransactions = kotakData.sweepTransactions;
-        sweepBalance = kotakData.sweepBalance;
-        actualBalance = kotakData.actualBalance;
+        metadata = await parseKotakStatementMetadata(buffer, password);
+        fullParse = () => parseKotakStatementFull(buffer, password);
         break;
       }
       case 'icici': {
@@ -2049,10 +2169,17 @@ router.post('/smart-import', upload.single('file'), async (req, res) => {
         // Check if this is a PDF (HDFC PDF parser) or XLS (existing HDFC parser)
         const ext = req.file.originalname.toLowerCase().split('.').pop();
         if (ext === 'pdf') {
-          const hdfcData = await parseHDFCPDFStatementFull(buffer, password);
-          metadata = hdfcData.metadata;
-          transactions = hdfcData.transactions;
-          actualBalance = hdfcData.actualBalance;
+          metadata = await parseHDFCPDFStatementMetadata(buffer, password);
+          fullParse = async (watermark) => {
+            const hdfcData = await parseHDFCPDFStatementFull(buffer, password, watermark);
+            return {
+              transactions: hdfcData.transactions,
+              sweepTransactions: [],
+              sweepBalance: 0,
+              // A statement cut at the watermark may have no rows left to read it from
+              actualBalance: metadata.closingBalance ?? hdfcData.actualBalance,
+            };
+          };
         } else {
           // Use existing XLS parser
           const xlsTransactions = parseHDFCStatement(buffer);
@@ -2104,6 +2231,14 @@ router.post('/smart-import', upload.single('file'), async (req, res) => {
 
     let accountCreated = false;
 
+    if (fullParse) {
+      const parsed = await fullParse(existingAccounts[0] ? await accountWatermark(existingAccounts[0].id) : null);
+      transactions = parsed.transactions;
+      sweepTransactions = parsed.sweepTransactions;
+      sweepBalance = parsed.sweepBalance;
+      actualBalance = parsed.actualBalance;
+    }
+
     if (existingAccounts[0]) {
       account = existingAccounts[0];
       console.log(`[SmartImport] Found existing account: ${account.id} (${account.accountNumber})`);
@@ -2189,7 +2324,7 @@ router.post('/smart-import', upload.single('file'), async (req, res) => {
     }
 
     // Step 6: Import non-duplicate transactions
-    let importedCount = 0;
+    const dbTransactions: any[] = [];
     let duplicateCount = 0;
 
     for (const txn of transactions) {
@@ -2211,6 +2346,7 @@ router.post('/smart-import', upload.single('file'), async (req, res) => {
         transactionType: txn.transactionType,
         amount: txn.amount,
         balance: txn.balance,
+        ...narrationColumns(txn.narrationFields),
         categoryId: null,
         notes: txn.sweepAdjustment ? `Actual balance (incl. sweep): ₹${txn.balance?.toLocaleString('en-IN')}` : null,
         isReconciled: false,
@@ -2221,10 +2357,11 @@ router.post('/smart-import', upload.single('file'), async (req, res) => {
         updatedAt: now,
       };
 
-      await db.insert(bankTransactions).values(dbTxn);
-      importedCount++;
+      dbTransactions.push(dbTxn);
     }
 
+    const importedCount = bulkInsert([{ table: bankTransactions, rows: dbTransactions }], 'smart import').totalRows;
+
     // Step 7: Update account balance
     await db
       .update(accounts)
@@ -2543,9 +2680,9 @@ async function handleInfiniaCreditCardSmartImport(
     });
 
     // Insert transactions
-    let insertedCount = 0;
-    for (const txn of newTransactions) {
-      await db.insert(creditCardTransactions).values({
+    const insertedCount = bulkInsert([{
+      table: creditCardTransactions,
+      rows: newTransactions.map(txn => ({
         id: uuidv4(),
         userId: req.userId!,
         accountId: account.id,
@@ -2563,9 +2700,8 @@ async function handleInfiniaCreditCardSmartImport(
         uploadId,
         createdAt: now,
         updatedAt: now,
-      });
-      insertedCount++;
-    }
+      })),
+    }], 'HDFC Infinia statement').totalRows;
 
     // Create statement record
     await db.insert(creditCardStatements).values({
@@ -2749,9 +2885,9 @@ async function handleICICICreditCardSmartImport(
       return !existingSignatures.has(sig);
     });
 
-    let insertedCount = 0;
-    for (const txn of newTransactions) {
-      await db.insert(creditCardTransactions).values({
+    const insertedCount = bulkInsert([{
+      table: creditCardTransactions,
+      rows: newTransactions.map(txn => ({
         id: uuidv4(),
         userId: req.userId!,
         accountId: account.id,
@@ -2765,9 +2901,8 @@ async function handleICICICreditCardSmartImport(
         uploadId,
         createdAt: now,
         updatedAt: now,
-      });
-      insertedCount++;
-    }
+      })),
+    }], 'ICICI credit card statement').totalRows;
 
     // Create statement record
     await db.insert(creditCardStatements).values({
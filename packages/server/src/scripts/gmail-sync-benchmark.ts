@@ -0,0 +1,176 @@
+/**
+ * Gmail Sync Benchmark
+ * Runs syncGmailTransactions against a throwaway database and a local fake
+ * Gmail client that serves synthetic HDFC, ICICI, Axis and Kotak alert
+ * emails with a simulated request latency. Each configuration starts from
+ * an empty processed_emails table, so the runs are comparable.
+ *
+ *   npm run bench:gmail-sync -- [--emails 2000] [--latency 40] [--concurrency 1,6,12] [--batch 50]
+ */
+
+import fs from 'fs';
+import os from 'os';
+import path from 'path';
+import type { GmailClient, GmailEmail } from '../services/gmail-service.js';
+
+const args = process.argv.slice(2);
+function option(name: string, fallback: string): string {
+  const i = args.indexOf(`--${name}`);
+  return i >= 0 && args[i + 1] ? args[i + 1] : fallback;
+}
+
+const EMAILS = parseInt(option('emails', '2000'));
+const LATENCY_MS = parseInt(option('latency', '40'));
+const CONCURRENCY = option('concurrency', '1,6,12').split(',').map(n => parseInt(n));
+const WRITE_BATCH_SIZE = parseInt(option('batch', '50'));
+const PAGE_SIZE = 100;
+
+// db/index.ts opens DATABASE_PATH on import
+const dbPath = path.join(os.tmpdir(), `keystone-gmail-sync-benchmark-${process.pid}.db`);
+process.env.DATABASE_PATH = dbPath;
+
+const { db, sqlite, initializeDatabase, accounts } = await import('../db/index.js');
+const { syncGmailTransactions } = await import('../services/gmail-sync-service.js');
+
+const CONNECTION_ID = 'bench-connection';
+const USER_ID = 'bench-user';
+
+// One alert template per bank, matching the patterns in parsers/email-parsers
+const TEMPLATES = [
+  {
+    from: 'HDFC Bank InstaAlerts <alerts@hdfcbank.net>',
+    subject: 'You have done a UPI txn. Check details!',
+    account: { bankName: 'HDFC Bank', accountNumber: '50100012341111', accountType: 'savings' },
+    body: (n: number, amount: string, date: Date) =>
+      `Dear Customer, Rs.${amount} has been debited from account 1111 to VPA shop${n}@okhdfcbank SHOP ${n} on ${dmy(date, '-')}. ` +
+      `Your UPI transaction reference number is ${400000000000 + n}.`,
+  },
+  {
+    from: 'HDFC Bank InstaAlerts <alerts@hdfcbank.net>',
+    subject: 'Alert : Update on your HDFC Bank Credit Card',
+    account: { bankName: 'HDFC Bank', accountNumber: 'XXXXXXXXXXXX2222', accountType: 'credit_card' },
+    body: (n: number, amount: string, date: Date) =>
+      `Dear Card Member, Rs.${amount} spent on HDFC Bank Card x2222 at MERCHANT ${n} on ${dmy(date, '-')}.`,
+  },
+  {
+    from: 'ICICI Bank <alerts@icicibank.com>',
+    subject: 'Transaction alert for your ICICI Bank account',
+    account: { bankName: 'ICICI Bank', accountNumber: '000101013333', accountType: 'savings' },
+    body: (n: number, amount: string, date: Date) =>
+      `Dear Customer, INR ${amount} debited from Acct XX3333 on ${dmy(date, '-', true)}. Info: UPI-${n}.`,
+  },
+  {
+    from: 'Axis Bank Alerts <alerts@axisbank.com>',
+    subject: 'Debit transaction alert for Axis Bank A/c',
+    account: { bankName: 'Axis Bank', accountNumber: '918010044444', accountType: 'savings' },
+    body: (n: number, amount: string, date: Date) =>
+      `INR ${amount} debited from A/c XX4444 on ${dmy(date, '-', true)}. UPI/P2M/${n}/MERCHANT`,
+  },
+  {
+    from: 'Kotak Mahindra Bank <alerts@kotak.com>',
+    subject: 'Kotak Bank transaction alert',
+    account: { bankName: 'Kotak Mahindra Bank', accountNumber: '7712345555', accountType: 'savings' },
+    body: (n: number, amount: string) =>
+      `Rs.${amount} has been debited from your Kotak Bank a/c XX5555 towards UPI-${n}.`,
+  },
+];
+
+const MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'];
+function dmy(date: Date, separator: string, monthName = false): string {
+  const day = String(date.getUTCDate()).padStart(2, '0');
+  const month = monthName ? MONTHS[date.getUTCMonth()] : String(date.getUTCMonth() + 1).padStart(2, '0');
+  return [day, month, String(date.getUTCFullYear()).slice(2)].join(separator);
+}
+
+function syntheticEmail(n: number): GmailEmail {
+  const template = TEMPLATES[n % TEMPLATES.length];
+  const date = new Date(Date.UTC(2025, 0, 1) + (n % 365) * 86_400_000);
+  const amount = (100 + (n * 37) % 90_000 + (n % 100) / 100).toFixed(2);
+  return {
+    id: `msg-${n}`,
+    threadId: `thread-${n}`,
+    from: template.from,
+    subject: template.subject,
+    date: date.toUTCString(),
+    body: template.body(n, amount, date),
+    internalDate: String(date.getTime()),
+    snippet: null,
+  };
+}
+
+const sleep = (ms: number) => new Promise(resolve => setTimeout(resolve, ms));
+
+/**
+ * Gmail client serving EMAILS synthetic messages, newest first, with
+ * LATENCY_MS per request like a network round trip
+ */
+function createFakeGmailClient(stats: { requests: number }): GmailClient {
+  return {
+    async listMessages({ maxResults, pageToken }) {
+      stats.requests++;
+      await sleep(LATENCY_MS);
+      const start = pageToken ? parseInt(pageToken) : 0;
+      const end = Math.min(EMAILS, start + Math.min(maxResults || PAGE_SIZE, PAGE_SIZE));
+      const messages = [];
+      for (let n = start; n < end; n++) messages.push({ id: `msg-${n}` });
+      return { messages, nextPageToken: end < EMAILS ? String(end) : null, resultSizeEstimate: EMAILS };
+    },
+    async getMessage(messageId) {
+      stats.requests++;
+      await sleep(LATENCY_MS);
+      return syntheticEmail(parseInt(messageId.slice('msg-'.length)));
+    },
+  };
+}
+
+function reset() {
+  sqlite.exec(`
+    DELETE FROM processed_emails;
+    DELETE FROM gmail_sync_state;
+    DELETE FROM bank_transactions;
+    DELETE FROM credit_card_transactions;
+  `);
+}
+
+async function run() {
+  initializeDatabase();
+
+  const now = new Date().toISOString();
+  db.insert(accounts).values(TEMPLATES.map((template, i) => ({
+    id: `bench-account-${i}`,
+    userId: USER_ID,
+    name: `${template.account.bankName} ${template.account.accountType}`,
+    ...template.account,
+    createdAt: now,
+    updatedAt: now,
+  }))).run();
+
+  console.log(`[Gmail Sync Benchmark] ${EMAILS} emails, ${LATENCY_MS}ms per request, write batches of ${WRITE_BATCH_SIZE}`);
+
+  for (const concurrency of CONCURRENCY) {
+    reset();
+    const stats = { requests: 0 };
+    const start = performance.now();
+    const result = await syncGmailTransactions(
+      CONNECTION_ID,
+      { syncType: 'historical', maxEmails: EMAILS, fetchConcurrency: concurrency, writeBatchSize: WRITE_BATCH_SIZE },
+      createFakeGmailClient(stats)
+    );
+    const seconds = (performance.now() - start) / 1000;
+
+    console.log(
+      `[Gmail Sync Benchmark] fetch concurrency ${concurrency}: ${seconds.toFixed(2)}s, ` +
+      `${Math.round(result.processedCount / seconds)} emails/s, ${stats.requests} requests, ` +
+      `${result.newTransactions} new, ${result.duplicates} duplicates, ${result.errors} errors (${result.status})`
+    );
+  }
+}
+
+try {
+  await run();
+} finally {
+  sqlite.close();
+  for (const suffix of ['', '-wal', '-shm']) {
+    fs.rmSync(dbPath + suffix, { force: true });
+  }
+}
@@ -0,0 +1,346 @@
+/**
+ * Query Benchmark
+ * Seeds a throwaway database with synthetic bank, Vyapar and credit card
+ * transactions, then records the EXPLAIN QUERY PLAN and latency of the hot
+ * transaction queries (list pages, date-range totals, account lookups,
+ * unreconciled counts). Exits non-zero if any of them scans a whole table.
+ *
+ *   npm run bench:queries -- [--transactions 1000000] [--users 50] [--runs 20]
+ */
+
+import fs from 'fs';
+import os from 'os';
+import path from 'path';
+import { eq, and, between, desc, asc, inArray, sql } from 'drizzle-orm';
+
+const args = process.argv.slice(2);
+function option(name: string, fallback: number): number {
+  const i = args.indexOf(`--${name}`);
+  return i >= 0 && args[i + 1] ? parseInt(args[i + 1]) : fallback;
+}
+
+const TRANSACTIONS = option('transactions', 1_000_000);
+const USERS = option('users', 50);
+const RUNS = option('runs', 20);
+const ACCOUNTS_PER_USER = 3;
+const YEARS = 5;
+
+// db/index.ts opens DATABASE_PATH on import
+const dbPath = path.join(os.tmpdir(), `keystone-query-benchmark-${process.pid}.db`);
+process.env.DATABASE_PATH = dbPath;
+
+const { db, sqlite, initializeDatabase, bankTransactions, vyaparTransactions, creditCardTransactions, monthlyRollups } =
+  await import('../db/index.js');
+const { bulkInsert } = await import('../services/bulk-import.js');
+const { searchCondition } = await import('../services/transaction-search.js');
+
+// Tables whose full scans grow with transaction history
+const SCANNED_TABLE = /^SCAN (bank_transactions|vyapar_transactions|credit_card_transactions|monthly_rollups)\b/;
+
+const BANK_TYPES = ['credit', 'debit'];
+const VYAPAR_TYPES = ['Sale', 'Sale Order', 'Payment-In', 'Purchase', 'Payment-Out', 'Expense'];
+const CATEGORIES = [null, 'cat-food', 'cat-fuel', 'cat-rent', 'cat-salary', 'cat-shopping'];
+
+// Deterministic PRNG so runs are comparable
+let seed = 42;
+function random(): number {
+  seed = (Math.imul(seed, 1103515245) + 12345) & 0x7fffffff;
+  return seed / 0x7fffffff;
+}
+function pick<T>(values: T[]): T {
+  return values[Math.floor(random() * values.length)];
+}
+
+const startYear = new Date().getFullYear() - YEARS + 1;
+function randomDate(): string {
+  const month = String(1 + Math.floor(random() * 12)).padStart(2, '0');
+  const day = String(1 + Math.floor(random() * 28)).padStart(2, '0');
+  return `${startYear + Math.floor(random() * YEARS)}-${month}-${day}`;
+}
+
+const userId = (n: number) => `bench-user-${n}`;
+const accountId = (user: number, n: number) => `bench-account-${user}-${n}`;
+
+function* bankRows(count: number) {
+  for (let i = 0; i < count; i++) {
+    const user = i % USERS;
+    const date = randomDate();
+    const createdAt = `${date}T00:00:00.000Z`;
+    yield {
+      id: `bank-${i}`,
+      userId: userId(user),
+      accountId: accountId(user, i % ACCOUNTS_PER_USER),
+      date,
+      narration: `UPI-MERCHANT ${i % 997}-merchant${i % 997}@okaxis-PAYMENT`,
+      reference: String(100000000000 + i),
+      transactionType: pick(BANK_TYPES),
+      amount: Math.round(random() * 5_000_000) / 100,
+      balance: Math.round(random() * 50_000_000) / 100,
+      categoryId: pick(CATEGORIES),
+      isReconciled: random() < 0.6,
+      createdAt,
+      updatedAt: createdAt,
+    };
+  }
+}
+
+function* vyaparRows(count: number) {
+  for (let i = 0; i < count; i++) {
+    const date = randomDate();
+    const createdAt = `${date}T00:00:00.000Z`;
+    yield {
+      id: `vyapar-${i}`,
+      userId: userId(i % USERS),
+      date,
+      invoiceNumber: `INV-${i}`,
+      transactionType: pick(VYAPAR_TYPES),
+      partyName: `Party ${i % 499}`,
+      categoryName: pick(CATEGORIES),
+      amount: Math.round(random() * 2_000_000) / 100,
+      isReconciled: random() < 0.5,
+      createdAt,
+      updatedAt: createdAt,
+    };
+  }
+}
+
+function* creditCardRows(count: number) {
+  for (let i = 0; i < count; i++) {
+    const user = i % USERS;
+    const date = randomDate();
+    const createdAt = `${date}T00:00:00.000Z`;
+    yield {
+      id: `card-${i}`,
+      userId: userId(user),
+      accountId: accountId(user, ACCOUNTS_PER_USER),
+      date,
+      description: `MERCHANT ${i % 797}`,
+      amount: Math.round(random() * 1_000_000) / 100,
+      transactionType: random() < 0.9 ? 'debit' : 'credit',
+      createdAt,
+      updatedAt: createdAt,
+    };
+  }
+}
+
+interface HotQuery {
+  name: string;
+  build: (user: number) => { toSQL(): { sql: string; params: unknown[] } };
+}
+
+const rangeStart = `${startYear + YEARS - 1}-01-01`;
+const rangeEnd = `${startYear + YEARS - 1}-03-31`;
+const yearEnd = `${startYear + YEARS - 1}-12-31`;
+
+// Mirrors of the queries in routes/transactions.ts, routes/uploads.ts and services/report-service.ts
+const HOT_QUERIES: HotQuery[] = [
+  {
+    name: 'bank list page',
+    build: u => db.select().from(bankTransactions)
+      .where(eq(bankTransactions.userId, userId(u)))
+      .orderBy(desc(bankTransactions.date), desc(bankTransactions.createdAt)).limit(50),
+  },
+  {
+    name: 'bank list by date range',
+    build: u => db.select().from(bankTransactions)
+      .where(and(eq(bankTransactions.userId, userId(u)), between(bankTransactions.date, rangeStart, rangeEnd)))
+      .orderBy(desc(bankTransactions.date), desc(bankTransactions.createdAt)).limit(50),
+  },
+  {
+    name: 'bank list by account',
+    build: u => db.select().from(bankTransactions)
+      .where(and(eq(bankTransactions.userId, userId(u)), eq(bankTransactions.accountId, accountId(u, 0))))
+      .orderBy(desc(bankTransactions.date), desc(bankTransactions.createdAt)).limit(50),
+  },
+  {
+    name: 'bank search',
+    build: u => db.select().from(bankTransactions)
+      .where(and(eq(bankTransactions.userId, userId(u)), searchCondition('bank', `merchant${u * 7}`)))
+      .orderBy(desc(bankTransactions.date), desc(bankTransactions.createdAt)),
+  },
+  {
+    name: 'bank account history',
+    build: u => db.select().from(bankTransactions)
+      .where(and(eq(bankTransactions.userId, userId(u)), eq(bankTransactions.accountId, accountId(u, 0))))
+      .orderBy(asc(bankTransactions.date), asc(bankTransactions.createdAt)),
+  },
+  {
+    name: 'bank monthly totals',
+    build: u => db
+      .select({
+        period: sql<string>`substr(${bankTransactions.date}, 1, 7)`,
+        categoryId: bankTransactions.categoryId,
+        transactionType: bankTransactions.transactionType,
+        total: sql<number>`sum(${bankTransactions.amount})`,
+        count: sql<number>`count(*)`,
+      })
+      .from(bankTransactions)
+      .where(and(
+        between(bankTransactions.date, rangeStart, yearEnd),
+        eq(bankTransactions.userId, userId(u)),
+        inArray(bankTransactions.transactionType, BANK_TYPES)
+      ))
+      .groupBy(sql`substr(${bankTransactions.date}, 1, 7)`, bankTransactions.categoryId, bankTransactions.transactionType),
+  },
+  {
+    name: 'bank daily totals',
+    build: u => db
+      .select({
+        period: bankTransactions.date,
+        categoryId: bankTransactions.categoryId,
+        transactionType: bankTransactions.transactionType,
+        total: sql<number>`sum(${bankTransactions.amount})`,
+        count: sql<number>`count(*)`,
+      })
+      .from(bankTransactions)
+      .where(and(between(bankTransactions.date, rangeStart, rangeEnd), eq(bankTransactions.userId, userId(u))))
+      .groupBy(bankTransactions.date, bankTransactions.categoryId, bankTransactions.transactionType),
+  },
+  {
+    name: 'bank unreconciled count',
+    build: u => db.select({ count: sql<number>`count(*)` }).from(bankTransactions)
+      .where(and(eq(bankTransactions.isReconciled, false), eq(bankTransactions.userId, userId(u)))),
+  },
+  {
+    name: 'bank duplicate check',
+    build: u => db
+      .select({
+        date: bankTransactions.date,
+        amount: bankTransactions.amount,
+        narration: bankTransactions.narration,
+        reference: bankTransactions.reference,
+      })
+      .from(bankTransactions)
+      .where(eq(bankTransactions.accountId, accountId(u, 0))),
+  },
+  {
+    name: 'bank import watermark',
+    build: u => db.select({ date: bankTransactions.date, balance: bankTransactions.balance }).from(bankTransactions)
+      .where(eq(bankTransactions.accountId, accountId(u, 0)))
+      .orderBy(desc(bankTransactions.date), desc(sql`rowid`)).limit(1),
+  },
+  {
+    name: 'vyapar list by date range',
+    build: u => db.select().from(vyaparTransactions)
+      .where(and(eq(vyaparTransactions.userId, userId(u)), between(vyaparTransactions.date, rangeStart, rangeEnd)))
+      .orderBy(desc(vyaparTransactions.date), desc(vyaparTransactions.createdAt)),
+  },
+  {
+    name: 'vyapar daily totals',
+    build: u => db
+      .select({
+        period: vyaparTransactions.date,
+        categoryId: vyaparTransactions.categoryName,
+        transactionType: vyaparTransactions.transactionType,
+        total: sql<number>`sum(${vyaparTransactions.amount})`,
+        count: sql<number>`count(*)`,
+      })
+      .from(vyaparTransactions)
+      .where(and(
+        between(vyaparTransactions.date, rangeStart, rangeEnd),
+        eq(vyaparTransactions.userId, userId(u)),
+        inArray(vyaparTransactions.transactionType, ['Sale', 'Sale Order', 'Expense'])
+      ))
+      .groupBy(vyaparTransactions.date, vyaparTransactions.categoryName, vyaparTransactions.transactionType),
+  },
+  {
+    name: 'vyapar unreconciled count',
+    build: u => db.select({ count: sql<number>`count(*)` }).from(vyaparTransactions)
+      .where(and(eq(vyaparTransactions.isReconciled, false), eq(vyaparTransactions.userId, userId(u)))),
+  },
+  {
+    name: 'vyapar by reconciled bank row',
+    build: u => db.select().from(vyaparTransactions)
+      .where(eq(vyaparTransactions.reconciledWithId, `bank-${u}`)),
+  },
+  {
+    name: 'credit card list by date range',
+    build: u => db.select().from(creditCardTransactions)
+      .where(and(eq(creditCardTransactions.userId, userId(u)), between(creditCardTransactions.date, rangeStart, rangeEnd)))
+      .orderBy(desc(creditCardTransactions.date), desc(creditCardTransactions.createdAt)),
+  },
+  {
+    name: 'credit card list by account',
+    build: u => db.select().from(creditCardTransactions)
+      .where(and(eq(creditCardTransactions.userId, userId(u)), eq(creditCardTransactions.accountId, accountId(u, ACCOUNTS_PER_USER))))
+      .orderBy(desc(creditCardTransactions.date), desc(creditCardTransactions.createdAt)),
+  },
+  {
+    name: 'monthly rollups',
+    build: u => db
+      .select({
+        period: monthlyRollups.month,
+        categoryId: monthlyRollups.categoryId,
+        transactionType: monthlyRollups.transactionType,
+        total: sql<number>`sum(${monthlyRollups.total})`,
+        count: sql<number>`sum(${monthlyRollups.count})`,
+      })
+      .from(monthlyRollups)
+      .where(and(
+        eq(monthlyRollups.source, 'bank'),
+        between(monthlyRollups.month, `${startYear}-01`, `${startYear + YEARS - 1}-12`),
+        eq(monthlyRollups.userId, userId(u))
+      ))
+      .groupBy(monthlyRollups.month, monthlyRollups.categoryId, monthlyRollups.transactionType),
+  },
+];
+
+function percentile(sorted: number[], p: number): number {
+  return sorted[Math.min(sorted.length - 1, Math.floor(sorted.length * p))];
+}
+
+function run() {
+  initializeDatabase();
+
+  const bankCount = Math.round(TRANSACTIONS * 0.6);
+  const vyaparCount = Math.round(TRANSACTIONS * 0.25);
+  const cardCount = TRANSACTIONS - bankCount - vyaparCount;
+  bulkInsert([
+    { table: bankTransactions, rows: bankRows(bankCount) },
+    { table: vyaparTransactions, rows: vyaparRows(vyaparCount) },
+    { table: creditCardTransactions, rows: creditCardRows(cardCount) },
+  ], 'benchmark seed');
+  // No ANALYZE: the server never runs it, so plans must hold without statistics
+
+  const failures: string[] = [];
+
+  for (const hot of HOT_QUERIES) {
+    const { sql: text, params } = hot.build(0).toSQL();
+    const plan = (sqlite.prepare(`EXPLAIN QUERY PLAN ${text}`).all(...params) as Array<{ detail: string }>)
+      .map(step => step.detail);
+
+    const statement = sqlite.prepare(text);
+    const timings: number[] = [];
+    let rows = 0;
+    for (let i = 0; i < RUNS; i++) {
+      const query = hot.build(i % USERS).toSQL();
+      const start = performance.now();
+      rows = statement.all(...query.params).length;
+      timings.push(performance.now() - start);
+    }
+    timings.sort((a, b) => a - b);
+
+    const scans = plan.filter(step => SCANNED_TABLE.test(step));
+    if (scans.length > 0) failures.push(hot.name);
+
+    console.log(
+      `[Query Benchmark] ${scans.length > 0 ? 'FAIL' : 'ok  '} ${hot.name}: ` +
+      `p50 ${percentile(timings, 0.5).toFixed(2)}ms, p95 ${percentile(timings, 0.95).toFixed(2)}ms, ${rows} rows`
+    );
+    for (const step of plan) console.log(`    ${step}`);
+  }
+
+  if (failures.length > 0) {
+    console.error(`[Query Benchmark] Full table scans in: ${failures.join(', ')}`);
+    process.exitCode = 1;
+  }
+}
+
+try {
+  run();
+} finally {
+  sqlite.close();
+  for (const suffix of ['', '-wal', '-shm']) {
+    fs.rmSync(dbPath + suffix, { force: true });
+  }
+}
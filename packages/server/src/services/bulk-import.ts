@@ -0,0 +1,88 @@
+/**
+ * Bulk Import
+ * Writes parsed rows with multi-row INSERTs inside a single SQLite
+ * transaction, so an upload is one WAL commit instead of one per row.
+ */
+
+import { getTableColumns, getTableName } from 'drizzle-orm';
+import type { SQLiteTable } from 'drizzle-orm/sqlite-core';
+import type { Statement } from 'better-sqlite3';
+import { db, sqlite } from '../db/index.js';
+
+// SQLite's bound-parameter limit (SQLITE_MAX_VARIABLE_NUMBER) is 32766
+const MAX_PARAMS_PER_STATEMENT = 32766;
+const MAX_ROWS_PER_STATEMENT = 500;
+
+export interface BulkInsertBatch {
+  table: SQLiteTable;
+  rows: Iterable<Record<string, unknown>>;
+}
+
+export interface BulkInsertStats {
+  rows: Record<string, number>; // Rows inserted per table
+  totalRows: number;
+  ms: number;
+  rowsPerSecond: number;
+}
+
+// Prepared INSERTs by SQL text; every full chunk of a table shares one
+const statements = new Map<string, Statement>();
+
+function prepared(sqlText: string): Statement {
+  let statement = statements.get(sqlText);
+  if (!statement) {
+    statement = sqlite.prepare(sqlText);
+    statements.set(sqlText, statement);
+  }
+  return statement;
+}
+
+function insertChunk(table: SQLiteTable, chunk: Record<string, unknown>[]): void {
+  // Drizzle builds the SQL so defaults and value mapping match db.insert()
+  const query = db.insert(table).values(chunk as any).toSQL();
+  prepared(query.sql).run(...query.params);
+}
+
+/**
+ * Insert rows into one or more tables in a single transaction. Rows may be
+ * a generator; they are consumed in chunks. Rolls back everything on error.
+ */
+export function bulkInsert(batches: BulkInsertBatch[], label = 'import'): BulkInsertStats {
+  const start = performance.now();
+  const rows: Record<string, number> = {};
+
+  sqlite.transaction(() => {
+    for (const { table, rows: tableRows } of batches) {
+      const name = getTableName(table);
+      const columnCount = Object.keys(getTableColumns(table)).length;
+      const chunkSize = Math.max(1, Math.min(MAX_ROWS_PER_STATEMENT, Math.floor(MAX_PARAMS_PER_STATEMENT / columnCount)));
+
+      let chunk: Record<string, unknown>[] = [];
+      let count = 0;
+      for (const row of tableRows) {
+        chunk.push(row);
+        if (chunk.length === chunkSize) {
+          insertChunk(table, chunk);
+          count += chunk.length;
+          chunk = [];
+        }
+      }
+      if (chunk.length > 0) {
+        insertChunk(table, chunk);
+        count += chunk.length;
+      }
+      rows[name] = (rows[name] || 0) + count;
+    }
+  })();
+
+  const ms = performance.now() - start;
+  const totalRows = Object.values(rows).reduce((sum, n) => sum + n, 0);
+  const rowsPerSecond = ms > 0 ? Math.round(totalRows / (ms / 1000)) : totalRows;
+
+  if (totalRows > 0) {
+    const perTable = Object.entries(rows).map(([name, n]) => `${name}=${n}`).join(', ');
+    console.log(`[Bulk Import] ${label}: ${totalRows} rows (${perTable}) in ${ms.toFixed(1)}ms, ${rowsPerSecond} rows/sec`);
+  }
+
+  return { rows, totalRows, ms, rowsPerSecond };
+}
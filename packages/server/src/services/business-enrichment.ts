@@ -4,6 +4,8 @@
  * for ASG Technologies (GearUp Mods business)
  */
 
+import type { NarrationFields } from '../parsers/narration-fields.js';
+
 export type BizType = 'SALARY' | 'PETROL' | 'PORTER' | 'HELPER' | 'VENDOR' | 'SALES_INCOME' | 'OTHER';
 
 export interface EnrichmentResult {
@@ -135,8 +137,14 @@ function cleanVendorName(name: string): string {
 
 /**
  * Detect business type from narration
+ * @param channel - Payment channel decoded at import, when available
  */
-export function detectBizType(narration: string, transactionType: 'credit' | 'debit', amount: number): BizType {
+export function detectBizType(
+  narration: string,
+  transactionType: 'credit' | 'debit',
+  amount: number,
+  channel?: NarrationFields['channel'] | null
+): BizType {
   const upperNarration = narration.toUpperCase();
 
   // Check for SALES_INCOME first (credits from payment gateways)
@@ -179,6 +187,9 @@ export function detectBizType(narration: string, transactionType: 'credit' | 'de
     }
 
     // Check VENDOR (NEFT/RTGS payments)
+    if (channel === 'NEFT' || channel === 'RTGS') {
+      return 'VENDOR';
+    }
     for (const pattern of PATTERNS.VENDOR.patterns) {
       if (pattern.test(narration)) {
         return 'VENDOR';
@@ -186,7 +197,7 @@ export function detectBizType(narration: string, transactionType: 'credit' | 'de
     }
 
     // Large UPI payments are likely vendor payments
-    if (amount >= LARGE_UPI_THRESHOLD && upperNarration.includes('UPI')) {
+    if (amount >= LARGE_UPI_THRESHOLD && (channel === 'UPI' || upperNarration.includes('UPI'))) {
       return 'VENDOR';
     }
   }
@@ -233,14 +244,18 @@ export function generateBizDescription(bizType: BizType, vendorName: string | nu
 
 /**
  * Enrich a single transaction
+ * @param fields - Narration fields decoded at import; the narration is only parsed without them
  */
 export function enrichTransaction(
   narration: string,
   transactionType: 'credit' | 'debit',
-  amount: number
+  amount: number,
+  fields?: NarrationFields | null
 ): EnrichmentResult {
-  const bizType = detectBizType(narration, transactionType, amount);
-  const vendorName = extractVendorName(narration);
+  const bizType = detectBizType(narration, transactionType, amount, fields?.channel);
+  const vendorName = fields?.counterpartyName
+    ? cleanVendorName(fields.counterpartyName)
+    : extractVendorName(narration);
   const bizDescription = generateBizDescription(bizType, vendorName, narration);
   const { needsInvoice, gstType } = PATTERNS[bizType];
 
@@ -1,104 +1,143 @@
-import { db, categories } from '../db/index.js';
-import { eq, like, or } from 'drizzle-orm';
+import fs from 'fs';
+import path from 'path';
+import { fileURLToPath } from 'url';
+import { db, categories, bankTransactions } from '../db/index.js';
+import { eq, like, or, and, desc, isNotNull, sql } from 'drizzle-orm';
+import type { NarrationFields } from '../parsers/narration-fields.js';
+
+const __dirname = path.dirname(fileURLToPath(import.meta.url));
 
 interface CategoryRule {
-  patterns: RegExp[];
-  categoryName: string;
+  category: string;
+  patterns: string[]; // Case-insensitive regex sources, word-bounded (\bRENT\b) since they're applied at import
+}
+
+// Built-in keyword rules, shared with the Python parsers (statement_parsers/categorize.py)
+const categoryRules: CategoryRule[] = JSON.parse(
+  fs.readFileSync(path.join(__dirname, '../parsers/statement_parsers/category_rules.json'), 'utf-8')
+);
+
+// All rules in one regex: alternatives are tried in rule order, so the
+// first rule with a matching pattern anywhere in the text wins
+const ruleMatcher = new RegExp(
+  `^(?:${categoryRules.map((rule, i) => `(?=[\\s\\S]*?(?:${rule.patterns.join('|')}))(?<r${i}>)`).join('|')})`,
+  'i'
+);
+const rulePatterns = categoryRules.map(rule => new RegExp(rule.patterns.join('|'), 'i'));
+
+// Built-in rule matches by normalized text
+const MEMO_LIMIT = 10000;
+const ruleMemo = new Map<string, string | null>();
+
+// Category name -> id, loaded once; call invalidateCategoryCache() when categories change
+let categoryIdCache: Map<string, string> | null = null;
+
+export interface CategorizableTransaction {
+  id: string;
+  narration: string;
+  narrationFields?: NarrationFields | null;
+  suggestedCategory?: string | null; // Built-in rule match from the Python parsers
+}
+
+export function invalidateCategoryCache(): void {
+  categoryIdCache = null;
+}
+
+async function categoryIdsByName(): Promise<Map<string, string>> {
+  if (!categoryIdCache) {
+    const rows = await db.select({ id: categories.id, name: categories.name }).from(categories);
+    const ids = new Map<string, string>();
+    for (const row of rows) {
+      if (!ids.has(row.name)) ids.set(row.name, row.id);
+    }
+    categoryIdCache = ids;
+  }
+  return categoryIdCache;
+}
+
+// Learned rules: the category the user most often gave each counterparty
+async function learnedCategories(userId: string): Promise<Map<string, string>> {
+  const rows = await db
+    .select({
+      counterparty: bankTransactions.counterpartyName,
+      categoryId: bankTransactions.categoryId,
+      count: sql<number>`count(*)`,
+    })
+    .from(bankTransactions)
+    .where(and(
+      eq(bankTransactions.userId, userId),
+      isNotNull(bankTransactions.counterpartyName),
+      isNotNull(bankTransactions.categoryId)
+    ))
+    .groupBy(bankTransactions.counterpartyName, bankTransactions.categoryId)
+    .orderBy(desc(sql`count(*)`));
+
+  const learned = new Map<string, string>();
+  for (const row of rows) {
+    const key = row.counterparty!.toUpperCase();
+    if (!learned.has(key)) learned.set(key, row.categoryId!);
+  }
+  return learned;
+}
+
+// Decoded narrations are matched on the counterparty and remark only, so
+// IFSC codes, bank names and references can't trigger a rule
+function categoryText(narration: string, fields?: NarrationFields | null): string {
+  const text = fields
+    ? [fields.counterpartyName, fields.counterpartyAccount, fields.remark].filter(Boolean).join('/')
+    : narration;
+  return (text || '').toUpperCase().replace(/\s+/g, ' ');
 }
 
-const categoryRules: CategoryRule[] = [
-  {
-    patterns: [/SALARY/i, /PAYROLL/i, /WAGES/i],
-    categoryName: 'Salary',
-  },
-  {
-    patterns: [/INTEREST/i, /DIVIDEND/i, /BONUS/i],
-    categoryName: 'Investment Returns',
-  },
-  {
-    patterns: [/RENT/i, /LEASE/i],
-    categoryName: 'Rental Income',
-  },
-  {
-    patterns: [/SWIGGY/i, /ZOMATO/i, /RESTAURANT/i, /CAFE/i, /FOOD/i, /DOMINOS/i, /PIZZA/i, /BURGER/i],
-    categoryName: 'Food & Dining',
-  },
-  {
-    patterns: [/UBER/i, /OLA/i, /RAPIDO/i, /PETROL/i, /FUEL/i, /PARKING/i, /METRO/i, /IRCTC/i, /RAILWAY/i],
-    categoryName: 'Transportation',
-  },
-  {
-    patterns: [/AMAZON/i, /FLIPKART/i, /MYNTRA/i, /AJIO/i, /MEESHO/i, /SHOPPING/i],
-    categoryName: 'Shopping',
-  },
-  {
-    patterns: [/NETFLIX/i, /PRIME VIDEO/i, /HOTSTAR/i, /SPOTIFY/i, /YOUTUBE/i, /INOX/i, /PVR/i, /MOVIE/i],
-    categoryName: 'Entertainment',
-  },
-  {
-    patterns: [/ELECTRICITY/i, /WATER/i, /GAS/i, /INTERNET/i, /BROADBAND/i, /JIO/i, /AIRTEL/i, /VI /i, /BSNL/i],
-    categoryName: 'Bills & Utilities',
-  },
-  {
-    patterns: [/HOSPITAL/i, /PHARMACY/i, /MEDICAL/i, /DOCTOR/i, /CLINIC/i, /APOLLO/i, /FORTIS/i, /PHARMA/i],
-    categoryName: 'Healthcare',
-  },
-  {
-    patterns: [/SCHOOL/i, /COLLEGE/i, /UNIVERSITY/i, /UDEMY/i, /COURSERA/i, /FEES/i, /TUITION/i],
-    categoryName: 'Education',
-  },
-  {
-    patterns: [/FLIGHT/i, /HOTEL/i, /BOOKING/i, /GOIBIBO/i, /MAKEMYTRIP/i, /CLEARTRIP/i, /AIRBNB/i],
-    categoryName: 'Travel',
-  },
-  {
-    patterns: [/SALON/i, /SPA/i, /GYM/i, /FITNESS/i, /BEAUTY/i],
-    categoryName: 'Personal Care',
-  },
-  {
-    patterns: [/INSURANCE/i, /LIC/i, /HDFC LIFE/i, /ICICI PRUDENTIAL/i, /POLICY/i],
-    categoryName: 'Insurance',
-  },
-  {
-    patterns: [/TAX/i, /GST/i, /TDS/i, /INCOME TAX/i],
-    categoryName: 'Taxes',
-  },
-  {
-    patterns: [/BANK CHARGE/i, /ANNUAL FEE/i, /SERVICE CHARGE/i, /SMS ALERT/i, /AMC/i],
-    categoryName: 'Bank Charges',
-  },
-];
-
-export async function suggestCategory(narration: string): Promise<string | null> {
-  // Try to match against rules
-  for (const rule of categoryRules) {
-    for (const pattern of rule.patterns) {
-      if (pattern.test(narration)) {
-        // Find the category ID
-        const category = await db
-          .select()
-          .from(categories)
-          .where(eq(categories.name, rule.categoryName))
-          .limit(1);
-
-        if (category[0]) {
-          return category[0].id;
-        }
-        break;
-      }
+function firstMatchingRule(text: string): string | null {
+  let name = ruleMemo.get(text);
+  if (name === undefined) {
+    const match = ruleMatcher.exec(text);
+    name = null;
+    if (match?.groups) {
+      const index = categoryRules.findIndex((_, i) => match.groups![`r${i}`] !== undefined);
+      name = categoryRules[index].category;
     }
+    if (ruleMemo.size >= MEMO_LIMIT) ruleMemo.clear();
+    ruleMemo.set(text, name);
   }
+  return name;
+}
+
+function builtInCategoryId(text: string, ids: Map<string, string>, suggested?: string | null): string | null {
+  const name = suggested ?? firstMatchingRule(text);
+  if (!name) return null;
+  const id = ids.get(name);
+  if (id) return id;
 
+  // First matching rule's category doesn't exist; try the rules after it
+  const start = categoryRules.findIndex(rule => rule.category === name) + 1;
+  for (let i = start; i < categoryRules.length; i++) {
+    const laterId = ids.get(categoryRules[i].category);
+    if (laterId && rulePatterns[i].test(text)) return laterId;
+  }
   return null;
 }
 
-export async function autoCategorizeTransactions(
-  transactions: Array<{ id: string; narration: string }>
+/**
+ * Categorize a batch of transactions: learned counterparty rules first, then
+ * the built-in keyword rules. One query for category ids (cached) and one
+ * for the user's learned rules, however large the batch.
+ */
+export async function categorizeBatch(
+  transactions: CategorizableTransaction[],
+  userId?: string
 ): Promise<Map<string, string>> {
   const categoryMap = new Map<string, string>();
+  if (transactions.length === 0) return categoryMap;
+
+  const ids = await categoryIdsByName();
+  const learned = userId ? await learnedCategories(userId) : new Map<string, string>();
 
   for (const txn of transactions) {
-    const categoryId = await suggestCategory(txn.narration);
+    const counterparty = txn.narrationFields?.counterpartyName?.toUpperCase();
+    const categoryId = (counterparty && learned.get(counterparty))
+      || builtInCategoryId(categoryText(txn.narration, txn.narrationFields), ids, txn.suggestedCategory);
     if (categoryId) {
       categoryMap.set(txn.id, categoryId);
     }
@@ -107,6 +146,21 @@ export async function autoCategorizeTransactions(
   return categoryMap;
 }
 
+export async function suggestCategory(
+  narration: string,
+  fields?: NarrationFields | null
+): Promise<string | null> {
+  const result = await categorizeBatch([{ id: '', narration, narrationFields: fields }]);
+  return result.get('') ?? null;
+}
+
+export async function autoCategorizeTransactions(
+  transactions: CategorizableTransaction[],
+  userId?: string
+): Promise<Map<string, string>> {
+  return categorizeBatch(transactions, userId);
+}
+
 export async function searchCategories(query: string) {
   return db
     .select()
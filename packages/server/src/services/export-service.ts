@@ -1,23 +1,35 @@
 import * as XLSX from 'xlsx';
+import ExcelJS from 'exceljs';
 import { format } from 'date-fns';
+import type { Writable } from 'stream';
+import type { Database } from 'better-sqlite3';
+
+export type ExportRow = (string | number | null)[];
 
 export interface ExportData {
   headers: string[];
-  rows: (string | number | null)[][];
+  rows: ExportRow[];
 }
 
-export function exportToCSV(data: ExportData): string {
-  const escape = (val: string | number | null): string => {
-    if (val === null || val === undefined) return '';
-    const str = String(val);
-    if (str.includes(',') || str.includes('"') || str.includes('\n')) {
-      return `"${str.replace(/"/g, '""')}"`;
-    }
-    return str;
-  };
+// Streamed CSV is written in chunks of about this many characters
+const CSV_CHUNK_SIZE = 64 * 1024;
 
-  const headerLine = data.headers.map(escape).join(',');
-  const dataLines = data.rows.map(row => row.map(escape).join(','));
+function csvField(val: string | number | null): string {
+  if (val === null || val === undefined) return '';
+  const str = String(val);
+  if (str.includes(',') || str.includes('"') || str.includes('\n')) {
+    return `"${str.replace(/"/g, '""')}"`;
+  }
+  return str;
+}
+
+function csvLine(row: ExportRow): string {
+  return row.map(csvField).join(',');
+}
+
+export function exportToCSV(data: ExportData): string {
+  const headerLine = csvLine(data.headers);
+  const dataLines = data.rows.map(csvLine);
 
   return [headerLine, ...dataLines].join('\n');
 }
@@ -41,32 +53,37 @@ export function exportToExcel(data: ExportData, sheetName = 'Data'): Buffer {
   return Buffer.from(XLSX.write(wb, { type: 'buffer', bookType: 'xlsx' }));
 }
 
-export function formatTransactionsForExport(
-  transactions: Array<{
-    date: string;
-    narration?: string;
-    description?: string;
-    transactionType: string;
-    amount: number;
-    balance?: number | null;
-    categoryId?: string | null;
-    isReconciled?: boolean;
-    notes?: string | null;
-  }>,
-  categories?: Map<string, string>
-): ExportData {
-  const headers = [
-    'Date',
-    'Description',
-    'Type',
-    'Amount',
-    'Balance',
-    'Category',
-    'Reconciled',
-    'Comment',
-  ];
+export interface TransactionExportFields {
+  date: string;
+  narration?: string | null;
+  description?: string | null;
+  transactionType: string;
+  amount: number;
+  balance?: number | null;
+  categoryId?: string | null;
+  isReconciled?: boolean | number | null; // 0/1 when read without drizzle
+  notes?: string | null;
+}
 
-  const rows = transactions.map(t => [
+export const TRANSACTION_EXPORT_HEADERS = [
+  'Date',
+  'Description',
+  'Type',
+  'Amount',
+  'Balance',
+  'Category',
+  'Reconciled',
+  'Comment',
+];
+
+// Streamed XLSX can't size columns from the data, so they get fixed widths
+export const TRANSACTION_EXPORT_WIDTHS = [12, 50, 8, 12, 12, 20, 11, 30];
+
+export function transactionExportRow(
+  t: TransactionExportFields,
+  categories?: Map<string, string>
+): ExportRow {
+  return [
     t.date,
     t.narration || t.description || '',
     t.transactionType,
@@ -75,9 +92,120 @@ export function formatTransactionsForExport(
     categories?.get(t.categoryId || '') || '',
     t.isReconciled ? 'Yes' : 'No',
     t.notes || '',
-  ]);
+  ];
+}
+
+export function formatTransactionsForExport(
+  transactions: TransactionExportFields[],
+  categories?: Map<string, string>
+): ExportData {
+  return {
+    headers: TRANSACTION_EXPORT_HEADERS,
+    rows: transactions.map(t => transactionExportRow(t, categories)),
+  };
+}
+
+/**
+ * Rows of a drizzle select, read one at a time from the given connection
+ * (see openReadOnlyConnection) and keyed by `keys` in select order
+ */
+export function* iterateQuery<T>(
+  connection: Database,
+  query: { toSQL(): { sql: string; params: unknown[] } },
+  keys: string[]
+): Generator<T> {
+  const { sql, params } = query.toSQL();
+  const statement = connection.prepare(sql).raw(true);
+  for (const values of statement.iterate(...params) as IterableIterator<unknown[]>) {
+    const row: Record<string, unknown> = {};
+    keys.forEach((key, i) => { row[key] = values[i]; });
+    yield row as T;
+  }
+}
+
+/**
+ * Merge row streams that are each sorted by date descending. On equal dates
+ * earlier streams come first, like a stable sort of their concatenation.
+ */
+export function* mergeByDateDesc<T extends { date: string }>(sources: Iterable<T>[]): Generator<T> {
+  const iterators = sources.map(source => source[Symbol.iterator]());
+  const heads = iterators.map(it => it.next());
+  try {
+    while (true) {
+      let next = -1;
+      heads.forEach((head, i) => {
+        if (!head.done && (next < 0 || head.value.date > (heads[next].value as T).date)) next = i;
+      });
+      if (next < 0) return;
+      yield heads[next].value as T;
+      heads[next] = iterators[next].next();
+    }
+  } finally {
+    iterators.forEach(it => it.return?.());
+  }
+}
+
+// Wait until a stream that returned false from write() can take more
+function drained(out: Writable): Promise<void> {
+  return new Promise((resolve, reject) => {
+    const onDrain = () => { cleanup(); resolve(); };
+    const onClose = () => { cleanup(); reject(new Error('Export stream closed before it finished')); };
+    const cleanup = () => {
+      out.off('drain', onDrain);
+      out.off('close', onClose);
+    };
+    out.on('drain', onDrain);
+    out.on('close', onClose);
+  });
+}
+
+/**
+ * Write rows as CSV to a stream (e.g. an HTTP response) as they are produced,
+ * waiting whenever the stream is full. Output matches exportToCSV.
+ */
+export async function streamCSV(out: Writable, headers: string[], rows: Iterable<ExportRow>): Promise<void> {
+  let chunk = csvLine(headers);
+  for (const row of rows) {
+    chunk += '\n' + csvLine(row);
+    if (chunk.length >= CSV_CHUNK_SIZE) {
+      const ok = out.write(chunk);
+      chunk = '';
+      if (!ok) await drained(out);
+    }
+  }
+  out.end(chunk);
+}
+
+/**
+ * Write rows as an XLSX workbook to a stream with the exceljs streaming
+ * writer. Each row is committed as it is added, so only the zip buffers
+ * are held in memory.
+ */
+export async function streamExcel(
+  out: Writable,
+  headers: string[],
+  rows: Iterable<ExportRow>,
+  sheetName = 'Data',
+  widths: number[] = []
+): Promise<void> {
+  const workbook = new ExcelJS.stream.xlsx.WorkbookWriter({
+    stream: out,
+    useStyles: false,
+    useSharedStrings: false, // Shared strings would be kept for the whole file
+  });
+  const sheet = workbook.addWorksheet(sheetName);
+  sheet.columns = headers.map((header, i) => ({
+    header,
+    width: widths[i] ?? Math.min(header.length + 2, 50),
+  }));
+
+  for (const row of rows) {
+    sheet.addRow(row).commit();
+    if (out.writableNeedDrain) await drained(out);
+  }
 
-  return { headers, rows };
+  sheet.commit();
+  await workbook.commit();
 }
 
 export function formatReconciliationReport(
@@ -148,18 +148,40 @@ export async function getGmailClient(connectionId: string) {
 }
 
 /**
- * Search for transaction emails in Gmail
+ * Email fields the sync pipeline reads from a message
  */
-export async function searchTransactionEmails(
-  connectionId: string,
-  options: {
-    query: string;
-    maxResults?: number;
-    pageToken?: string;
-  }
-) {
-  const gmail = await getGmailClient(connectionId);
+export interface GmailEmail {
+  id: string | null | undefined;
+  threadId: string | null | undefined;
+  from: string;
+  subject: string;
+  date: string;
+  body: string;
+  internalDate: string | null | undefined;
+  snippet: string | null | undefined;
+}
+
+export interface GmailMessagePage {
+  messages: Array<{ id?: string | null }>;
+  nextPageToken?: string | null;
+  resultSizeEstimate?: number | null;
+}
+
+/**
+ * Message source for Gmail sync. The real client talks to the Gmail API;
+ * scripts/gmail-sync-benchmark.ts swaps in a local fake.
+ */
+export interface GmailClient {
+  listMessages(options: { query: string; maxResults?: number; pageToken?: string }): Promise<GmailMessagePage>;
+  getMessage(messageId: string): Promise<GmailEmail>;
+}
 
+type GmailApi = Awaited<ReturnType<typeof getGmailClient>>;
+
+async function listMessages(
+  gmail: GmailApi,
+  options: { query: string; maxResults?: number; pageToken?: string }
+): Promise<GmailMessagePage> {
   const response = await gmail.users.messages.list({
     userId: 'me',
     q: options.query,
@@ -174,12 +196,7 @@ export async function searchTransactionEmails(
   };
 }
 
-/**
- * Fetch full email content by message ID
- */
-export async function fetchEmailContent(connectionId: string, messageId: string) {
-  const gmail = await getGmailClient(connectionId);
-
+async function getMessage(gmail: GmailApi, messageId: string): Promise<GmailEmail> {
   const response = await gmail.users.messages.get({
     userId: 'me',
     id: messageId,
@@ -217,6 +234,53 @@ export async function fetchEmailContent(connectionId: string, messageId: string)
   };
 }
 
+// How long a sync reuses one authenticated client before re-checking the token
+const CLIENT_REUSE_MS = 4 * 60 * 1000;
+
+/**
+ * Gmail client for one sync run. The connection is looked up (and its token
+ * refreshed) once, then again every few minutes, instead of on every request.
+ */
+export function createGmailClient(connectionId: string): GmailClient {
+  let gmail: Promise<GmailApi> | null = null;
+  let createdAt = 0;
+
+  const api = (): Promise<GmailApi> => {
+    if (gmail && Date.now() - createdAt < CLIENT_REUSE_MS) return gmail;
+    createdAt = Date.now();
+    const client = getGmailClient(connectionId);
+    client.catch(() => { gmail = null; }); // Retry the lookup on the next request
+    gmail = client;
+    return client;
+  };
+
+  return {
+    listMessages: async (options) => listMessages(await api(), options),
+    getMessage: async (messageId) => getMessage(await api(), messageId),
+  };
+}
+
+/**
+ * Search for transaction emails
+ */
+export async function searchTransactionEmails(
+  connectionId: string,
+  options: {
+    query: string;
+    maxResults?: number;
+    pageToken?: string;
+  }
+) {
+  return listMessages(await getGmailClient(connectionId), options);
+}
+
+/**
+ * Fetch full email content by message ID
+ */
+export async function fetchEmailContent(connectionId: string, messageId: string) {
+  return getMessage(await getGmailClient(connectionId), messageId);
+}
+
 /**
  * Extract body text from email payload (handles multipart)
  */
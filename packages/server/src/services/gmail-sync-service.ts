@@ -1,10 +1,11 @@
 import { v4 as uuidv4 } from 'uuid';
-import { db, gmailSyncState, processedEmails, accounts, bankTransactions, creditCardTransactions } from '../db/index.js';
-import { eq, and, like } from 'drizzle-orm';
+import { db, sqlite, gmailSyncState, processedEmails, accounts, bankTransactions, creditCardTransactions } from '../db/index.js';
+import { eq, and, like, inArray } from 'drizzle-orm';
 import type { GmailSyncState, NewGmailSyncState, NewProcessedEmail, ProcessedEmail } from '../db/index.js';
 import * as gmailService from './gmail-service.js';
+import type { GmailClient, GmailEmail } from './gmail-service.js';
 import { parseTransactionEmail, buildGmailSearchQuery, detectBankFromSender } from '../parsers/email-parsers/index.js';
-import type { ParsedEmailTransaction, SupportedBank } from '../parsers/email-parsers/types.js';
+import type { EmailParseResult, ParsedEmailTransaction, SupportedBank } from '../parsers/email-parsers/types.js';
 
 export interface SyncOptions {
   syncType: 'historical' | 'incremental';
@@ -12,6 +13,27 @@ export interface SyncOptions {
   beforeDate?: string; // YYYY-MM-DD
   banks?: SupportedBank[];
   maxEmails?: number;
+  fetchConcurrency?: number;
+  writeBatchSize?: number;
+}
+
+/**
+ * Counters for one pipeline stage (write counts batches, the others emails)
+ */
+export interface StageProgress {
+  concurrency: number;
+  queued: number;
+  active: number;
+  completed: number;
+  failed: number;
+}
+
+export interface SyncProgress {
+  listed: number; // Message IDs returned by the search
+  alreadyProcessed: number; // Skipped before fetching
+  fetch: StageProgress;
+  parse: StageProgress;
+  write: StageProgress;
 }
 
 export interface SyncResult {
@@ -23,14 +45,100 @@ export interface SyncResult {
   duplicates: number;
   errors: number;
   errorMessage?: string;
+  progress: SyncProgress;
+}
+
+// Gmail allows 250 quota units per user per second and messages.get costs 5,
+// so a handful of requests in flight is about what a single mailbox can take
+const FETCH_CONCURRENCY = 6;
+const PARSE_CONCURRENCY = 2; // Parsing is synchronous; this only bounds its queue
+const WRITE_BATCH_SIZE = 50; // Emails per SQLite transaction
+
+interface Stage<T> {
+  progress: StageProgress;
+  push(item: T): Promise<void>;
+  drain(): Promise<void>;
 }
 
 /**
- * Main sync orchestrator - fetches and processes Gmail transaction emails
+ * Worker pool with its own concurrency limit and a bounded queue. push()
+ * waits while the queue is full, so a slow stage holds back the stages
+ * feeding it instead of buffering the whole mailbox.
+ */
+function createStage<T>(
+  concurrency: number,
+  handle: (item: T) => unknown,
+  onError: (item: T, error: unknown) => void
+): Stage<T> {
+  const capacity = concurrency * 2;
+  const queue: T[] = [];
+  const progress: StageProgress = { concurrency, queued: 0, active: 0, completed: 0, failed: 0 };
+  let waiters: Array<() => void> = [];
+
+  const wake = () => {
+    const woken = waiters;
+    waiters = [];
+    woken.forEach(resolve => resolve());
+  };
+  const wait = () => new Promise<void>(resolve => waiters.push(resolve));
+
+  const next = () => {
+    while (progress.active < concurrency && queue.length > 0) {
+      const item = queue.shift() as T;
+      progress.queued = queue.length;
+      progress.active++;
+      Promise.resolve()
+        .then(() => handle(item))
+        .then(
+          () => { progress.completed++; },
+          (error) => { progress.failed++; onError(item, error); }
+        )
+        .finally(() => {
+          progress.active--;
+          next();
+          wake();
+        });
+    }
+  };
+
+  return {
+    progress,
+    async push(item) {
+      while (queue.length >= capacity) await wait();
+      queue.push(item);
+      progress.queued = queue.length;
+      next();
+    },
+    async drain() {
+      while (queue.length > 0 || progress.active > 0) await wait();
+    },
+  };
+}
+
+interface FetchedEmail {
+  messageId: string;
+  email: GmailEmail;
+}
+
+interface ParsedEmail extends FetchedEmail {
+  bankName: SupportedBank | null;
+  parseResult: EmailParseResult;
+}
+
+type SyncAccount = { id: string; accountNumber: string | null; userId: string | null };
+
+/**
+ * Main sync orchestrator - fetches and processes Gmail transaction emails.
+ *
+ * Runs as a pipeline: search pages are listed and filtered against
+ * processed_emails in one query per page, messages are fetched with bounded
+ * concurrency, parsed, and written in batches of one SQLite transaction
+ * each. The Gmail client can be replaced (see scripts/gmail-sync-benchmark.ts).
  */
 export async function syncGmailTransactions(
   connectionId: string,
-  options: SyncOptions
+  options: SyncOptions,
+  client: GmailClient = gmailService.createGmailClient(connectionId)
 ): Promise<SyncResult> {
   const now = new Date().toISOString();
 
@@ -48,6 +156,55 @@ export async function syncGmailTransactions(
 
   await db.insert(gmailSyncState).values(syncState);
 
+  const writeBatchSize = options.writeBatchSize || WRITE_BATCH_SIZE;
+  const accountCache = new Map<string, SyncAccount | null>();
+  let pending: ParsedEmail[] = [];
+
+  const writeStage = createStage<ParsedEmail[]>(
+    1, // SQLite has a single writer
+    (batch) => writeBatch(connectionId, syncState.id, batch, result, accountCache),
+    (batch, error) => {
+      console.error(`[Gmail Sync] Error writing batch of ${batch.length} emails:`, error);
+      result.processedCount += batch.length;
+      result.errors += batch.length;
+    }
+  );
+
+  const parseStage = createStage<FetchedEmail>(
+    PARSE_CONCURRENCY,
+    async ({ messageId, email }) => {
+      pending.push({
+        messageId,
+        email,
+        bankName: detectBankFromSender(email.from),
+        parseResult: parseTransactionEmail(email.from, email.body, email.subject),
+      });
+      if (pending.length >= writeBatchSize) {
+        const batch = pending;
+        pending = [];
+        await writeStage.push(batch);
+      }
+    },
+    ({ messageId }, error) => {
+      console.error(`Error processing email ${messageId}:`, error);
+      result.processedCount++;
+      result.errors++;
+    }
+  );
+
+  const fetchStage = createStage<string>(
+    options.fetchConcurrency || FETCH_CONCURRENCY,
+    async (messageId) => {
+      const email = await client.getMessage(messageId);
+      await parseStage.push({ messageId, email });
+    },
+    (messageId, error) => {
+      console.error(`Error fetching email ${messageId}:`, error);
+      result.processedCount++;
+      result.errors++;
+    }
+  );
+
   const result: SyncResult = {
     syncId: syncState.id,
     status: 'completed',
@@ -56,6 +213,13 @@ export async function syncGmailTransactions(
     newTransactions: 0,
     duplicates: 0,
     errors: 0,
+    progress: {
+      listed: 0,
+      alreadyProcessed: 0,
+      fetch: fetchStage.progress,
+      parse: parseStage.progress,
+      write: writeStage.progress,
+    },
   };
 
   try {
@@ -70,63 +234,55 @@ export async function syncGmailTransactions(
     console.log(`[Gmail Sync] Date range: after ${options.afterDate}, before ${options.beforeDate || 'now'}`);
     console.log(`[Gmail Sync] Banks: ${options.banks?.join(', ') || 'all'}`);
 
-    // Fetch emails with pagination
+    // List search results page by page and feed unseen messages to the pipeline
     let pageToken: string | undefined;
-    let totalFetched = 0;
     const maxEmails = options.maxEmails || 500;
 
-    do {
-      const searchResult = await gmailService.searchTransactionEmails(connectionId, {
-        query: searchQuery,
-        maxResults: Math.min(100, maxEmails - totalFetched),
-        pageToken,
-      });
-
-      const messages = searchResult.messages;
-      pageToken = searchResult.nextPageToken || undefined;
-
-      console.log(`[Gmail Sync] Fetched ${messages.length} messages (page token: ${pageToken ? 'yes' : 'no'}, total so far: ${totalFetched + messages.length})`);
-
-      // Log first 3 message IDs to help debug
-      if (totalFetched === 0 && messages.length > 0) {
-        console.log(`[Gmail Sync] First 3 message IDs: ${messages.slice(0, 3).map(m => m.id).join(', ')}`);
-      }
-
-      // Process each message
-      for (const message of messages) {
-        if (!message.id) continue;
-
-        try {
-          const processResult = await processEmail(connectionId, message.id);
-          result.processedCount++;
-
-          if (processResult.status === 'skipped') {
-            // Log first few skipped for debugging
-            if (result.processedCount <= 5) {
-              console.log(`[Gmail Sync] Skipped (already processed): ${message.id}`);
-            }
-          }
-
-          if (processResult.status === 'success') {
-            result.matchedCount++;
-            if (processResult.isNew) {
-              result.newTransactions++;
-            } else {
-              result.duplicates++;
-            }
-          } else if (processResult.status === 'failed') {
-            result.errors++;
-          }
-          // 'skipped' status doesn't count as error
-        } catch (err) {
-          console.error(`Error processing email ${message.id}:`, err);
-          result.errors++;
+    try {
+      do {
+        const searchResult = await client.listMessages({
+          query: searchQuery,
+          maxResults: Math.min(100, maxEmails - result.progress.listed),
+          pageToken,
+        });
+
+        pageToken = searchResult.nextPageToken || undefined;
+        const messageIds = searchResult.messages
+          .map(m => m.id)
+          .filter((id): id is string => !!id)
+          .slice(0, maxEmails - result.progress.listed);
+        result.progress.listed += messageIds.length;
+
+        console.log(`[Gmail Sync] Fetched ${messageIds.length} messages (page token: ${pageToken ? 'yes' : 'no'}, total so far: ${result.progress.listed})`);
+
+        const processed = messageIds.length === 0 ? [] : await db
+          .select({ gmailMessageId: processedEmails.gmailMessageId })
+          .from(processedEmails)
+          .where(inArray(processedEmails.gmailMessageId, messageIds));
+        const processedIds = new Set(processed.map(p => p.gmailMessageId));
+
+        // Already-processed messages count as processed, not as errors
+        result.progress.alreadyProcessed += processedIds.size;
+        result.processedCount += processedIds.size;
+
+        for (const messageId of messageIds) {
+          if (!processedIds.has(messageId)) await fetchStage.push(messageId);
         }
+      } while (pageToken && result.progress.listed < maxEmails);
+    } finally {
+      // Let in-flight messages finish even if listing failed
+      await fetchStage.drain();
+      await parseStage.drain();
+      if (pending.length > 0) await writeStage.push(pending);
+      pending = [];
+      await writeStage.drain();
+    }
 
-        totalFetched++;
-        if (totalFetched >= maxEmails) break;
-      }
-    } while (pageToken && totalFetched < maxEmails);
+    console.log(
+      `[Gmail Sync] Listed ${result.progress.listed} (${result.progress.alreadyProcessed} already processed), ` +
+      `fetched ${fetchStage.progress.completed} (${fetchStage.progress.failed} failed), ` +
+      `parsed ${parseStage.progress.completed}, wrote ${writeStage.progress.completed} batches (${writeStage.progress.failed} failed)`
+    );
 
     // Update sync state
     await db
@@ -159,38 +315,75 @@ export async function syncGmailTransactions(
   return result;
 }
 
-interface ProcessEmailResult {
-  status: 'success' | 'failed' | 'skipped';
-  isNew?: boolean;
-  transactionId?: string;
-  error?: string;
-}
-
 /**
- * Process a single email message
+ * Record a batch of parsed emails in one transaction, then publish the
+ * running counts to the sync state so getSyncState() shows progress
  */
-async function processEmail(
+function writeBatch(
   connectionId: string,
-  messageId: string
-): Promise<ProcessEmailResult> {
-  // Check if already processed
-  const existing = await db
-    .select()
-    .from(processedEmails)
-    .where(eq(processedEmails.gmailMessageId, messageId))
-    .limit(1);
+  syncId: string,
+  batch: ParsedEmail[],
+  result: SyncResult,
+  accountCache: Map<string, SyncAccount | null>
+): void {
+  const counts = { processed: 0, matched: 0, newTransactions: 0, duplicates: 0, errors: 0 };
+
+  sqlite.transaction(() => {
+    // A concurrent sync may have recorded some of these since they were listed
+    const recorded = new Set(
+      db.select({ gmailMessageId: processedEmails.gmailMessageId })
+        .from(processedEmails)
+        .where(inArray(processedEmails.gmailMessageId, batch.map(item => item.messageId)))
+        .all()
+        .map(row => row.gmailMessageId)
+    );
+
+    for (const item of batch) {
+      counts.processed++;
+      if (recorded.has(item.messageId)) continue;
+
+      try {
+        const status = recordEmail(connectionId, item, accountCache);
+        if (status === 'failed') {
+          counts.errors++;
+        } else {
+          counts.matched++;
+          if (status === 'new') counts.newTransactions++;
+          else counts.duplicates++;
+        }
+      } catch (err) {
+        console.error(`Error processing email ${item.messageId}:`, err);
+        counts.errors++;
+      }
+    }
 
-  if (existing.length > 0) {
-    return { status: 'skipped' };
-  }
+    db.update(gmailSyncState)
+      .set({
+        processedCount: result.processedCount + counts.processed,
+        matchedCount: result.matchedCount + counts.matched,
+      })
+      .where(eq(gmailSyncState.id, syncId))
+      .run();
+  })();
+
+  result.processedCount += counts.processed;
+  result.matchedCount += counts.matched;
+  result.newTransactions += counts.newTransactions;
+  result.duplicates += counts.duplicates;
+  result.errors += counts.errors;
+}
 
-  // Fetch email content
-  const email = await gmailService.fetchEmailContent(connectionId, messageId);
+/**
+ * Save one parsed email and its transaction. Runs in a savepoint, so a
+ * failure rolls back only this email and not the rest of its batch.
+ */
+const recordEmail = sqlite.transaction((
+  connectionId: string,
+  { messageId, email, bankName, parseResult }: ParsedEmail,
+  accountCache: Map<string, SyncAccount | null>
+): 'new' | 'duplicate' | 'failed' => {
   const now = new Date().toISOString();
 
-  // Detect bank from sender
-  const bankName = detectBankFromSender(email.from);
-
   // Base processed email data
   const baseEmailData = {
     id: uuidv4(),
@@ -205,82 +398,73 @@ async function processEmail(
     createdAt: now,
   };
 
-  // Parse the email
-  const parseResult = parseTransactionEmail(email.from, email.body, email.subject);
-
   if (!parseResult.success || !parseResult.transaction) {
-    await db.insert(processedEmails).values({
+    db.insert(processedEmails).values({
       ...baseEmailData,
       parseStatus: 'failed',
       transactionId: null,
       transactionType: null,
       errorMessage: parseResult.error || null,
-    });
-    return { status: 'failed', error: parseResult.error };
+    }).run();
+    return 'failed';
   }
 
   const parsed = parseResult.transaction;
 
-  console.log(`[Gmail Sync] Parsed: ${parsed.bank} ${parsed.sourceType} ${parsed.accountLastFour} ${parsed.amount}`);
-
-  // Find matching account
-  const account = await findAccountByLastFour(
-    parsed.accountLastFour,
-    parsed.sourceType,
-    parsed.bank
-  );
-
-  console.log(`[Gmail Sync] Account found: ${account ? account.id : 'NONE'}`);
+  // Find matching account (accounts don't change during a sync)
+  const accountKey = `${parsed.sourceType}|${parsed.bank}|${parsed.accountLastFour}`;
+  let account = accountCache.get(accountKey);
+  if (account === undefined) {
+    account = findAccountByLastFour(parsed.accountLastFour, parsed.sourceType, parsed.bank);
+    accountCache.set(accountKey, account);
+  }
 
   if (!account) {
-    const errorMsg = `No matching account found for last 4 digits: ${parsed.accountLastFour}`;
-    await db.insert(processedEmails).values({
+    db.insert(processedEmails).values({
       ...baseEmailData,
       parseStatus: 'failed',
       transactionId: null,
       transactionType: null,
-      errorMessage: errorMsg,
-    });
-    return { status: 'failed', error: errorMsg };
+      errorMessage: `No matching account found for last 4 digits: ${parsed.accountLastFour}`,
+    }).run();
+    return 'failed';
   }
 
-  // Check for duplicate transaction
-  const isDuplicate = await isDuplicateTransaction(parsed, account.id);
-
-  if (isDuplicate) {
-    await db.insert(processedEmails).values({
+  // Check for duplicate transaction (sees rows written earlier in this batch)
+  if (isDuplicateTransaction(parsed, account.id)) {
+    db.insert(processedEmails).values({
       ...baseEmailData,
       parseStatus: 'success',
       transactionId: null,
       transactionType: parsed.sourceType,
       errorMessage: 'Duplicate transaction',
-    });
-    return { status: 'success', isNew: false };
+    }).run();
+    return 'duplicate';
   }
 
   // Save the transaction
-  const transactionId = await saveTransaction(parsed, account.id, account.userId);
+  const transactionId = saveTransaction(parsed, account.id, account.userId);
 
   // Save processed email record
-  await db.insert(processedEmails).values({
+  db.insert(processedEmails).values({
     ...baseEmailData,
     parseStatus: 'success',
     transactionId,
     transactionType: parsed.sourceType,
     errorMessage: null,
-  });
+  }).run();
 
-  return { status: 'success', isNew: true, transactionId };
-}
+  return 'new';
+});
 
 /**
  * Find account by last 4 digits of account number
  */
-async function findAccountByLastFour(
+function findAccountByLastFour(
   lastFour: string,
   sourceType: 'bank' | 'credit_card',
   bankName: string
-): Promise<{ id: string; accountNumber: string | null; userId: string | null } | null> {
+): SyncAccount | null {
   // Determine account type based on source
   const accountTypes = sourceType === 'credit_card'
     ? ['credit_card']
@@ -295,10 +479,11 @@ async function findAccountByLastFour(
   // Try to match bank name
   const bankNameNormalized = bankName.toLowerCase();
 
-  const results = await db
+  const results = db
     .select({ id: accounts.id, accountNumber: accounts.accountNumber, bankName: accounts.bankName, accountType: accounts.accountType, userId: accounts.userId })
     .from(accounts)
-    .where(and(...conditions));
+    .where(and(...conditions))
+    .all();
 
   // Filter by account type and bank name
   const filtered = results.filter(acc => {
@@ -320,14 +505,14 @@ async function findAccountByLastFour(
 /**
  * Check if a transaction already exists (duplicate detection)
  */
-async function isDuplicateTransaction(
+function isDuplicateTransaction(
   parsed: ParsedEmailTransaction,
   accountId: string
-): Promise<boolean> {
+): boolean {
   if (parsed.sourceType === 'credit_card') {
     // Check credit card transactions
-    const existing = await db
-      .select()
+    const existing = db
+      .select({ id: creditCardTransactions.id })
       .from(creditCardTransactions)
       .where(
         and(
@@ -337,13 +522,14 @@ async function isDuplicateTransaction(
           eq(creditCardTransactions.transactionType, parsed.transactionType)
         )
       )
-      .limit(1);
+      .limit(1)
+      .get();
 
-    return existing.length > 0;
+    return existing !== undefined;
   } else {
     // Check bank transactions
-    const existing = await db
-      .select()
+    const existing = db
+      .select({ id: bankTransactions.id })
       .from(bankTransactions)
       .where(
         and(
@@ -353,47 +539,41 @@ async function isDuplicateTransaction(
           eq(bankTransactions.transactionType, parsed.transactionType)
         )
       )
-      .limit(1);
+      .limit(1)
+      .get();
 
-    return existing.length > 0;
+    return existing !== undefined;
   }
 }
 
 /**
  * Save transaction to database
  */
-async function saveTransaction(
+function saveTransaction(
   parsed: ParsedEmailTransaction,
   accountId: string,
   userId: string | null
-): Promise<string> {
+): string {
   const now = new Date().toISOString();
   const id = uuidv4();
   const gmailNote = `[Gmail Sync] ${parsed.bank}`;
 
   if (parsed.sourceType === 'credit_card') {
-    console.log(`[Gmail Sync] Saving credit card txn: ${id} to account ${accountId} for user ${userId}`);
-    try {
-      await db.insert(creditCardTransactions).values({
-        id,
-        userId,
-        accountId,
-        date: parsed.date,
-        description: parsed.merchantOrDescription,
-        amount: parsed.amount,
-        transactionType: parsed.transactionType,
-        notes: gmailNote,
-        source: 'gmail',
-        createdAt: now,
-        updatedAt: now,
-      });
-      console.log(`[Gmail Sync] Saved credit card txn: ${id}`);
-    } catch (e) {
-      console.error(`[Gmail Sync] ERROR saving credit card txn:`, e);
-      throw e;
-    }
+    db.insert(creditCardTransactions).values({
+      id,
+      userId,
+      accountId,
+      date: parsed.date,
+      description: parsed.merchantOrDescription,
+      amount: parsed.amount,
+      transactionType: parsed.transactionType,
+      notes: gmailNote,
+      source: 'gmail',
+      createdAt: now,
+      updatedAt: now,
+    }).run();
   } else {
-    await db.insert(bankTransactions).values({
+    db.insert(bankTransactions).values({
       id,
       userId,
       accountId,
@@ -404,7 +584,7 @@ async function saveTransaction(
       notes: gmailNote,
       createdAt: now,
       updatedAt: now,
-    });
+    }).run();
   }
 
   return id;
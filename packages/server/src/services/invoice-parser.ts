@@ -1,12 +1,18 @@
 /**
  * Invoice Parser Service
  * Extracts GST information from uploaded invoice PDFs and images
- * Uses Tesseract OCR with improved configuration for images
+ * Uses the PDF text layer when there is one, and pooled Tesseract OCR
+ * (see ocr-pool.ts) for images and scanned PDFs
  */
 
 import pdf from 'pdf-parse';
 import fs from 'fs';
-import Tesseract from 'tesseract.js';
+import { recognizeImage } from './ocr-pool.js';
+
+// A text layer with fewer characters than this is treated as a scan
+const MIN_TEXT_LAYER_CHARS = 50;
+const MIN_SCAN_IMAGE_BYTES = 10 * 1024;
+const MAX_OCR_PAGES = 3; // Page images OCR'd per PDF
 
 export interface InvoiceGSTInfo {
   gstAmount: number | null;
@@ -481,15 +487,62 @@ function extractGSTFromText(text: string): InvoiceGSTInfo {
 
 
 /**
- * Extract GST information from PDF buffer
+ * Scanned PDFs usually hold each page as one JPEG image (DCTDecode), whose
+ * stream bytes are a complete JPEG file. Returns the largest few in page
+ * order; small ones are logos, stamps and signatures.
+ */
+function embeddedJpegs(pdfBuffer: Buffer): Buffer[] {
+  const images: Array<{ index: number; data: Buffer }> = [];
+  let pos = 0;
+
+  while ((pos = pdfBuffer.indexOf('stream', pos)) !== -1) {
+    let start = pos + 'stream'.length;
+    if (pdfBuffer[start] === 0x0d) start++;
+    if (pdfBuffer[start] === 0x0a) start++;
+    const end = pdfBuffer.indexOf('endstream', start);
+    if (end === -1) break;
+
+    const isJpeg = pdfBuffer[start] === 0xff && pdfBuffer[start + 1] === 0xd8 && pdfBuffer[start + 2] === 0xff;
+    if (isJpeg && end - start >= MIN_SCAN_IMAGE_BYTES) {
+      images.push({ index: images.length, data: pdfBuffer.subarray(start, end) });
+    }
+    pos = end + 'endstream'.length;
+  }
+
+  return images
+    .sort((a, b) => b.data.length - a.data.length)
+    .slice(0, MAX_OCR_PAGES)
+    .sort((a, b) => a.index - b.index)
+    .map(image => image.data);
+}
+
+/**
+ * Extract GST information from a PDF. The text layer is used whenever it
+ * has enough text; only scanned PDFs without one go through OCR.
  */
 export async function extractGSTFromPDF(filePath: string): Promise<InvoiceGSTInfo> {
   try {
     const dataBuffer = fs.readFileSync(filePath);
-    const data = await pdf(dataBuffer);
-    const text = data.text;
+
+    let text = '';
+    try {
+      text = (await pdf(dataBuffer)).text;
+    } catch (error) {
+      console.error('[InvoiceParser] Error reading PDF text layer:', error);
+    }
 
     console.log('[InvoiceParser] PDF text length:', text.length);
+
+    if (text.replace(/\s/g, '').length < MIN_TEXT_LAYER_CHARS) {
+      const images = embeddedJpegs(dataBuffer);
+      if (images.length > 0) {
+        console.log(`[InvoiceParser] No usable text layer, running OCR on ${images.length} page image(s)`);
+        const pages = await Promise.all(images.map(image => recognizeImage(image)));
+        text = pages.map(page => page.text).join('\n');
+        console.log('[InvoiceParser] OCR text length:', text.length);
+      }
+    }
+
     console.log('[InvoiceParser] PDF text preview:', text.substring(0, 500));
 
     // Use regex-based extraction
@@ -579,19 +632,11 @@ export async function extractGSTFromImage(filePath: string): Promise<InvoiceGSTI
   try {
     console.log('[InvoiceParser] Using Tesseract OCR for image:', filePath);
 
-    // Use Tesseract with optimized settings for invoices
-    const result = await Tesseract.recognize(filePath, 'eng', {
-      logger: (m) => {
-        if (m.status === 'recognizing text') {
-          console.log(`[InvoiceParser] OCR progress: ${Math.round(m.progress * 100)}%`);
-        }
-      },
-    });
-
-    const text = result.data.text;
+    // Pooled worker; identical files reuse the cached result
+    const { text, confidence } = await recognizeImage(fs.readFileSync(filePath));
     console.log('[InvoiceParser] OCR text length:', text.length);
     console.log('[InvoiceParser] OCR text preview:', text.substring(0, 500));
-    console.log('[InvoiceParser] OCR confidence:', result.data.confidence);
+    console.log('[InvoiceParser] OCR confidence:', confidence);
 
     if (!text || text.trim().length < 10) {
       console.log('[InvoiceParser] OCR produced insufficient text');
@@ -0,0 +1,188 @@
+/**
+ * Market Data
+ * Cached USD-INR rate and historical stock prices for portfolio views.
+ *
+ * Values are kept in memory and persisted to market_data_cache. A fresh
+ * value is returned as is; a stale one is returned immediately while a
+ * background refresh runs (stale-while-revalidate), so pages never wait on
+ * the upstream once a value has been seen. Concurrent callers share one
+ * upstream request per key. The upstream is a MarketDataSource, which tests
+ * and scripts can replace with setMarketDataSource().
+ */
+
+import { eq } from 'drizzle-orm';
+import { db, marketDataCache } from '../db/index.js';
+
+const FX_TTL_MS = 10 * 60 * 1000;
+const PRICES_TTL_MS = 60 * 60 * 1000; // Daily closes; only today's changes
+const FETCH_TIMEOUT_MS = 5000;
+const FALLBACK_USD_INR = 83.5; // Used only before any rate has ever been fetched
+
+export interface PricePoint {
+  date: string;
+  close: number;
+}
+
+/**
+ * Upstream market data. Methods return null when no value is available.
+ */
+export interface MarketDataSource {
+  fetchUsdToInrRate(): Promise<number | null>;
+  fetchHistoricalPrices(symbol: string, days: number): Promise<PricePoint[] | null>;
+}
+
+/**
+ * Google Finance for the FX rate, Yahoo Finance chart API for prices
+ */
+export const webMarketDataSource: MarketDataSource = {
+  async fetchUsdToInrRate() {
+    const response = await fetch('https://www.google.com/finance/quote/USD-INR', {
+      signal: AbortSignal.timeout(FETCH_TIMEOUT_MS),
+    });
+    const html = await response.text();
+
+    const rateMatch = html.match(/data-last-price="([\d.]+)"/);
+    if (rateMatch && rateMatch[1]) {
+      return parseFloat(rateMatch[1]);
+    }
+
+    const altMatch = html.match(/<div[^>]*class="[^"]*YMlKec[^"]*"[^>]*>([\d.]+)<\/div>/);
+    if (altMatch && altMatch[1]) {
+      return parseFloat(altMatch[1]);
+    }
+
+    console.warn('[MarketData] Could not parse USD-INR rate');
+    return null;
+  },
+
+  async fetchHistoricalPrices(symbol, days) {
+    const endDate = Math.floor(Date.now() / 1000);
+    const startDate = endDate - days * 24 * 60 * 60;
+
+    // Yahoo Finance chart API
+    const url = `https://query1.finance.yahoo.com/v8/finance/chart/${encodeURIComponent(symbol)}?period1=${startDate}&period2=${endDate}&interval=1d`;
+
+    const response = await fetch(url, {
+      headers: {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+      },
+      signal: AbortSignal.timeout(FETCH_TIMEOUT_MS),
+    });
+
+    if (!response.ok) {
+      console.error(`[MarketData] Failed to fetch prices for ${symbol}: ${response.status}`);
+      return null;
+    }
+
+    const data = await response.json() as {
+      chart?: { result?: Array<{
+        timestamp?: number[];
+        indicators?: { quote?: Array<{ close?: (number | null)[] }> };
+      }> };
+    };
+    const result = data.chart?.result?.[0];
+
+    if (!result || !result.timestamp || !result.indicators?.quote?.[0]?.close) {
+      return null;
+    }
+
+    const timestamps = result.timestamp;
+    const closes = result.indicators.quote[0].close;
+
+    const prices: PricePoint[] = [];
+    for (let i = 0; i < timestamps.length; i++) {
+      const closePrice = closes[i];
+      if (closePrice !== null && closePrice !== undefined) {
+        const date = new Date(timestamps[i] * 1000).toISOString().split('T')[0];
+        prices.push({ date, close: closePrice });
+      }
+    }
+
+    return prices;
+  },
+};
+
+let source: MarketDataSource = webMarketDataSource;
+
+/**
+ * Replace the upstream (e.g. with a local stub). Cached values are kept.
+ */
+export function setMarketDataSource(next: MarketDataSource) {
+  source = next;
+}
+
+interface CachedValue {
+  value: unknown;
+  fetchedAt: number;
+}
+
+const memory = new Map<string, CachedValue>();
+const inflight = new Map<string, Promise<unknown>>();
+
+// Memory first, then the last value persisted by any earlier run
+function lookup(key: string): CachedValue | undefined {
+  let cached = memory.get(key);
+  if (!cached) {
+    const row = db.select().from(marketDataCache).where(eq(marketDataCache.key, key)).get();
+    if (row) {
+      cached = { value: JSON.parse(row.value), fetchedAt: row.fetchedAt };
+      memory.set(key, cached);
+    }
+  }
+  return cached;
+}
+
+function store(key: string, value: unknown) {
+  const fetchedAt = Date.now();
+  memory.set(key, { value, fetchedAt });
+  db.insert(marketDataCache)
+    .values({ key, value: JSON.stringify(value), fetchedAt })
+    .onConflictDoUpdate({ target: marketDataCache.key, set: { value: JSON.stringify(value), fetchedAt } })
+    .run();
+}
+
+// One upstream request per key at a time; failures resolve to null
+function refresh<T>(key: string, fetchValue: () => Promise<T | null>): Promise<T | null> {
+  let pending = inflight.get(key) as Promise<T | null> | undefined;
+  if (!pending) {
+    pending = fetchValue()
+      .then(value => {
+        if (value !== null) store(key, value);
+        return value;
+      }, error => {
+        console.error(`[MarketData] Error fetching ${key}:`, error);
+        return null;
+      })
+      .finally(() => inflight.delete(key));
+    inflight.set(key, pending);
+  }
+  return pending;
+}
+
+async function cached<T>(key: string, ttlMs: number, fetchValue: () => Promise<T | null>): Promise<T | null> {
+  const hit = lookup(key);
+  if (hit) {
+    if (Date.now() - hit.fetchedAt >= ttlMs) {
+      void refresh(key, fetchValue);
+    }
+    return hit.value as T;
+  }
+  return refresh(key, fetchValue);
+}
+
+/**
+ * USD to INR rate
+ */
+export async function getUsdToInrRate(): Promise<number> {
+  const rate = await cached('fx:USD-INR', FX_TTL_MS, () => source.fetchUsdToInrRate());
+  return rate ?? FALLBACK_USD_INR;
+}
+
+/**
+ * Daily closing prices for a symbol over the last `days` days (empty if
+ * unavailable)
+ */
+export async function getHistoricalPrices(symbol: string, days: number = 30): Promise<PricePoint[]> {
+  const prices = await cached(`prices:${symbol}:${days}`, PRICES_TTL_MS, () => source.fetchHistoricalPrices(symbol, days));
+  return prices ?? [];
+}
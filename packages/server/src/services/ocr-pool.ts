@@ -0,0 +1,134 @@
+/**
+ * OCR Worker Pool
+ * Long-lived Tesseract workers shared by all invoice uploads. Starting a
+ * worker loads the language data, which costs more than recognizing a
+ * typical invoice, so workers are started on first use (up to OCR_WORKERS),
+ * reused for queued jobs and terminated after sitting idle. Results are
+ * cached by content hash, so re-parsing the same file skips OCR.
+ */
+
+import os from 'os';
+import crypto from 'crypto';
+import Tesseract from 'tesseract.js';
+
+// Each worker holds its own copy of the language data (~100MB)
+const POOL_SIZE = parseInt(process.env.OCR_WORKERS || '') || Math.max(1, Math.min(2, os.cpus().length - 1));
+const IDLE_TIMEOUT_MS = 5 * 60 * 1000;
+const CACHE_SIZE = 500;
+
+export interface OcrResult {
+  text: string;
+  confidence: number;
+}
+
+interface PooledWorker {
+  worker: Tesseract.Worker;
+  idleTimer?: NodeJS.Timeout;
+}
+
+const idle: PooledWorker[] = [];
+const waiting: Array<() => void> = [];
+let workerCount = 0; // Started or starting
+let activeJobs = 0;
+
+// Results (or in-flight jobs) by SHA-256 of the image, least recently used first
+const cache = new Map<string, Promise<OcrResult>>();
+
+function wakeOne() {
+  waiting.shift()?.();
+}
+
+async function acquire(): Promise<PooledWorker> {
+  while (true) {
+    const ready = idle.pop();
+    if (ready) {
+      clearTimeout(ready.idleTimer);
+      return ready;
+    }
+
+    if (workerCount < POOL_SIZE) {
+      workerCount++;
+      try {
+        console.log(`[OcrPool] Starting worker ${workerCount}/${POOL_SIZE}`);
+        return { worker: await Tesseract.createWorker('eng') };
+      } catch (error) {
+        workerCount--;
+        wakeOne(); // Let a queued job try starting one instead
+        throw error;
+      }
+    }
+
+    await new Promise<void>(resolve => waiting.push(resolve));
+  }
+}
+
+function release(pooled: PooledWorker) {
+  pooled.idleTimer = setTimeout(() => {
+    const i = idle.indexOf(pooled);
+    if (i >= 0) idle.splice(i, 1);
+    retire(pooled);
+  }, IDLE_TIMEOUT_MS);
+  pooled.idleTimer.unref();
+
+  idle.push(pooled);
+  wakeOne();
+}
+
+function retire(pooled: PooledWorker) {
+  workerCount--;
+  pooled.worker.terminate().catch(() => {});
+  wakeOne();
+}
+
+async function runJob(image: Buffer): Promise<OcrResult> {
+  const pooled = await acquire();
+  activeJobs++;
+  try {
+    const result = await pooled.worker.recognize(image);
+    release(pooled);
+    return { text: result.data.text, confidence: result.data.confidence };
+  } catch (error) {
+    retire(pooled); // Don't reuse a worker in an unknown state
+    throw error;
+  } finally {
+    activeJobs--;
+  }
+}
+
+/**
+ * Recognize text in an image (PNG, JPEG, ...). Jobs queue for a pooled
+ * worker; an image already recognized (or in progress) reuses that result.
+ */
+export function recognizeImage(image: Buffer): Promise<OcrResult> {
+  const key = crypto.createHash('sha256').update(image).digest('hex');
+
+  const cached = cache.get(key);
+  if (cached) {
+    // Move to the most recently used end
+    cache.delete(key);
+    cache.set(key, cached);
+    return cached;
+  }
+
+  const job = runJob(image);
+  job.catch(() => cache.delete(key)); // Failures aren't cached
+  cache.set(key, job);
+  if (cache.size > CACHE_SIZE) {
+    cache.delete(cache.keys().next().value!);
+  }
+  return job;
+}
+
+/**
+ * Current pool usage, for logs and health checks
+ */
+export function getOcrPoolStatus() {
+  return {
+    size: POOL_SIZE,
+    workers: workerCount,
+    idle: idle.length,
+    active: activeJobs,
+    queued: waiting.length,
+    cached: cache.size,
+  };
+}
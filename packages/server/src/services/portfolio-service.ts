@@ -2,40 +2,7 @@ import { db, portfolioSnapshots, accounts, investments, mutualFundHoldings, mutu
 import { eq, and, desc, sql, isNull, or } from 'drizzle-orm';
 import { v4 as uuidv4 } from 'uuid';
 import type { PortfolioSnapshot, NewPortfolioSnapshot } from '../db/index.js';
-
-// Cache for exchange rate
-let exchangeRateCache: { rate: number; timestamp: number } | null = null;
-const CACHE_DURATION = 10 * 60 * 1000; // 10 minutes
-
-async function fetchUsdToInrRate(): Promise<number> {
-  if (exchangeRateCache && Date.now() - exchangeRateCache.timestamp < CACHE_DURATION) {
-    return exchangeRateCache.rate;
-  }
-
-  try {
-    const response = await fetch('https://www.google.com/finance/quote/USD-INR');
-    const html = await response.text();
-
-    const rateMatch = html.match(/data-last-price="([\d.]+)"/);
-    if (rateMatch && rateMatch[1]) {
-      const rate = parseFloat(rateMatch[1]);
-      exchangeRateCache = { rate, timestamp: Date.now() };
-      return rate;
-    }
-
-    const altMatch = html.match(/<div[^>]*class="[^"]*YMlKec[^"]*"[^>]*>([\d.]+)<\/div>/);
-    if (altMatch && altMatch[1]) {
-      const rate = parseFloat(altMatch[1]);
-      exchangeRateCache = { rate, timestamp: Date.now() };
-      return rate;
-    }
-
-    return exchangeRateCache?.rate || 83.5;
-  } catch (error) {
-    console.error('Error fetching exchange rate:', error);
-    return exchangeRateCache?.rate || 83.5;
-  }
-}
+import { getUsdToInrRate, getHistoricalPrices } from './market-data.js';
 
 export interface PortfolioSummary {
   // Investments (Financial) - All values in INR
@@ -80,10 +47,11 @@ export interface PortfolioSummary {
  * Calculate current portfolio summary for a user
  * Note: Bank balance is NOT included - this tracks investments and assets only
  * All values are returned in INR (US stocks are converted using exchange rate)
+ * Pass exchangeRate when running on a read pool worker, which can't refresh
+ * the cached rate.
  */
-export async function calculatePortfolioSummary(userId: string): Promise<PortfolioSummary> {
-  // Fetch exchange rate first
-  const exchangeRate = await fetchUsdToInrRate();
+export async function calculatePortfolioSummary(userId: string, exchangeRate?: number): Promise<PortfolioSummary> {
+  exchangeRate ??= await getUsdToInrRate();
 
   // 1. Investments by type and country
   const investmentsData = await db
@@ -479,62 +447,6 @@ export async function createSeedSnapshot(userId: string): Promise<PortfolioSnaps
 /**
  * Get aggregated performance data for charts
  */
-/**
- * Fetch historical stock prices from Yahoo Finance
- */
-async function fetchHistoricalPrices(
-  symbol: string,
-  days: number = 30
-): Promise<{ date: string; close: number }[]> {
-  try {
-    const endDate = Math.floor(Date.now() / 1000);
-    const startDate = endDate - days * 24 * 60 * 60;
-
-    // Yahoo Finance chart API
-    const url = `https://query1.finance.yahoo.com/v8/finance/chart/${encodeURIComponent(symbol)}?period1=${startDate}&period2=${endDate}&interval=1d`;
-
-    const response = await fetch(url, {
-      headers: {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-      },
-    });
-
-    if (!response.ok) {
-      console.error(`Failed to fetch prices for ${symbol}: ${response.status}`);
-      return [];
-    }
-
-    const data = await response.json() as {
-      chart?: { result?: Array<{
-        timestamp?: number[];
-        indicators?: { quote?: Array<{ close?: (number | null)[] }> };
-      }> };
-    };
-    const result = data.chart?.result?.[0];
-
-    if (!result || !result.timestamp || !result.indicators?.quote?.[0]?.close) {
-      return [];
-    }
-
-    const timestamps = result.timestamp;
-    const closes = result.indicators.quote[0].close;
-
-    const prices: { date: string; close: number }[] = [];
-    for (let i = 0; i < timestamps.length; i++) {
-      const closePrice = closes[i];
-      if (closePrice !== null && closePrice !== undefined) {
-        const date = new Date(timestamps[i] * 1000).toISOString().split('T')[0];
-        prices.push({ date, close: closePrice });
-      }
-    }
-
-    return prices;
-  } catch (error) {
-    console.error(`Error fetching historical prices for ${symbol}:`, error);
-    return [];
-  }
-}
-
 /**
  * Get stock trends - historical performance based on current holdings
  * Assumes same quantity held for past 30 days, uses historical ticker prices
@@ -556,7 +468,7 @@ export async function getStockTrends(
   }>;
 }> {
   // Fetch exchange rate
-  const exchangeRate = await fetchUsdToInrRate();
+  const exchangeRate = await getUsdToInrRate();
 
   // Get user's stock holdings
   const stockHoldings = await db
@@ -588,7 +500,7 @@ export async function getStockTrends(
       yahooSymbol = `${yahooSymbol}.NS`;
     }
 
-    const prices = await fetchHistoricalPrices(yahooSymbol, days);
+    const prices = await getHistoricalPrices(yahooSymbol, days);
 
     return {
       stock,
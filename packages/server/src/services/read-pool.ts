@@ -0,0 +1,207 @@
+/**
+ * Read Pool
+ * Worker threads holding read-only connections to the same database, for
+ * long reads and aggregations (reports, dashboard, portfolio history,
+ * auto-reconcile). WAL mode lets them read while the main connection
+ * writes, and a slow report no longer blocks the event loop for every other
+ * request. Writes always stay on the main connection.
+ *
+ * Workers are started on first use, up to READ_WORKERS (READ_WORKERS=0 runs
+ * tasks inline on the main thread). Run time and queue wait are recorded
+ * per task; see getReadPoolStats().
+ */
+
+import os from 'os';
+import { Worker } from 'worker_threads';
+import type { ReadTasks, ReadTaskName, ReadRequest, ReadResponse } from './read-worker.js';
+
+const POOL_SIZE = process.env.READ_WORKERS !== undefined
+  ? Math.max(0, parseInt(process.env.READ_WORKERS) || 0)
+  : Math.max(1, Math.min(4, os.cpus().length - 1));
+const SLOW_TASK_MS = 200;
+
+// tsx runs the sources, the build runs the compiled output
+const WORKER_URL = new URL(import.meta.url.endsWith('.ts') ? './read-worker.ts' : './read-worker.js', import.meta.url);
+
+type TaskResult<T extends ReadTaskName> = Awaited<ReturnType<ReadTasks[T]>>;
+
+interface Job {
+  id: number;
+  task: ReadTaskName;
+  args: unknown[];
+  queuedAt: number;
+  startedAt: number;
+  resolve: (result: any) => void;
+  reject: (error: Error) => void;
+}
+
+interface PooledWorker {
+  worker: Worker;
+  job: Job | null;
+  completed: number;
+}
+
+interface TaskTiming {
+  calls: number;
+  errors: number;
+  totalMs: number;
+  maxMs: number;
+  totalQueuedMs: number;
+  totalOverheadMs: number; // Copying arguments and results between threads (and starting a new worker)
+}
+
+const workers: PooledWorker[] = [];
+const queue: Job[] = [];
+const timings = new Map<string, TaskTiming>();
+let nextJobId = 1;
+let inline = POOL_SIZE === 0;
+
+function record(task: ReadTaskName, ms: number, queuedMs: number, overheadMs: number, failed: boolean) {
+  let timing = timings.get(task);
+  if (!timing) {
+    timing = { calls: 0, errors: 0, totalMs: 0, maxMs: 0, totalQueuedMs: 0, totalOverheadMs: 0 };
+    timings.set(task, timing);
+  }
+  timing.calls++;
+  if (failed) timing.errors++;
+  timing.totalMs += ms;
+  timing.maxMs = Math.max(timing.maxMs, ms);
+  timing.totalQueuedMs += queuedMs;
+  timing.totalOverheadMs += overheadMs;
+
+  if (ms >= SLOW_TASK_MS) {
+    console.log(`[ReadPool] ${task} took ${Math.round(ms)}ms (queued ${Math.round(queuedMs)}ms)`);
+  }
+}
+
+function startWorker(): PooledWorker {
+  const pooled: PooledWorker = {
+    worker: new Worker(WORKER_URL, { workerData: { readOnlyDatabase: true } }),
+    job: null,
+    completed: 0,
+  };
+  pooled.worker.unref();
+
+  pooled.worker.on('message', (response: ReadResponse) => {
+    const job = pooled.job;
+    if (!job || job.id !== response.id) return;
+    pooled.job = null;
+    pooled.completed++;
+    pooled.worker.unref();
+
+    const queuedMs = job.startedAt - job.queuedAt;
+    const overheadMs = Math.max(0, performance.now() - job.startedAt - response.ms);
+    const failed = 'error' in response;
+    record(job.task, response.ms, queuedMs, overheadMs, failed);
+
+    if ('error' in response) {
+      job.reject(new Error(response.error));
+    } else {
+      job.resolve(response.result);
+    }
+    dispatch();
+  });
+
+  pooled.worker.on('error', error => {
+    console.error('[ReadPool] Worker error:', error);
+  });
+
+  pooled.worker.on('exit', code => {
+    workers.splice(workers.indexOf(pooled), 1);
+    const job = pooled.job;
+    pooled.job = null;
+    if (job) {
+      record(job.task, performance.now() - job.startedAt, job.startedAt - job.queuedAt, 0, true);
+      job.reject(new Error(`Read worker exited with code ${code}`));
+    }
+
+    // A worker that never finished a task most likely can't start at all;
+    // run the rest inline instead of restarting it in a loop
+    if (pooled.completed === 0 && !inline) {
+      console.error('[ReadPool] Worker failed before completing a task, running reads on the main thread');
+      inline = true;
+      for (const queued of queue.splice(0)) {
+        runInline(queued);
+      }
+      return;
+    }
+    dispatch();
+  });
+
+  workers.push(pooled);
+  return pooled;
+}
+
+function dispatch() {
+  while (queue.length > 0) {
+    let free = workers.find(w => !w.job);
+    if (!free && workers.length < POOL_SIZE) {
+      free = startWorker();
+    }
+    if (!free) return;
+
+    const job = queue.shift()!;
+    job.startedAt = performance.now();
+    free.job = job;
+    free.worker.ref(); // Keep the process alive until the task answers
+    free.worker.postMessage({ id: job.id, task: job.task, args: job.args } satisfies ReadRequest);
+  }
+}
+
+async function runInline(job: Job) {
+  job.startedAt = performance.now();
+  try {
+    const { READ_TASKS } = await import('./read-worker.js');
+    const run = READ_TASKS[job.task] as (...args: unknown[]) => Promise<unknown>;
+    const result = await run(...job.args);
+    record(job.task, performance.now() - job.startedAt, job.startedAt - job.queuedAt, 0, false);
+    job.resolve(result);
+  } catch (error) {
+    record(job.task, performance.now() - job.startedAt, job.startedAt - job.queuedAt, 0, true);
+    job.reject(error instanceof Error ? error : new Error(String(error)));
+  }
+}
+
+/**
+ * Run a read-only task from READ_TASKS on a pool worker. Resolves with the
+ * task's result (copied back from the worker); rejects with its error.
+ */
+export function runRead<T extends ReadTaskName>(task: T, ...args: Parameters<ReadTasks[T]>): Promise<TaskResult<T>> {
+  return new Promise((resolve, reject) => {
+    const job: Job = { id: nextJobId++, task, args, queuedAt: performance.now(), startedAt: 0, resolve, reject };
+    if (inline) {
+      runInline(job);
+    } else {
+      queue.push(job);
+      dispatch();
+    }
+  });
+}
+
+/**
+ * Pool usage and per-task timings (milliseconds), for GET /api/admin/read-pool
+ */
+export function getReadPoolStats() {
+  const round = (ms: number) => Math.round(ms * 10) / 10;
+  const tasks: Record<string, object> = {};
+  for (const [task, t] of [...timings].sort((a, b) => b[1].totalMs - a[1].totalMs)) {
+    tasks[task] = {
+      calls: t.calls,
+      errors: t.errors,
+      avgMs: round(t.totalMs / t.calls),
+      maxMs: round(t.maxMs),
+      totalMs: round(t.totalMs),
+      avgQueuedMs: round(t.totalQueuedMs / t.calls),
+      avgOverheadMs: round(t.totalOverheadMs / t.calls),
+    };
+  }
+
+  return {
+    size: POOL_SIZE,
+    inline,
+    workers: workers.length,
+    busy: workers.filter(w => w.job).length,
+    queued: queue.length,
+    tasks,
+  };
+}
@@ -0,0 +1,75 @@
+/**
+ * Read Worker
+ * Entry point for the read pool's worker threads (see read-pool.ts). The
+ * worker imports db/index.ts like the main thread does, but gets a
+ * read-only connection, and runs one READ_TASKS function per message.
+ */
+
+import { parentPort } from 'worker_threads';
+import {
+  getDashboardStats,
+  getCashFlowData,
+  getRecentTransactions,
+  getTransactionTrends,
+  getCategoryTrends,
+  getVyaparSummary,
+  getVyaparTrends,
+  getGSTSummary,
+  getVyaparPL,
+  getVyaparExpenseBreakdown,
+  getTopCustomers,
+  getPendingReceivables,
+  getTopSellingItems,
+} from './report-service.js';
+import { calculatePortfolioSummary, getSnapshotHistory, getPerformanceData } from './portfolio-service.js';
+import { autoReconcile } from './reconciliation-service.js';
+
+/**
+ * Functions the pool can run. Each must only read: the worker's connection
+ * rejects writes. Arguments and results are copied between threads, so they
+ * must be plain data.
+ */
+export const READ_TASKS = {
+  getDashboardStats,
+  getCashFlowData,
+  getRecentTransactions,
+  getTransactionTrends,
+  getCategoryTrends,
+  getVyaparSummary,
+  getVyaparTrends,
+  getGSTSummary,
+  getVyaparPL,
+  getVyaparExpenseBreakdown,
+  getTopCustomers,
+  getPendingReceivables,
+  getTopSellingItems,
+  calculatePortfolioSummary,
+  getSnapshotHistory,
+  getPerformanceData,
+  autoReconcile,
+};
+
+export type ReadTasks = typeof READ_TASKS;
+export type ReadTaskName = keyof ReadTasks;
+
+export interface ReadRequest {
+  id: number;
+  task: ReadTaskName;
+  args: unknown[];
+}
+
+export type ReadResponse =
+  | { id: number; ms: number; result: unknown }
+  | { id: number; ms: number; error: string };
+
+parentPort?.on('message', async ({ id, task, args }: ReadRequest) => {
+  const start = performance.now();
+  try {
+    const run = READ_TASKS[task] as (...args: unknown[]) => Promise<unknown>;
+    const result = await run(...args);
+    parentPort!.postMessage({ id, ms: performance.now() - start, result } satisfies ReadResponse);
+  } catch (error) {
+    const message = error instanceof Error ? error.message : String(error);
+    parentPort!.postMessage({ id, ms: performance.now() - start, error: message } satisfies ReadResponse);
+  }
+});
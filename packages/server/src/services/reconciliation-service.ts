@@ -120,36 +120,48 @@ export interface ReconciliationMatch {
   vyaparDate: string;
 }
 
-// Calculate string similarity (Levenshtein-based)
-function similarity(s1: string, s2: string): number {
+// Calculate string similarity (Levenshtein-based).
+// Returns 0 as soon as the similarity can no longer exceed minSimilarity.
+function similarity(s1: string, s2: string, minSimilarity = 0): number {
   const longer = s1.length > s2.length ? s1 : s2;
   const shorter = s1.length > s2.length ? s2 : s1;
 
   if (longer.length === 0) return 1.0;
 
-  const editDistance = levenshteinDistance(longer.toLowerCase(), shorter.toLowerCase());
+  const maxDistance = Math.ceil(longer.length * (1 - minSimilarity));
+  const editDistance = boundedLevenshteinDistance(longer.toLowerCase(), shorter.toLowerCase(), maxDistance);
+  if (editDistance > maxDistance) return 0;
   return (longer.length - editDistance) / longer.length;
 }
 
-function levenshteinDistance(s1: string, s2: string): number {
-  const costs: number[] = [];
-  for (let i = 0; i <= s1.length; i++) {
-    let lastValue = i;
-    for (let j = 0; j <= s2.length; j++) {
-      if (i === 0) {
-        costs[j] = j;
-      } else if (j > 0) {
-        let newValue = costs[j - 1];
-        if (s1.charAt(i - 1) !== s2.charAt(j - 1)) {
-          newValue = Math.min(Math.min(newValue, lastValue), costs[j]) + 1;
-        }
-        costs[j - 1] = lastValue;
-        lastValue = newValue;
-      }
+// Levenshtein distance, or maxDistance + 1 once it is certain to exceed maxDistance.
+// Only the diagonal band of width 2 * maxDistance + 1 is computed.
+function boundedLevenshteinDistance(s1: string, s2: string, maxDistance: number): number {
+  const over = maxDistance + 1;
+  if (Math.abs(s1.length - s2.length) > maxDistance) return over;
+
+  let prev = new Array<number>(s2.length + 1);
+  let curr = new Array<number>(s2.length + 1);
+  for (let j = 0; j <= s2.length; j++) prev[j] = j <= maxDistance ? j : over;
+
+  for (let i = 1; i <= s1.length; i++) {
+    const from = Math.max(1, i - maxDistance);
+    const to = Math.min(s2.length, i + maxDistance);
+    curr.fill(over);
+    curr[0] = i <= maxDistance ? i : over;
+
+    let rowMin = curr[0];
+    for (let j = from; j <= to; j++) {
+      const cost = s1.charCodeAt(i - 1) === s2.charCodeAt(j - 1) ? 0 : 1;
+      const value = Math.min(prev[j - 1] + cost, prev[j] + 1, curr[j - 1] + 1);
+      curr[j] = value > over ? over : value;
+      if (curr[j] < rowMin) rowMin = curr[j];
     }
-    if (i > 0) costs[s2.length] = lastValue;
+    if (rowMin > maxDistance) return over;
+
+    [prev, curr] = [curr, prev];
   }
-  return costs[s2.length];
+  return prev[s2.length] > maxDistance ? over : prev[s2.length];
 }
 
 // Extract party name from narration
@@ -247,6 +259,76 @@ function datesWithinRange(date1: string, date2: string, days: number): boolean {
   return d2 >= start && d2 <= end;
 }
 
+// Calendar day number of a YYYY-MM-DD date (NaN when unparseable)
+function dayNumber(date: string): number {
+  return Math.floor(Date.UTC(+date.slice(0, 4), +date.slice(5, 7) - 1, +date.slice(8, 10)) / 86400000);
+}
+
+/**
+ * Candidate index over vyapar transactions, bucketed by amount in paise and
+ * then by day. Lookups return positions in the original array, in order, so
+ * each pass still picks the same first match as a full scan would. Every
+ * candidate must still be checked with amountsMatch/datesWithinRange.
+ */
+class CandidateIndex {
+  private buckets = new Map<number, Map<number, number[]>>();
+  private amountCandidates = new Map<number, number[]>();
+
+  constructor(txns: Array<{ amount: number; date: string }>) {
+    txns.forEach((txn, position) => {
+      const paise = Math.round(Math.abs(txn.amount) * 100);
+      let byDay = this.buckets.get(paise);
+      if (!byDay) {
+        byDay = new Map();
+        this.buckets.set(paise, byDay);
+      }
+      const day = dayNumber(txn.date);
+      const bucket = byDay.get(day);
+      if (bucket) bucket.push(position);
+      else byDay.set(day, [position]);
+    });
+  }
+
+  // Amount buckets that can hold an amount within the 0.01 tolerance
+  private amountBuckets(amount: number): Array<Map<number, number[]>> {
+    const paise = Math.round(Math.abs(amount) * 100);
+    const result: Array<Map<number, number[]>> = [];
+    for (let p = paise - 1; p <= paise + 1; p++) {
+      const byDay = this.buckets.get(p);
+      if (byDay) result.push(byDay);
+    }
+    return result;
+  }
+
+  /** Positions with a matching amount, dated within `days` of `date` */
+  near(amount: number, date: string, days: number): number[] {
+    const day = dayNumber(date);
+    const positions: number[] = [];
+    for (const byDay of this.amountBuckets(amount)) {
+      for (let d = day - days; d <= day + days; d++) {
+        const bucket = byDay.get(d);
+        if (bucket) positions.push(...bucket);
+      }
+    }
+    return positions.sort((a, b) => a - b);
+  }
+
+  /** Positions with a matching amount, at any date */
+  withAmount(amount: number): number[] {
+    const paise = Math.round(Math.abs(amount) * 100);
+    let positions = this.amountCandidates.get(paise);
+    if (!positions) {
+      positions = [];
+      for (const byDay of this.amountBuckets(amount)) {
+        for (const bucket of byDay.values()) positions.push(...bucket);
+      }
+      positions.sort((a, b) => a - b);
+      this.amountCandidates.set(paise, positions);
+    }
+    return positions;
+  }
+}
+
 export async function autoReconcile(
   startDate: string,
   endDate: string,
@@ -373,6 +455,9 @@ export async function autoReconcile(
     console.log(`[AutoReconcile] Sample vyapar txn: ${vyaparTxns[0].date}, ${vyaparTxns[0].amount}, ${vyaparTxns[0].transactionType}`);
   }
 
+  // Each pass only scores vyapar transactions with a matching amount (and date, where required)
+  const candidates = new CandidateIndex(vyaparTxns);
+
   // Create sets to track matched transactions
   const matchedBankIds = new Set<string>();
   const matchedVyaparIds = new Set<string>();
@@ -391,7 +476,8 @@ export async function autoReconcile(
       if (!rule) continue;
 
       // Find vyapar transaction with matching party name and amount
-      for (const vyaparTxn of vyaparTxns) {
+      for (const position of candidates.near(bankTxn.amount, bankTxn.date, 7)) {
+        const vyaparTxn = vyaparTxns[position];
         if (matchedVyaparIds.has(vyaparTxn.id)) continue;
         if (!vyaparTxn.partyName) continue;
 
@@ -426,7 +512,8 @@ export async function autoReconcile(
   for (const bankTxn of filteredBankTxns) {
     if (matchedBankIds.has(bankTxn.id)) continue;
 
-    for (const vyaparTxn of vyaparTxns) {
+    for (const position of candidates.near(bankTxn.amount, bankTxn.date, 0)) {
+      const vyaparTxn = vyaparTxns[position];
       if (matchedVyaparIds.has(vyaparTxn.id)) continue;
 
       if (
@@ -455,7 +542,8 @@ export async function autoReconcile(
   for (const bankTxn of filteredBankTxns) {
     if (matchedBankIds.has(bankTxn.id)) continue;
 
-    for (const vyaparTxn of vyaparTxns) {
+    for (const position of candidates.near(bankTxn.amount, bankTxn.date, 7)) {
+      const vyaparTxn = vyaparTxns[position];
       if (matchedVyaparIds.has(vyaparTxn.id)) continue;
 
       if (
@@ -491,9 +579,11 @@ export async function autoReconcile(
   for (const bankTxn of filteredBankTxns) {
     if (matchedBankIds.has(bankTxn.id)) continue;
 
-    const bankParty = extractPartyName(bankTxn.narration);
+    // Counterparty decoded at import; older rows fall back to parsing the narration
+    const bankParty = bankTxn.counterpartyName || extractPartyName(bankTxn.narration);
 
-    for (const vyaparTxn of vyaparTxns) {
+    for (const position of candidates.withAmount(bankTxn.amount)) {
+      const vyaparTxn = vyaparTxns[position];
       if (matchedVyaparIds.has(vyaparTxn.id)) continue;
 
       if (!vyaparTxn.partyName) continue;
@@ -502,7 +592,7 @@ export async function autoReconcile(
         amountsMatch(bankTxn.amount, vyaparTxn.amount) &&
         areDirectionsCompatible(bankTxn.transactionType, vyaparTxn.transactionType)
       ) {
-        const partySimilarity = similarity(bankParty, vyaparTxn.partyName);
+        const partySimilarity = similarity(bankParty, vyaparTxn.partyName, 0.8);
 
         if (partySimilarity > 0.8) {
           matches.push({
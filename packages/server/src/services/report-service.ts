@@ -1,7 +1,7 @@
 import { db } from '../db/index.js';
-import { bankTransactions, vyaparTransactions, vyaparItemDetails, categories, accounts } from '../db/index.js';
-import { eq, and, between, sql, gte, lte, desc, asc } from 'drizzle-orm';
-import { format, startOfMonth, endOfMonth, parseISO, subMonths, addDays, addMonths } from 'date-fns';
+import { bankTransactions, vyaparTransactions, vyaparItemDetails, categories, accounts, monthlyRollups } from '../db/index.js';
+import { eq, and, between, sql, gte, lte, desc, asc, inArray } from 'drizzle-orm';
+import { format, startOfMonth, endOfMonth, parseISO, subMonths, subDays, addDays, addMonths } from 'date-fns';
 
 export interface DashboardStats {
   totalBalance: number;
@@ -36,6 +36,133 @@ export interface MonthlyPL {
   }>;
 }
 
+interface PeriodTotal {
+  period: string; // yyyy-MM from monthlyTotals, yyyy-MM-dd from dailyTotals
+  categoryId: string | null; // Category name for Vyapar
+  transactionType: string;
+  total: number;
+  count: number;
+}
+
+const TOTAL_SOURCES = {
+  bank: {
+    table: bankTransactions,
+    date: bankTransactions.date,
+    userId: bankTransactions.userId,
+    category: bankTransactions.categoryId,
+    transactionType: bankTransactions.transactionType,
+    amount: bankTransactions.amount,
+  },
+  vyapar: {
+    table: vyaparTransactions,
+    date: vyaparTransactions.date,
+    userId: vyaparTransactions.userId,
+    category: vyaparTransactions.categoryName,
+    transactionType: vyaparTransactions.transactionType,
+    amount: vyaparTransactions.amount,
+  },
+};
+
+type TotalSource = keyof typeof TOTAL_SOURCES;
+
+// Sums grouped in SQL by day or month, category and type
+async function transactionTotals(
+  source: TotalSource,
+  startDate: string,
+  endDate: string,
+  byDay: boolean,
+  userId?: string,
+  types?: string[]
+): Promise<PeriodTotal[]> {
+  const t = TOTAL_SOURCES[source];
+  const period = byDay ? sql<string>`${t.date}` : sql<string>`substr(${t.date}, 1, 7)`;
+
+  const conditions = [between(t.date, startDate, endDate)];
+  if (userId) conditions.push(eq(t.userId, userId));
+  if (types) conditions.push(inArray(t.transactionType, types));
+
+  return db
+    .select({
+      period,
+      categoryId: t.category,
+      transactionType: t.transactionType,
+      total: sql<number>`sum(${t.amount})`,
+      count: sql<number>`count(*)`,
+    })
+    .from(t.table)
+    .where(and(...conditions))
+    .groupBy(period, t.category, t.transactionType);
+}
+
+/**
+ * Totals by month, category and type for a date range. Whole months are
+ * read from monthly_rollups; days outside them at either end of the range
+ * are summed from the transactions.
+ */
+async function monthlyTotals(
+  source: TotalSource,
+  startDate: string,
+  endDate: string,
+  userId?: string,
+  types?: string[]
+): Promise<PeriodTotal[]> {
+  const firstMonth = startOfMonth(parseISO(startDate));
+  const lastMonth = startOfMonth(parseISO(endDate));
+  const firstWhole = format(startDate.endsWith('-01') ? firstMonth : addMonths(firstMonth, 1), 'yyyy-MM');
+  const lastWhole = format(endDate === format(endOfMonth(lastMonth), 'yyyy-MM-dd') ? lastMonth : subMonths(lastMonth, 1), 'yyyy-MM');
+
+  if (firstWhole > lastWhole) {
+    return transactionTotals(source, startDate, endDate, false, userId, types);
+  }
+
+  const conditions = [eq(monthlyRollups.source, source), between(monthlyRollups.month, firstWhole, lastWhole)];
+  if (userId) conditions.push(eq(monthlyRollups.userId, userId));
+  if (types) conditions.push(inArray(monthlyRollups.transactionType, types));
+
+  const rollups = await db
+    .select({
+      period: monthlyRollups.month,
+      categoryId: monthlyRollups.categoryId,
+      transactionType: monthlyRollups.transactionType,
+      total: sql<number>`sum(${monthlyRollups.total})`,
+      count: sql<number>`sum(${monthlyRollups.count})`,
+    })
+    .from(monthlyRollups)
+    .where(and(...conditions))
+    .groupBy(monthlyRollups.month, monthlyRollups.categoryId, monthlyRollups.transactionType);
+
+  const totals: PeriodTotal[] = rollups.map(r => ({ ...r, categoryId: r.categoryId || null }));
+
+  const wholeStart = firstWhole + '-01';
+  if (startDate < wholeStart) {
+    totals.push(...await transactionTotals(source, startDate, format(subDays(parseISO(wholeStart), 1), 'yyyy-MM-dd'), false, userId, types));
+  }
+  const wholeEnd = format(endOfMonth(parseISO(lastWhole + '-01')), 'yyyy-MM-dd');
+  if (endDate > wholeEnd) {
+    totals.push(...await transactionTotals(source, format(addDays(parseISO(wholeEnd), 1), 'yyyy-MM-dd'), endDate, false, userId, types));
+  }
+
+  return totals;
+}
+
+// Daily totals by category and type, summed in SQL
+function dailyTotals(source: TotalSource, startDate: string, endDate: string, userId?: string, types?: string[]) {
+  return transactionTotals(source, startDate, endDate, true, userId, types);
+}
+
+// Group key of a yyyy-MM-dd date (or yyyy-MM month) for a trend granularity
+function trendPeriod(date: string, granularity: 'daily' | 'weekly' | 'monthly'): string {
+  if (granularity === 'monthly') return date.slice(0, 7);
+  if (granularity === 'daily') return date;
+  // Start of week (Monday)
+  const txnDate = parseISO(date);
+  const day = txnDate.getDay();
+  const diff = txnDate.getDate() - day + (day === 0 ? -6 : 1);
+  const weekStart = new Date(txnDate);
+  weekStart.setDate(diff);
+  return format(weekStart, 'yyyy-MM-dd');
+}
+
 export async function getDashboardStats(month?: string, userId?: string): Promise<DashboardStats> {
   const now = month ? parseISO(month + '-01') : new Date();
   const monthStart = format(startOfMonth(now), 'yyyy-MM-dd');
@@ -49,23 +176,16 @@ export async function getDashboardStats(month?: string, userId?: string): Promis
   );
   const totalBalance = accountsData.reduce((sum, acc) => sum + (acc.currentBalance || 0), 0);
 
-  // Get monthly transactions
-  const monthlyTxns = await db
-    .select()
-    .from(bankTransactions)
-    .where(
-      userId
-        ? and(between(bankTransactions.date, monthStart, monthEnd), eq(bankTransactions.userId, userId))
-        : between(bankTransactions.date, monthStart, monthEnd)
-    );
+  // Get monthly totals
+  const monthlyTotalsData = await monthlyTotals('bank', monthStart, monthEnd, userId, ['credit', 'debit']);
 
-  const monthlyIncome = monthlyTxns
+  const monthlyIncome = monthlyTotalsData
     .filter(t => t.transactionType === 'credit')
-    .reduce((sum, t) => sum + t.amount, 0);
+    .reduce((sum, t) => sum + t.total, 0);
 
-  const monthlyExpense = monthlyTxns
+  const monthlyExpense = monthlyTotalsData
     .filter(t => t.transactionType === 'debit')
-    .reduce((sum, t) => sum + t.amount, 0);
+    .reduce((sum, t) => sum + t.total, 0);
 
   // Get unreconciled count
   const unreconciledBank = await db
@@ -102,28 +222,28 @@ export async function getCashFlowData(months = 6, userId?: string): Promise<Cash
   const result: CashFlowData[] = [];
   const now = new Date();
 
+  const totals = await monthlyTotals(
+    'bank',
+    format(startOfMonth(subMonths(now, months - 1)), 'yyyy-MM-dd'),
+    format(endOfMonth(now), 'yyyy-MM-dd'),
+    userId,
+    ['credit', 'debit']
+  );
+
   for (let i = months - 1; i >= 0; i--) {
     const date = subMonths(now, i);
-    const monthStart = format(startOfMonth(date), 'yyyy-MM-dd');
-    const monthEnd = format(endOfMonth(date), 'yyyy-MM-dd');
+    const month = format(date, 'yyyy-MM');
     const monthLabel = format(date, 'MMM yyyy');
 
-    const txns = await db
-      .select()
-      .from(bankTransactions)
-      .where(
-        userId
-          ? and(between(bankTransactions.date, monthStart, monthEnd), eq(bankTransactions.userId, userId))
-          : between(bankTransactions.date, monthStart, monthEnd)
-      );
+    const monthTotals = totals.filter(t => t.period === month);
 
-    const income = txns
+    const income = monthTotals
       .filter(t => t.transactionType === 'credit')
-      .reduce((sum, t) => sum + t.amount, 0);
+      .reduce((sum, t) => sum + t.total, 0);
 
-    const expense = txns
+    const expense = monthTotals
       .filter(t => t.transactionType === 'debit')
-      .reduce((sum, t) => sum + t.amount, 0);
+      .reduce((sum, t) => sum + t.total, 0);
 
     result.push({ month: monthLabel, income, expense });
   }
@@ -132,24 +252,7 @@ export async function getCashFlowData(months = 6, userId?: string): Promise<Cash
 }
 
 export async function getExpenseBreakdown(startDate: string, endDate: string, userId?: string): Promise<ExpenseBreakdown[]> {
-  const txns = await db
-    .select({
-      amount: bankTransactions.amount,
-      categoryId: bankTransactions.categoryId,
-    })
-    .from(bankTransactions)
-    .where(
-      userId
-        ? and(
-            eq(bankTransactions.transactionType, 'debit'),
-            between(bankTransactions.date, startDate, endDate),
-            eq(bankTransactions.userId, userId)
-          )
-        : and(
-            eq(bankTransactions.transactionType, 'debit'),
-            between(bankTransactions.date, startDate, endDate)
-          )
-    );
+  const totals = await monthlyTotals('bank', startDate, endDate, userId, ['debit']);
 
   const allCategories = await db.select().from(categories);
   const categoryMap = new Map(allCategories.map(c => [c.id, c]));
@@ -158,16 +261,16 @@ export async function getExpenseBreakdown(startDate: string, endDate: string, us
   const categoryTotals = new Map<string, number>();
   let uncategorized = 0;
 
-  for (const txn of txns) {
-    if (txn.categoryId) {
-      const current = categoryTotals.get(txn.categoryId) || 0;
-      categoryTotals.set(txn.categoryId, current + txn.amount);
+  for (const row of totals) {
+    if (row.categoryId) {
+      const current = categoryTotals.get(row.categoryId) || 0;
+      categoryTotals.set(row.categoryId, current + row.total);
     } else {
-      uncategorized += txn.amount;
+      uncategorized += row.total;
     }
   }
 
-  const totalExpense = txns.reduce((sum, t) => sum + t.amount, 0);
+  const totalExpense = totals.reduce((sum, t) => sum + t.total, 0);
 
   const result: ExpenseBreakdown[] = [];
 
@@ -220,14 +323,7 @@ export async function getMonthlyPL(month: string, userId?: string): Promise<Mont
   const monthEnd = format(endOfMonth(date), 'yyyy-MM-dd');
   const monthLabel = format(date, 'MMMM yyyy');
 
-  const txns = await db
-    .select()
-    .from(bankTransactions)
-    .where(
-      userId
-        ? and(between(bankTransactions.date, monthStart, monthEnd), eq(bankTransactions.userId, userId))
-        : between(bankTransactions.date, monthStart, monthEnd)
-    );
+  const totals = await monthlyTotals('bank', monthStart, monthEnd, userId);
 
   const allCategories = await db.select().from(categories);
   const categoryMap = new Map(allCategories.map(c => [c.id, c]));
@@ -236,14 +332,14 @@ export async function getMonthlyPL(month: string, userId?: string): Promise<Mont
   const incomeByCategory = new Map<string, number>();
   const expenseByCategory = new Map<string, number>();
 
-  for (const txn of txns) {
-    const categoryId = txn.categoryId || 'uncategorized';
-    if (txn.transactionType === 'credit') {
+  for (const row of totals) {
+    const categoryId = row.categoryId || 'uncategorized';
+    if (row.transactionType === 'credit') {
       const current = incomeByCategory.get(categoryId) || 0;
-      incomeByCategory.set(categoryId, current + txn.amount);
+      incomeByCategory.set(categoryId, current + row.total);
     } else {
       const current = expenseByCategory.get(categoryId) || 0;
-      expenseByCategory.set(categoryId, current + txn.amount);
+      expenseByCategory.set(categoryId, current + row.total);
     }
   }
 
@@ -267,13 +363,13 @@ export async function getMonthlyPL(month: string, userId?: string): Promise<Mont
     });
   }
 
-  const revenue = txns
+  const revenue = totals
     .filter(t => t.transactionType === 'credit')
-    .reduce((sum, t) => sum + t.amount, 0);
+    .reduce((sum, t) => sum + t.total, 0);
 
-  const expenses = txns
+  const expenses = totals
     .filter(t => t.transactionType === 'debit')
-    .reduce((sum, t) => sum + t.amount, 0);
+    .reduce((sum, t) => sum + t.total, 0);
 
   return {
     month: monthLabel,
@@ -291,43 +387,23 @@ export async function getTransactionTrends(
   granularity: 'daily' | 'weekly' | 'monthly' = 'daily',
   userId?: string
 ) {
-  const txns = await db
-    .select()
-    .from(bankTransactions)
-    .where(
-      userId
-        ? and(between(bankTransactions.date, startDate, endDate), eq(bankTransactions.userId, userId))
-        : between(bankTransactions.date, startDate, endDate)
-    );
+  const totals = granularity === 'monthly'
+    ? await monthlyTotals('bank', startDate, endDate, userId)
+    : await dailyTotals('bank', startDate, endDate, userId);
 
-  // Group transactions by date
+  // Group totals by date
   const dateGroups = new Map<string, { income: number; expense: number; count: number }>();
 
-  for (const txn of txns) {
-    let groupKey: string;
-    const txnDate = parseISO(txn.date);
-
-    if (granularity === 'daily') {
-      groupKey = txn.date;
-    } else if (granularity === 'weekly') {
-      // Get start of week (Monday)
-      const day = txnDate.getDay();
-      const diff = txnDate.getDate() - day + (day === 0 ? -6 : 1);
-      const weekStart = new Date(txnDate);
-      weekStart.setDate(diff);
-      groupKey = format(weekStart, 'yyyy-MM-dd');
-    } else {
-      // Monthly
-      groupKey = format(txnDate, 'yyyy-MM');
-    }
+  for (const row of totals) {
+    const groupKey = trendPeriod(row.period, granularity);
 
     const current = dateGroups.get(groupKey) || { income: 0, expense: 0, count: 0 };
-    if (txn.transactionType === 'credit') {
-      current.income += txn.amount;
+    if (row.transactionType === 'credit') {
+      current.income += row.total;
     } else {
-      current.expense += txn.amount;
+      current.expense += row.total;
     }
-    current.count++;
+    current.count += row.count;
     dateGroups.set(groupKey, current);
   }
 
@@ -356,18 +432,10 @@ export async function getCategoryTrends(
   type: 'expense' | 'income' | 'all' = 'expense',
   userId?: string
 ) {
-  const whereConditions = [between(bankTransactions.date, startDate, endDate)];
-  if (type !== 'all') {
-    whereConditions.push(eq(bankTransactions.transactionType, type === 'expense' ? 'debit' : 'credit'));
-  }
-  if (userId) {
-    whereConditions.push(eq(bankTransactions.userId, userId));
-  }
-
-  const txns = await db
-    .select()
-    .from(bankTransactions)
-    .where(and(...whereConditions));
+  const types = type === 'all' ? undefined : [type === 'expense' ? 'debit' : 'credit'];
+  const totals = granularity === 'monthly'
+    ? await monthlyTotals('bank', startDate, endDate, userId, types)
+    : await dailyTotals('bank', startDate, endDate, userId, types);
 
   const allCategories = await db.select().from(categories);
   const categoryMap = new Map(allCategories.map(c => [c.id, c]));
@@ -375,31 +443,18 @@ export async function getCategoryTrends(
   // Group by period and category
   const periodCategoryGroups = new Map<string, Map<string, number>>();
 
-  for (const txn of txns) {
-    let periodKey: string;
-    const txnDate = parseISO(txn.date);
-
-    if (granularity === 'daily') {
-      periodKey = txn.date;
-    } else if (granularity === 'weekly') {
-      const day = txnDate.getDay();
-      const diff = txnDate.getDate() - day + (day === 0 ? -6 : 1);
-      const weekStart = new Date(txnDate);
-      weekStart.setDate(diff);
-      periodKey = format(weekStart, 'yyyy-MM-dd');
-    } else {
-      periodKey = format(txnDate, 'yyyy-MM');
-    }
+  for (const row of totals) {
+    const periodKey = trendPeriod(row.period, granularity);
 
-    const categoryName = txn.categoryId
-      ? (categoryMap.get(txn.categoryId)?.name || 'Unknown')
+    const categoryName = row.categoryId
+      ? (categoryMap.get(row.categoryId)?.name || 'Unknown')
       : 'Uncategorized';
 
     if (!periodCategoryGroups.has(periodKey)) {
       periodCategoryGroups.set(periodKey, new Map());
     }
     const categoryGroup = periodCategoryGroups.get(periodKey)!;
-    categoryGroup.set(categoryName, (categoryGroup.get(categoryName) || 0) + txn.amount);
+    categoryGroup.set(categoryName, (categoryGroup.get(categoryName) || 0) + row.total);
   }
 
   // Get all unique categories
@@ -572,19 +627,11 @@ export async function getVyaparTrends(
   granularity: 'daily' | 'weekly' | 'monthly' = 'daily',
   userId?: string
 ) {
-  const txns = await db
-    .select()
-    .from(vyaparTransactions)
-    .where(
-      userId
-        ? and(between(vyaparTransactions.date, startDate, endDate), eq(vyaparTransactions.userId, userId))
-        : between(vyaparTransactions.date, startDate, endDate)
-    );
-
-  // Filter only Sale, Sale Order, and Expense
-  const filteredTxns = txns.filter(t =>
-    ['Sale', 'Sale Order', 'Expense'].includes(t.transactionType)
-  );
+  // Only Sale, Sale Order, and Expense
+  const types = ['Sale', 'Sale Order', 'Expense'];
+  const totals = granularity === 'monthly'
+    ? await monthlyTotals('vyapar', startDate, endDate, userId, types)
+    : await dailyTotals('vyapar', startDate, endDate, userId, types);
 
   // Initialize all dates/periods in the range with zero values
   const dateGroups = new Map<string, { sale: number; saleOrder: number; expense: number; count: number }>();
@@ -616,31 +663,18 @@ export async function getVyaparTrends(
   }
 
   // Add transaction data
-  for (const txn of filteredTxns) {
-    let groupKey: string;
-    const txnDate = parseISO(txn.date);
-
-    if (granularity === 'daily') {
-      groupKey = txn.date;
-    } else if (granularity === 'weekly') {
-      const day = txnDate.getDay();
-      const diff = txnDate.getDate() - day + (day === 0 ? -6 : 1);
-      const weekStart = new Date(txnDate);
-      weekStart.setDate(diff);
-      groupKey = format(weekStart, 'yyyy-MM-dd');
-    } else {
-      groupKey = format(txnDate, 'yyyy-MM');
-    }
+  for (const row of totals) {
+    const groupKey = trendPeriod(row.period, granularity);
 
     const currentGroup = dateGroups.get(groupKey) || { sale: 0, saleOrder: 0, expense: 0, count: 0 };
-    if (txn.transactionType === 'Sale') {
-      currentGroup.sale += txn.amount;
-    } else if (txn.transactionType === 'Sale Order') {
-      currentGroup.saleOrder += txn.amount;
-    } else if (txn.transactionType === 'Expense') {
-      currentGroup.expense += txn.amount;
+    if (row.transactionType === 'Sale') {
+      currentGroup.sale += row.total;
+    } else if (row.transactionType === 'Sale Order') {
+      currentGroup.saleOrder += row.total;
+    } else if (row.transactionType === 'Expense') {
+      currentGroup.expense += row.total;
     }
-    currentGroup.count++;
+    currentGroup.count += row.count;
     dateGroups.set(groupKey, currentGroup);
   }
 
@@ -705,14 +739,7 @@ const CATEGORY_COLORS = [
 
 // Get P&L from Vyapar transactions (single source of truth for GearUp)
 export async function getVyaparPL(startDate: string, endDate: string, userId?: string, minAmount = 5000): Promise<MonthlyPL> {
-  const txns = await db
-    .select()
-    .from(vyaparTransactions)
-    .where(
-      userId
-        ? and(between(vyaparTransactions.date, startDate, endDate), eq(vyaparTransactions.userId, userId))
-        : between(vyaparTransactions.date, startDate, endDate)
-    );
+  const totals = await monthlyTotals('vyapar', startDate, endDate, userId, ['Sale', 'Expense']);
 
   // Revenue = Sale only, Expenses = Expense only (matches Dashboard getVyaparSummary)
   // Payment-In is cash receipt against Sale invoices (not additional income)
@@ -722,16 +749,16 @@ export async function getVyaparPL(startDate: string, endDate: string, userId?: s
   let revenue = 0;   // Sale only
   let expenses = 0;  // Expense only
 
-  for (const txn of txns) {
-    switch (txn.transactionType) {
+  for (const row of totals) {
+    switch (row.transactionType) {
       case 'Sale': {
-        revenue += txn.amount;
+        revenue += row.total;
         break;
       }
       case 'Expense': {
-        expenses += txn.amount;
-        const expCat = txn.categoryName || 'Uncategorized';
-        expenseByCategory.set(expCat, (expenseByCategory.get(expCat) || 0) + txn.amount);
+        expenses += row.total;
+        const expCat = row.categoryId || 'Uncategorized';
+        expenseByCategory.set(expCat, (expenseByCategory.get(expCat) || 0) + row.total);
         break;
       }
     }
@@ -834,30 +861,16 @@ export async function getVyaparPL(startDate: string, endDate: string, userId?: s
 
 // Get expense breakdown from Vyapar transactions
 export async function getVyaparExpenseBreakdown(startDate: string, endDate: string, userId?: string): Promise<ExpenseBreakdown[]> {
-  const txns = await db
-    .select()
-    .from(vyaparTransactions)
-    .where(
-      userId
-        ? and(
-            eq(vyaparTransactions.transactionType, 'Expense'),
-            between(vyaparTransactions.date, startDate, endDate),
-            eq(vyaparTransactions.userId, userId)
-          )
-        : and(
-            eq(vyaparTransactions.transactionType, 'Expense'),
-            between(vyaparTransactions.date, startDate, endDate)
-          )
-    );
+  const totals = await monthlyTotals('vyapar', startDate, endDate, userId, ['Expense']);
 
   // Group by categoryName
   const categoryTotals = new Map<string, number>();
   let totalExpense = 0;
 
-  for (const txn of txns) {
-    const category = txn.categoryName || 'Uncategorized';
-    categoryTotals.set(category, (categoryTotals.get(category) || 0) + txn.amount);
-    totalExpense += txn.amount;
+  for (const row of totals) {
+    const category = row.categoryId || 'Uncategorized';
+    categoryTotals.set(category, (categoryTotals.get(category) || 0) + row.total);
+    totalExpense += row.total;
   }
 
   const result: ExpenseBreakdown[] = [];
@@ -0,0 +1,102 @@
+/**
+ * Transaction Search
+ * Search conditions backed by the FTS5 trigram indexes in db/index.ts
+ * (bank narrations, Vyapar party names, invoice numbers and descriptions,
+ * credit card descriptions). Every word of the search must appear in the
+ * row; "quoted phrases" match as a whole. Trigrams match any substring of
+ * 3+ characters, so prefixes and partial words work like the LIKE filters
+ * this replaces; shorter words fall back to LIKE.
+ */
+
+import { and, or, like, sql, type SQL } from 'drizzle-orm';
+import type { SQLiteColumn } from 'drizzle-orm/sqlite-core';
+import { bankTransactions, vyaparTransactions, creditCardTransactions } from '../db/index.js';
+
+const MIN_INDEXED_LENGTH = 3; // Trigram tokenizer can't look up shorter strings
+
+const SEARCH_SOURCES = {
+  bank: {
+    table: bankTransactions,
+    fts: 'bank_transactions_fts',
+    columns: [bankTransactions.narration] as SQLiteColumn[],
+  },
+  vyapar: {
+    table: vyaparTransactions,
+    fts: 'vyapar_transactions_fts',
+    columns: [vyaparTransactions.partyName, vyaparTransactions.invoiceNumber, vyaparTransactions.description] as SQLiteColumn[],
+  },
+  creditCard: {
+    table: creditCardTransactions,
+    fts: 'credit_card_transactions_fts',
+    columns: [creditCardTransactions.description] as SQLiteColumn[],
+  },
+};
+
+export type SearchSource = keyof typeof SEARCH_SOURCES;
+
+/**
+ * Words and "quoted phrases" of a search string (a trailing * is dropped,
+ * since every term already matches as a prefix)
+ */
+function searchTerms(search: string): string[] {
+  const terms: string[] = [];
+  for (const match of search.matchAll(/"([^"]+)"|(\S+)/g)) {
+    const term = (match[1] ?? match[2]).replace(/\*+$/, '').trim();
+    if (term) terms.push(term);
+  }
+  return terms;
+}
+
+/**
+ * FTS5 MATCH expression requiring every indexable term, or null if no term
+ * is long enough for the index
+ */
+function ftsQuery(terms: string[]): string | null {
+  const indexed = terms.filter(t => t.length >= MIN_INDEXED_LENGTH);
+  if (indexed.length === 0) return null;
+  return indexed.map(t => `"${t.replace(/"/g, '""')}"`).join(' AND ');
+}
+
+// LIKE conditions for the terms too short for the trigram index
+function shortTermConditions(columns: SQLiteColumn[], terms: string[]): (SQL | undefined)[] {
+  return terms
+    .filter(t => t.length < MIN_INDEXED_LENGTH)
+    .map(term => or(...columns.map(column => like(column, `%${term}%`))));
+}
+
+/**
+ * WHERE condition matching rows that contain every term of the search
+ */
+export function searchCondition(source: SearchSource, search: string): SQL | undefined {
+  const { table, fts, columns } = SEARCH_SOURCES[source];
+  const terms = searchTerms(search);
+  const match = ftsQuery(terms);
+
+  return and(
+    match ? sql`${table}.rowid IN (SELECT rowid FROM ${sql.raw(fts)} WHERE ${sql.raw(fts)} MATCH ${match})` : undefined,
+    ...shortTermConditions(columns, terms)
+  );
+}
+
+/**
+ * Join that filters rows like searchCondition and exposes their bm25 rank
+ * (ascending = best first) for ORDER BY. Null when the search has no term
+ * long enough to rank; use searchCondition then.
+ */
+export function searchRank(source: SearchSource, search: string): { table: SQL; on: SQL; rank: SQL } | null {
+  const { table, fts, columns } = SEARCH_SOURCES[source];
+  const terms = searchTerms(search);
+  const match = ftsQuery(terms);
+  if (!match) return null;
+
+  const ftsTable = sql.raw(fts);
+  return {
+    table: ftsTable,
+    on: and(
+      sql`${ftsTable}.rowid = ${table}.rowid`,
+      sql`${ftsTable} MATCH ${match}`,
+      ...shortTermConditions(columns, terms)
+    )!,
+    rank: sql`${ftsTable}.rank`,
+  };
+}